@@ -1,6 +1,27 @@
 # Streaming/__init__.py
-from .menu import Menu
-from .arquivo_midia import ArquivoDeMidia
-from .playlist import Playlist
-from .usuarios import Usuario
-from .analises import Analises
\ No newline at end of file
+# Carregamento preguiçoso: cada classe só importa o seu módulo no primeiro acesso
+# (ex.: "from Streaming import Analises" não carrega o menu nem as playlists).
+from importlib import import_module
+
+_EXPORTS = {
+    "Menu": ".menu",
+    "ArquivoDeMidia": ".arquivo_midia",
+    "Playlist": ".playlist",
+    "Usuario": ".usuarios",
+    "Analises": ".analises",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(nome):
+    modulo = _EXPORTS.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(import_module(modulo, __name__), nome)
+    globals()[nome] = valor  # guarda para os próximos acessos
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,122 @@
+#\Streaming\agregados.py
+"""
+Agregados parciais do relatório, calculados por partes (shards) e combinados.
+
+Cada agregado do Analises vira um parcial que pode ser somado a outro:
+    top N músicas   -> N menores (-reproducoes, índice)   (heapq.nsmallest)
+    playlist/usuário mais popular -> menor (-valor, índice)
+    médias          -> (títulos, médias) na ordem do shard
+    total           -> soma
+O índice global desempata como no cálculo serial (ordenação estável e max()
+devolvendo o primeiro), então o resultado combinado é idêntico ao serial.
+
+Em Linux os processos são criados com fork e leem as listas herdadas da
+memória do processo principal (só os limites do shard são enviados);
+nos demais sistemas cada shard é serializado e enviado ao processo.
+"""
+import heapq
+import multiprocessing
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+# Coleções visíveis aos processos criados com fork (preenchido só durante o cálculo)
+_DADOS = {}
+
+# Abaixo disso, dividir em processos custa mais do que calcular direto
+LIMIAR_PARALELO = 20000
+
+
+# Parciais de cada coleção
+def parcial_musicas(musicas, inicio: int, top_n: int):
+    top = heapq.nsmallest(top_n, ((-m.reproducoes, inicio + i) for i, m in enumerate(musicas)))
+    titulos = [m.titulo.strip() for m in musicas]
+    medias = array("d", ((sum(a) / len(a)) if a else 0.0 for a in (m.avaliacoes or [] for m in musicas)))
+    return {"top": top, "titulos": titulos, "medias": medias}
+
+
+def parcial_playlists(playlists, inicio: int, top_n: int):
+    melhor = min(((-p.reproducoes, inicio + i) for i, p in enumerate(playlists)), default=None)
+    return {"melhor": melhor}
+
+
+def parcial_usuarios(usuarios, inicio: int, top_n: int):
+    tamanhos = [len(u.historico) for u in usuarios]
+    melhor = min(((-t, inicio + i) for i, t in enumerate(tamanhos)), default=None)
+    return {"melhor": melhor, "total": sum(tamanhos)}
+
+
+_PARCIAIS = {"musicas": parcial_musicas, "playlists": parcial_playlists, "usuarios": parcial_usuarios}
+
+
+# Executado em cada processo: recebe os limites do shard (e os dados, sem fork)
+def _executar(tarefa):
+    colecao, inicio, fim, top_n, dados = tarefa
+    fonte = dados if dados is not None else _DADOS[colecao][inicio:fim]
+    return colecao, inicio, _PARCIAIS[colecao](fonte, inicio, top_n)
+
+
+# Combina os parciais (na ordem dos shards) no formato do Analises
+def combinar(parciais, musicas, playlists, usuarios, top_n: int):
+    """Retorna (top, playlist mais popular, usuário mais ativo, médias, total)."""
+    por_colecao = {"musicas": [], "playlists": [], "usuarios": []}
+    for colecao, inicio, parcial in sorted(parciais, key=lambda x: (x[0], x[1])):
+        por_colecao[colecao].append(parcial)
+
+    ps = por_colecao["musicas"]
+    top = [musicas[i] for _, i in heapq.nsmallest(top_n, (t for p in ps for t in p["top"]))]
+    medias = {}
+    for p in ps:
+        medias.update(zip(p["titulos"], p["medias"]))
+
+    melhor = min((p["melhor"] for p in por_colecao["playlists"] if p["melhor"] is not None), default=None)
+    pl_pop = playlists[melhor[1]] if melhor else None
+
+    us = por_colecao["usuarios"]
+    melhor = min((p["melhor"] for p in us if p["melhor"] is not None), default=None)
+    user_ativo = usuarios[melhor[1]] if melhor else None
+    total = sum(p["total"] for p in us)
+    return top, pl_pop, user_ativo, medias, total
+
+
+# Divide [0, n) em até 'partes' faixas contíguas
+def _faixas(n: int, partes: int):
+    partes = max(1, min(partes, n))
+    passo, sobra = divmod(n, partes)
+    inicio = 0
+    for i in range(partes):
+        fim = inicio + passo + (1 if i < sobra else 0)
+        yield inicio, fim
+        inicio = fim
+
+
+def calcular(musicas, playlists, usuarios, top_n: int = 10, processos: int = None):
+    """
+    Calcula os agregados do relatório em paralelo (ou direto, para coleções pequenas).
+    processos=None usa os núcleos disponíveis.
+    """
+    musicas, playlists, usuarios = list(musicas), list(playlists), list(usuarios)
+    top_n = max(0, int(top_n))
+    processos = processos or os.cpu_count() or 1
+    colecoes = {"musicas": musicas, "playlists": playlists, "usuarios": usuarios}
+
+    if processos <= 1 or max(map(len, colecoes.values())) < LIMIAR_PARALELO:
+        parciais = [(c, 0, _PARCIAIS[c](dados, 0, top_n)) for c, dados in colecoes.items()]
+        return combinar(parciais, musicas, playlists, usuarios, top_n)
+
+    usa_fork = "fork" in multiprocessing.get_all_start_methods()
+    tarefas = []
+    for colecao, dados in colecoes.items():
+        # Coleções pequenas viram um shard só
+        partes = processos if len(dados) >= LIMIAR_PARALELO else 1
+        for inicio, fim in _faixas(len(dados), partes):
+            tarefas.append((colecao, inicio, fim, top_n, None if usa_fork else dados[inicio:fim]))
+
+    contexto = multiprocessing.get_context("fork" if usa_fork else None)
+    _DADOS.update(colecoes)
+    try:
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            parciais = list(executor.map(_executar, tarefas))
+    finally:
+        _DADOS.clear()
+    return combinar(parciais, musicas, playlists, usuarios, top_n)
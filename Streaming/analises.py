@@ -1,17 +1,11 @@
 #\Streaming\analises.py
 # Importação das bibliotecas necessárias e permitidas pelo trabalho
-import sys
-import os
-import math
-
 from datetime import datetime
 from pathlib import Path
 
-# Evita dependências externas; assume que Musica, Playlist e Usuario
-# já estão definidos no pacote Streaming
-from .arquivo_midia import ArquivoDeMidia  # para contexto de tipos/atributos
-from .playlist import Playlist
-from .usuarios import Usuario  # seu arquivo chama 'usuarios.py' (classe Usuario)
+# Evita dependências externas; trabalha com quaisquer objetos que tenham os
+# atributos de Musica, Playlist e Usuario (sem importar esses módulos)
+from .instrumentacao import instrumentar
 
 class Analises:
     """
@@ -23,6 +17,7 @@ class Analises:
     # Métodos obrigatórios estáticos
     # Estatísticas e relatórios solicitados
     @staticmethod
+    @instrumentar("analises.top_musicas_reproduzidas")
     def top_musicas_reproduzidas(musicas, top_n = 10):
         """
         Retorna uma lista com as n = 10 músicas mais reproduzidas.
@@ -35,6 +30,7 @@ class Analises:
         return ordenadas[:max(0, int(top_n))]
 
     @staticmethod
+    @instrumentar("analises.playlist_mais_popular")
     def playlist_mais_popular(playlists):
         """
         Retorna a playlist mais ouvida ou a de maior reproducoes.        
@@ -45,6 +41,7 @@ class Analises:
         return max(playlists, key=lambda p: p.reproducoes) if playlists else None
 
     @staticmethod
+    @instrumentar("analises.usuario_mais_ativo")
     def usuario_mais_ativo(usuarios):
         """
         Retorna o usuário que mais ouviu músicas ou o que tem maior tamanho de 'historico'.
@@ -55,6 +52,7 @@ class Analises:
         return max(usuarios, key=lambda u: len(u.historico)) if usuarios else None
 
     @staticmethod
+    @instrumentar("analises.media_avaliacoes")
     def media_avaliacoes(musicas):
         """
         Retorna um dicionário com as médias {titulo_da_musica: media_avaliacao(float)}.
@@ -67,6 +65,7 @@ class Analises:
         return medias
 
     @staticmethod
+    @instrumentar("analises.total_reproducoes")
     def total_reproducoes(usuarios):
         """
         Retorna o total de reproduções feitas por todos os usuários.
@@ -74,8 +73,159 @@ class Analises:
         return sum(len(u.historico or []) for u in usuarios)
 
 
+    # Agregados por grupo, lidos dos índices secundários (IndicesCatalogo)
+    @staticmethod
+    @instrumentar("analises.reproducoes_por_genero")
+    def reproducoes_por_genero(indices):
+        """
+        Retorna {genero: total de reproduções das músicas do gênero},
+        em ordem decrescente de reproduções.
+        """
+        totais = {g: sum(m.reproducoes for m in musicas) for g, musicas in indices.grupos_genero()}
+        return dict(sorted(totais.items(), key=lambda x: x[1], reverse=True))
+
+    @staticmethod
+    @instrumentar("analises.reproducoes_por_artista")
+    def reproducoes_por_artista(indices, top_n=None):
+        """
+        Retorna {artista: total de reproduções das mídias do artista},
+        em ordem decrescente; top_n limita a quantidade de artistas.
+        """
+        totais = {a: sum(m.reproducoes for m in midias) for a, midias in indices.grupos_artista()}
+        ordenados = sorted(totais.items(), key=lambda x: x[1], reverse=True)
+        return dict(ordenados if top_n is None else ordenados[:max(0, int(top_n))])
+
+    @staticmethod
+    def top_por_genero(indices, genero, top_n=10):
+        """Retorna as top_n músicas mais reproduzidas do gênero (consulta no índice)."""
+        return Analises.top_musicas_reproduzidas(indices.por_genero(genero), top_n)
+
+    # Estatísticas por janela de tempo, lidas das séries temporais (SeriesReproducoes)
+    @staticmethod
+    @instrumentar("analises.top_janela")
+    def top_janela(series, segundos=3600, top_n=10, instante=None):
+        """
+        Retorna [(midia, reproduções)] das top_n mídias mais tocadas nos últimos
+        'segundos' (padrão: última hora). Mídias sem reprodução na janela ficam de fora.
+        """
+        contagens = [(m, n) for m, n in series.contagens_janela(segundos, instante) if n > 0]
+        contagens.sort(key=lambda x: x[1], reverse=True)
+        return contagens[:max(0, int(top_n))]
+
+    @staticmethod
+    @instrumentar("analises.em_alta")
+    def em_alta(series, janela=3600, base=86400, top_n=10, instante=None):
+        """
+        Retorna [(midia, reproduções na janela, fator)] das mídias em alta:
+        fator = taxa na janela recente / taxa no restante do período base
+        (com suavização +1, para mídias novas não dividirem por zero).
+        """
+        recentes = dict((id(m), n) for m, n in series.contagens_janela(janela, instante))
+        saida = []
+        for m, total in series.contagens_janela(base, instante):
+            n = recentes.get(id(m), 0)
+            if n <= 0:
+                continue
+            taxa_recente = n / janela
+            taxa_base = (max(0, total - n) + 1) / max(1, base - janela)
+            saida.append((m, n, taxa_recente / taxa_base))
+        saida.sort(key=lambda x: (x[2], x[1]), reverse=True)
+        return saida[:max(0, int(top_n))]
+
+    @staticmethod
+    def tendencia_diaria(series, midia, dias=7, instante=None):
+        """Retorna as reproduções da mídia por dia, do mais antigo ao dia atual."""
+        return series.serie(midia, "dia", dias, instante)
+
+    # Modo aproximado: estimativas dos sketches (AnalisesAproximadas), com memória fixa
+    @staticmethod
+    def ouvintes_distintos(aprox, titulo=None):
+        """
+        Estimativa de ouvintes distintos da mídia (ou de todo o sistema se titulo=None).
+        Erro padrão relativo ~ 1.04 / sqrt(2**p) (HyperLogLog).
+        """
+        if titulo is None:
+            return aprox.ouvintes_total.contar()
+        hll = aprox.ouvintes.get(titulo)
+        return hll.contar() if hll is not None else 0
+
+    @staticmethod
+    @instrumentar("analises.usuarios_mais_ativos_aprox")
+    def usuarios_mais_ativos_aprox(aprox, top_n=10):
+        """Retorna [(nome, reproduções estimadas)]; superestima no máximo epsilon * total, com probabilidade >= 1 - delta."""
+        return aprox.usuarios_top.top(top_n)
+
+    @staticmethod
+    @instrumentar("analises.midias_mais_tocadas_aprox")
+    def midias_mais_tocadas_aprox(aprox, top_n=10):
+        """Retorna [(titulo, reproduções estimadas)]; superestima no máximo epsilon * total, com probabilidade >= 1 - delta."""
+        return aprox.midias_top.top(top_n)
+
+    @staticmethod
+    def quantis_duracao(aprox, quantis=(0.5, 0.9, 0.99)):
+        """Retorna {quantil: duração em segundos} das mídias tocadas (TDigest)."""
+        return {q: aprox.duracoes.quantil(q) for q in quantis}
+
+    @staticmethod
+    def quantis_reproducoes(midias, quantis=(0.5, 0.9, 0.99), compressao=100):
+        """Retorna {quantil: reproduções} da distribuição de reproduções por mídia (TDigest)."""
+        from .sketches import TDigest
+
+        digest = TDigest(compressao)
+        for m in midias:
+            digest.adicionar(m.reproducoes)
+        return {q: digest.quantil(q) for q in quantis}
+
+    @staticmethod
+    @instrumentar("analises.salvar_relatorio")
+    def salvar_relatorio(musicas, playlists, usuarios, top_n=10, pasta="Relatório", arquivo="relatorio.txt",
+                         indices=None, series=None, aprox=None, processos=1):       
+        """
+        Grava o relatório em pasta/arquivo e retorna o caminho.
+        Se 'indices' (IndicesCatalogo) for informado, inclui os totais por gênero e por artista.
+        Se 'series' (SeriesReproducoes) for informado, inclui o top da última hora e as mídias em alta.
+        Se 'aprox' (AnalisesAproximadas) for informado, inclui as estimativas do modo aproximado.
+        Com processos > 1 (ou None = todos os núcleos) os agregados são calculados em paralelo.
+        """
+        linhas = Analises.montar_relatorio(musicas, playlists, usuarios, top_n,
+                                           indices=indices, series=series, aprox=aprox, processos=processos)
+        return Analises.gravar_relatorio(linhas, pasta, arquivo)
+
+    # Grava linhas já montadas (relatório completo ou materializado) e retorna o caminho
     @staticmethod
-    def salvar_relatorio(musicas, playlists, usuarios, top_n=10, pasta="Relatório", arquivo="relatorio.txt"):       
+    def gravar_relatorio(linhas, pasta="Relatório", arquivo="relatorio.txt"):
+        # Grava no arquivo Relatório/relatorio.txt
+        dirp = Path(pasta)
+        dirp.mkdir(parents=True, exist_ok=True)
+        destino = dirp / arquivo
+        destino.write_text("\n".join(linhas), encoding="utf-8")
+        return destino
+
+    # Exporta as métricas por música (csv, jsonl, colunar ou formato registrado) em lotes
+    @staticmethod
+    @instrumentar("analises.exportar_metricas")
+    def exportar_metricas(musicas, formato="csv", pasta="Relatório", arquivo=None, lote=None):
+        """
+        Grava uma linha de métricas por música (id, título, artista, gênero, duração,
+        reproduções, quantidade e média das avaliações) e retorna (caminho, linhas).
+        As linhas são geradas e gravadas lote a lote (ver Streaming.exportacao).
+        """
+        from .exportacao import ESCRITORES, LOTE_PADRAO, exportar, metricas_musicas
+
+        classe = ESCRITORES.get(formato)
+        destino = Path(pasta) / (arquivo or f"metricas{classe.extensao if classe else ''}")
+        linhas = exportar(metricas_musicas(musicas, lote or LOTE_PADRAO), formato, destino)
+        return destino, linhas
+
+    # Agregados principais do relatório, em série ou em paralelo (mesmo resultado)
+    @staticmethod
+    @instrumentar("analises.agregados_relatorio")
+    def agregados_relatorio(musicas, playlists, usuarios, top_n=10, processos=1):
+        """Retorna (top, playlist mais popular, usuário mais ativo, médias, total de reproduções)."""
+        if processos is None or processos > 1:
+            from .agregados import calcular
+
+            return calcular(musicas, playlists, usuarios, top_n, processos)
 
         # Coletas a partir dos próprios métodos da classe
         top = Analises.top_musicas_reproduzidas(musicas, top_n)
@@ -83,55 +233,147 @@ class Analises:
         user_ativo = Analises.usuario_mais_ativo(usuarios)
         medias = Analises.media_avaliacoes(musicas)
         total_rep = Analises.total_reproducoes(usuarios)
+        return top, pl_pop, user_ativo, medias, total_rep
 
-        # Monta o texto
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        linhas = []
-        linhas.append("=== Relatório de Análises ===")
-        linhas.append(f"Gerado em: {ts}")
-        linhas.append("")
-        linhas.append("— Resumo —")
-        linhas.append(f"Total de usuários: {len(usuarios)}")
-        linhas.append(f"Total de músicas: {len(musicas)}")
-        linhas.append(f"Total de playlists: {len(playlists)}")
-        linhas.append(f"Total de reproduções (históricos de usuários): {total_rep}")
-        linhas.append("")
+    # Monta as linhas do relatório (sem gravar)
+    @staticmethod
+    def montar_relatorio(musicas, playlists, usuarios, top_n=10, indices=None, series=None, aprox=None,
+                         processos=1, gerado_em=None):
+        top, pl_pop, user_ativo, medias, total_rep = Analises.agregados_relatorio(
+            musicas, playlists, usuarios, top_n, processos)
 
-        linhas.append(f"— Top {top_n} músicas por reproduções —")
+        # Monta o texto, seção por seção
+        linhas = Analises.secao_cabecalho(gerado_em)
+        linhas += Analises.secao_resumo(len(usuarios), len(musicas), len(playlists), total_rep)
+        linhas += Analises.secao_top(top, top_n)
+        linhas += Analises.secao_playlist(pl_pop)
+        linhas += Analises.secao_usuario(user_ativo)
+        linhas += Analises.secao_medias(medias)
+        if indices is not None:
+            linhas += Analises.secao_grupos(Analises.reproducoes_por_genero(indices),
+                                            Analises.reproducoes_por_artista(indices, top_n), top_n)
+        if series is not None:
+            linhas += Analises.secao_series(series, top_n)
+        if aprox is not None:
+            linhas += Analises.secao_aproximada(aprox, top_n)
+        return linhas
+
+    # Seções do relatório (cada uma retorna suas linhas, já com a linha em branco final)
+    @staticmethod
+    def secao_cabecalho(gerado_em=None):
+        ts = (gerado_em or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+        return ["=== Relatório de Análises ===", f"Gerado em: {ts}", ""]
+
+    @staticmethod
+    def secao_resumo(qtde_usuarios, qtde_musicas, qtde_playlists, total_rep):
+        return ["— Resumo —",
+                f"Total de usuários: {qtde_usuarios}",
+                f"Total de músicas: {qtde_musicas}",
+                f"Total de playlists: {qtde_playlists}",
+                f"Total de reproduções (históricos de usuários): {total_rep}",
+                ""]
+
+    @staticmethod
+    def secao_top(top, top_n):
+        linhas = [f"— Top {top_n} músicas por reproduções —"]
         if top:
             for i, m in enumerate(top, start=1):
                 linhas.append(f"{i:02d}. '{m.titulo}' — {m.artista} | reproduções: {m.reproducoes}")
         else:
             linhas.append("Nenhuma música cadastrada.")
         linhas.append("")
+        return linhas
 
-        linhas.append("— Playlist mais popular —")
+    @staticmethod
+    def secao_playlist(pl_pop):
+        linhas = ["— Playlist mais popular —"]
         if pl_pop:
             linhas.append(f"'{pl_pop.nome}' — criador: {pl_pop.dono} | itens: {len(pl_pop)} | reproduções: {pl_pop.reproducoes}")
         else:
             linhas.append("Nenhuma playlist cadastrada.")
         linhas.append("")
+        return linhas
 
-        linhas.append("— Usuário mais ativo —")
+    @staticmethod
+    def secao_usuario(user_ativo):
+        linhas = ["— Usuário mais ativo —"]
         if user_ativo:
             linhas.append(f"{user_ativo.nome} — músicas no histórico: {len(getattr(user_ativo, 'historico', []))}")
         else:
             linhas.append("Nenhum usuário cadastrado.")
         linhas.append("")
+        return linhas
 
-        linhas.append("— Médias de avaliações por música —")
+    @staticmethod
+    def secao_medias(medias):
+        linhas = ["— Médias de avaliações por música —"]
         if medias:
             for titulo, media in medias.items():
                 linhas.append(f"'{titulo}': {media:.2f}")
         else:
             linhas.append("Nenhuma música com avaliações.")
         linhas.append("")
+        return linhas
 
-        # Grava no arquivo Relatório/relatorio.txt
-        dirp = Path(pasta)
-        dirp.mkdir(parents=True, exist_ok=True)
-        destino = dirp / arquivo
-        destino.write_text("\n".join(linhas), encoding="utf-8")
-        return destino
+    @staticmethod
+    def secao_grupos(por_genero, por_artista, top_n):
+        linhas = ["— Reproduções por gênero —"]
+        if por_genero:
+            for genero, total in por_genero.items():
+                linhas.append(f"{genero}: {total}")
+        else:
+            linhas.append("Nenhuma música cadastrada.")
+        linhas.append("")
+
+        linhas.append(f"— Top {top_n} artistas por reproduções —")
+        if por_artista:
+            for i, (artista, total) in enumerate(por_artista.items(), start=1):
+                linhas.append(f"{i:02d}. {artista}: {total}")
+        else:
+            linhas.append("Nenhuma mídia cadastrada.")
+        linhas.append("")
+        return linhas
+
+    @staticmethod
+    def secao_series(series, top_n):
+        linhas = [f"— Top {top_n} da última hora —"]
+        top_hora = Analises.top_janela(series, 3600, top_n)
+        if top_hora:
+            for i, (m, n) in enumerate(top_hora, start=1):
+                linhas.append(f"{i:02d}. '{m.titulo}' — {m.artista} | reproduções: {n}")
+        else:
+            linhas.append("Nenhuma reprodução na última hora.")
+        linhas.append("")
+
+        linhas.append("— Em alta (última hora x últimas 24 horas) —")
+        alta = Analises.em_alta(series, 3600, 86400, top_n)
+        if alta:
+            for i, (m, n, fator) in enumerate(alta, start=1):
+                linhas.append(f"{i:02d}. '{m.titulo}' — {m.artista} | reproduções: {n} | fator: {fator:.1f}x")
+        else:
+            linhas.append("Nenhuma mídia em alta.")
+        linhas.append("")
+        return linhas
+
+    @staticmethod
+    def secao_aproximada(aprox, top_n):
+        linhas = ["— Estimativas (modo aproximado) —",
+                  f"Ouvintes distintos (estimado): {Analises.ouvintes_distintos(aprox)}"]
+        sketch = aprox.usuarios_top.sketch
+        linhas.append(f"Erro das contagens: até +{sketch.epsilon * sketch.total:.0f} "
+                      f"(epsilon={sketch.epsilon:.4f}, com probabilidade >= {1 - sketch.delta:.4f}) "
+                      f"| memória: {aprox.memoria_bytes()} bytes")
+        linhas.append("Usuários mais ativos:")
+        for i, (nome, n) in enumerate(Analises.usuarios_mais_ativos_aprox(aprox, top_n), start=1):
+            linhas.append(f"{i:02d}. {nome}: ~{n}")
+        linhas.append("Mídias mais tocadas (reproduções estimadas):")
+        for i, (titulo, n) in enumerate(Analises.midias_mais_tocadas_aprox(aprox, top_n), start=1):
+            linhas.append(f"{i:02d}. '{titulo}': ~{n} ({Analises.ouvintes_distintos(aprox, titulo)} ouvintes)")
+        quantis = Analises.quantis_duracao(aprox)
+        if aprox.duracoes.total:
+            linhas.append("Duração tocada: " + " | ".join(
+                f"p{int(q * 100)}: {v:.0f}s" for q, v in quantis.items()))
+        linhas.append("")
+        return linhas
 
  
@@ -1,8 +1,93 @@
 #\Streaming\arquivo_midia.py
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 from abc import ABC, abstractmethod
 
+from .instrumentacao import instrumentar
+from .concorrencia import TRAVAS
+from .ids import registro_atual
+
+class CacheTextos:
+    """
+    Cache LRU dos textos de config/<titulo>.txt (letras e descrições).
+    - Cada entrada guarda o (mtime, tamanho) do arquivo lido; a consulta faz
+      só um stat() e relê o arquivo apenas se ele mudou.
+    - Com 'validade' (pré-carga da fila de reprodução), uma entrada conferida
+      há menos de 'validade' segundos é usada sem stat(), e a ausência do
+      arquivo também fica guardada (texto None).
+    - No máximo 'max_itens' textos em memória; o menos usado sai primeiro.
+    - invalidar() descarta uma entrada (ex.: o observador de config/ viu o
+      arquivo mudar ou sumir) ou todas.
+    """
+
+    def __init__(self, max_itens: int = 256, relogio=time.monotonic):
+        self.max_itens = max(1, int(max_itens))
+        self.relogio = relogio
+        self._itens = OrderedDict()     # caminho -> ((mtime_ns, tamanho) ou None, texto, conferido em)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.leituras = 0
+
+    def ler(self, caminho, validade: float = 0.0):
+        """Texto do arquivo (sem espaços nas pontas) ou None se ele não existir."""
+        chave = str(caminho)
+        agora = self.relogio()
+        if validade > 0:
+            item = self._itens.get(chave)
+            if item is not None and agora - item[2] < validade:
+                self.acertos += 1
+                return item[1]
+        try:
+            st = os.stat(chave)
+        except OSError:
+            if validade > 0:
+                self._guardar(chave, None, None, agora)
+            elif chave in self._itens:
+                self.invalidar(chave)
+            return None
+        versao = (st.st_mtime_ns, st.st_size)
+        with self._trava:
+            item = self._itens.get(chave)
+            if item is not None and item[0] == versao:
+                self._itens[chave] = (versao, item[1], agora)
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[1]
+        texto = Path(chave).read_text(encoding="utf-8").strip()
+        self.leituras += 1
+        self._guardar(chave, versao, texto, agora)
+        return texto
+
+    def _guardar(self, chave: str, versao, texto, agora: float) -> None:
+        with self._trava:
+            self._itens[chave] = (versao, texto, agora)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, caminho=None) -> None:
+        with self._trava:
+            if caminho is None:
+                self._itens.clear()
+            else:
+                self._itens.pop(str(caminho), None)
+
+    def __len__(self):
+        return len(self._itens)
+
+
+# Cache compartilhado pelas mídias (o arquivo é o mesmo para mídias de mesmo título)
+TEXTOS = CacheTextos()
+
+# Pasta dos textos config/<titulo>.txt
+PASTA_CONFIG = Path(__file__).parents[1] / "config"
+
+
 class ArquivoDeMidia (ABC):
     """
     Classe de um arquivo de mídia genérico (música, podcast, álbum, etc.)
@@ -11,10 +96,10 @@ class ArquivoDeMidia (ABC):
     Atributos adicionais são definidos nas subclasses.
     """
 
-    # Lista das instâncias dos objeto de mídia (podcast + música)
-    # Atributo de classe (compartilhado por todas as instâncias)
-    registroMidia = []  
-    
+    # As instâncias não ficam num registro global: quem as guarda é o Catalogo
+    # do app (Streaming/catalogo.py); o registro de IDs (o do app que as criou
+    # ou incluiu) só as vincula por weakref
+
     @abstractmethod
     def __init__(self, titulo: str, duracao: int, artista: str, reproducoes: int = 0):
         
@@ -22,30 +107,68 @@ class ArquivoDeMidia (ABC):
         self.duracao = duracao               # duração em segundos (int)
         self.artista = artista
         self.reproducoes = reproducoes       # contador de execuções iniciado em zero
-   
-        # adiciona qualquer instância (música ou podcast) como objeto 
-        # em um registro geral de mídia
-        ArquivoDeMidia.registroMidia.append(self)
+        # ID inteiro do registro de IDs; históricos guardam este ID, não o título
+        self._registro = registro_atual()
+        self.id = self._registro.midias.id(titulo)
+        self._registro.midias.vincular(self.id, self)
 
+    # Obsoleto: procura só no registro de IDs em uso (fora de um app, o global IDS),
+    # não no catálogo do app; use o catálogo dono (Catalogo.buscar)
     @classmethod
     def buscar_por_titulo(cls, titulo: str):
-        t = titulo.strip().lower()
-        for m in cls.registroMidia:
-            if m.titulo.strip().lower() == t:
-                return m
-        return None
+        warnings.warn("ArquivoDeMidia.buscar_por_titulo está obsoleto; use Catalogo.buscar do app.",
+                      DeprecationWarning, stacklevel=2)
+        midias = registro_atual().midias
+        i = midias.procurar(titulo)
+        return None if i is None else midias.objeto(i)
+
+    # Renomeia a mídia; históricos que guardam o ID passam a mostrar o título novo.
+    # Só o registro de IDs muda: mídia de um app é renomeada por StreamingApp.renomear_midia
+    # (catálogo, busca e banco acompanham)
+    def renomear(self, novo: str) -> None:
+        novo = (novo or "").strip()
+        if not novo:
+            raise ValueError("O título não pode ser vazio.")
+        self._registro.midias.renomear(self.id, novo)
+        self.titulo = novo
+
+    # Passa para o registro de IDs do app que incluiu a mídia (criada fora dele)
+    def _mudar_registro(self, registro) -> None:
+        if registro is self._registro:
+            return
+        self._registro = registro
+        self.id = registro.midias.id(self.titulo)
+        registro.midias.vincular(self.id, self)
+
+    # O registro fica no processo: ao desserializar, o ID é obtido de novo pelo título
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        estado.pop("_registro", None)
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._registro = registro_atual()
+        self.id = self._registro.midias.id(self.titulo)
+        self._registro.midias.vincular(self.id, self)
    
+    # Caminho do arquivo config/<titulo>.txt (letra ou descrição)
+    def caminho_texto_config(self) -> Path:
+        return PASTA_CONFIG / f"{self.titulo}.txt"
+
     # Inovação: leitura de arquivo .txt com a letra da música ou descrição do podcast
+    @instrumentar("midia.ler_texto_config")
     def _ler_texto_config(self) -> str:
         """
         Lê o arquivo config/<titulo>.txt e retorna seu conteúdo como string.
         Se o arquivo não existir, retorna aviso.
+        O texto vem do cache TEXTOS (relido só se o arquivo mudar).
         """
         try:
-            base = Path(__file__).parents[1] / "config"
-            caminho = base / f"{self.titulo}.txt"
-            if caminho.exists():
-                return caminho.read_text(encoding="utf-8").strip()
+            caminho = self.caminho_texto_config()
+            texto = TEXTOS.ler(caminho)
+            if texto is not None:
+                return texto
             else:
                 return f"[Aviso] Arquivo '{caminho.name}' não encontrado em /config."
         except Exception as e:
@@ -55,10 +178,18 @@ class ArquivoDeMidia (ABC):
     # Métodos obrigatórios especiais
     # Simula a execução do arquivo de mídia, mostra na tela as informações 
     # contendo título, artista e duração
-    def reproduzir(self) -> None:
+    @instrumentar("midia.reproduzir")
+    def reproduzir(self, interativo: bool = True) -> None:
         """Simula a execução do arquivo de mídia, incrementando reproduções 
-        e exibe as informações e se exsitir a letra."""
-        self.reproducoes += 1
+        e exibe as informações e se exsitir a letra.
+        Com interativo=False apenas contabiliza (sem saída e sem pedir avaliação)."""
+        # Incremento protegido: várias sessões podem tocar a mesma mídia ao mesmo tempo
+        with TRAVAS.para(self):
+            self.reproducoes += 1
+        # Publica a reprodução (séries temporais, agregados); sem assinantes não custa nada
+        self._registro.eventos.emitir("reproducao", midia=self)
+        if not interativo:
+            return
         print(f"-> Reproduzindo: '{self.titulo}' — {self.artista} "
               f" Duração: {self.duracao} segundos. Total de reproduções: {self.reproducoes})")
         # Lê o arquivo midia.txt e imprime seu conteúdo
@@ -70,6 +201,15 @@ class ArquivoDeMidia (ABC):
         if callable(avaliar):
             avaliar()         
 
+    # Soma de uma vez várias reproduções acumuladas (escrita adiada)
+    def somar_reproducoes(self, qtde: int) -> None:
+        """Aplica 'qtde' reproduções num único incremento e publica um único evento."""
+        if qtde <= 0:
+            return
+        with TRAVAS.para(self):
+            self.reproducoes += qtde
+        self._registro.eventos.emitir("reproducao", midia=self, qtde=qtde)
+
     #  Compara dois arquivos de mídia (mesmo título e artista).
     def __eq__(self, other) -> bool:
         """Dois arquivos são iguais se título e artista forem iguais, ignora espaços e case."""
@@ -145,13 +285,23 @@ class Musica(ArquivoDeMidia):
             return False
             
         # Adiciona a nota se estiver no intervalo válido na lista de avaliações
-        self.avaliacoes.append(nota)
+        self.registrar_avaliacao(nota)
         media = sum(self.avaliacoes) / len(self.avaliacoes)
         print(f"Avaliação registrada: {nota}.\n" 
               f"Média atual: {media:.2f}.\n"
               f"Mídia com {len(self.avaliacoes)} avaliação(ões).")
         return True
 
+    # Registra uma nota sem interação (usado pelo avaliar e pela linha de comando)
+    def registrar_avaliacao(self, nota: int) -> bool:
+        """Adiciona a nota se for um inteiro de 0 a 5. Retorna True se adicionou."""
+        if isinstance(nota, bool) or not isinstance(nota, int) or not 0 <= nota <= 5:
+            return False
+        with TRAVAS.para(self):
+            self.avaliacoes.append(nota)
+        self._registro.eventos.emitir("avaliacao", midia=self, nota=nota)
+        return True
+
     # Métodos obrigatórios gerais
     # ToString
     def __str__(self):
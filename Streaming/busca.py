@@ -0,0 +1,295 @@
+#\Streaming\busca.py
+import json
+import math
+import os
+import re
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+
+from .instrumentacao import instrumentar
+
+
+_PALAVRA = re.compile(r"[a-z0-9]+")
+
+
+# Normalização: minúsculas e sem acentos ("Inteligência" -> "inteligencia")
+def normalizar(texto: str) -> str:
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+
+# Quebra o texto normalizado em termos alfanuméricos
+def tokenizar(texto: str) -> list:
+    return _PALAVRA.findall(normalizar(texto))
+
+
+# Trigramas de um termo, com bordas ("rock" -> "$ro", "roc", "ock", "ck$")
+def trigramas(termo: str) -> set:
+    t = f"${termo}$"
+    return {t[i:i + 3] for i in range(len(t) - 2)}
+
+
+class IndiceBusca:
+    """
+    Índice invertido para busca textual nas mídias.
+    - Campos indexados (com peso): titulo, artista, genero, host e o texto de config/<titulo>.txt.
+    - Termos sem acento e em minúsculas; ranking BM25 com frequências ponderadas por campo.
+    - Casamento por prefixo (último termo da consulta) e aproximado por trigramas (erros de digitação).
+    - Atualização incremental (adicionar/remover) e persistência em JSON.
+      Cada documento guarda uma assinatura (metadados + mtime/tamanho do .txt);
+      ao recarregar, só é reindexado o que mudou.
+    """
+
+    PESOS = {"titulo": 3.0, "artista": 2.0, "genero": 1.5, "host": 1.5, "texto": 1.0}
+    K1 = 1.2
+    B = 0.75
+    VERSAO = 1
+
+    def __init__(self):
+        self._chaves = []          # doc_id -> chave do documento (None se removido)
+        self._por_chave = {}       # chave -> doc_id
+        self._assinaturas = []     # doc_id -> assinatura usada para detectar mudanças
+        self._tamanhos = []        # doc_id -> comprimento ponderado do documento
+        self._termos_doc = []      # doc_id -> termos do documento (para remoção)
+        self._postings = {}        # termo -> {doc_id: frequência ponderada}
+        self._midias = {}          # doc_id -> objeto de mídia (não é persistido)
+        self._total_tamanho = 0.0
+        self._ativos = 0
+        # Estruturas auxiliares montadas sob demanda
+        self._vocabulario = None   # termos ordenados (prefixo)
+        self._trigramas = None     # trigrama -> {termos}
+        self.alterado = False
+
+    # Chave estável do documento: tipo + título normalizado
+    @staticmethod
+    def chave(midia) -> str:
+        return f"{midia.__class__.__name__}:{midia.titulo.strip().lower()}"
+
+    # Assinatura: muda quando algum campo indexado ou o .txt muda
+    @staticmethod
+    def assinatura(midia) -> str:
+        caminho = midia.caminho_texto_config()
+        try:
+            st = os.stat(caminho)
+            arq = f"{st.st_mtime_ns}:{st.st_size}"
+        except OSError:
+            arq = "-"
+        campos = [getattr(midia, c, "") or "" for c in ("artista", "genero", "host")]
+        return "|".join([*campos, arq])
+
+    def __len__(self):
+        return self._ativos
+
+    def __contains__(self, midia):
+        return self.chave(midia) in self._por_chave
+
+    # Atualização incremental
+    @instrumentar("busca.adicionar")
+    def adicionar(self, midia, assinatura: str = None) -> bool:
+        """
+        Indexa (ou reindexa) a mídia. Se ela já estiver indexada com a mesma
+        assinatura, apenas associa o objeto. Retorna True se tokenizou de novo.
+        """
+        chave = self.chave(midia)
+        assinatura = assinatura if assinatura is not None else self.assinatura(midia)
+        doc = self._por_chave.get(chave)
+        if doc is not None and self._assinaturas[doc] == assinatura:
+            self._midias[doc] = midia
+            return False
+        if doc is not None:
+            self._remover_doc(doc)
+
+        campos = {
+            "titulo": midia.titulo,
+            "artista": getattr(midia, "artista", ""),
+            "genero": getattr(midia, "genero", ""),
+            "host": getattr(midia, "host", ""),
+            "texto": self._ler_texto(midia),
+        }
+        freq = {}
+        tamanho = 0.0
+        for campo, valor in campos.items():
+            peso = IndiceBusca.PESOS[campo]
+            for termo in tokenizar(valor):
+                freq[termo] = freq.get(termo, 0.0) + peso
+                tamanho += peso
+
+        doc = len(self._chaves)
+        self._chaves.append(chave)
+        self._assinaturas.append(assinatura)
+        self._tamanhos.append(tamanho)
+        self._termos_doc.append(list(freq))
+        self._por_chave[chave] = doc
+        self._midias[doc] = midia
+        self._total_tamanho += tamanho
+        self._ativos += 1
+        for termo, f in freq.items():
+            lista = self._postings.get(termo)
+            if lista is None:
+                lista = self._postings[termo] = {}
+                self._novo_termo(termo)
+            lista[doc] = f
+        self.alterado = True
+        return True
+
+    def remover(self, midia) -> bool:
+        doc = self._por_chave.get(self.chave(midia))
+        if doc is None:
+            return False
+        self._remover_doc(doc)
+        return True
+
+    def _remover_doc(self, doc: int) -> None:
+        for termo in self._termos_doc[doc]:
+            lista = self._postings.get(termo)
+            if lista is not None:
+                lista.pop(doc, None)
+                if not lista:
+                    del self._postings[termo]
+                    self._vocabulario = None
+                    if self._trigramas is not None:
+                        for tg in trigramas(termo):
+                            self._trigramas.get(tg, set()).discard(termo)
+        del self._por_chave[self._chaves[doc]]
+        self._total_tamanho -= self._tamanhos[doc]
+        self._ativos -= 1
+        self._chaves[doc] = None
+        self._termos_doc[doc] = []
+        self._tamanhos[doc] = 0.0
+        self._midias.pop(doc, None)
+        self.alterado = True
+
+    def podar(self, midias) -> int:
+        """Remove os documentos que não estão em 'midias'; retorna quantos removeu."""
+        vivas = {self.chave(m) for m in midias}
+        mortos = [d for c, d in self._por_chave.items() if c not in vivas]
+        for d in mortos:
+            self._remover_doc(d)
+        return len(mortos)
+
+    def _novo_termo(self, termo: str) -> None:
+        self._vocabulario = None
+        if self._trigramas is not None:
+            for tg in trigramas(termo):
+                self._trigramas.setdefault(tg, set()).add(termo)
+
+    # Lê o .txt da mídia apenas se existir (o aviso de ausência não é indexado)
+    @staticmethod
+    def _ler_texto(midia) -> str:
+        try:
+            return midia.caminho_texto_config().read_text(encoding="utf-8")
+        except OSError:
+            return ""
+
+    # Consulta
+    def _expandir(self, termo: str, prefixo: bool):
+        """Retorna [(termo_do_indice, peso)] para um termo da consulta."""
+        expansoes = {}
+        if termo in self._postings:
+            expansoes[termo] = 1.0
+        if prefixo and len(termo) >= 2:
+            if self._vocabulario is None:
+                self._vocabulario = sorted(self._postings)
+            i = bisect_left(self._vocabulario, termo)
+            while i < len(self._vocabulario) and self._vocabulario[i].startswith(termo):
+                t = self._vocabulario[i]
+                expansoes.setdefault(t, 0.8)
+                i += 1
+        if not expansoes and len(termo) >= 3:
+            if self._trigramas is None:
+                self._trigramas = {}
+                for t in self._postings:
+                    for tg in trigramas(t):
+                        self._trigramas.setdefault(tg, set()).add(t)
+            alvo = trigramas(termo)
+            comuns = {}
+            for tg in alvo:
+                for t in self._trigramas.get(tg, ()):
+                    comuns[t] = comuns.get(t, 0) + 1
+            for t, c in comuns.items():
+                sim = c / (len(alvo) + len(trigramas(t)) - c)  # Jaccard dos trigramas
+                if sim >= 0.4:
+                    expansoes[t] = 0.7 * sim
+        return expansoes.items()
+
+    @instrumentar("busca.buscar")
+    def buscar(self, consulta: str, limite: int = 10, prefixo: bool = True, aproximado: bool = True):
+        """
+        Retorna [(midia, pontuacao)] em ordem decrescente de relevância (BM25).
+        O último termo da consulta também casa por prefixo ("bohem" -> "bohemian").
+        Termos sem correspondência exata tentam casamento aproximado por trigramas.
+        """
+        termos = tokenizar(consulta)
+        if not termos or not self._ativos:
+            return []
+        media_tam = self._total_tamanho / self._ativos or 1.0
+        n = self._ativos
+        pontos = {}
+        for i, termo in enumerate(termos):
+            usar_prefixo = prefixo and i == len(termos) - 1
+            for t, peso in self._expandir(termo, usar_prefixo):
+                if not aproximado and peso < 0.8:
+                    continue
+                lista = self._postings[t]
+                idf = math.log(1 + (n - len(lista) + 0.5) / (len(lista) + 0.5))
+                for doc, f in lista.items():
+                    norm = IndiceBusca.K1 * (1 - IndiceBusca.B + IndiceBusca.B * self._tamanhos[doc] / media_tam)
+                    pontos[doc] = pontos.get(doc, 0.0) + peso * idf * f * (IndiceBusca.K1 + 1) / (f + norm)
+
+        melhores = sorted(pontos.items(), key=lambda x: (-x[1], x[0]))
+        resultado = []
+        for doc, p in melhores:
+            midia = self._midias.get(doc)
+            if midia is not None:
+                resultado.append((midia, p))
+                if len(resultado) >= limite:
+                    break
+        return resultado
+
+    # Persistência
+    def salvar(self, caminho) -> Path:
+        """Grava o índice compactado (sem documentos removidos) em JSON."""
+        vivos = [d for d, c in enumerate(self._chaves) if c is not None]
+        novo_id = {d: i for i, d in enumerate(vivos)}
+        dados = {
+            "versao": IndiceBusca.VERSAO,
+            "chaves": [self._chaves[d] for d in vivos],
+            "assinaturas": [self._assinaturas[d] for d in vivos],
+            "tamanhos": [self._tamanhos[d] for d in vivos],
+            "postings": {t: [[novo_id[d], f] for d, f in lista.items()]
+                         for t, lista in self._postings.items()},
+        }
+        destino = Path(caminho)
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_suffix(destino.suffix + ".tmp")
+        temporario.write_text(json.dumps(dados, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(temporario, destino)
+        self.alterado = False
+        return destino
+
+    @classmethod
+    def carregar(cls, caminho):
+        """Lê um índice salvo; se não existir ou for de outra versão, retorna um índice vazio."""
+        indice = cls()
+        try:
+            dados = json.loads(Path(caminho).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return indice
+        if dados.get("versao") != cls.VERSAO:
+            return indice
+        indice._chaves = list(dados["chaves"])
+        indice._assinaturas = list(dados["assinaturas"])
+        indice._tamanhos = list(dados["tamanhos"])
+        indice._termos_doc = [[] for _ in indice._chaves]
+        indice._por_chave = {c: d for d, c in enumerate(indice._chaves)}
+        for termo, lista in dados["postings"].items():
+            indice._postings[termo] = {d: f for d, f in lista}
+            for d, _ in lista:
+                indice._termos_doc[d].append(termo)
+        indice._total_tamanho = sum(indice._tamanhos)
+        indice._ativos = len(indice._chaves)
+        return indice
+
+    def __repr__(self):
+        return f"IndiceBusca(documentos={self._ativos}, termos={len(self._postings)})"
@@ -0,0 +1,130 @@
+#\Streaming\catalogo.py
+import threading
+
+from .ids import registro_atual
+from .instrumentacao import instrumentar
+
+
+class Catalogo:
+    """
+    Catálogo de mídias de um StreamingApp (substitui o antigo registro global
+    ArquivoDeMidia.registroMidia).
+    - Só guarda as mídias incluídas explicitamente: objetos criados e depois
+      descartados (ex.: duplicados de uma reimportação) não ficam presos aqui
+      e são liberados pelo coletor; o registro de IDs só os guarda por
+      referência fraca.
+    - Título é único por catálogo (normalizado como no registro de IDs);
+      vários catálogos podem coexistir (testes, vários inquilinos).
+    - Inclusão e remoção em lote fazem uma passada só nas listas.
+    - As mídias incluídas passam para o registro de IDs do catálogo (o do
+      app); sem um informado, o registro em uso na criação.
+    """
+
+    def __init__(self, registro=None):
+        self.registro = registro if registro is not None else registro_atual()
+        self.musicas = []           # em ordem de inclusão (as listas do app apontam para estas)
+        self.podcasts = []
+        self._por_chave = {}        # título normalizado -> mídia
+        self._por_id = {}           # ID da mídia (registro de IDs) -> mídia deste catálogo
+        self._ids = set()           # id() das mídias (pertence ao catálogo? sem normalizar título)
+        self._trava = threading.RLock()
+
+    @staticmethod
+    def chave(titulo) -> str:
+        return str(titulo or "").strip().lower()
+
+    @staticmethod
+    def _eh_podcast(midia) -> bool:
+        return hasattr(midia, "episodio")
+
+    # Consultas
+    def buscar(self, titulo: str):
+        """Mídia deste catálogo com o título (sem diferenciar maiúsculas), ou None."""
+        return self._por_chave.get(self.chave(titulo))
+
+    def por_id(self, i: int):
+        """Mídia deste catálogo com o ID (ex.: vizinhos do recomendador), ou None."""
+        return self._por_id.get(i)
+
+    def __contains__(self, midia) -> bool:
+        """Título: há mídia com esse título. Objeto: é exatamente uma mídia deste catálogo."""
+        if isinstance(midia, str):
+            return self.chave(midia) in self._por_chave
+        return id(midia) in self._ids
+
+    def __len__(self):
+        return len(self._por_chave)
+
+    def __iter__(self):
+        return iter(self.musicas + self.podcasts)
+
+    # Inclusão
+    def adicionar(self, midia) -> bool:
+        """Inclui a mídia; retorna False se o título já estiver no catálogo."""
+        return bool(self.adicionar_varios((midia,)))
+
+    @instrumentar("catalogo.adicionar_varios")
+    def adicionar_varios(self, midias) -> list:
+        """Inclui as mídias em ordem e retorna as que entraram (títulos repetidos ficam de fora)."""
+        novas = []
+        with self._trava:
+            por_chave = self._por_chave
+            for m in midias:
+                k = self.chave(m.titulo)
+                if k in por_chave:
+                    continue
+                por_chave[k] = m
+                self._ids.add(id(m))
+                # O catálogo mantém a mídia viva; o registro de IDs passa a apontar para ela
+                m._mudar_registro(self.registro)
+                self.registro.midias.vincular(m.id, m)
+                self._por_id[m.id] = m
+                (self.podcasts if self._eh_podcast(m) else self.musicas).append(m)
+                novas.append(m)
+        return novas
+
+    # Renomeação: a chave por título acompanha o título novo (o ID não muda)
+    def renomear(self, midia, novo: str) -> bool:
+        """
+        Troca o título de uma mídia deste catálogo; retorna False se ela não for
+        daqui. Título de outra mídia do catálogo gera ValueError, e o título
+        antigo fica livre para uma inclusão nova.
+        """
+        with self._trava:
+            k = self.chave(midia.titulo)
+            if self._por_chave.get(k) is not midia:
+                return False
+            existente = self._por_chave.get(self.chave(novo))
+            if existente is not None and existente is not midia:
+                raise ValueError(f"Já existe mídia com o título '{novo.strip()}' no catálogo.")
+            midia.renomear(novo)
+            del self._por_chave[k]
+            self._por_chave[self.chave(midia.titulo)] = midia
+        return True
+
+    # Remoção
+    def remover(self, midia) -> bool:
+        return bool(self.remover_varios((midia,)))
+
+    @instrumentar("catalogo.remover_varios")
+    def remover_varios(self, midias) -> list:
+        """Retira as mídias (o próprio objeto deste catálogo) e retorna as removidas."""
+        with self._trava:
+            removidas = []
+            for m in midias:
+                k = self.chave(m.titulo)
+                if self._por_chave.get(k) is m:
+                    del self._por_chave[k]
+                    self._ids.discard(id(m))
+                    if self._por_id.get(m.id) is m:
+                        del self._por_id[m.id]
+                    removidas.append(m)
+            if removidas:
+                fora = {id(m) for m in removidas}
+                # Listas reescritas no lugar: quem guarda a referência continua vendo o catálogo
+                self.musicas[:] = [m for m in self.musicas if id(m) not in fora]
+                self.podcasts[:] = [m for m in self.podcasts if id(m) not in fora]
+        return removidas
+
+    def __repr__(self):
+        return f"Catalogo(musicas={len(self.musicas)}, podcasts={len(self.podcasts)})"
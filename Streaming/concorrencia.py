@@ -0,0 +1,40 @@
+#\Streaming\concorrencia.py
+import threading
+from contextlib import ExitStack
+
+
+class TravasParticionadas:
+    """
+    Conjunto fixo de travas (lock striping) compartilhado pelos objetos do sistema.
+    Cada objeto é mapeado para uma das n travas pelo seu id(), então duas sessões
+    só disputam a mesma trava se mexerem em objetos da mesma partição.
+    Evita guardar uma trava por objeto (memória constante) e mantém os objetos
+    serializáveis (pickle), pois nenhuma trava fica como atributo.
+    """
+
+    def __init__(self, n: int = 64):
+        self._travas = [threading.Lock() for _ in range(max(1, int(n)))]
+
+    # Retorna a trava da partição do objeto
+    def para(self, obj) -> threading.Lock:
+        # id() é múltiplo de 16 no CPython; descarta os bits sempre zerados
+        return self._travas[(id(obj) >> 4) % len(self._travas)]
+
+    # Trava vários objetos de uma vez, sempre na mesma ordem (evita deadlock)
+    def varias(self, *objs) -> ExitStack:
+        """Uso: 'with TRAVAS.varias(a, b): ...'. Partições repetidas são travadas uma vez."""
+        indices = sorted({(id(o) >> 4) % len(self._travas) for o in objs})
+        pilha = ExitStack()
+        for i in indices:
+            pilha.enter_context(self._travas[i])
+        return pilha
+
+    def __len__(self):
+        return len(self._travas)
+
+    def __repr__(self):
+        return f"TravasParticionadas(n={len(self._travas)})"
+
+
+# Instância única usada por mídias, playlists e usuários
+TRAVAS = TravasParticionadas()
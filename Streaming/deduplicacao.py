@@ -0,0 +1,241 @@
+#\Streaming\deduplicacao.py
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from .busca import normalizar
+from .instrumentacao import instrumentar
+
+
+# Trechos entre parênteses/colchetes e sufixo " - ..." ("Song - 2011 Remaster")
+_GRUPO = re.compile(r"[\(\[]([^\)\]]*)[\)\]]")
+_SUFIXO = re.compile(r"\s+-\s+(.*)$")
+_PALAVRA = re.compile(r"[a-z0-9]+")
+
+# Palavras de qualificadores que não mudam a gravação (o trecho some da assinatura);
+# "(Live)", "(Acoustic)", "(Remix)" continuam e separam as versões
+_NEUTRAS = frozenset("""
+    remaster remastered remasterizado remasterizada remasterizacao digitally
+    version versao radio edit single album mono stereo explicit clean
+    deluxe edition edicao bonus track faixa original
+""".split())
+_PARTICIPACAO = frozenset(("feat", "ft", "featuring", "com", "with"))
+
+
+# Texto ASCII (a maioria) não precisa da decomposição Unicode de normalizar()
+def _normalizar(texto: str) -> str:
+    texto = texto or ""
+    return texto.lower() if texto.isascii() else normalizar(texto)
+
+
+def _neutro(trecho: str) -> bool:
+    termos = _PALAVRA.findall(trecho)
+    if termos and termos[0] in _PARTICIPACAO:
+        return True                     # "(feat. Fulano)": participação não muda a faixa
+    return all(t in _NEUTRAS or t.isdigit() for t in termos)
+
+
+def assinatura_titulo(titulo: str) -> str:
+    """Título sem acentos, pontuação e qualificadores neutros ("Shape Of You (Remastered)" -> "shape of you")."""
+    texto = _normalizar(titulo).replace("'", "").replace("’", "")
+    texto = _GRUPO.sub(lambda m: " " if _neutro(m.group(1)) else f" {m.group(1)} ", texto)
+    sufixo = _SUFIXO.search(texto)
+    if sufixo and _neutro(sufixo.group(1)):
+        texto = texto[:sufixo.start()]
+    return " ".join(_PALAVRA.findall(texto))
+
+
+# Artistas se repetem muito entre os registros: a assinatura fica em cache
+@lru_cache(maxsize=65536)
+def assinatura_artista(artista: str) -> str:
+    """Artista principal normalizado (sem participações nem "The" inicial)."""
+    termos = _PALAVRA.findall(_normalizar(artista).replace("'", "").replace("’", ""))
+    for i, t in enumerate(termos):
+        if t in _PARTICIPACAO - {"com", "with"}:
+            termos = termos[:i]
+            break
+    if len(termos) > 1 and termos[0] == "the":
+        termos = termos[1:]
+    return " ".join(termos)
+
+
+class Decisao:
+    """
+    Resultado da deduplicação de um registro importado.
+    - acao: "nova" (entra como está), "mesclada" (é a mesma faixa de 'canonico'),
+      "homonima" (mesmo título de outra faixa; entra com 'titulo' desambiguado)
+      ou "conflito" (título ocupado e sem desambiguação possível; fica de fora)
+    - canonico: referência da faixa já conhecida (mesclada/conflito)
+    """
+
+    __slots__ = ("acao", "titulo", "canonico", "pontuacao", "_chave")
+
+    def __init__(self, acao, titulo, canonico=None, pontuacao=0.0, chave=None):
+        self.acao = acao
+        self.titulo = titulo
+        self.canonico = canonico
+        self.pontuacao = pontuacao
+        self._chave = chave         # dados já calculados, reaproveitados em incluir()
+
+    @property
+    def entra(self) -> bool:
+        return self.acao in ("nova", "homonima")
+
+    def __repr__(self):
+        return f"Decisao({self.acao!r}, {self.titulo!r}, pontuacao={self.pontuacao:.2f})"
+
+
+class Deduplicador:
+    """
+    Deduplicação aproximada de mídias na importação.
+    - Cada registro vira uma assinatura (título sem acentos, pontuação e
+      qualificadores neutros como "(Remastered)" ou "- 2011 Remaster") e o
+      artista principal normalizado.
+    - Assinatura e artista iguais: mesma faixa, sem comparar nada.
+    - Senão, compara só com os candidatos dos blocos do registro
+      (artista + primeiro termo, artista + último termo), no máximo
+      'max_bloco' por bloco: o custo por registro é limitado, nunca O(n²).
+    - Similaridade = SequenceMatcher nas assinaturas, com filtros baratos
+      antes (comprimento, números do título, episódio, duração).
+    - Título igual com artista/gravação diferente não é mesclado: entra como
+      "Título (Artista)" (o catálogo exige título único).
+    As referências guardadas (objetos ou títulos) são o que o chamador passa
+    em incluir(); quem cria os objetos continua sendo o leitor/app.
+    """
+
+    def __init__(self, limiar: float = 0.9, max_bloco: int = 32,
+                 tolerancia_duracao: float = 0.1, desambiguar: bool = True):
+        self.limiar = float(limiar)
+        self.max_bloco = max(1, int(max_bloco))
+        self.tolerancia_duracao = float(tolerancia_duracao)
+        self.desambiguar = desambiguar
+        self._entradas = []       # i -> (assinatura, números, extra, duração, referência)
+        self._exatas = {}         # (tipo, artista, assinatura) -> [i, ...]
+        self._blocos = {}         # chave de bloco -> [i, ...]
+        self._titulos = {}        # título normalizado -> i (títulos ocupados)
+        self.comparacoes = 0
+        self.decisoes = {"nova": 0, "mesclada": 0, "homonima": 0, "conflito": 0}
+
+    @classmethod
+    @instrumentar("deduplicacao.de_midias")
+    def de_midias(cls, midias, **opcoes):
+        """Deduplicador já alimentado com mídias existentes (ex.: o catálogo do app)."""
+        dedup = cls(**opcoes)
+        for m in midias:
+            d = dedup.decidir(**cls.campos(m))
+            # O que já está no catálogo entra sempre, com o próprio título
+            dedup.incluir(Decisao("nova", m.titulo, chave=d._chave), m)
+        dedup.comparacoes = 0
+        dedup.decisoes = dict.fromkeys(dedup.decisoes, 0)
+        return dedup
+
+    @staticmethod
+    def campos(midia) -> dict:
+        podcast = hasattr(midia, "episodio")
+        return {"titulo": midia.titulo,
+                "artista": getattr(midia, "host", None) if podcast else midia.artista,
+                "duracao": getattr(midia, "duracao", 0),
+                "tipo": "podcast" if podcast else "musica",
+                "extra": (normalizar(getattr(midia, "temporada", "")), midia.episodio) if podcast else None}
+
+    @staticmethod
+    def _titulo_chave(titulo) -> str:
+        return str(titulo or "").strip().lower()
+
+    @staticmethod
+    def _blocos_de(tipo, artista, termos):
+        if not termos:
+            return ((tipo, artista, ""),)
+        if len(termos) == 1 or termos[0] == termos[-1]:
+            return ((tipo, artista, termos[0]),)
+        return ((tipo, artista, termos[0]), (tipo, artista, "$" + termos[-1]))
+
+    # Campos extras (ex.: temporada e episódio de podcast); None vale como "desconhecido"
+    @staticmethod
+    def _extras_compativeis(a, b) -> bool:
+        if a is None or b is None:
+            return a is b
+        return len(a) == len(b) and all(x is None or y is None or x == y for x, y in zip(a, b))
+
+    def _duracoes_compativeis(self, a, b) -> bool:
+        if not a or not b:
+            return True
+        return abs(a - b) <= max(2, self.tolerancia_duracao * max(a, b))
+
+    # Decisão
+    def decidir(self, titulo, artista="", duracao=0, tipo="musica", extra=None) -> Decisao:
+        """Decide o destino do registro (sem incluí-lo; ver incluir())."""
+        ass = assinatura_titulo(titulo)
+        art = assinatura_artista(artista)
+        termos = ass.split()
+        numeros = tuple(t for t in termos if t.isdigit())
+        try:
+            duracao = int(duracao or 0)
+        except (TypeError, ValueError):
+            duracao = 0
+        chave = (tipo, art, ass, extra, numeros, duracao, termos)
+
+        # 1) Mesma assinatura e artista
+        for i in self._exatas.get((tipo, art, ass), ()):
+            _, _, extra_i, dur_i, ref = self._entradas[i]
+            if self._extras_compativeis(extra, extra_i) and self._duracoes_compativeis(duracao, dur_i):
+                return self._decidido(Decisao("mesclada", titulo, ref, 1.0, chave))
+
+        # 2) Candidatos dos blocos
+        melhor, melhor_i = 0.0, None
+        vistos = set()
+        for bloco in self._blocos_de(tipo, art, termos):
+            for j in self._blocos.get(bloco, ())[-self.max_bloco:]:
+                if j in vistos:
+                    continue
+                vistos.add(j)
+                ass_j, num_j, extra_j, dur_j, _ = self._entradas[j]
+                if (num_j != numeros or not self._extras_compativeis(extra, extra_j)
+                        or not self._duracoes_compativeis(duracao, dur_j)):
+                    continue
+                n, m = len(ass), len(ass_j)
+                if 2 * min(n, m) < self.limiar * (n + m):
+                    continue                       # o ratio nunca chegaria ao limiar
+                self.comparacoes += 1
+                sm = SequenceMatcher(None, ass, ass_j, autojunk=False)
+                if sm.quick_ratio() < self.limiar:
+                    continue
+                r = sm.ratio()
+                if r > melhor:
+                    melhor, melhor_i = r, j
+        if melhor_i is not None and melhor >= self.limiar:
+            return self._decidido(Decisao("mesclada", titulo, self._entradas[melhor_i][4], melhor, chave))
+
+        # 3) Faixa nova; se o título já estiver ocupado, tenta "Título (Artista)"
+        dono = self._titulos.get(self._titulo_chave(titulo))
+        if dono is None:
+            return self._decidido(Decisao("nova", titulo, None, 0.0, chave))
+        ref = self._entradas[dono][4]
+        alternativo = f"{str(titulo).strip()} ({str(artista).strip()})" if str(artista or "").strip() else None
+        if self.desambiguar and alternativo and self._titulo_chave(alternativo) not in self._titulos:
+            return self._decidido(Decisao("homonima", alternativo, ref, 0.0, chave))
+        return self._decidido(Decisao("conflito", titulo, ref, 0.0, chave))
+
+    def _decidido(self, d: Decisao) -> Decisao:
+        self.decisoes[d.acao] += 1
+        return d
+
+    def incluir(self, decisao: Decisao, referencia=None) -> None:
+        """Registra a faixa aceita (acao nova/homônima) com a referência do chamador (objeto ou título)."""
+        if not decisao.entra:
+            return
+        tipo, art, ass, extra, numeros, duracao, termos = decisao._chave
+        i = len(self._entradas)
+        self._entradas.append((ass, numeros, extra, duracao,
+                               decisao.titulo if referencia is None else referencia))
+        self._exatas.setdefault((tipo, art, ass), []).append(i)
+        self._titulos[self._titulo_chave(decisao.titulo)] = i
+        for bloco in self._blocos_de(tipo, art, termos):
+            self._blocos.setdefault(bloco, []).append(i)
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __repr__(self):
+        return (f"Deduplicador(faixas={len(self._entradas)}, blocos={len(self._blocos)}, "
+                f"comparacoes={self.comparacoes}, decisoes={self.decisoes})")
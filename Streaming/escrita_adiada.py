@@ -0,0 +1,190 @@
+#\Streaming\escrita_adiada.py
+import atexit
+import contextlib
+import threading
+import time
+import weakref
+
+from .instrumentacao import Instrumentacao
+
+
+class _Buffer:
+    """Reproduções pendentes de uma thread."""
+
+    __slots__ = ("midias", "playlists", "historicos", "qtde", "inicio", "trava", "dona")
+
+    def __init__(self):
+        self.midias = {}        # id(mídia) -> [mídia, quantidade]
+        self.playlists = {}     # id(playlist) -> [playlist, quantidade]
+        self.historicos = {}    # id(usuário) -> [usuário, [títulos]]
+        self.qtde = 0
+        self.inicio = time.monotonic()
+        self.trava = threading.Lock()   # só disputada quando outra thread descarrega ou lê
+        self.dona = weakref.ref(threading.current_thread())
+
+    def viva(self) -> bool:
+        """A thread dona ainda roda (só ela escreve no buffer)."""
+        dona = self.dona()
+        return dona is not None and dona.is_alive()
+
+    def trocar(self):
+        """Retorna o conteúdo atual e zera o buffer (chamar com a trava)."""
+        conteudo = (self.midias, self.playlists, self.historicos)
+        self.midias, self.playlists, self.historicos = {}, {}, {}
+        self.qtde = 0
+        self.inicio = time.monotonic()
+        return conteudo
+
+
+class EscritaAdiada:
+    """
+    Write-behind das reproduções: cada thread soma as reproduções num buffer
+    próprio (dicionários, sem travas compartilhadas) e o buffer é aplicado ao
+    modelo em lote quando chega a 'lote' reproduções ou passa 'intervalo'
+    segundos. Na aplicação, cada mídia/playlist recebe um único incremento
+    (somar_reproducoes) e cada usuário uma única extensão do histórico; os
+    eventos levam a quantidade, então séries, relatório e banco recebem o
+    lote de uma vez.
+    Uma thread de fundo descarrega buffers parados; reproducoes() soma as
+    pendências ao valor do modelo, então a leitura nunca fica para trás.
+    Cada buffer é aplicado com a própria trava: para quem lê, uma reprodução
+    está no buffer ou já no modelo, nunca nos dois nem em nenhum.
+    O buffer de uma thread que terminou é aplicado uma última vez e
+    descartado, então a lista acompanha as threads vivas, não todas as que
+    já reproduziram.
+    """
+
+    def __init__(self, lote: int = 256, intervalo: float = 0.05):
+        self.lote = max(1, int(lote))
+        self.intervalo = float(intervalo)
+        self._local = threading.local()
+        self._buffers = []               # todos os buffers (leituras e descarga geral)
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._fundo = threading.Thread(target=self._descarregar_periodicamente,
+                                       name="escrita-adiada", daemon=True)
+        self._fundo.start()
+        atexit.register(self.fechar)
+        self.lotes = 0
+
+    def _buffer(self) -> _Buffer:
+        buf = getattr(self._local, "buffer", None)
+        if buf is None:
+            buf = self._local.buffer = _Buffer()
+            with self._trava:
+                self._buffers.append(buf)
+        return buf
+
+    # Registro (caminho quente: só dicionários da própria thread)
+    def reproduzir(self, midia, usuario=None) -> None:
+        buf = self._buffer()
+        with buf.trava:
+            par = buf.midias.get(id(midia))
+            if par is None:
+                buf.midias[id(midia)] = [midia, 1]
+            else:
+                par[1] += 1
+            if usuario is not None:
+                par = buf.historicos.get(id(usuario))
+                if par is None:
+                    par = buf.historicos[id(usuario)] = [usuario, []]
+                par[1].append(midia.titulo)
+            buf.qtde += 1
+            cheio = buf.qtde >= self.lote or time.monotonic() - buf.inicio >= self.intervalo
+        if cheio:
+            self._aplicar(buf)
+
+    def reproduzir_playlist(self, playlist, usuario=None) -> None:
+        buf = self._buffer()
+        with buf.trava:
+            par = buf.playlists.get(id(playlist))
+            if par is None:
+                buf.playlists[id(playlist)] = [playlist, 1]
+            else:
+                par[1] += 1
+        for midia in list(playlist.itens):
+            if midia is not None:
+                self.reproduzir(midia, usuario)
+
+    # Aplicação no modelo
+    def _aplicar(self, buf: _Buffer) -> None:
+        with buf.trava:
+            midias, playlists, historicos = buf.trocar()
+            if not (midias or playlists or historicos):
+                return
+            for pl, qtde in playlists.values():
+                pl.somar_reproducoes(qtde)
+            for midia, qtde in midias.values():
+                midia.somar_reproducoes(qtde)
+            for usuario, titulos in historicos.values():
+                usuario.registrar_reproducoes(titulos)
+            self.lotes += 1
+        Instrumentacao.contar("escrita_adiada.lotes")
+
+    def descarregar(self) -> None:
+        """Aplica no modelo as reproduções pendentes de todas as threads."""
+        with self._trava:
+            buffers = list(self._buffers)
+        for buf in buffers:
+            self._aplicar(buf)
+        self._recolher()
+
+    # Buffers de threads encerradas: ninguém mais escreve neles; depois da
+    # última aplicação saem da lista (e das leituras)
+    def _recolher(self) -> None:
+        with self._trava:
+            mortos = [b for b in self._buffers if not b.viva()]
+        if not mortos:
+            return
+        for buf in mortos:
+            self._aplicar(buf)
+        descartar = set(map(id, mortos))
+        with self._trava:
+            self._buffers = [b for b in self._buffers if id(b) not in descartar]
+
+    def _descarregar_periodicamente(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            agora = time.monotonic()
+            with self._trava:
+                parados = [b for b in self._buffers if b.qtde and agora - b.inicio >= self.intervalo]
+            for buf in parados:
+                self._aplicar(buf)
+            self._recolher()
+
+    # Leituras com as pendências somadas
+    @contextlib.contextmanager
+    def _congelado(self):
+        # Trava todos os buffers (sempre na mesma ordem): nenhum lote fica no meio da aplicação
+        with self._trava:
+            buffers = list(self._buffers)
+        with contextlib.ExitStack() as pilha:
+            for buf in buffers:
+                pilha.enter_context(buf.trava)
+            yield buffers
+
+    @staticmethod
+    def _somar_pendentes(buffers, obj) -> int:
+        total = 0
+        for buf in buffers:
+            par = buf.midias.get(id(obj)) or buf.playlists.get(id(obj))
+            if par is not None:
+                total += par[1]
+        return total
+
+    def pendentes(self, obj) -> int:
+        with self._congelado() as buffers:
+            return self._somar_pendentes(buffers, obj)
+
+    def reproducoes(self, obj) -> int:
+        """Reproduções de uma mídia ou playlist, incluindo as ainda não aplicadas."""
+        with self._congelado() as buffers:
+            return obj.reproducoes + self._somar_pendentes(buffers, obj)
+
+    def fechar(self) -> None:
+        self._parar.set()
+        self.descarregar()
+        atexit.unregister(self.fechar)
+
+    def __repr__(self):
+        return (f"EscritaAdiada(lote={self.lote}, intervalo={self.intervalo}, "
+                f"threads={len(self._buffers)}, lotes={self.lotes})")
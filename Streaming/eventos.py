@@ -0,0 +1,49 @@
+#\Streaming\eventos.py
+import threading
+
+
+class BarramentoEventos:
+    """
+    Publicação/assinatura simples entre os objetos do sistema.
+    - assinar(evento, funcao) / cancelar(evento, funcao)
+    - emitir(evento, **dados): chama cada assinante com os dados nomeados
+    Sem assinantes, emitir() é só uma consulta a dicionário (custo quase zero
+    no caminho de reprodução). As listas de assinantes são tuplas trocadas
+    inteiras a cada alteração, então emitir() não precisa de trava.
+    """
+
+    def __init__(self):
+        self._assinantes = {}    # evento -> tupla de funções
+        self._trava = threading.Lock()
+
+    def assinar(self, evento: str, funcao) -> None:
+        with self._trava:
+            self._assinantes[evento] = self._assinantes.get(evento, ()) + (funcao,)
+
+    def cancelar(self, evento: str, funcao) -> bool:
+        with self._trava:
+            atuais = self._assinantes.get(evento, ())
+            restantes = tuple(f for f in atuais if f != funcao)
+            if restantes:
+                self._assinantes[evento] = restantes
+            else:
+                self._assinantes.pop(evento, None)
+            return len(restantes) != len(atuais)
+
+    def ha_assinantes(self, evento: str) -> bool:
+        return evento in self._assinantes
+
+    def emitir(self, evento: str, **dados) -> None:
+        funcoes = self._assinantes.get(evento)
+        if not funcoes:
+            return
+        for funcao in funcoes:
+            funcao(**dados)
+
+    def __repr__(self):
+        return f"BarramentoEventos({ {e: len(f) for e, f in self._assinantes.items()} })"
+
+
+# Barramento do registro global de IDs: objetos criados fora de um app publicam
+# aqui; cada StreamingApp tem o seu (app.eventos)
+EVENTOS = BarramentoEventos()
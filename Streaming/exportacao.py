@@ -0,0 +1,246 @@
+#\Streaming\exportacao.py
+"""
+Exportação das métricas por música em formatos lidos por máquina.
+
+Os escritores recebem as linhas em lotes (listas de tuplas na ordem de
+COLUNAS) e gravam cada lote assim que ele chega, então a memória usada
+não depende do tamanho do catálogo:
+    csv      -> texto com cabeçalho (módulo csv)
+    jsonl    -> um objeto JSON por linha
+    colunar  -> binário por blocos de colunas (ver EscritorColunar)
+Novos formatos entram com registrar_escritor(nome, classe).
+"""
+import csv
+import io
+import json
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from pathlib import Path
+
+# Colunas das métricas por música: nome -> tipo no formato colunar
+# (códigos do módulo array; "s" = texto UTF-8)
+COLUNAS = (
+    ("id", "I"),
+    ("titulo", "s"),
+    ("artista", "s"),
+    ("genero", "s"),
+    ("duracao", "I"),
+    ("reproducoes", "Q"),
+    ("avaliacoes", "I"),
+    ("media", "d"),
+)
+NOMES = tuple(nome for nome, _ in COLUNAS)
+
+# Linhas por lote (cada lote é montado, gravado e descartado)
+LOTE_PADRAO = 10000
+
+MAGICO = b"STRMCOL1"
+
+
+# Linha de métricas de uma música (mesma média de Analises.media_avaliacoes)
+def linha_musica(m) -> tuple:
+    avals = m.avaliacoes or []
+    media = (sum(avals) / len(avals)) if avals else 0.0
+    return (int(m.id), m.titulo.strip(), m.artista.strip(), m.genero, int(m.duracao or 0),
+            int(m.reproducoes), len(avals), media)
+
+
+def lotes(linhas, tamanho: int = LOTE_PADRAO):
+    """Agrupa um iterável de linhas em listas de até 'tamanho' itens."""
+    tamanho = max(1, int(tamanho))
+    lote = []
+    for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def metricas_musicas(musicas, tamanho: int = LOTE_PADRAO):
+    """Gera as métricas das músicas em lotes (a lista de músicas não é copiada)."""
+    return lotes((linha_musica(m) for m in musicas), tamanho)
+
+
+class EscritorMetricas(ABC):
+    """
+    Base dos escritores: abre o destino, grava lotes e fecha.
+    Uso: with Escritor(caminho) as e: e.escrever(lote) ...
+    """
+
+    extensao = ""
+    binario = False
+
+    def __init__(self, destino):
+        self.destino = Path(destino)
+        self.linhas = 0
+        self.destino.parent.mkdir(parents=True, exist_ok=True)
+        if self.binario:
+            self._arquivo = open(self.destino, "wb")
+        else:
+            self._arquivo = open(self.destino, "w", encoding="utf-8", newline="")
+        self._iniciar()
+
+    def _iniciar(self) -> None:
+        pass
+
+    @abstractmethod
+    def _gravar(self, lote) -> None:
+        pass
+
+    def _finalizar(self) -> None:
+        pass
+
+    def escrever(self, lote) -> None:
+        if lote:
+            self._gravar(lote)
+            self.linhas += len(lote)
+
+    def fechar(self) -> None:
+        if self._arquivo.closed:
+            return
+        try:
+            self._finalizar()
+        finally:
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+
+class EscritorCSV(EscritorMetricas):
+    extensao = ".csv"
+
+    def _iniciar(self) -> None:
+        self._csv = csv.writer(self._arquivo)
+        self._csv.writerow(NOMES)
+
+    def _gravar(self, lote) -> None:
+        self._csv.writerows(lote)
+
+
+class EscritorJSONL(EscritorMetricas):
+    extensao = ".jsonl"
+
+    _codificar = json.JSONEncoder(ensure_ascii=False).encode
+
+    def _gravar(self, lote) -> None:
+        # Um único write por lote
+        codificar = self._codificar
+        self._arquivo.write("".join([codificar(dict(zip(NOMES, linha))) + "\n" for linha in lote]))
+
+
+class EscritorColunar(EscritorMetricas):
+    """
+    Binário colunar em blocos (little-endian):
+        cabeçalho: MAGICO, uint32 tamanho + JSON com as colunas [[nome, tipo], ...]
+        cada bloco: uint32 linhas, e para cada coluna
+            numérica -> uint32 bytes + valores (array do tipo da coluna)
+            texto    -> uint32 bytes + deslocamentos uint32 (linhas + 1) + uint32 bytes + UTF-8
+        fim: bloco com 0 linhas
+    Cada coluna de um bloco é contígua, então um leitor pode somar ou filtrar
+    uma coluna sem decodificar as outras.
+    """
+
+    extensao = ".col"
+    binario = True
+
+    def _iniciar(self) -> None:
+        esquema = json.dumps([list(c) for c in COLUNAS]).encode("utf-8")
+        self._arquivo.write(MAGICO + struct.pack("<I", len(esquema)) + esquema)
+
+    @staticmethod
+    def _bytes(valores: array) -> bytes:
+        if sys.byteorder == "big":
+            valores.byteswap()
+        return valores.tobytes()
+
+    def _gravar(self, lote) -> None:
+        saida = io.BytesIO()
+        saida.write(struct.pack("<I", len(lote)))
+        for i, (_, tipo) in enumerate(COLUNAS):
+            if tipo == "s":
+                textos = [linha[i].encode("utf-8") for linha in lote]
+                deslocamentos = array("I", [0])
+                total = 0
+                for t in textos:
+                    total += len(t)
+                    deslocamentos.append(total)
+                bloco = self._bytes(deslocamentos)
+                saida.write(struct.pack("<I", len(bloco)) + bloco)
+                saida.write(struct.pack("<I", total))
+                saida.write(b"".join(textos))
+            else:
+                bloco = self._bytes(array(tipo, (linha[i] for linha in lote)))
+                saida.write(struct.pack("<I", len(bloco)) + bloco)
+        self._arquivo.write(saida.getvalue())
+
+    def _finalizar(self) -> None:
+        self._arquivo.write(struct.pack("<I", 0))
+
+
+def ler_colunar(caminho):
+    """Lê um arquivo colunar bloco a bloco; gera {coluna: lista de valores}."""
+    with open(caminho, "rb") as f:
+        if f.read(len(MAGICO)) != MAGICO:
+            raise ValueError(f"Arquivo colunar inválido: {caminho}")
+        (n,) = struct.unpack("<I", f.read(4))
+        colunas = [tuple(c) for c in json.loads(f.read(n).decode("utf-8"))]
+
+        def ler_array(tipo):
+            (tam,) = struct.unpack("<I", f.read(4))
+            valores = array(tipo)
+            valores.frombytes(f.read(tam))
+            if sys.byteorder == "big":
+                valores.byteswap()
+            return valores
+
+        while True:
+            (linhas,) = struct.unpack("<I", f.read(4))
+            if not linhas:
+                return
+            bloco = {}
+            for nome, tipo in colunas:
+                if tipo == "s":
+                    desl = ler_array("I")
+                    (tam,) = struct.unpack("<I", f.read(4))
+                    dados = f.read(tam)
+                    bloco[nome] = [dados[desl[j]:desl[j + 1]].decode("utf-8") for j in range(linhas)]
+                else:
+                    bloco[nome] = ler_array(tipo).tolist()
+            yield bloco
+
+
+# Registro de formatos
+ESCRITORES = {
+    "csv": EscritorCSV,
+    "jsonl": EscritorJSONL,
+    "colunar": EscritorColunar,
+}
+
+
+def registrar_escritor(nome: str, classe) -> None:
+    ESCRITORES[nome] = classe
+
+
+def escritor(formato: str, destino):
+    try:
+        classe = ESCRITORES[formato]
+    except KeyError:
+        raise ValueError(f"Formato desconhecido: {formato} (disponíveis: {', '.join(sorted(ESCRITORES))})")
+    return classe(destino)
+
+
+def exportar(lotes_de_linhas, formato: str, destino) -> int:
+    """Grava os lotes no formato pedido e retorna a quantidade de linhas."""
+    with escritor(formato, destino) as e:
+        for lote in lotes_de_linhas:
+            e.escrever(lote)
+    return e.linhas
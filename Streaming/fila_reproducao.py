@@ -0,0 +1,384 @@
+#\Streaming\fila_reproducao.py
+import os
+import random
+from collections import deque
+
+from .arquivo_midia import PASTA_CONFIG, TEXTOS
+from .instrumentacao import instrumentar
+
+
+_MASCARA64 = (1 << 64) - 1
+
+
+# Mistura de 64 bits (splitmix64) para derivar chaves novas a partir da semente
+def _misturar(x: int) -> int:
+    x = (x + 0x9E3779B97F4A7C15) & _MASCARA64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASCARA64
+    return x ^ (x >> 31)
+
+
+class PermutacaoPreguicosa:
+    """
+    Permutação pseudoaleatória de range(n) calculada posição a posição,
+    sem montar nem copiar a lista de itens: memória constante para qualquer n.
+    - n pequeno (até PEQUENA, o que cabe num byte): Fisher-Yates guiado pela
+      chave, feito aos poucos: cada posição pedida sorteia só até ela, numa
+      tabela de 'n' bytes; é exata e uniforme.
+    - n maior: uma rede de Feistel de 6 rodadas é uma bijeção em [0, 2^bits)
+      (bits = menor par com 2^bits >= n); o valor da posição i é obtido
+      aplicando a rede até cair em [0, n) ("cycle walking"), o que continua
+      sendo uma bijeção e custa menos de 4 aplicações em média.
+    - A mesma chave gera sempre a mesma ordem; outra chave, outra ordem.
+    """
+
+    __slots__ = ("n", "chave", "_meio", "_mascara", "_tabela", "_prontas")
+
+    PEQUENA = 256
+    _RODADAS = (0x9E3779B97F4A7C15, 0xD1B54A32D192ED03, 0x94D049BB133111EB,
+                0x2545F4914F6CDD1D, 0xBF58476D1CE4E5B9, 0x8CB92BA72F3D8DD7)
+
+    def __init__(self, n: int, chave: int):
+        self.n = max(0, int(n))
+        self.chave = int(chave) & _MASCARA64
+        bits = max(2, (self.n - 1).bit_length())
+        bits += bits & 1
+        self._meio = bits // 2
+        self._mascara = (1 << self._meio) - 1
+        self._tabela = bytearray(range(self.n)) if self.n <= self.PEQUENA else None
+        self._prontas = 0
+
+    # Sorteia as posições até i (a posição k troca com uma de [k, n))
+    def _sortear(self, i: int) -> None:
+        tabela, n, chave = self._tabela, self.n, self.chave
+        for k in range(self._prontas, i + 1):
+            j = k + ((_misturar(chave + k) * (n - k)) >> 64)     # uniforme em [k, n) sem divisão
+            tabela[k], tabela[j] = tabela[j], tabela[k]
+        self._prontas = i + 1
+
+    # Rodada: multiplicação de 64 bits + xorshift; os bits altos do produto viram a máscara
+    def _feistel(self, x: int) -> int:
+        meio, mascara, chave = self._meio, self._mascara, self.chave
+        desloca = 64 - meio
+        esq, dir = x >> meio, x & mascara
+        for constante in self._RODADAS:
+            h = ((chave ^ (dir + constante)) * 0xBF58476D1CE4E5B9) & _MASCARA64
+            h = ((h ^ (h >> 31)) * 0x94D049BB133111EB) & _MASCARA64
+            esq, dir = dir, esq ^ (h >> desloca)
+        return (esq << meio) | dir
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.n:
+            raise IndexError("posição fora da permutação")
+        if self._tabela is not None:
+            if i >= self._prontas:
+                self._sortear(i)
+            return self._tabela[i]
+        x = self._feistel(i)
+        while x >= self.n:
+            x = self._feistel(x)
+        return x
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return (self[i] for i in range(self.n))
+
+    def __repr__(self):
+        return f"PermutacaoPreguicosa(n={self.n}, chave={self.chave:#x})"
+
+
+# Aquecimento padrão da janela: a letra/descrição entra no cache de textos
+# (na hora de tocar, o .txt já está em memória). A pré-carga aceita um texto
+# conferido há até VALIDADE_AQUECIMENTO segundos (a leitura ao tocar confere
+# de novo), e o caminho é montado como texto, sem Path.
+VALIDADE_AQUECIMENTO = 1.0
+_PREFIXO_TEXTOS = os.path.join(PASTA_CONFIG, "")
+
+
+def aquecer_texto(midia) -> None:
+    try:
+        TEXTOS.ler(_PREFIXO_TEXTOS + midia.titulo + ".txt", VALIDADE_AQUECIMENTO)
+    except (OSError, UnicodeDecodeError):
+        pass
+
+
+class Radio:
+    """
+    Continuação automática quando a fila acaba (modo rádio).
+    - Próxima = o vizinho mais similar da última faixa (Recomendador) que
+      pertença ao catálogo e não esteja entre as últimas 'memoria' faixas.
+    - Sem vizinho disponível: a próxima de uma ordem aleatória do catálogo
+      (PermutacaoPreguicosa, sem copiar o catálogo).
+    - As faixas sugeridas são lembradas já na escolha: a fila pede as
+      próximas antes de tocá-las (janela de pré-carga), e uma faixa que
+      ainda está na janela não pode ser sugerida de novo.
+    Memória constante: só os ids das últimas 'memoria' faixas são lembrados
+    (um anel; a consulta percorre no máximo 'memoria' inteiros).
+    """
+
+    __slots__ = ("catalogo", "recomendador", "memoria", "_recentes", "_perm", "_pos")
+
+    def __init__(self, catalogo, recomendador=None, memoria: int = 50, semente: int = None):
+        self.catalogo = catalogo
+        self.recomendador = recomendador
+        self.memoria = max(1, int(memoria))
+        self._recentes = deque(maxlen=self.memoria)   # ids na ordem em que tocaram
+        self._perm = PermutacaoPreguicosa(0, random.getrandbits(64) if semente is None else semente)
+        self._pos = 0
+
+    # Faixa tocada ou sugerida (a sugerida volta aqui quando toca: não entra duas vezes)
+    def lembrar(self, midia) -> None:
+        if midia.id not in self._recentes:
+            self._recentes.append(midia.id)
+
+    def proxima(self, ultima):
+        midia = self._escolher(ultima)
+        if midia is not None:
+            self.lembrar(midia)
+        return midia
+
+    def _escolher(self, ultima):
+        if ultima is not None and self.recomendador is not None:
+            for vizinho, _ in self.recomendador.vizinhos(ultima.id):
+                if vizinho in self._recentes:
+                    continue
+                # Resolvido pelo catálogo da fila: vizinho fora dele é pulado
+                midia = self.catalogo.por_id(vizinho)
+                if midia is not None:
+                    return midia
+        musicas = self.catalogo.musicas
+        if not musicas:
+            return None
+        for _ in range(min(len(musicas), self.memoria + 1)):
+            if self._perm.n != len(musicas) or self._pos >= self._perm.n:
+                # Catálogo mudou ou a ordem acabou: outra volta com outra chave
+                self._perm = PermutacaoPreguicosa(len(musicas), _misturar(self._perm.chave))
+                self._pos = 0
+            midia = musicas[self._perm[self._pos]]
+            self._pos += 1
+            if midia.id not in self._recentes:
+                return midia
+        return midia
+
+
+class FilaReproducao:
+    """
+    Fila de reprodução de uma sessão (uma playlist ou uma lista de mídias).
+    - enfileirar(): "tocar em seguida" do usuário, O(1) (deque); essas faixas
+      vêm antes da continuação da playlist.
+    - proxima(): O(1); a ordem da playlist vem da posição atual, direto da
+      lista de itens (sem cópia) ou de uma PermutacaoPreguicosa no modo
+      aleatório (uma chave nova a cada volta com repetir="lista").
+    - repetir: "nao", "faixa" (a atual de novo) ou "lista" (recomeça).
+    - radio: um Radio que continua tocando quando a playlist acaba.
+    - Janela de pré-carga: as próximas 'janela' faixas já ficam resolvidas
+      (posição -> mídia, vizinhos do rádio) e aquecidas por 'aquecer'
+      (padrão: a letra entra no cache de textos) antes de a atual acabar, e
+      a troca de faixa não espera E/S. A janela é um anel de tamanho fixo.
+    A memória não cresce com o tamanho da playlist nem com o tempo tocando:
+    só com as faixas que o usuário enfileirar. Uma fila pertence a uma
+    sessão (não é compartilhada entre threads).
+    Alterações na playlist valem a partir da posição atual (no modo
+    aleatório, a ordem restante é sorteada para o novo tamanho).
+    """
+
+    __slots__ = ("itens", "playlist", "aleatorio", "repetir", "radio", "aquecer", "atual",
+                 "_semente", "_passada", "_pos", "_perm", "_fila",
+                 "_anel", "_ini", "_qtde", "_ultima_base", "_fim", "tocadas")
+
+    MODOS_REPETIR = ("nao", "faixa", "lista")
+
+    def __init__(self, itens, playlist=None, aleatorio: bool = False, repetir: str = "nao",
+                 radio=None, janela: int = 3, semente: int = None, aquecer=aquecer_texto):
+        if repetir not in self.MODOS_REPETIR:
+            raise ValueError(f"repetir deve ser um de {self.MODOS_REPETIR}")
+        self.itens = itens                # a própria lista (a playlist pode mudar durante a sessão)
+        self.playlist = playlist
+        self.aleatorio = bool(aleatorio)
+        self.repetir = repetir
+        self.radio = radio
+        self.aquecer = aquecer
+        self.atual = None
+        self.tocadas = 0
+        self._semente = random.getrandbits(64) if semente is None else int(semente)
+        self._passada = 0
+        self._pos = 0
+        self._perm = None
+        self._fila = None                 # deque criada no primeiro enfileirar()
+        self._anel = [None] * max(1, int(janela))
+        self._ini = 0
+        self._qtde = 0
+        self._ultima_base = None
+        self._fim = False
+
+    @classmethod
+    def da_playlist(cls, playlist, **opcoes):
+        return cls(playlist.itens, playlist=playlist, **opcoes)
+
+    # Sequência base (playlist, repetição e rádio)
+    def _permutacao(self, n: int):
+        perm = self._perm
+        if perm is None or perm.n != n:
+            perm = self._perm = PermutacaoPreguicosa(n, _misturar(self._semente + self._passada))
+        return perm
+
+    def _base(self):
+        itens = self.itens
+        while not self._fim:
+            n = len(itens)
+            if self._pos >= n:
+                if self.repetir == "lista" and n:
+                    self._passada += 1
+                    self._pos = 0
+                    self._perm = None
+                    continue
+                if self.radio is not None:
+                    midia = self.radio.proxima(self._ultima_base)
+                    if midia is None:
+                        self._fim = True
+                        return None
+                    self._ultima_base = midia
+                    return midia
+                self._fim = True
+                return None
+            i = self._permutacao(n)[self._pos] if self.aleatorio else self._pos
+            self._pos += 1
+            midia = itens[i] if i < len(itens) else None
+            if midia is not None:
+                self._ultima_base = midia
+                return midia
+        return None
+
+    # Janela de pré-carga (anel de tamanho fixo)
+    def _encher(self) -> None:
+        anel = self._anel
+        while self._qtde < len(anel):
+            midia = self._base()
+            if midia is None:
+                return
+            anel[(self._ini + self._qtde) % len(anel)] = midia
+            self._qtde += 1
+            # O rádio escolhe as próximas antes de a janela tocar: o que já está nela conta como recente
+            if self.radio is not None:
+                self.radio.lembrar(midia)
+            if self.aquecer is not None:
+                self.aquecer(midia)
+
+    def _tirar_da_janela(self):
+        if not self._qtde:
+            return None
+        anel = self._anel
+        midia = anel[self._ini]
+        anel[self._ini] = None
+        self._ini = (self._ini + 1) % len(anel)
+        self._qtde -= 1
+        return midia
+
+    # Operações da sessão
+    def enfileirar(self, midia) -> None:
+        """Toca 'midia' antes da continuação da playlist (depois das já enfileiradas)."""
+        if self._fila is None:
+            self._fila = deque()
+        self._fila.append(midia)
+        if self.aquecer is not None and len(self._fila) <= len(self._anel):
+            self.aquecer(midia)
+
+    def proxima(self):
+        """Avança e retorna a próxima mídia (None quando a fila acabou)."""
+        if self.repetir == "faixa" and self.atual is not None:
+            midia = self.atual
+        elif self._fila:
+            midia = self._fila.popleft()
+        else:
+            self._encher()
+            midia = self._tirar_da_janela()
+        if midia is not None:
+            self._encher()
+            if self.radio is not None:
+                self.radio.lembrar(midia)
+            self.tocadas += 1
+        self.atual = midia
+        return midia
+
+    def proximas(self, n: int = None) -> list:
+        """As próximas faixas (sem avançar): enfileiradas primeiro, depois a janela."""
+        self._encher()
+        n = len(self._anel) if n is None else max(0, int(n))
+        saida = list(self._fila or ())[:n]
+        for k in range(min(self._qtde, n - len(saida))):
+            saida.append(self._anel[(self._ini + k) % len(self._anel)])
+        return saida
+
+    def embaralhar(self, ligado: bool = True) -> None:
+        """
+        Liga/desliga o aleatório. A janela ainda não tocada é refeita na nova ordem:
+        ligado, uma ordem nova da playlist inteira; desligado, a ordem da playlist
+        a partir da faixa atual.
+        """
+        if bool(ligado) == self.aleatorio:
+            return
+        self.aleatorio = bool(ligado)
+        self._anel = [None] * len(self._anel)
+        self._ini = self._qtde = 0
+        self._perm = None
+        self._fim = False
+        if self.aleatorio:
+            self._passada += 1
+            self._pos = 0
+        else:
+            try:
+                self._pos = self.itens.index(self.atual) + 1   # uma vez por toque do usuário
+            except ValueError:
+                self._pos = 0
+
+    def __iter__(self):
+        while True:
+            midia = self.proxima()
+            if midia is None:
+                return
+            yield midia
+
+    def __repr__(self):
+        return (f"FilaReproducao(itens={len(self.itens)}, aleatorio={self.aleatorio}, "
+                f"repetir={self.repetir!r}, radio={self.radio is not None}, "
+                f"enfileiradas={len(self._fila or ())}, janela={self._qtde}/{len(self._anel)}, "
+                f"tocadas={self.tocadas})")
+
+
+# Sessões de uma simulação: uma fila por sessão, playlists em rodízio
+def criar_sessoes(playlists, quantidade: int, inicio: int = 0, catalogo=None, radio: bool = False,
+                  memoria_radio: int = 50, **opcoes) -> list:
+    """'radio' cria um Radio (sem recomendador) sobre 'catalogo' para cada sessão."""
+    filas = []
+    for i in range(inicio, inicio + quantidade):
+        r = Radio(catalogo, memoria=memoria_radio, semente=i) if radio else None
+        filas.append(FilaReproducao.da_playlist(playlists[i % len(playlists)], radio=r, semente=i, **opcoes))
+    return filas
+
+
+@instrumentar("fila.simular_sessoes")
+def simular_sessoes(playlists, sessoes: int, passos: int, simultaneas: int = 10000, **opcoes) -> dict:
+    """
+    Roda 'sessoes' filas de até 'passos' faixas cada, 'simultaneas' vivas ao
+    mesmo tempo (as sessões de um lote avançam intercaladas, como usuários
+    reais). Retorna faixas tocadas e tempo; usado pelo `cli.py queue`.
+    """
+    import time
+
+    total = 0
+    inicio = time.perf_counter()
+    feitas = 0
+    simultaneas = max(1, int(simultaneas))
+    while feitas < sessoes:
+        lote = min(simultaneas, sessoes - feitas)
+        filas = criar_sessoes(playlists, lote, feitas, **opcoes)
+        for _ in range(passos):
+            for f in filas:
+                if f.proxima() is not None:
+                    total += 1
+        feitas += lote
+    dur = time.perf_counter() - inicio
+    return {"sessoes": sessoes, "faixas": total, "duracao_s": dur,
+            "faixas_por_s": total / dur if dur else None}
@@ -0,0 +1,139 @@
+#\Streaming\gerador_playlist.py
+import heapq
+import random
+from bisect import bisect_right
+from math import log1p
+
+from .instrumentacao import instrumentar
+
+
+class GeradorPlaylist:
+    """
+    Monta playlists a partir de restrições, consultando os índices (IndicesCatalogo):
+    - gênero, artista e duração de cada faixa resolvidos no índice mais seletivo;
+    - nota mínima (média das avaliações) e exclusão do histórico recente
+      conferidas só nos candidatos;
+    - orçamento de duração total preenchido como uma mochila:
+        1) guloso por pontuação/duração (maior valor por segundo primeiro);
+        2) sobra preenchida com a maior faixa que ainda cabe (busca binária).
+    O custo não depende do tamanho do catálogo: no critério "variado" os
+    candidatos são sorteados por posição dentro da faixa do índice (sem
+    percorrê-la); no "popular" a faixa é percorrida uma vez com heapq.
+    """
+
+    CRITERIOS = ("variado", "popular")
+
+    def __init__(self, indices, candidatos: int = 400, semente=None):
+        self.indices = indices
+        self.candidatos = max(1, int(candidatos))
+        self.semente = semente
+
+    # Valor de uma faixa: mais avaliada e mais tocada vale mais
+    @staticmethod
+    def pontuacao(midia) -> float:
+        avals = getattr(midia, "avaliacoes", None) or []
+        media = (sum(avals) / len(avals)) if avals else 2.5
+        return (1.0 + media / 5.0) * (1.0 + log1p(midia.reproducoes))
+
+    @staticmethod
+    def _filtro(genero, artista, duracao_min, duracao_max, nota_minima, excluir, apenas_musicas):
+        genero = genero.strip().lower() if genero else None
+        artista = artista.strip().lower() if artista else None
+
+        def aceita(m) -> bool:
+            if m.id in excluir:
+                return False
+            if apenas_musicas and not hasattr(m, "genero"):
+                return False
+            if genero and getattr(m, "genero", "").strip().lower() != genero:
+                return False
+            if artista and m.artista.strip().lower() != artista:
+                return False
+            dur = int(m.duracao or 0)
+            if dur <= 0 or (duracao_min is not None and dur < duracao_min):
+                return False
+            if duracao_max is not None and dur > duracao_max:
+                return False
+            if nota_minima is not None:
+                avals = getattr(m, "avaliacoes", None) or []
+                if not avals or sum(avals) / len(avals) < nota_minima:
+                    return False
+            return True
+
+        return aceita
+
+    # Candidatos sorteados por posição (não percorre a faixa inteira)
+    def _sortear(self, lista, ini, fim, aceita, rnd) -> list:
+        total = fim - ini
+        if total <= self.candidatos * 4:
+            achados = [m for m in lista[ini:fim] if aceita(m)]
+            rnd.shuffle(achados)
+            return achados[:self.candidatos]
+        achados, vistos = [], set()
+        tentativas = self.candidatos * 20
+        while len(achados) < self.candidatos and tentativas > 0 and len(vistos) < total:
+            lote = min(self.candidatos, total - len(vistos))
+            for pos in rnd.sample(range(ini, fim), lote):
+                tentativas -= 1
+                if pos in vistos:
+                    continue
+                vistos.add(pos)
+                m = lista[pos]
+                if aceita(m):
+                    achados.append(m)
+        return achados
+
+    def _populares(self, lista, ini, fim, aceita) -> list:
+        return heapq.nlargest(self.candidatos, (m for m in lista[ini:fim] if aceita(m)), key=self.pontuacao)
+
+    # Mochila: guloso por valor/segundo e depois a maior faixa que cabe na sobra
+    @staticmethod
+    def empacotar(candidatos, orcamento: int, pontuacao) -> list:
+        escolhidas, usado = [], 0
+        restantes = []
+        for m in sorted(candidatos, key=lambda m: pontuacao(m) / m.duracao, reverse=True):
+            if usado + m.duracao <= orcamento:
+                escolhidas.append(m)
+                usado += m.duracao
+            else:
+                restantes.append(m)
+
+        restantes.sort(key=lambda m: m.duracao)
+        duracoes = [m.duracao for m in restantes]
+        while restantes:
+            i = bisect_right(duracoes, orcamento - usado) - 1
+            if i < 0:
+                break
+            m = restantes.pop(i)
+            del duracoes[i]
+            escolhidas.append(m)
+            usado += m.duracao
+        return escolhidas
+
+    @instrumentar("gerador_playlist.gerar")
+    def gerar(self, duracao_total: int, genero: str = None, artista: str = None,
+              duracao_min: int = None, duracao_max: int = None, nota_minima: float = None,
+              excluir=(), criterio: str = "variado", apenas_musicas: bool = True) -> list:
+        """
+        Retorna as mídias escolhidas (em ordem de pontuação) somando no máximo
+        'duracao_total' segundos. duracao_min/duracao_max limitam cada faixa;
+        'excluir' recebe ids de mídia (ex.: o histórico recente) ou as próprias mídias.
+        """
+        if criterio not in self.CRITERIOS:
+            raise ValueError(f"Critério desconhecido: {criterio} (use {', '.join(self.CRITERIOS)})")
+        orcamento = int(duracao_total)
+        if orcamento <= 0:
+            return []
+        maximo = orcamento if duracao_max is None else min(int(duracao_max), orcamento)
+        excluir = {e if isinstance(e, int) else e.id for e in excluir}
+        aceita = self._filtro(genero, artista, duracao_min, maximo, nota_minima, excluir, apenas_musicas)
+
+        lista, ini, fim = self.indices.visao(genero, artista, duracao_min, maximo)
+        if criterio == "popular":
+            candidatos = self._populares(lista, ini, fim, aceita)
+        else:
+            candidatos = self._sortear(lista, ini, fim, aceita, random.Random(self.semente))
+
+        escolhidas = self.empacotar(candidatos, orcamento, self.pontuacao)
+        escolhidas.sort(key=self.pontuacao, reverse=True)
+        return escolhidas
@@ -0,0 +1,360 @@
+#\Streaming\ids.py
+import contextlib
+import contextvars
+import threading
+import weakref
+from array import array
+from collections.abc import MutableSequence
+
+from .eventos import EVENTOS, BarramentoEventos
+
+
+# Chave de internação: sem espaços nas pontas e sem diferenciar maiúsculas
+def _chave(nome) -> str:
+    return str(nome or "").strip().lower()
+
+
+class EspacoIds:
+    """
+    Um espaço de nomes de IDs (mídias, usuários ou playlists).
+    Cada nome (normalizado) recebe um inteiro denso 0, 1, 2, ... na primeira vez
+    que aparece; o nome de exibição fica numa lista indexada pelo ID.
+    - id(nome): interna e retorna o ID (O(1))
+    - nome(id): nome de exibição (O(1), é só um índice de lista)
+    - renomear(id, novo): troca o nome em um lugar só; todas as referências
+      guardadas como ID passam a mostrar o nome novo
+    - vincular(id, obj)/objeto(id): objeto do ID, guardado por referência
+      fraca (quem mantém o objeto vivo é o catálogo/app que o incluiu)
+    Nomes que só são únicos dentro de um dono (ex.: playlists por usuário)
+    usam 'escopo': id(nome, escopo) interna o par (escopo, nome), então o
+    mesmo nome em escopos diferentes recebe IDs diferentes.
+
+    Coleta: quem guarda IDs como inteiros se registra com reter(obj) e
+    informa quais em obj._ids_retidos(espaco) (listas de IDs, playlists,
+    recomendador). Quando o espaço dobra de tamanho desde a última coleta,
+    os IDs sem objeto vinculado vivo e fora de todo retentor saem do
+    dicionário de nomes; se na coleta seguinte continuarem sem referência,
+    são liberados e reaproveitados pelos próximos nomes novos. Assim um
+    processo com rotatividade (playlists criadas e excluídas, mídias
+    trocadas) não acumula nomes sem limite. A espera de uma coleta cobre
+    quem obteve o ID pouco antes e ainda não o guardou; o caminho de id()
+    para nomes já internados continua sem trava.
+    """
+
+    # Tamanho a partir do qual a coleta passa a rodar (abaixo disso não compensa)
+    COLETA_MINIMA = 4096
+
+    def __init__(self, nome: str):
+        self.nome_espaco = nome
+        self._ids = {}         # chave normalizada (ou (escopo, chave)) -> id
+        self._chaves = []      # id -> chave usada em _ids (renomear mantém o escopo)
+        self._nomes = []       # id -> nome de exibição (None se liberado)
+        self._objetos = []     # id -> weakref do objeto vinculado (ou None)
+        self._outros = {}      # id -> weakrefs de outros objetos vivos com o mesmo ID
+        self._retentores = weakref.WeakValueDictionary()   # id(obj) -> obj (objetos sem hash, ex.: ListaIds)
+        self._quarentena = []  # fora do dicionário na última coleta; liberados na próxima
+        self._livres = []      # IDs liberados, reaproveitados por nomes novos
+        self._limiar = self.COLETA_MINIMA
+        self._trava = threading.Lock()
+
+    def id(self, nome, escopo=None) -> int:
+        chave = _chave(nome) if escopo is None else (escopo, _chave(nome))
+        i = self._ids.get(chave)
+        if i is not None:
+            return i
+        # Criação protegida: duas sessões não geram IDs diferentes para o mesmo nome
+        with self._trava:
+            i = self._ids.get(chave)
+            if i is None:
+                if not self._livres and len(self._nomes) >= self._limiar:
+                    self._coletar()
+                nome = str(nome or "").strip()
+                if self._livres:
+                    i = self._livres.pop()
+                    self._nomes[i], self._chaves[i] = nome, chave
+                else:
+                    i = len(self._nomes)
+                    self._nomes.append(nome)
+                    self._chaves.append(chave)
+                    self._objetos.append(None)
+                self._ids[chave] = i
+            return i
+
+    # Retorna o ID já existente ou None (não cria)
+    def procurar(self, nome, escopo=None):
+        return self._ids.get(_chave(nome) if escopo is None else (escopo, _chave(nome)))
+
+    def nome(self, i: int) -> str:
+        return self._nomes[i]
+
+    def renomear(self, i: int, novo: str) -> None:
+        """
+        Troca o nome do ID (no mesmo escopo); se o nome novo já pertencer a
+        outro ID do escopo, gera ValueError.
+        """
+        antiga = self._chaves[i]
+        chave = _chave(novo) if type(antiga) is str else (antiga[0], _chave(novo))
+        with self._trava:
+            dono = self._ids.get(chave)
+            if dono is not None and dono != i:
+                raise ValueError(f"'{novo}' já está em uso em {self.nome_espaco}.")
+            if self._ids.get(antiga) == i:
+                del self._ids[antiga]
+            self._ids[chave] = i
+            self._chaves[i] = chave
+            self._nomes[i] = str(novo).strip()
+
+    # Associa um objeto ao ID (o primeiro vinculado permanece enquanto estiver vivo;
+    # os demais, ex.: duplicados de uma reimportação, só mantêm o ID na coleta)
+    def vincular(self, i: int, obj) -> None:
+        ref = self._objetos[i]
+        atual = None if ref is None else ref()
+        if atual is None:
+            self._objetos[i] = weakref.ref(obj)
+        elif atual is not obj:
+            with self._trava:
+                outros = [r for r in self._outros.get(i, ()) if r() is not None and r() is not obj]
+                outros.append(weakref.ref(obj))
+                self._outros[i] = outros
+
+    def objeto(self, i: int):
+        ref = self._objetos[i]
+        return None if ref is None else ref()
+
+    # Passa a consultar obj._ids_retidos(self) nas coletas (obj guarda IDs deste espaço)
+    def reter(self, obj) -> None:
+        with self._trava:
+            self._retentores[id(obj)] = obj
+
+    def coletar(self) -> int:
+        """Roda uma coleta agora (ver a classe); retorna quantos IDs foram liberados."""
+        with self._trava:
+            return self._coletar()
+
+    def _vivo(self, i: int) -> bool:
+        ref = self._objetos[i]
+        if ref is not None and ref() is not None:
+            return True
+        outros = self._outros.get(i)
+        if outros is not None:
+            outros = [r for r in outros if r() is not None]
+            if outros:
+                self._outros[i] = outros
+                return True
+            del self._outros[i]
+        return False
+
+    # Chamada com a trava: marca os IDs em uso e libera os que seguem sem referência
+    def _coletar(self) -> int:
+        usados = set()
+        for retentor in self._retentores.values():
+            usados.update(retentor._ids_retidos(self))
+        liberados = 0
+        # Quarentena da coleta anterior: o que voltou a ser guardado (por quem obteve
+        # o ID antes dela) volta ao dicionário; o resto é liberado
+        for i in self._quarentena:
+            if i in usados or self._vivo(i):
+                self._ids.setdefault(self._chaves[i], i)
+            else:
+                self._nomes[i] = self._chaves[i] = self._objetos[i] = None
+                self._livres.append(i)
+                liberados += 1
+        em_quarentena = set(self._quarentena)
+        self._quarentena = []
+        for i, chave in enumerate(self._chaves):
+            if chave is None or i in usados or i in em_quarentena or self._vivo(i):
+                continue
+            # Sai do dicionário (um pedido novo pelo nome recebe outro ID); o nome
+            # de exibição fica até a próxima coleta
+            if self._ids.get(chave) == i:
+                del self._ids[chave]
+            self._quarentena.append(i)
+        # Próxima coleta quando os nomes novos passarem do dobro dos em uso (a quarentena
+        # conta à parte: ela é liberada na próxima)
+        em_uso = len(self._nomes) - len(self._livres) - len(self._quarentena)
+        self._limiar = max(self.COLETA_MINIMA, 2 * em_uso) + len(self._quarentena)
+        return liberados
+
+    def __len__(self):
+        return len(self._nomes) - len(self._livres)
+
+    def __repr__(self):
+        return f"EspacoIds({self.nome_espaco!r}, ids={len(self._nomes)})"
+
+
+class RegistroIds:
+    """
+    Registro com um espaço de IDs para cada tipo de entidade e o barramento
+    em que os objetos do registro publicam os seus eventos.
+    Cada StreamingApp (e portanto cada inquilino) tem o seu: renomear num app
+    não afeta outro, os eventos de um app não chegam aos assinantes de outro,
+    e nomes e assinaturas somem junto com o app. Objetos criados fora de um
+    app usam o registro global IDS (e o barramento global EVENTOS).
+    """
+
+    def __init__(self, eventos: BarramentoEventos = None):
+        self.eventos = eventos if eventos is not None else BarramentoEventos()
+        self.midias = EspacoIds("midias")
+        self.usuarios = EspacoIds("usuarios")
+        self.playlists = EspacoIds("playlists")
+
+    def espaco(self, nome: str) -> EspacoIds:
+        return getattr(self, nome)
+
+    def __repr__(self):
+        return (f"RegistroIds(midias={len(self.midias)}, usuarios={len(self.usuarios)}, "
+                f"playlists={len(self.playlists)})")
+
+
+# Registro dos objetos criados fora de um app (scripts, testes, processos de agregados)
+IDS = RegistroIds(EVENTOS)
+
+# Registro em que os objetos novos são criados: o do app enquanto ele importa,
+# carrega ou cria objetos (usando_registro); fora disso, IDS
+_REGISTRO_ATUAL = contextvars.ContextVar("registro_ids", default=IDS)
+
+
+def registro_atual() -> RegistroIds:
+    return _REGISTRO_ATUAL.get()
+
+
+@contextlib.contextmanager
+def usando_registro(registro: RegistroIds):
+    """Objetos criados dentro do bloco (nesta thread/tarefa) usam 'registro'."""
+    token = _REGISTRO_ATUAL.set(registro)
+    try:
+        yield registro
+    finally:
+        _REGISTRO_ATUAL.reset(token)
+
+
+class ListaIds(MutableSequence):
+    """
+    Lista de referências guardada como array de inteiros (4 bytes por item).
+    Para quem usa, continua se comportando como uma lista de nomes:
+    append("Shape of You"), "x" in lista, lista[0] -> nome de exibição.
+    Os IDs crus ficam em lista.ids (para junções por índice).
+    Com 'escopo', os nomes são internados dentro dele (ver EspacoIds).
+    """
+
+    __slots__ = ("_espaco", "_escopo", "ids", "__weakref__")
+
+    def __init__(self, espaco: EspacoIds, nomes=(), escopo=None):
+        self._espaco = espaco
+        self._escopo = escopo
+        self.ids = array("I", (espaco.id(n, escopo) for n in nomes))
+        espaco.reter(self)
+
+    # IDs guardados pela lista (coleta do EspacoIds)
+    def _ids_retidos(self, espaco):
+        return self.ids if espaco is self._espaco else ()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._espaco.nome(x) for x in self.ids[i]]
+        return self._espaco.nome(self.ids[i])
+
+    def __setitem__(self, i, nome):
+        if isinstance(i, slice):
+            self.ids[i] = array("I", (self._espaco.id(n, self._escopo) for n in nome))
+        else:
+            self.ids[i] = self._espaco.id(nome, self._escopo)
+
+    def __delitem__(self, i):
+        del self.ids[i]
+
+    def insert(self, i, nome):
+        self.ids.insert(i, self._espaco.id(nome, self._escopo))
+
+    # Atalhos sem passar pelos métodos genéricos do MutableSequence
+    def append(self, nome):
+        self.ids.append(self._espaco.id(nome, self._escopo))
+
+    def extend(self, nomes):
+        espaco, escopo = self._espaco, self._escopo
+        self.ids.extend([espaco.id(n, escopo) for n in nomes])
+
+    def __iter__(self):
+        nomes = self._espaco._nomes
+        return (nomes[x] for x in self.ids)
+
+    def __contains__(self, nome):
+        i = self._espaco.procurar(nome, self._escopo)
+        return i is not None and i in self.ids
+
+    def __eq__(self, outra):
+        if isinstance(outra, ListaIds):
+            return self._espaco is outra._espaco and self.ids == outra.ids
+        if isinstance(outra, list):
+            return list(self) == outra
+        return NotImplemented
+
+    # Serializa pelos nomes: IDs só valem dentro do processo que os criou
+    # (o escopo também é um ID; quem o guarda refaz a lista ao desserializar)
+    def __reduce__(self):
+        return (_lista_de_nomes, (self._espaco.nome_espaco, list(self)))
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class ListaIdsPreguicosa(ListaIds):
+    """
+    ListaIds cujos IDs só são lidos (ex.: do banco) no primeiro acesso a .ids.
+    Enquanto não carregada, len() usa o tamanho informado e não dispara a leitura.
+    Depois de carregada o slot 'ids' fica preenchido e o acesso volta a ser direto.
+    """
+
+    __slots__ = ("_carregar", "_tamanho", "_trava")
+
+    def __init__(self, espaco: EspacoIds, carregar, tamanho: int = 0):
+        self._espaco = espaco
+        self._escopo = None
+        self._carregar = carregar      # função que retorna array("I") com os IDs
+        self._tamanho = int(tamanho)
+        self._trava = threading.Lock()
+        espaco.reter(self)
+
+    # Só é chamado enquanto o slot 'ids' está vazio
+    def __getattr__(self, nome):
+        if nome != "ids":
+            raise AttributeError(nome)
+        with self._trava:
+            try:
+                return _SLOT_IDS.__get__(self, ListaIds)
+            except AttributeError:
+                ids = self._carregar()
+                self.ids = ids
+                return ids
+
+    # Sem carregar: enquanto não lidos, os IDs estão no banco, que só referencia
+    # mídias do catálogo (vivas e vinculadas)
+    def _ids_retidos(self, espaco):
+        try:
+            ids = _SLOT_IDS.__get__(self, ListaIds)
+        except AttributeError:
+            return ()
+        return ids if espaco is self._espaco else ()
+
+    def carregada(self) -> bool:
+        try:
+            _SLOT_IDS.__get__(self, ListaIds)
+            return True
+        except AttributeError:
+            return False
+
+    def __len__(self):
+        try:
+            return len(_SLOT_IDS.__get__(self, ListaIds))
+        except AttributeError:
+            return self._tamanho
+
+
+_SLOT_IDS = ListaIds.ids
+
+
+def _lista_de_nomes(espaco: str, nomes) -> ListaIds:
+    return ListaIds(registro_atual().espaco(espaco), nomes)
@@ -0,0 +1,191 @@
+#\Streaming\indices.py
+from bisect import bisect_left, bisect_right
+from itertools import count
+
+
+# Normaliza chaves de índice (strip + lower)
+def _norm(s) -> str:
+    return str(s or "").strip().lower()
+
+
+class IndicesCatalogo:
+    """
+    Índices secundários mantidos junto com o catálogo:
+    - artista -> mídias (ordem de inclusão)
+    - gênero -> músicas, ordenadas por duração (permite faixa de duração por gênero)
+    - (host, temporada) -> episódios ordenados pelo número do episódio
+    - duração -> todas as mídias (consulta por faixa com bisect)
+    Consultas são buscas diretas nos índices, sem percorrer o catálogo.
+    """
+
+    def __init__(self):
+        self._seq = count()
+        self._ordem = {}          # id(midia) -> número de sequência (desempate estável)
+        self._por_artista = {}    # artista -> [midias]
+        self._por_genero = {}     # genero -> ([(duracao, seq)], [musicas])
+        self._episodios = {}      # (host, temporada) -> ([(episodio, seq)], [podcasts])
+        self._temporadas = {}     # host -> {temporadas} (para listar por host)
+        self._duracoes = ([], []) # ([(duracao, seq)], [midias])
+        self._nomes = {}          # chave normalizada -> nome como foi cadastrado
+
+    # Inclui um item em uma lista ordenada paralela (chaves, valores)
+    @staticmethod
+    def _inserir(par, chave, valor) -> None:
+        chaves, valores = par
+        i = bisect_right(chaves, chave)
+        chaves.insert(i, chave)
+        valores.insert(i, valor)
+
+    @staticmethod
+    def _retirar(par, chave) -> None:
+        chaves, valores = par
+        i = bisect_left(chaves, chave)
+        if i < len(chaves) and chaves[i] == chave:
+            del chaves[i]
+            del valores[i]
+
+    # Limites [ini, fim) da faixa [minimo, maximo] numa lista ordenada paralela
+    @staticmethod
+    def _limites(par, minimo=None, maximo=None) -> tuple:
+        chaves, _ = par
+        ini = 0 if minimo is None else bisect_left(chaves, (minimo, -1))
+        fim = len(chaves) if maximo is None else bisect_right(chaves, (maximo, float("inf")))
+        return ini, fim
+
+    # Faixa [minimo, maximo] de uma lista ordenada paralela
+    @staticmethod
+    def _faixa(par, minimo=None, maximo=None) -> list:
+        ini, fim = IndicesCatalogo._limites(par, minimo, maximo)
+        return par[1][ini:fim]
+
+    # Manutenção
+    def adicionar(self, midia) -> None:
+        if id(midia) in self._ordem:
+            return
+        seq = next(self._seq)
+        self._ordem[id(midia)] = seq
+        dur = int(getattr(midia, "duracao", 0) or 0)
+
+        artista = _norm(midia.artista)
+        self._nomes.setdefault(("artista", artista), midia.artista.strip())
+        self._por_artista.setdefault(artista, []).append(midia)
+
+        self._inserir(self._duracoes, (dur, seq), midia)
+
+        if hasattr(midia, "genero"):
+            genero = _norm(midia.genero)
+            self._nomes.setdefault(("genero", genero), midia.genero)
+            self._inserir(self._por_genero.setdefault(genero, ([], [])), (dur, seq), midia)
+
+        if hasattr(midia, "episodio"):
+            chave = (_norm(midia.host), _norm(midia.temporada))
+            self._nomes.setdefault(("temporada", chave), (midia.host, midia.temporada))
+            self._temporadas.setdefault(chave[0], set()).add(chave[1])
+            ep = int(midia.episodio or 0)
+            self._inserir(self._episodios.setdefault(chave, ([], [])), (ep, seq), midia)
+
+    def remover(self, midia) -> bool:
+        seq = self._ordem.pop(id(midia), None)
+        if seq is None:
+            return False
+        dur = int(getattr(midia, "duracao", 0) or 0)
+
+        artista = _norm(midia.artista)
+        lista = self._por_artista.get(artista, [])
+        lista[:] = [m for m in lista if m is not midia]
+        if not lista:
+            self._por_artista.pop(artista, None)
+
+        self._retirar(self._duracoes, (dur, seq))
+
+        if hasattr(midia, "genero"):
+            par = self._por_genero.get(_norm(midia.genero))
+            if par:
+                self._retirar(par, (dur, seq))
+                if not par[0]:
+                    del self._por_genero[_norm(midia.genero)]
+
+        if hasattr(midia, "episodio"):
+            chave = (_norm(midia.host), _norm(midia.temporada))
+            par = self._episodios.get(chave)
+            if par:
+                self._retirar(par, (int(midia.episodio or 0), seq))
+                if not par[0]:
+                    del self._episodios[chave]
+                    self._temporadas[chave[0]].discard(chave[1])
+                    if not self._temporadas[chave[0]]:
+                        del self._temporadas[chave[0]]
+        return True
+
+    def __len__(self):
+        return len(self._ordem)
+
+    def __contains__(self, midia):
+        return id(midia) in self._ordem
+
+    # Consultas
+    def por_artista(self, artista: str) -> list:
+        return list(self._por_artista.get(_norm(artista), []))
+
+    def por_genero(self, genero: str, duracao_min: int = None, duracao_max: int = None) -> list:
+        """Músicas do gênero em ordem de duração, opcionalmente numa faixa de duração (segundos)."""
+        par = self._por_genero.get(_norm(genero))
+        return self._faixa(par, duracao_min, duracao_max) if par else []
+
+    def episodios(self, host: str, temporada: str, ep_min: int = None, ep_max: int = None) -> list:
+        """Episódios de (host, temporada) ordenados por número, opcionalmente numa faixa."""
+        par = self._episodios.get((_norm(host), _norm(temporada)))
+        return self._faixa(par, ep_min, ep_max) if par else []
+
+    def por_host(self, host: str) -> list:
+        """Todos os episódios do host, temporada a temporada."""
+        h = _norm(host)
+        saida = []
+        for temporada in sorted(self._temporadas.get(h, ())):
+            saida.extend(self._episodios[(h, temporada)][1])
+        return saida
+
+    def por_duracao(self, minimo: int = None, maximo: int = None) -> list:
+        """Mídias com duração na faixa [minimo, maximo] (segundos), em ordem de duração."""
+        return self._faixa(self._duracoes, minimo, maximo)
+
+    def visao(self, genero: str = None, artista: str = None, duracao_min: int = None,
+              duracao_max: int = None) -> tuple:
+        """
+        (lista, ini, fim) do índice mais seletivo para os filtros, sem copiar a faixa:
+        os candidatos são lista[ini:fim]. Filtros não resolvidos pelo índice escolhido
+        (ex.: artista quando o gênero é mais seletivo) devem ser conferidos por quem consulta.
+        """
+        opcoes = []
+        if genero:
+            par = self._por_genero.get(_norm(genero))
+            if not par:
+                return [], 0, 0
+            opcoes.append((par[1], *self._limites(par, duracao_min, duracao_max)))
+        if artista:
+            lista = self._por_artista.get(_norm(artista))
+            if not lista:
+                return [], 0, 0
+            opcoes.append((lista, 0, len(lista)))
+        if not opcoes:
+            opcoes.append((self._duracoes[1], *self._limites(self._duracoes, duracao_min, duracao_max)))
+        return min(opcoes, key=lambda o: o[2] - o[1])
+
+    # Grupos (para os agregados do Analises)
+    def grupos_artista(self):
+        """Itera (nome do artista, [mídias])."""
+        for k, lista in self._por_artista.items():
+            yield self._nomes[("artista", k)], lista
+
+    def grupos_genero(self):
+        """Itera (nome do gênero, [músicas])."""
+        for k, par in self._por_genero.items():
+            yield self._nomes[("genero", k)], par[1]
+
+    def temporadas(self) -> list:
+        """Lista [(host, temporada, quantidade de episódios)]."""
+        return [(*self._nomes[("temporada", k)], len(par[0])) for k, par in self._episodios.items()]
+
+    def __repr__(self):
+        return (f"IndicesCatalogo(midias={len(self._ordem)}, artistas={len(self._por_artista)}, "
+                f"generos={len(self._por_genero)}, temporadas={len(self._episodios)})")
@@ -0,0 +1,168 @@
+#\Streaming\inquilinos.py
+import contextlib
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+
+from .instrumentacao import Instrumentacao, instrumentar
+
+
+def _hash(texto: str) -> int:
+    # Estável entre execuções (hash() de str muda a cada processo)
+    return zlib.crc32(str(texto).strip().lower().encode("utf-8"))
+
+
+class _Fragmento:
+    """Partição do roteador: os inquilinos cujo hash cai aqui e uma trava só deles."""
+
+    __slots__ = ("trava", "apps")
+
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.apps = {}          # inquilino -> StreamingApp carregado
+
+
+class RoteadorInquilinos:
+    """
+    Vários catálogos independentes (um por parceiro/inquilino) no mesmo processo.
+    - Cada inquilino tem o próprio StreamingApp: catálogo, usuários, playlists,
+      índices e relatório separados.
+    - O inquilino é roteado pelo hash do nome para um dos 'fragmentos'; a
+      carga e o descarte de um inquilino só travam o fragmento dele.
+    - No máximo 'max_ativos' inquilinos ficam em memória (LRU). O menos usado
+      é descarregado: o estado já está no snapshot SQLite do inquilino
+      (pasta/<inquilino>.db, via ArmazenamentoSQLite) e o app é fechado, o
+      que cancela as assinaturas de eventos e libera a memória. No próximo
+      acesso ele é recarregado do snapshot (históricos sob demanda).
+    - Inquilinos em uso (dentro de usar()) nunca são descartados.
+    Uso:
+        with roteador.usar("parceiro-a") as app:
+            app.reproduzir_midia(...)
+    """
+
+    def __init__(self, pasta, max_ativos: int = 8, fragmentos: int = 16, criar=None):
+        """
+        criar(app, inquilino): chamada para popular um inquilino sem snapshot
+        (ex.: importar o catálogo do parceiro); sem ela o app começa vazio.
+        """
+        self.pasta = Path(pasta)
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self.max_ativos = max(1, int(max_ativos))
+        self.criar = criar
+        self._fragmentos = [_Fragmento() for _ in range(max(1, int(fragmentos)))]
+        self._trava = threading.Lock()           # ordem de uso e contagem de uso
+        self._recentes = OrderedDict()           # inquilino -> None, do menos para o mais recente
+        self._em_uso = {}                        # inquilino -> sessões abertas
+        self.carregamentos = 0
+        self.descartes = 0
+
+    # Roteamento
+    def fragmento(self, inquilino: str) -> int:
+        return _hash(inquilino) % len(self._fragmentos)
+
+    def particao_usuario(self, inquilino: str, usuario: str, particoes: int) -> int:
+        """Partição estável de um usuário dentro do inquilino (para espalhar trabalho por usuário)."""
+        return _hash(f"{inquilino}\0{usuario}") % max(1, int(particoes))
+
+    def caminho(self, inquilino: str) -> Path:
+        nome = re.sub(r"[^\w.-]+", "_", str(inquilino).strip().lower()) or "inquilino"
+        return self.pasta / f"{nome}-{_hash(inquilino):08x}.db"
+
+    # Carga e descarte
+    @instrumentar("inquilinos.carregar")
+    def _carregar(self, inquilino: str):
+        from main import StreamingApp
+        from .ids import usando_registro
+
+        caminho = self.caminho(inquilino)
+        novo = not caminho.exists()
+        app = StreamingApp()
+        app.abrir_armazenamento(caminho)
+        if novo and self.criar is not None:
+            # O que criar() instanciar já nasce no registro de IDs do inquilino
+            with usando_registro(app.ids):
+                self.criar(app, inquilino)
+            app.armazenamento.gravar()
+        self.carregamentos += 1
+        Instrumentacao.contar("inquilinos.carregamentos")
+        return app
+
+    @instrumentar("inquilinos.descarregar")
+    def _descarregar(self, inquilino: str) -> bool:
+        frag = self._fragmentos[self.fragmento(inquilino)]
+        with frag.trava:
+            with self._trava:
+                # Pode ter voltado a ser usado entre a escolha e a trava do fragmento
+                if self._em_uso.get(inquilino) or inquilino in self._recentes:
+                    return False
+            app = frag.apps.pop(inquilino, None)
+            if app is None:
+                return False
+            app.fechar()                 # grava o snapshot e cancela as assinaturas
+        self.descartes += 1
+        Instrumentacao.contar("inquilinos.descartes")
+        return True
+
+    def _abrir(self, inquilino: str):
+        frag = self._fragmentos[self.fragmento(inquilino)]
+        with frag.trava:
+            app = frag.apps.get(inquilino)
+            if app is None:
+                app = frag.apps[inquilino] = self._carregar(inquilino)
+            with self._trava:
+                self._em_uso[inquilino] = self._em_uso.get(inquilino, 0) + 1
+                self._recentes.pop(inquilino, None)
+                self._recentes[inquilino] = None
+        return app
+
+    def _fechar_uso(self, inquilino: str) -> None:
+        with self._trava:
+            n = self._em_uso.get(inquilino, 0) - 1
+            if n > 0:
+                self._em_uso[inquilino] = n
+            else:
+                self._em_uso.pop(inquilino, None)
+        self._despejar()
+
+    def _despejar(self) -> None:
+        # Fora das travas de fragmento (evita esperar uma pela outra entre fragmentos)
+        while True:
+            with self._trava:
+                if len(self._recentes) <= self.max_ativos:
+                    return
+                vitima = next((i for i in self._recentes if not self._em_uso.get(i)), None)
+                if vitima is None:
+                    return                 # todos em uso: o limite volta a valer quando liberarem
+                del self._recentes[vitima]
+            self._descarregar(vitima)
+
+    @contextlib.contextmanager
+    def usar(self, inquilino: str):
+        """App do inquilino (carregado se preciso); não é descartado enquanto estiver em uso."""
+        app = self._abrir(inquilino)
+        try:
+            yield app
+        finally:
+            self._fechar_uso(inquilino)
+
+    # Consultas e encerramento
+    def ativos(self) -> list:
+        with self._trava:
+            return list(self._recentes)
+
+    def descarregar_todos(self) -> None:
+        """Grava e fecha todos os inquilinos carregados (ex.: ao encerrar o processo)."""
+        for frag in self._fragmentos:
+            with frag.trava:
+                apps, frag.apps = frag.apps, {}
+            for app in apps.values():
+                app.fechar()
+        with self._trava:
+            self._recentes.clear()
+
+    def __repr__(self):
+        return (f"RoteadorInquilinos(ativos={len(self._recentes)}/{self.max_ativos}, "
+                f"fragmentos={len(self._fragmentos)}, carregamentos={self.carregamentos}, "
+                f"descartes={self.descartes})")
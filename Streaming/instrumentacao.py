@@ -0,0 +1,236 @@
+#\Streaming\instrumentacao.py
+import os
+import threading
+import time
+from functools import wraps
+
+
+class Histograma:
+    """
+    Histograma de latências com baldes em potências de 2 (microssegundos).
+    O balde 0 guarda as amostras abaixo de 1 µs e o balde i (i >= 1) cobre o
+    intervalo [2^(i-1), 2^i) µs (índice = bit_length dos microssegundos);
+    memória fixa por métrica.
+    Guarda também quantidade, soma, mínimo e máximo (em segundos).
+    """
+
+    BALDES = 32
+
+    def __init__(self):
+        self.baldes = [0] * Histograma.BALDES
+        self.n = 0
+        self.total = 0.0
+        self.minimo = None
+        self.maximo = 0.0
+
+    # Registra uma amostra de duração (em segundos)
+    def registrar(self, segundos: float) -> None:
+        micros = int(segundos * 1_000_000)
+        i = min(micros.bit_length(), Histograma.BALDES - 1)
+        self.baldes[i] += 1
+        self.n += 1
+        self.total += segundos
+        if self.minimo is None or segundos < self.minimo:
+            self.minimo = segundos
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    # Estima um percentil pelo limite superior do balde onde ele cai
+    def percentil(self, p: float) -> float:
+        """Retorna o percentil p (0-100) estimado em segundos (limite superior do balde)."""
+        if not self.n:
+            return 0.0
+        alvo = max(1, int(round(self.n * p / 100.0)))
+        acumulado = 0
+        for i, qtde in enumerate(self.baldes):
+            acumulado += qtde
+            if acumulado >= alvo:
+                return min((1 << i) / 1_000_000, self.maximo)
+        return self.maximo
+
+    def resumo(self) -> dict:
+        ms = 1000.0
+        return {
+            "n": self.n,
+            "total_ms": self.total * ms,
+            "media_ms": (self.total / self.n * ms) if self.n else 0.0,
+            "min_ms": (self.minimo or 0.0) * ms,
+            "max_ms": self.maximo * ms,
+            "p50_ms": self.percentil(50) * ms,
+            "p99_ms": self.percentil(99) * ms,
+            "baldes_us": {f"<{1 << i}": q for i, q in enumerate(self.baldes) if q},
+        }
+
+
+# Gerenciador de contexto nulo, reutilizado quando a instrumentação está desligada
+class _Nulo:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# Gerenciador de contexto que mede um trecho e registra no histograma
+class _Medicao:
+    __slots__ = ("nome", "inicio")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.inicio = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        Instrumentacao.registrar_latencia(self.nome, time.perf_counter() - self.inicio)
+        return False
+
+
+class Instrumentacao:
+    """
+    Camada opcional de instrumentação: contadores, histogramas de latência
+    e captura de perfil (cProfile e tracemalloc).
+    Desligada por padrão; ligue com Instrumentacao.ativar() ou com a variável
+    de ambiente STREAMING_INSTRUMENTACAO=1. Desligada, cada ponto medido custa
+    apenas a leitura de um atributo de classe.
+    """
+
+    ativo = os.environ.get("STREAMING_INSTRUMENTACAO", "").strip() not in ("", "0")
+
+    _lock = threading.Lock()
+    _contadores = {}
+    _latencias = {}
+    _nulo = _Nulo()
+    _perfil = None
+    _memoria = False
+
+    @classmethod
+    def ativar(cls) -> None:
+        cls.ativo = True
+
+    @classmethod
+    def desativar(cls) -> None:
+        cls.ativo = False
+
+    @classmethod
+    def limpar(cls) -> None:
+        """Zera contadores e histogramas."""
+        with cls._lock:
+            cls._contadores = {}
+            cls._latencias = {}
+
+    # Coleta
+    @classmethod
+    def contar(cls, nome: str, qtde: int = 1) -> None:
+        if not cls.ativo:
+            return
+        with cls._lock:
+            cls._contadores[nome] = cls._contadores.get(nome, 0) + qtde
+
+    @classmethod
+    def registrar_latencia(cls, nome: str, segundos: float) -> None:
+        with cls._lock:
+            h = cls._latencias.get(nome)
+            if h is None:
+                h = cls._latencias[nome] = Histograma()
+            h.registrar(segundos)
+
+    @classmethod
+    def medir(cls, nome: str):
+        """Gerenciador de contexto: 'with Instrumentacao.medir("fase"): ...'."""
+        if not cls.ativo:
+            return cls._nulo
+        return _Medicao(nome)
+
+    @classmethod
+    def instrumentar(cls, nome: str):
+        """Decorador que mede cada chamada da função com o nome informado."""
+        def decorador(func):
+            @wraps(func)
+            def envoltorio(*args, **kwargs):
+                if not cls.ativo:
+                    return func(*args, **kwargs)
+                inicio = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    cls.registrar_latencia(nome, time.perf_counter() - inicio)
+            return envoltorio
+        return decorador
+
+    # Perfil (cProfile + tracemalloc), importados só quando usados
+    @classmethod
+    def iniciar_perfil(cls, memoria: bool = False) -> None:
+        """Inicia a captura com cProfile e, opcionalmente, tracemalloc."""
+        import cProfile
+
+        if cls._perfil is not None:
+            return
+        cls._perfil = cProfile.Profile()
+        cls._perfil.enable()
+        if memoria:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            cls._memoria = True
+
+    @classmethod
+    def parar_perfil(cls, top: int = 20) -> dict:
+        """
+        Encerra a captura e retorna {"cpu": texto do pstats, "memoria": [linhas]}.
+        Se nenhum perfil estiver ativo, retorna dicionário vazio.
+        """
+        import io
+        import pstats
+
+        if cls._perfil is None:
+            return {}
+        cls._perfil.disable()
+        saida = io.StringIO()
+        pstats.Stats(cls._perfil, stream=saida).sort_stats("cumulative").print_stats(top)
+        resultado = {"cpu": saida.getvalue(), "memoria": []}
+        cls._perfil = None
+
+        if cls._memoria:
+            import tracemalloc
+            foto = tracemalloc.take_snapshot()
+            resultado["memoria"] = [str(s) for s in foto.statistics("lineno")[:top]]
+            tracemalloc.stop()
+            cls._memoria = False
+        return resultado
+
+    # Leitura
+    @classmethod
+    def snapshot(cls) -> dict:
+        """Retorna uma cópia das métricas atuais (serializável em JSON)."""
+        with cls._lock:
+            return {
+                "ativo": cls.ativo,
+                "contadores": dict(cls._contadores),
+                "latencias": {nome: h.resumo() for nome, h in sorted(cls._latencias.items())},
+            }
+
+    @classmethod
+    def formatar(cls) -> str:
+        """Texto legível do snapshot, usado pelo menu."""
+        snap = cls.snapshot()
+        linhas = [f"=== Métricas de desempenho (ativo: {'sim' if snap['ativo'] else 'não'}) ==="]
+        if snap["contadores"]:
+            linhas.append("— Contadores —")
+            for nome, qtde in sorted(snap["contadores"].items()):
+                linhas.append(f"{nome}: {qtde}")
+        if snap["latencias"]:
+            linhas.append("— Latências (ms) —")
+            for nome, r in snap["latencias"].items():
+                linhas.append(f"{nome}: n={r['n']} média={r['media_ms']:.3f} "
+                              f"p50={r['p50_ms']:.3f} p99={r['p99_ms']:.3f} máx={r['max_ms']:.3f}")
+        if not snap["contadores"] and not snap["latencias"]:
+            linhas.append("Nenhuma métrica coletada.")
+        return "\n".join(linhas)
+
+
+# Atalhos usados pelos módulos instrumentados
+instrumentar = Instrumentacao.instrumentar
+medir = Instrumentacao.medir
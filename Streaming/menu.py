@@ -18,7 +18,10 @@ class Menu:
             "7": "Concatenar playlists",
             "8": "Gerar relatório",
             "9": "Carregar dados via arquvivos markdown",
-            "10": "Sair"
+            "10": "Sair",
+            "11": "Métricas de desempenho",
+            "12": "Recomendações para você",
+            "13": "Gerar playlist automática"
         }
 
     def exibir_menu_inicial(self):
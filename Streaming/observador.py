@@ -0,0 +1,295 @@
+#\Streaming\observador.py
+import os
+import threading
+import time
+from pathlib import Path
+
+from .instrumentacao import Instrumentacao, instrumentar
+
+
+# Extensões acompanhadas além dos catálogos (config.leitores.LEITORES)
+EXTENSAO_TEXTO = ".txt"
+
+
+def _chave(texto) -> str:
+    return str(texto or "").strip().lower()
+
+
+# Identidade de um registro do catálogo dentro do arquivo (a mesma da deduplicação do import)
+def chave_registro(secao: str, registro: dict):
+    if secao == "playlists":
+        dono = registro.get("dono") or registro.get("usuario")
+        return (secao, _chave(registro.get("nome")), _chave(dono))
+    if secao == "usuarios":
+        return (secao, _chave(registro.get("nome")))
+    return (secao, _chave(registro.get("titulo")))
+
+
+class ObservadorConfig:
+    """
+    Acompanha a pasta config/ e aplica no app só o que mudou, sem reimportar tudo.
+    - Sondagem: a cada 'intervalo' segundos uma passada de os.scandir() na pasta
+      compara (mtime, tamanho) de cada catálogo (.md, .csv, .jsonl, .spod) e
+      de cada texto (.txt); nenhum arquivo é aberto se nada mudou.
+    - Rajadas (editor salvando várias vezes, cópia em andamento) são agrupadas:
+      o arquivo só é aplicado depois de 'espera' segundos sem nova mudança.
+    - Catálogo alterado: o arquivo é relido e comparado, registro a registro,
+      com a versão anterior dele; só os registros novos ou alterados tocam o
+      app (mídias novas passam pela deduplicação do import, mídias alteradas
+      por app.atualizar_midia(), playlists alteradas têm os itens trocados).
+      Registros apagados do arquivo não são removidos do app (remoção
+      continua explícita, via app.remover_midias()).
+    - Texto alterado, criado ou apagado: a entrada do cache de textos sai e a
+      mídia do mesmo título volta para a fila da busca (retokenizada no
+      próximo acesso, pela assinatura com o mtime do .txt).
+    - O estado inicial da pasta é a referência: quem cria o observador já
+      importou a pasta (ex.: importar_markdowns_para_main).
+    verificar() faz uma passada síncrona (testes e linha de comando);
+    iniciar()/parar() rodam as passadas numa thread em segundo plano.
+    """
+
+    def __init__(self, app, pasta=None, intervalo: float = 1.0, espera: float = 0.5,
+                 ao_aplicar=None, relogio=time.monotonic):
+        """ao_aplicar(resumo): chamada depois de cada arquivo aplicado (ex.: avisar no menu)."""
+        from config.leitores import LEITORES
+
+        self.app = app
+        self.pasta = Path(pasta) if pasta is not None else Path(__file__).parents[1] / "config"
+        self.intervalo = max(0.01, float(intervalo))
+        self.espera = max(0.0, float(espera))
+        self.ao_aplicar = ao_aplicar
+        self.relogio = relogio
+        self._catalogos = frozenset(LEITORES)
+        self._vistos = {}          # nome -> (mtime_ns, tamanho) da última passada
+        self._mudancas = {}        # nome -> instante da última mudança ainda não aplicada
+        self._registros = {}       # nome do catálogo -> {chave do registro: registro}
+        self._trava = threading.Lock()
+        self._parar = threading.Event()
+        self._thread = None
+        self.passadas = 0
+        self.aplicados = []        # resumos dos arquivos aplicados (os mais recentes)
+        self._referencia()
+
+    # Estado da pasta
+    def _acompanhado(self, nome: str) -> bool:
+        sufixo = os.path.splitext(nome)[1].lower()
+        return sufixo == EXTENSAO_TEXTO or sufixo in self._catalogos
+
+    def _varrer(self) -> dict:
+        estado = {}
+        try:
+            with os.scandir(self.pasta) as it:
+                for e in it:
+                    if not self._acompanhado(e.name):
+                        continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue                    # apagado durante a passada
+                    estado[e.name] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            pass
+        return estado
+
+    def _referencia(self) -> None:
+        self._vistos = self._varrer()
+        for nome in self._vistos:
+            if not nome.lower().endswith(EXTENSAO_TEXTO):
+                try:
+                    self._registros[nome] = self._indexar(self._ler(self.pasta / nome))
+                except (OSError, ValueError):
+                    self._registros[nome] = {}
+
+    @staticmethod
+    def _ler(caminho: Path):
+        from config.leitores import ler_arquivo
+
+        return ler_arquivo(caminho)
+
+    # {chave do registro: registro} de um fluxo [(secao, [registros])]
+    @staticmethod
+    def _indexar(secoes) -> dict:
+        from config.leitores import secao_canonica
+
+        registros = {}
+        for secao, lista in secoes:
+            secao = secao_canonica(secao)
+            for r in lista:
+                registros[chave_registro(secao, r)] = r
+        return registros
+
+    # Passada
+    @instrumentar("observador.verificar")
+    def verificar(self, forcar: bool = False) -> list:
+        """
+        Uma passada: registra as mudanças e aplica os arquivos já estáveis
+        (com forcar=True, aplica sem esperar). Retorna os resumos aplicados.
+        """
+        with self._trava:
+            self.passadas += 1
+            agora = self.relogio()
+            atual = self._varrer()
+            for nome in self._vistos.keys() | atual.keys():
+                if self._vistos.get(nome) != atual.get(nome):
+                    self._mudancas[nome] = agora
+            self._vistos = atual
+            prontos = sorted(n for n, t in self._mudancas.items() if forcar or agora - t >= self.espera)
+            resumos = []
+            for nome in prontos:
+                del self._mudancas[nome]
+                resumo = self._aplicar(nome)
+                if resumo is not None:
+                    resumos.append(resumo)
+            self.aplicados = (self.aplicados + resumos)[-100:]
+        for resumo in resumos:
+            if self.ao_aplicar is not None:
+                self.ao_aplicar(resumo)
+        return resumos
+
+    def pendentes(self) -> list:
+        """Arquivos alterados que ainda aguardam a espera da rajada."""
+        with self._trava:
+            return sorted(self._mudancas)
+
+    def _aplicar(self, nome: str):
+        caminho = self.pasta / nome
+        if nome.lower().endswith(EXTENSAO_TEXTO):
+            return self._aplicar_texto(caminho)
+        if nome not in self._vistos:
+            # Catálogo apagado: o que ele trouxe continua no app
+            self._registros.pop(nome, None)
+            return {"arquivo": nome, "tipo": "catalogo", "apagado": True}
+        return self._aplicar_catalogo(caminho)
+
+    # Textos (letras e descrições)
+    def _aplicar_texto(self, caminho: Path) -> dict:
+        from .arquivo_midia import TEXTOS
+
+        midia = self.app.catalogo.buscar(caminho.stem)
+        if midia is not None:
+            TEXTOS.invalidar(midia.caminho_texto_config())
+            self.app.reindexar_midia(midia)
+        TEXTOS.invalidar(caminho)
+        Instrumentacao.contar("observador.textos")
+        return {"arquivo": caminho.name, "tipo": "texto",
+                "midia": midia.titulo if midia is not None else None,
+                "apagado": caminho.name not in self._vistos}
+
+    # Catálogos
+    @instrumentar("observador.aplicar_catalogo")
+    def _aplicar_catalogo(self, caminho: Path) -> dict:
+        from config.lermarkdown import LerMarkdown
+        from .catalogo import Catalogo
+        from .deduplicacao import Deduplicador
+        from .ids import usando_registro
+        from .playlist import Playlist
+
+        nome = caminho.name
+        resumo = {"arquivo": nome, "tipo": "catalogo", "registros_alterados": 0,
+                  "usuarios": 0, "musicas": 0, "podcasts": 0, "playlists": 0,
+                  "midias_atualizadas": 0, "playlists_atualizadas": 0,
+                  "avisos": 0, "erros": 0, "falha": None}
+        try:
+            secoes = self._ler(caminho)
+        except (OSError, ValueError) as e:
+            # Arquivo inválido (ou ainda sendo gravado): fica a versão anterior
+            resumo["falha"] = str(e)
+            return resumo
+
+        anteriores = self._registros.get(nome, {})
+        atuais = self._indexar(secoes)
+        alterados = {k for k, r in atuais.items() if anteriores.get(k) != r}
+        resumo["registros_alterados"] = len(alterados)
+        if not alterados:
+            self._registros[nome] = atuais
+            return resumo
+
+        app = self.app
+        with app._trava_importacao, app.travado(), usando_registro(app.ids):
+            # Títulos que este arquivo já trouxe ficam fora da deduplicação: a versão
+            # nova do registro é comparada com as outras faixas, não com a antiga
+            proprios = {k[1] for k in anteriores if k[0] in ("musicas", "podcasts")}
+            dedup = Deduplicador.de_midias(m for m in app.catalogo if Catalogo.chave(m.titulo) not in proprios)
+            leitor = LerMarkdown(strict=False, deduplicador=dedup)
+            result = leitor.parse_registros(secoes, raiz_arquivo_log=str(caminho))
+            resumo["avisos"] = len(result["warnings"])
+            resumo["erros"] = len(result["errors"])
+
+            # 1 - Usuários novos
+            existentes = {_chave(u.nome) for u in app.usuarios}
+            for u in result["usuarios"]:
+                k = _chave(u.nome)
+                if ("usuarios", k) in alterados and k not in existentes:
+                    app.incluir_usuario(u)
+                    existentes.add(k)
+                    resumo["usuarios"] += 1
+
+            # 2 - Mídias: novas entram em lote; as deste arquivo com campos novos são atualizadas
+            novas = []
+            for secao, titulo in sorted(k for k in alterados if k[0] in ("musicas", "podcasts")):
+                midia = leitor.midia_do_registro(titulo)
+                if midia is None or midia in app.catalogo:
+                    continue                            # rejeitada, mesclada ou em conflito
+                atual = app.catalogo.buscar(midia.titulo)
+                if atual is None:
+                    novas.append(midia)
+                elif Catalogo.chave(midia.titulo) in proprios and type(atual) is type(midia):
+                    campos = {c: getattr(midia, c) for c in ("duracao", "artista", "genero",
+                                                             "episodio", "temporada", "host")
+                              if hasattr(midia, c)}
+                    resumo["midias_atualizadas"] += app.atualizar_midia(atual, **campos)
+            for midia in app.adicionar_midias(novas):
+                resumo["podcasts" if hasattr(midia, "episodio") else "musicas"] += 1
+
+            # 3 - Playlists: itens apontam para as mídias do catálogo do app
+            por_chave = {(_chave(pl.nome), _chave(pl.dono)): pl for pl in app.playlists}
+            for pl in result["playlists"]:
+                dono_nome = (getattr(pl, "dono", "") or "").strip() or "Usuário não informado"
+                k = (_chave(pl.nome), _chave(dono_nome))
+                if ("playlists", *k) not in alterados:
+                    continue
+                itens = [m for m in (app.catalogo.buscar(i.titulo) for i in (pl.itens or [])) if m is not None]
+                atual = por_chave.get(k)
+                if atual is None:
+                    nova = Playlist(pl.nome, dono_nome, itens=itens,
+                                    reproducoes=int(getattr(pl, "reproducoes", 0) or 0))
+                    app.incluir_playlist(nova)
+                    por_chave[k] = nova
+                    resumo["playlists"] += 1
+                elif app.substituir_itens_playlist(atual, itens):
+                    resumo["playlists_atualizadas"] += 1
+
+        self._registros[nome] = atuais
+        Instrumentacao.contar("observador.registros_aplicados", len(alterados))
+        return resumo
+
+    # Segundo plano
+    def iniciar(self):
+        """Roda as passadas numa thread daemon até parar()."""
+        if self._thread is None or not self._thread.is_alive():
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._rodar, name="observador-config", daemon=True)
+            self._thread.start()
+        return self
+
+    def _rodar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.verificar()
+            except Exception as e:                      # a thread não pode morrer por um arquivo ruim
+                Instrumentacao.contar("observador.falhas")
+                print(f"[observador] falha ao aplicar config/: {e}")
+
+    def parar(self, timeout: float = 5.0) -> None:
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def __repr__(self):
+        return (f"ObservadorConfig(pasta='{self.pasta}', arquivos={len(self._vistos)}, "
+                f"pendentes={len(self._mudancas)}, passadas={self.passadas}, ativo={self.ativo})")
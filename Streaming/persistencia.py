@@ -0,0 +1,474 @@
+#\Streaming\persistencia.py
+"""
+Persistência do StreamingApp em SQLite (biblioteca padrão).
+
+- O banco é aberto em modo WAL (leitores não bloqueiam a gravação) com
+  synchronous=NORMAL; todas as gravações passam por comandos preparados
+  (executemany) dentro de transações em lote.
+- O estado é acompanhado pelos eventos do app (app.eventos, Streaming.eventos):
+  inclusões, reproduções, avaliações, históricos e alterações de playlists
+  viram operações pendentes, gravadas juntas quando o lote enche, quando o
+  intervalo passa ou em gravar()/fechar(). Contadores são coalescidos: mil
+  reproduções da mesma mídia viram um único UPDATE com o valor final.
+- Ao abrir, catálogo, usuários e playlists são recriados a partir do banco;
+  os históricos (a maior parte dos dados) só são lidos quando acessados
+  (ListaIdsPreguicosa), e len() do histórico usa o total guardado.
+"""
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+from .ids import ListaIdsPreguicosa, usando_registro
+from .instrumentacao import instrumentar
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS midias (
+    id          INTEGER PRIMARY KEY,
+    tipo        TEXT    NOT NULL,
+    titulo      TEXT    NOT NULL,
+    duracao     INTEGER NOT NULL DEFAULT 0,
+    artista     TEXT,
+    genero      TEXT,
+    episodio    INTEGER,
+    temporada   TEXT,
+    host        TEXT,
+    reproducoes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS avaliacoes (
+    midia_id INTEGER NOT NULL REFERENCES midias(id),
+    nota     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_avaliacoes_midia ON avaliacoes(midia_id);
+CREATE TABLE IF NOT EXISTS usuarios (
+    id             INTEGER PRIMARY KEY,
+    nome           TEXT    NOT NULL UNIQUE,
+    criado_em      TEXT,
+    playlists      TEXT    NOT NULL DEFAULT '[]',
+    qtde_historico INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS historico (
+    usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+    midia_id   INTEGER NOT NULL REFERENCES midias(id)
+);
+CREATE INDEX IF NOT EXISTS idx_historico_usuario ON historico(usuario_id);
+CREATE TABLE IF NOT EXISTS playlists (
+    id          INTEGER PRIMARY KEY,
+    nome        TEXT    NOT NULL,
+    dono        TEXT,
+    reproducoes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS playlist_itens (
+    playlist_id INTEGER NOT NULL REFERENCES playlists(id),
+    posicao     INTEGER NOT NULL,
+    midia_id    INTEGER NOT NULL REFERENCES midias(id),
+    PRIMARY KEY (playlist_id, posicao)
+);
+"""
+
+# Comandos preparados (o sqlite3 guarda o plano em cache por texto do comando)
+SQL_MIDIA = ("INSERT OR IGNORE INTO midias (id, tipo, titulo, duracao, artista, genero, episodio, temporada, "
+             "host, reproducoes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+SQL_MIDIA_ALTERAR = ("UPDATE midias SET titulo = ?, duracao = ?, artista = ?, genero = ?, episodio = ?, "
+                     "temporada = ?, host = ? WHERE id = ?")
+# Remoção de mídia: sai com as avaliações, as entradas de histórico (descontadas do total
+# de cada usuário) e os itens de playlist, para nenhuma referência apontar para um id reutilizado
+SQL_MIDIA_EXCLUIR = "DELETE FROM midias WHERE id = ?"
+SQL_AVALIACOES_EXCLUIR = "DELETE FROM avaliacoes WHERE midia_id = ?"
+SQL_QTDE_HISTORICO_EXCLUIR = ("UPDATE usuarios SET qtde_historico = qtde_historico - (SELECT COUNT(*) FROM historico "
+                              "WHERE historico.usuario_id = usuarios.id AND historico.midia_id = ?1) "
+                              "WHERE id IN (SELECT usuario_id FROM historico WHERE midia_id = ?1)")
+SQL_HISTORICO_EXCLUIR = "DELETE FROM historico WHERE midia_id = ?"
+SQL_ITENS_MIDIA_EXCLUIR = "DELETE FROM playlist_itens WHERE midia_id = ?"
+SQL_AVALIACAO = "INSERT INTO avaliacoes (midia_id, nota) VALUES (?, ?)"
+SQL_USUARIO = ("INSERT OR IGNORE INTO usuarios (id, nome, criado_em, playlists, qtde_historico) "
+               "VALUES (?, ?, ?, ?, ?)")
+SQL_HISTORICO = "INSERT INTO historico (usuario_id, midia_id) VALUES (?, ?)"
+SQL_PLAYLIST = "INSERT OR REPLACE INTO playlists (id, nome, dono, reproducoes) VALUES (?, ?, ?, ?)"
+SQL_PLAYLIST_EXCLUIR = "DELETE FROM playlists WHERE id = ?"
+SQL_PLAYLIST_RENOMEAR = "UPDATE playlists SET nome = ? WHERE id = ?"
+SQL_PLAYLIST_DONO = "UPDATE playlists SET dono = ? WHERE id = ?"
+SQL_USUARIO_RENOMEAR = "UPDATE usuarios SET nome = ? WHERE id = ?"
+SQL_ITENS_LIMPAR = "DELETE FROM playlist_itens WHERE playlist_id = ?"
+SQL_ITEM = "INSERT INTO playlist_itens (playlist_id, posicao, midia_id) VALUES (?, ?, ?)"
+SQL_REP_MIDIA = "UPDATE midias SET reproducoes = ? WHERE id = ?"
+SQL_REP_PLAYLIST = "UPDATE playlists SET reproducoes = ? WHERE id = ?"
+SQL_QTDE_HISTORICO = "UPDATE usuarios SET qtde_historico = qtde_historico + ? WHERE id = ?"
+SQL_PLAYLISTS_USUARIO = "UPDATE usuarios SET playlists = ? WHERE id = ?"
+
+
+class ArmazenamentoSQLite:
+    """
+    Banco local do app. Uso:
+        arm = ArmazenamentoSQLite("dados/streaming.db")
+        arm.carregar(app)     # recria o estado salvo e passa a acompanhar o app
+        ...
+        arm.fechar()          # grava o que estiver pendente
+    """
+
+    def __init__(self, caminho, lote: int = 1000, intervalo: float = 1.0):
+        self.caminho = Path(caminho)
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        self.lote = max(1, int(lote))
+        self.intervalo = float(intervalo)
+        self.app = None
+        self._trava = threading.RLock()
+        self._con = sqlite3.connect(str(self.caminho), check_same_thread=False, isolation_level=None)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.executescript(ESQUEMA)
+
+        # IDs do processo (registro de IDs do app) -> IDs do banco
+        self._midias = {}        # app.ids.midias -> midias.id
+        self._midias_banco = {}  # midias.id -> app.ids.midias (leitura dos históricos)
+        self._usuarios = {}      # app.ids.usuarios -> usuarios.id
+        # Os eventos de reprodução são globais: só contam os objetos deste app
+        # (outro app/inquilino pode ter uma mídia ou usuário com o mesmo nome)
+        self._midia_obj = {}     # id(mídia) -> midias.id
+        self._usuario_obj = {}   # id(usuário) -> usuarios.id
+        self._playlists = {}     # id(playlist) -> playlists.id
+        self._proximo = {t: self._maximo(t) + 1 for t in ("midias", "usuarios", "playlists")}
+
+        # Pendências
+        self._ops = []                 # [(sql, parâmetros)] na ordem dos eventos
+        self._rep_midias = {}          # midias.id -> mídia (valor lido na gravação)
+        self._rep_playlists = {}       # playlists.id -> playlist
+        self._qtde_historico = {}      # usuarios.id -> quantidade de novas entradas
+        self._itens_sujos = {}         # playlists.id -> playlist
+        self._ultima_gravacao = time.monotonic()
+        self.gravacoes = 0
+
+        atexit.register(self.fechar)
+
+    def _maximo(self, tabela: str) -> int:
+        return self._con.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}").fetchone()[0]
+
+    def _novo_id(self, tabela: str) -> int:
+        i = self._proximo[tabela]
+        self._proximo[tabela] = i + 1
+        return i
+
+    def vazio(self) -> bool:
+        return self._con.execute("SELECT NOT EXISTS (SELECT 1 FROM midias) "
+                                 "AND NOT EXISTS (SELECT 1 FROM usuarios)").fetchone()[0] == 1
+
+    # Eventos acompanhados
+    def _assinaturas(self):
+        return [
+            ("midia_adicionada", self._ao_adicionar_midia),
+            ("midia_removida", self._ao_remover_midia),
+            ("midia_alterada", self._ao_alterar_midia),
+            ("usuario_criado", self._ao_criar_usuario),
+            ("usuario_renomeado", self._ao_renomear_usuario),
+            ("playlist_criada", self._ao_criar_playlist),
+            ("playlist_excluida", self._ao_excluir_playlist),
+            ("playlist_renomeada", self._ao_renomear_playlist),
+            ("playlist_substituida", self._ao_substituir_playlist),
+            ("playlist_alterada", self._ao_alterar_playlist),
+            ("reproducao", self._ao_reproduzir),
+            ("reproducao_playlist", self._ao_reproduzir_playlist),
+            ("historico", self._ao_historico),
+            ("avaliacao", self._ao_avaliar),
+        ]
+
+    # Carga
+    @instrumentar("persistencia.carregar")
+    def carregar(self, app) -> dict:
+        """
+        Recria no app o estado salvo (sem disparar novas gravações) e passa a
+        acompanhar os eventos dele. Retorna as quantidades carregadas.
+        """
+        from .arquivo_midia import Musica, Podcast
+        from .playlist import Playlist
+        from .usuarios import Usuario
+
+        with self._trava, usando_registro(app.ids):
+            self.app = app
+            con = self._con
+            avaliacoes = {}
+            for midia_id, nota in con.execute("SELECT midia_id, nota FROM avaliacoes ORDER BY rowid"):
+                avaliacoes.setdefault(midia_id, []).append(nota)
+
+            por_id = {}
+            for (i, tipo, titulo, duracao, artista, genero, episodio, temporada, host,
+                 reproducoes) in con.execute("SELECT * FROM midias ORDER BY id"):
+                if tipo == "podcast":
+                    m = Podcast(titulo, duracao, artista, episodio, temporada, host, reproducoes=reproducoes)
+                else:
+                    m = Musica(titulo, duracao, artista, genero, reproducoes=reproducoes,
+                               avaliacoes=avaliacoes.get(i, []))
+                self._midias[m.id] = self._midia_obj[id(m)] = i
+                self._midias_banco[i] = m.id
+                por_id[i] = m
+            app.adicionar_midias(list(por_id.values()))
+
+            usuarios = 0
+            for i, nome, criado_em, playlists, qtde in con.execute(
+                    "SELECT id, nome, criado_em, playlists, qtde_historico FROM usuarios ORDER BY id"):
+                u = Usuario(nome)
+                if criado_em:
+                    u.data_criacao = datetime.fromisoformat(criado_em)
+                u.playlists = json.loads(playlists or "[]")
+                u.historico = ListaIdsPreguicosa(app.ids.midias, self._leitor_historico(i), qtde)
+                self._usuarios[u.id] = self._usuario_obj[id(u)] = i
+                app.incluir_usuario(u)
+                usuarios += 1
+
+            itens = {}
+            for playlist_id, midia_id in con.execute(
+                    "SELECT playlist_id, midia_id FROM playlist_itens ORDER BY playlist_id, posicao"):
+                itens.setdefault(playlist_id, []).append(por_id.get(midia_id))
+            playlists = 0
+            for i, nome, dono, reproducoes in con.execute(
+                    "SELECT id, nome, dono, reproducoes FROM playlists ORDER BY id"):
+                pl = Playlist(nome, dono, itens=[m for m in itens.get(i, []) if m is not None],
+                              reproducoes=reproducoes)
+                self._playlists[id(pl)] = i
+                app.incluir_playlist(pl)
+                playlists += 1
+
+            for evento, funcao in self._assinaturas():
+                app.eventos.assinar(evento, funcao)
+        return {"midias": len(por_id), "usuarios": usuarios, "playlists": playlists}
+
+    # Histórico de um usuário, lido do banco no primeiro acesso
+    def _leitor_historico(self, usuario_id: int):
+        def carregar():
+            with self._trava:
+                self._gravar()    # entradas ainda pendentes entram na leitura
+                inverso = self._midias_banco
+                linhas = self._con.execute("SELECT midia_id FROM historico WHERE usuario_id = ? ORDER BY rowid",
+                                           (usuario_id,))
+                return array("I", (inverso[m] for (m,) in linhas if m in inverso))
+        return carregar
+
+    # Registro das pendências
+    def _pendente(self, sql: str, parametros) -> None:
+        self._ops.append((sql, parametros))
+        self._talvez_gravar()
+
+    def _talvez_gravar(self) -> None:
+        pendentes = len(self._ops) + len(self._rep_midias) + len(self._rep_playlists)
+        if pendentes >= self.lote or time.monotonic() - self._ultima_gravacao >= self.intervalo:
+            self._gravar()
+
+    def _ao_adicionar_midia(self, app, midia, **_) -> None:
+        if app is not self.app or midia.id in self._midias:
+            return
+        with self._trava:
+            i = self._midias[midia.id] = self._midia_obj[id(midia)] = self._novo_id("midias")
+            self._midias_banco[i] = midia.id
+            podcast = hasattr(midia, "episodio")
+            self._pendente(SQL_MIDIA, (
+                i, "podcast" if podcast else "musica", midia.titulo, int(midia.duracao or 0), midia.artista,
+                getattr(midia, "genero", None), getattr(midia, "episodio", None),
+                getattr(midia, "temporada", None), getattr(midia, "host", None), int(midia.reproducoes)))
+            for nota in list(getattr(midia, "avaliacoes", None) or []):
+                self._pendente(SQL_AVALIACAO, (i, nota))
+
+    # A mídia sai do banco e dos mapas: incluída de novo (mesmo título, outro objeto),
+    # vira uma linha nova com os dados e contadores do objeto novo
+    def _ao_remover_midia(self, app, midia, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            i = self._midia_obj.pop(id(midia), None)
+            if i is None:
+                return
+            if self._midias.get(midia.id) == i:
+                del self._midias[midia.id]
+            self._midias_banco.pop(i, None)
+            self._rep_midias.pop(i, None)
+            # Históricos pendentes entram antes, para o desconto por usuário ver todas as entradas
+            self._gravar()
+            for sql in (SQL_QTDE_HISTORICO_EXCLUIR, SQL_HISTORICO_EXCLUIR, SQL_ITENS_MIDIA_EXCLUIR,
+                        SQL_AVALIACOES_EXCLUIR, SQL_MIDIA_EXCLUIR):
+                self._pendente(sql, (i,))
+
+    def _ao_alterar_midia(self, app, midia, **_) -> None:
+        if app is not self.app:
+            return
+        i = self._midia_obj.get(id(midia))
+        if i is not None:
+            with self._trava:
+                self._pendente(SQL_MIDIA_ALTERAR, (
+                    midia.titulo, int(midia.duracao or 0), midia.artista, getattr(midia, "genero", None),
+                    getattr(midia, "episodio", None), getattr(midia, "temporada", None),
+                    getattr(midia, "host", None), i))
+
+    def _ao_criar_usuario(self, app, usuario, **_) -> None:
+        if app is not self.app or usuario.id in self._usuarios:
+            return
+        with self._trava:
+            i = self._usuarios[usuario.id] = self._usuario_obj[id(usuario)] = self._novo_id("usuarios")
+            historico = list(usuario.historico.ids)
+            self._pendente(SQL_USUARIO, (i, usuario.nome, usuario.data_criacao.isoformat(),
+                                         json.dumps(list(usuario.playlists), ensure_ascii=False),
+                                         len(historico)))
+            for m in historico:
+                if m in self._midias:
+                    self._pendente(SQL_HISTORICO, (i, self._midias[m]))
+
+    # O nome vai para a linha do usuário e para o dono das playlists dele
+    def _ao_renomear_usuario(self, app, usuario, **_) -> None:
+        if app is not self.app:
+            return
+        i = self._usuario_obj.get(id(usuario))
+        if i is None:
+            return
+        with self._trava:
+            self._pendente(SQL_USUARIO_RENOMEAR, (usuario.nome, i))
+            for pl in list(app.playlists):
+                p = self._playlists.get(id(pl))
+                if p is not None and pl.dono_id == usuario.id:
+                    self._pendente(SQL_PLAYLIST_DONO, (pl.dono, p))
+
+    # A lista de playlists do dono (nomes) também é regravada, não só no fechar()
+    def _ao_renomear_playlist(self, app, playlist, **_) -> None:
+        if app is not self.app:
+            return
+        i = self._playlists.get(id(playlist))
+        if i is None:
+            return
+        with self._trava:
+            self._pendente(SQL_PLAYLIST_RENOMEAR, (playlist.nome, i))
+            dono = app.ids.usuarios.objeto(playlist.dono_id)
+            u = self._usuario_obj.get(id(dono))
+            if u is not None:
+                self._pendente(SQL_PLAYLISTS_USUARIO, (json.dumps(list(dono.playlists), ensure_ascii=False), u))
+
+    def _registrar_playlist(self, playlist, i: int) -> None:
+        self._playlists[id(playlist)] = i
+        self._pendente(SQL_PLAYLIST, (i, playlist.nome, playlist.dono, int(playlist.reproducoes)))
+        self._itens_sujos[i] = playlist
+
+    def _ao_criar_playlist(self, app, playlist, **_) -> None:
+        if app is not self.app or id(playlist) in self._playlists:
+            return
+        with self._trava:
+            self._registrar_playlist(playlist, self._novo_id("playlists"))
+
+    def _ao_excluir_playlist(self, app, playlist, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            i = self._playlists.pop(id(playlist), None)
+            if i is not None:
+                self._itens_sujos.pop(i, None)
+                self._rep_playlists.pop(i, None)
+                self._pendente(SQL_ITENS_LIMPAR, (i,))
+                self._pendente(SQL_PLAYLIST_EXCLUIR, (i,))
+
+    def _ao_substituir_playlist(self, app, antiga, nova, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            i = self._playlists.pop(id(antiga), None)
+            if i is not None:
+                self._rep_playlists.pop(i, None)
+                self._registrar_playlist(nova, i)
+
+    def _ao_alterar_playlist(self, playlist, **_) -> None:
+        i = self._playlists.get(id(playlist))
+        if i is not None:
+            with self._trava:
+                self._itens_sujos[i] = playlist
+                self._talvez_gravar()
+
+    def _ao_reproduzir(self, midia, **_) -> None:
+        i = self._midia_obj.get(id(midia))
+        if i is not None:
+            with self._trava:
+                self._rep_midias[i] = midia
+                self._talvez_gravar()
+
+    def _ao_reproduzir_playlist(self, playlist, **_) -> None:
+        i = self._playlists.get(id(playlist))
+        if i is not None:
+            with self._trava:
+                self._rep_playlists[i] = playlist
+                self._talvez_gravar()
+
+    def _ao_historico(self, usuario, titulo=None, **_) -> None:
+        u = self._usuario_obj.get(id(usuario))
+        m = self._midias.get(self.app.ids.midias.procurar(titulo))
+        if u is None or m is None:
+            return
+        with self._trava:
+            self._qtde_historico[u] = self._qtde_historico.get(u, 0) + 1
+            self._pendente(SQL_HISTORICO, (u, m))
+
+    def _ao_avaliar(self, midia, nota, **_) -> None:
+        i = self._midia_obj.get(id(midia))
+        if i is not None:
+            with self._trava:
+                self._pendente(SQL_AVALIACAO, (i, nota))
+
+    # Gravação em lote: uma transação, um executemany por sequência de comandos iguais
+    @instrumentar("persistencia.gravar")
+    def _gravar(self) -> None:
+        ops, self._ops = self._ops, []
+        rep_midias, self._rep_midias = self._rep_midias, {}
+        rep_playlists, self._rep_playlists = self._rep_playlists, {}
+        qtde, self._qtde_historico = self._qtde_historico, {}
+        sujos, self._itens_sujos = self._itens_sujos, {}
+        self._ultima_gravacao = time.monotonic()
+        if not (ops or rep_midias or rep_playlists or qtde or sujos):
+            return
+
+        con = self._con
+        con.execute("BEGIN")
+        try:
+            inicio = 0
+            while inicio < len(ops):
+                sql = ops[inicio][0]
+                fim = inicio
+                while fim < len(ops) and ops[fim][0] == sql:
+                    fim += 1
+                con.executemany(sql, [p for _, p in ops[inicio:fim]])
+                inicio = fim
+            if sujos:
+                con.executemany(SQL_ITENS_LIMPAR, [(i,) for i in sujos])
+                itens = []
+                for i, pl in sujos.items():
+                    for pos, m in enumerate(list(pl.itens)):
+                        if m is not None and m.id in self._midias:
+                            itens.append((i, pos, self._midias[m.id]))
+                con.executemany(SQL_ITEM, itens)
+            con.executemany(SQL_REP_MIDIA, [(int(m.reproducoes), i) for i, m in rep_midias.items()])
+            con.executemany(SQL_REP_PLAYLIST, [(int(p.reproducoes), i) for i, p in rep_playlists.items()])
+            con.executemany(SQL_QTDE_HISTORICO, [(q, i) for i, q in qtde.items()])
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        self.gravacoes += 1
+
+    def gravar(self) -> None:
+        """Grava agora tudo o que estiver pendente."""
+        with self._trava:
+            self._gravar()
+
+    def fechar(self) -> None:
+        """Grava as pendências (e as listas de playlists dos usuários) e fecha o banco."""
+        with self._trava:
+            if self._con is None:
+                return
+            if self.app is not None:
+                for evento, funcao in self._assinaturas():
+                    self.app.eventos.cancelar(evento, funcao)
+                self._ops.extend(
+                    (SQL_PLAYLISTS_USUARIO, (json.dumps(list(u.playlists), ensure_ascii=False), self._usuarios[u.id]))
+                    for u in list(self.app.usuarios) if u.id in self._usuarios)
+            self._gravar()
+            self._con.close()
+            self._con = None
+        atexit.unregister(self.fechar)
+
+    def __repr__(self):
+        return (f"ArmazenamentoSQLite({str(self.caminho)!r}, midias={len(self._midias)}, "
+                f"usuarios={len(self._usuarios)}, playlists={len(self._playlists)}, pendentes={len(self._ops)})")
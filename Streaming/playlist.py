@@ -1,14 +1,15 @@
 #\Streaming\playlist.py
 from pathlib import Path
 from datetime import datetime
-from Streaming.arquivo_midia import ArquivoDeMidia
+from Streaming.concorrencia import TRAVAS
+from Streaming.ids import registro_atual, usando_registro
 
 class Playlist:
     """
     Classe de uma playlist de mídias contendo músicas e podcasts.
     Com os seguintes atributos:
         nome (str): com o nome da playlist
-        dono (str): com o nome do criador da playlist
+        dono (str): com o nome do criador da playlist (guardado como ID do usuário)
         itens (list): lista de objetos de ArquivoDeMidia
         reproducoes (int): um contador de execuções da playlist
     """
@@ -16,6 +17,7 @@ class Playlist:
     # Método construtor
     def __init__(self, nome: str, dono: str = "Não Informado", itens=None, reproducoes: int = 0):
         self.nome = (nome or "Sem nome").strip()
+        self._registro = registro_atual()
         # Força que o atributo dono seja uma string
         dono_str = (dono.nome if hasattr(dono, "nome") else str(dono or "Não informado")).strip()
         self.dono = dono_str
@@ -23,18 +25,80 @@ class Playlist:
         self.itens = list(itens) if itens else []
         self.reproducoes = reproducoes
 
+    # O dono é guardado como ID do usuário; o nome vem do registro
+    # (renomear o usuário reflete aqui sem percorrer as playlists).
+    # Enquanto o dono não for renomeado, vale a grafia informada (ex.: 'ana')
+    @property
+    def dono(self) -> str:
+        nome = self._registro.usuarios.nome(self.dono_id)
+        return self._dono if self._dono.lower() == nome.strip().lower() else nome
+
+    # O nome da playlist só é único por dono: o ID é do par (dono, nome),
+    # o mesmo que a lista de playlists do usuário guarda
+    @dono.setter
+    def dono(self, nome: str):
+        self._dono = str(nome or "").strip()
+        self.dono_id = self._registro.usuarios.id(nome)
+        self.id = self._registro.playlists.id(self.nome, self.dono_id)
+        self._registro.usuarios.reter(self)
+        self._registro.playlists.reter(self)
+
+    # IDs guardados como inteiros (coleta do registro de IDs): o do dono e o da playlist
+    def _ids_retidos(self, espaco):
+        if espaco is self._registro.usuarios:
+            return (self.dono_id,)
+        if espaco is self._registro.playlists:
+            return (self.id,)
+        return ()
+
+    # Renomeia a playlist; a lista do dono, que guarda o ID, mostra o nome novo
+    # (o nome novo só precisa ser livre entre as playlists do mesmo dono).
+    # Playlist de um app é renomeada por StreamingApp.renomear_playlist (o banco acompanha)
+    def renomear(self, novo: str) -> None:
+        novo = (novo or "").strip()
+        if not novo:
+            raise ValueError("O nome da playlist não pode ser vazio.")
+        self._registro.playlists.renomear(self.id, novo)
+        self.nome = novo
+
+    # Passa para o registro de IDs do app que incluiu a playlist (criada fora dele)
+    def _mudar_registro(self, registro) -> None:
+        if registro is self._registro:
+            return
+        dono = self.dono
+        self._registro = registro
+        self.dono = dono
+
+    # Serializa o dono pelo nome: IDs só valem dentro do processo que os criou
+    # (o registro fica no processo)
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        estado.pop("_registro", None)
+        estado["dono_id"] = self.dono
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._registro = registro_atual()
+        self.dono = estado["dono_id"]
+
     # Métodos obrigatórios
     # Adiciona uma mídia à playlist a partir do nome (título)
-    def adicionar_midia(self, nome_midia: str) -> bool:
+    def adicionar_midia(self, nome_midia: str, catalogo=None) -> bool:
         """
-        Recebe o nome da mídia e consulta a classe ArquivoDeMidia, 
-        através do método ArquivoDeMidia.buscar_por_titulo(titulo)
+        Recebe o nome da mídia e consulta o catálogo informado (Catalogo do app);
+        sem catálogo, procura no registro de IDs da playlist (o do app que a
+        incluiu), como fazia o antigo ArquivoDeMidia.buscar_por_titulo
         - Se achar, adiciona a mídia (nomes) à playlist.
         - Se não achar, não adiciona e retorna False.
         """
         titulo = (nome_midia or "").strip()
 
-        midia = ArquivoDeMidia.buscar_por_titulo(titulo)
+        if catalogo is not None:
+            midia = catalogo.buscar(titulo)
+        else:
+            i = self._registro.midias.procurar(titulo)
+            midia = None if i is None else self._registro.midias.objeto(i)
 
         if midia is None:
             print ("Midia não adicionada!")
@@ -42,7 +106,9 @@ class Playlist:
             return False
         else:
             print(f"Mídia '{titulo}' adicionada à playlist '{self.nome}'.")
-            self.itens.append(midia)
+            with TRAVAS.para(self):
+                self.itens.append(midia)
+            self._registro.eventos.emitir("playlist_alterada", playlist=self)
             return True
 
     # Remove uma mídia da playlist a partir do nome (título)
@@ -54,36 +120,67 @@ class Playlist:
         """
         titulo = (nome_midia or "").strip()        
 
-        for i, m in enumerate(self.itens):
-            # Compara o título passado com o título das mídias armazenadas
-            if m.titulo.strip() == titulo:
-                print (f"A mídia '{titulo}' foi removida da playlist '{self.nome}'.")
-                del self.itens[i]                
-                return True
+        # Busca e remoção na mesma seção travada (o índice não muda no meio)
+        with TRAVAS.para(self):
+            for i, m in enumerate(self.itens):
+                # Compara o título passado com o título das mídias armazenadas
+                if m.titulo.strip() == titulo:
+                    del self.itens[i]
+                    removida = True
+                    break
             else:
-                print(f"A mídia '{titulo}' não foi encontrada na playlist '{self.nome}'.")
-                return False
+                removida = False
+
+        if removida:
+            self._registro.eventos.emitir("playlist_alterada", playlist=self)
+            print (f"A mídia '{titulo}' foi removida da playlist '{self.nome}'.")
+        else:
+            print(f"A mídia '{titulo}' não foi encontrada na playlist '{self.nome}'.")
+        return removida
 
     # Reproduz a playlist
-    def reproduzir(self) -> None:
+    def reproduzir(self, interativo: bool = True) -> None:
         """
         Simula tocar todas as mídias da lista.
         - Incrementa 1 na contagem de reproduções da Playlist.
         - Incrementa 1 em cada midia tocada.
-        - Exibe as informações de cada mídia tocada.
+        - Exibe as informações de cada mídia tocada (se interativo).
         """
-        # Incrementa o contador de reproduções da playlist
-        self.reproducoes += 1
+        # Incrementa o contador de reproduções da playlist (protegido entre sessões)
+        # e toca uma cópia dos itens, para não ser afetado por alterações paralelas
+        with TRAVAS.para(self):
+            self.reproducoes += 1
+            itens = list(self.itens)
+        self._registro.eventos.emitir("reproducao_playlist", playlist=self)
         
-        for midia in self.itens:
+        for midia in itens:
             # verifica se a mídia não é None (pode ser None se o catálogo estiver incompleto)
             if midia is not None:                
                 # Chama o método reproduzir() do ArquivoDeMidia
                 # Tanto musica quanto podcast possuem o método
                 # O próprio método reproduzir() já exibe as informações
                 # O próprio método já incrementa o contador de reproduções
-                midia.reproduzir()
+                midia.reproduzir(interativo)
             
+    # Fila de reprodução da sessão (aleatório, repetir, rádio, "tocar em seguida")
+    def fila(self, **opcoes):
+        """
+        Retorna uma FilaReproducao sobre os itens desta playlist, sem copiá-los.
+        Opções: aleatorio, repetir ("nao", "faixa", "lista"), radio, janela, semente.
+        """
+        from Streaming.fila_reproducao import FilaReproducao
+
+        return FilaReproducao.da_playlist(self, **opcoes)
+
+    # Soma de uma vez várias reproduções acumuladas (escrita adiada); os itens
+    # são contabilizados à parte, mídia a mídia
+    def somar_reproducoes(self, qtde: int) -> None:
+        if qtde <= 0:
+            return
+        with TRAVAS.para(self):
+            self.reproducoes += qtde
+        self._registro.eventos.emitir("reproducao_playlist", playlist=self, qtde=qtde)
+
     # Métodos obrigatório de sobrecarga de operadores
     # Método para somar duas playlists
     def __add__(self, outra):
@@ -93,14 +190,19 @@ class Playlist:
         """        
         # Adiciona os objetos da playlist2 com os itens (ojetos: midia)
         # da playlist1 e coloca em playlist1          
-        self.itens.extend(outra.itens)
-        
-        # Soma as reproduções
-        self.reproducoes = int(self.reproducoes) + int(outra.reproducoes)
+        # As duas playlists ficam travadas durante a junção (ordem fixa evita deadlock)
+        with TRAVAS.varias(self, outra):
+            self.itens.extend(list(outra.itens))
+            
+            # Soma as reproduções
+            self.reproducoes = int(self.reproducoes) + int(outra.reproducoes)
+            itens = list(self.itens)
+            reproducoes = self.reproducoes
         
-        # Cria a terceira playlist - cópia do estado atual de self
-        terceira = Playlist(nome=self.nome, dono=self.dono,
-                            itens=list(self.itens), reproducoes=self.reproducoes)
+        # Cria a terceira playlist - cópia do estado atual de self (no mesmo registro de IDs)
+        with usando_registro(self._registro):
+            terceira = Playlist(nome=self.nome, dono=self.dono,
+                                itens=itens, reproducoes=reproducoes)
         return terceira
 
     # Método para informar o tamanho da playlist
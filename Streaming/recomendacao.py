@@ -0,0 +1,156 @@
+#\Streaming\recomendacao.py
+import heapq
+import threading
+from math import sqrt
+
+from .instrumentacao import instrumentar
+
+
+class Recomendador:
+    """
+    Recomendação item a item por coocorrência.
+    - Duas mídias coocorrem quando aparecem a até 'janela' posições uma da
+      outra numa playlist ou no histórico de um usuário.
+    - A matriz de coocorrência é esparsa: {id: {id vizinho: contagem}}.
+    - Similaridade = coocorrências / sqrt(ocorrências de a * ocorrências de b)
+      (cosseno), para que as mídias mais tocadas não dominem tudo.
+    - Os K vizinhos mais similares de cada mídia ficam pré-calculados; uma
+      consulta só soma as listas de vizinhos das mídias de partida.
+    - Novas reproduções (evento "historico") somam na matriz e marcam as
+      mídias tocadas; os vizinhos delas são recalculados na próxima consulta.
+    - Os IDs das sugestões viram mídias pelo catálogo informado (o do app):
+      mídias que não estão nele não são sugeridas.
+    - A matriz guarda IDs crus: o recomendador os retém no registro de IDs do
+      catálogo, para a coleta não reaproveitá-los com outro título.
+    """
+
+    def __init__(self, catalogo, k: int = 20, janela: int = 5, lote: int = 1000):
+        self.catalogo = catalogo
+        self.k = max(1, int(k))
+        self.janela = max(1, int(janela))
+        self.lote = max(1, int(lote))
+        self._trava = threading.Lock()
+        self._co = {}           # id -> {id vizinho: coocorrências}
+        self._ocorrencias = {}  # id -> vezes que apareceu nas sequências
+        self._vizinhos = {}     # id -> ((id vizinho, similaridade), ...) em ordem decrescente
+        self._sujos = set()     # ids com vizinhos desatualizados
+        catalogo.registro.midias.reter(self)
+
+    # IDs guardados na matriz (coleta do registro de IDs)
+    def _ids_retidos(self, espaco):
+        return list(self._ocorrencias)
+
+    # Contagem
+    def _somar_par(self, a: int, b: int) -> None:
+        if a == b:
+            return
+        linha = self._co.get(a)
+        if linha is None:
+            linha = self._co[a] = {}
+        linha[b] = linha.get(b, 0) + 1
+        linha = self._co.get(b)
+        if linha is None:
+            linha = self._co[b] = {}
+        linha[a] = linha.get(a, 0) + 1
+        self._sujos.add(a)
+        self._sujos.add(b)
+
+    def _somar_sequencia(self, ids) -> None:
+        janela = self.janela
+        for i, a in enumerate(ids):
+            self._ocorrencias[a] = self._ocorrencias.get(a, 0) + 1
+            for b in ids[max(0, i - janela):i]:
+                self._somar_par(a, b)
+
+    # Vizinhos de uma mídia (os K de maior similaridade; empate pelo menor id)
+    def _calcular_vizinhos(self, a: int) -> tuple:
+        linha = self._co.get(a)
+        if not linha:
+            return ()
+        oc = self._ocorrencias
+        na = oc.get(a, 1)
+        melhores = heapq.nlargest(self.k, ((c / sqrt(na * oc.get(b, 1)), -b) for b, c in linha.items()))
+        return tuple((-b, s) for s, b in melhores)
+
+    def _atualizar(self, ids) -> None:
+        for a in ids:
+            self._vizinhos[a] = self._calcular_vizinhos(a)
+            self._sujos.discard(a)
+
+    @instrumentar("recomendacao.construir")
+    def construir(self, playlists, usuarios) -> "Recomendador":
+        """Monta a matriz a partir das playlists e históricos e pré-calcula os vizinhos."""
+        with self._trava:
+            self._co, self._ocorrencias, self._vizinhos, self._sujos = {}, {}, {}, set()
+            for pl in playlists:
+                self._somar_sequencia([m.id for m in list(pl.itens) if m is not None])
+            for u in usuarios:
+                self._somar_sequencia(u.historico.ids.tolist())
+            # Pré-cálculo em lotes independentes (cada mídia só lê a própria linha)
+            ids = list(self._co)
+            for i in range(0, len(ids), self.lote):
+                self._atualizar(ids[i:i + self.lote])
+        return self
+
+    # Assinante do evento "historico": a mídia nova coocorre com as últimas do usuário
+    # ('posicao' vem das reproduções em lote; sem ela a nova é a última do histórico,
+    # e o ID dela é o que o histórico já guardou)
+    def registrar(self, usuario, titulo: str = None, posicao: int = None, **_) -> None:
+        ids = usuario.historico.ids
+        if posicao is None:
+            posicao = len(ids) - 1
+        if not 0 <= posicao < len(ids):
+            return
+        nova = ids[posicao]
+        anteriores = ids[max(0, posicao - self.janela):posicao].tolist()
+        with self._trava:
+            self._ocorrencias[nova] = self._ocorrencias.get(nova, 0) + 1
+            for b in anteriores:
+                self._somar_par(nova, b)
+
+    def vizinhos(self, midia_id: int) -> tuple:
+        """((id vizinho, similaridade), ...) da mídia, recalculando se estiver desatualizado."""
+        if midia_id in self._sujos:
+            with self._trava:
+                self._atualizar((midia_id,))
+        return self._vizinhos.get(midia_id, ())
+
+    # Consultas
+    def _recomendar(self, sementes, excluir, n: int, recencia: bool = False) -> list:
+        # Com recencia=True as sementes do fim da lista (mais recentes) pesam mais
+        pontos = {}
+        total = len(sementes)
+        for pos, a in enumerate(sementes):
+            peso = (pos + 1) / total if recencia else 1.0
+            for b, s in self.vizinhos(a):
+                if b not in excluir:
+                    pontos[b] = pontos.get(b, 0.0) + peso * s
+        n = max(0, int(n))
+        saida = []
+        for p, menos_id in heapq.nlargest(n * 2, ((p, -b) for b, p in pontos.items())):
+            midia = self.catalogo.por_id(-menos_id)
+            if midia is not None:
+                saida.append((midia, p))
+                if len(saida) >= n:
+                    break
+        return saida
+
+    @instrumentar("recomendacao.para_usuario")
+    def para_usuario(self, usuario, n: int = 10, recentes: int = 5) -> list:
+        """[(mídia, pontuação)] para tocar em seguida, a partir das últimas do histórico."""
+        ids = usuario.historico.ids
+        sementes = list(dict.fromkeys(ids[max(0, len(ids) - int(recentes)):].tolist()[::-1]))[::-1]
+        return self._recomendar(sementes, set(sementes), n, recencia=True)
+
+    @instrumentar("recomendacao.para_playlist")
+    def para_playlist(self, playlist, n: int = 10) -> list:
+        """[(mídia, pontuação)] para completar a playlist (sem repetir as que ela já tem)."""
+        sementes = list(dict.fromkeys(m.id for m in list(playlist.itens) if m is not None))
+        return self._recomendar(sementes, set(sementes), n)
+
+    def __len__(self):
+        return len(self._co)
+
+    def __repr__(self):
+        return (f"Recomendador(midias={len(self._co)}, k={self.k}, janela={self.janela}, "
+                f"desatualizados={len(self._sujos)})")
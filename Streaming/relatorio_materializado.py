@@ -0,0 +1,423 @@
+#\Streaming\relatorio_materializado.py
+import threading
+from bisect import bisect_left, insort
+
+from .analises import Analises
+from .instrumentacao import instrumentar
+
+
+class ListaOrdenada:
+    """
+    Lista sempre ordenada dividida em blocos (inclusão e remoção em ~O(sqrt n)),
+    para manter rankings que mudam a cada evento sem reordenar tudo.
+    """
+
+    BLOCO = 512
+
+    def __init__(self):
+        self._blocos = []      # listas ordenadas; o último item de cada bloco é o seu máximo
+        self._maximos = []
+        self._tamanho = 0
+
+    def adicionar(self, chave) -> None:
+        self._tamanho += 1
+        if not self._blocos:
+            self._blocos.append([chave])
+            self._maximos.append(chave)
+            return
+        i = min(bisect_left(self._maximos, chave), len(self._blocos) - 1)
+        bloco = self._blocos[i]
+        insort(bloco, chave)
+        self._maximos[i] = bloco[-1]
+        if len(bloco) > 2 * self.BLOCO:
+            self._blocos[i:i + 1] = [bloco[:self.BLOCO], bloco[self.BLOCO:]]
+            self._maximos[i:i + 1] = [bloco[self.BLOCO - 1], bloco[-1]]
+
+    def remover(self, chave) -> bool:
+        i = bisect_left(self._maximos, chave)
+        if i == len(self._blocos):
+            return False
+        bloco = self._blocos[i]
+        j = bisect_left(bloco, chave)
+        if j == len(bloco) or bloco[j] != chave:
+            return False
+        del bloco[j]
+        self._tamanho -= 1
+        if bloco:
+            self._maximos[i] = bloco[-1]
+        else:
+            del self._blocos[i]
+            del self._maximos[i]
+        return True
+
+    def primeiros(self, n: int) -> list:
+        saida = []
+        for bloco in self._blocos:
+            if len(saida) >= n:
+                break
+            saida.extend(bloco[:n - len(saida)])
+        return saida
+
+    def __len__(self):
+        return self._tamanho
+
+
+class RelatorioMaterializado:
+    """
+    Estado do relatório mantido em dia pelos eventos, em vez de recalculado:
+        reproducao, reproducao_playlist, historico, avaliacao,
+        midia_adicionada, midia_removida, midia_alterada, usuario_criado,
+        usuario_renomeado, playlist_criada, playlist_excluida,
+        playlist_substituida, playlist_alterada, playlist_renomeada
+    Cada seção guarda suas estruturas (rankings em ListaOrdenada, contadores,
+    médias) e o texto já renderizado. Os eventos de reprodução só anotam o
+    objeto como pendente (custo O(1) no caminho de reprodução); ao gerar o
+    relatório, cada pendente é conferido uma vez, os rankings e totais
+    recebem a diferença e só as seções alteradas são re-renderizadas.
+    Desempates seguem a ordem das coleções do app, como no cálculo completo,
+    então o texto é idêntico ao de Analises.montar_relatorio.
+    """
+
+    # Ranking e seção de cada tipo de objeto acompanhado
+    _SECOES = {"musica": "top", "playlist": "playlist", "usuario": "usuario"}
+
+    def __init__(self, app, top_n: int = 10):
+        self.app = app
+        self.top_n = top_n
+        self._trava = threading.RLock()
+        self._seq = 0
+        self._tipos = {}            # id(obj) -> tipo ("musica", "podcast", "playlist", "usuario")
+        self._valores = {}          # id(obj) -> último valor aplicado (reproduções ou tamanho do histórico)
+        self._chaves = {}           # id(obj) -> chave atual no ranking: (-valor, seq, id)
+        self._objetos = {}          # id(obj) -> obj
+        self._rankings = {"musica": ListaOrdenada(), "playlist": ListaOrdenada(), "usuario": ListaOrdenada()}
+        self._grupos_de = {}        # id(mídia) -> (grupo do artista, grupo do gênero ou None)
+        self._pendentes = {}        # id(obj) -> obj com valor possivelmente alterado
+        self._qtde = {"usuarios": 0, "musicas": 0, "playlists": 0}
+        self._total_rep = 0
+        self._medias = {}           # titulo -> média (mesma semântica do dict de media_avaliacoes)
+        self._dono_media = {}       # titulo -> id da última música com esse título (a que vale)
+        self._generos = {}          # genero normalizado -> [nome, total]
+        self._artistas = {}         # artista normalizado -> [nome, total]
+        self._cache = {}            # seção -> linhas renderizadas
+        self._sujas = set()
+        self._regrupar = False      # remoção de mídia: grupos refeitos a partir dos índices
+
+        for evento, funcao in self._assinaturas():
+            app.eventos.assinar(evento, funcao)
+
+    def _assinaturas(self):
+        return [
+            ("reproducao", self._ao_reproduzir),
+            ("reproducao_playlist", self._ao_reproduzir_playlist),
+            ("historico", self._ao_historico),
+            ("avaliacao", self._ao_avaliar),
+            ("midia_adicionada", self._ao_adicionar_midia),
+            ("midia_removida", self._ao_remover_midia),
+            ("midia_alterada", self._ao_alterar_midia),
+            ("usuario_criado", self._ao_criar_usuario),
+            ("playlist_criada", self._ao_criar_playlist),
+            ("playlist_excluida", self._ao_excluir_playlist),
+            ("playlist_substituida", self._ao_substituir_playlist),
+            ("playlist_alterada", self._ao_alterar_playlist),
+            ("playlist_renomeada", self._ao_renomear_playlist),
+            ("usuario_renomeado", self._ao_renomear_usuario),
+        ]
+
+    def fechar(self) -> None:
+        """Cancela as assinaturas (o app deixa de atualizar este relatório)."""
+        for evento, funcao in self._assinaturas():
+            self.app.eventos.cancelar(evento, funcao)
+
+    # Valor que ordena cada tipo de objeto
+    @staticmethod
+    def _valor(obj, tipo) -> int:
+        return len(obj.historico) if tipo == "usuario" else obj.reproducoes
+
+    # Passa a acompanhar um objeto (seq fixa a posição nos desempates)
+    def _entrar(self, obj, tipo, seq=None) -> None:
+        if seq is None:
+            seq = self._seq
+            self._seq += 1
+        valor = self._valor(obj, tipo)
+        self._tipos[id(obj)] = tipo
+        self._valores[id(obj)] = valor
+        self._objetos[id(obj)] = obj
+        ranking = self._rankings.get(tipo)
+        if ranking is not None:
+            chave = (-valor, seq, id(obj))
+            self._chaves[id(obj)] = chave
+            ranking.adicionar(chave)
+
+    def _sair(self, obj) -> int:
+        tipo = self._tipos.pop(id(obj))
+        chave = self._chaves.pop(id(obj))
+        self._rankings[tipo].remover(chave)
+        self._valores.pop(id(obj), None)
+        self._objetos.pop(id(obj), None)
+        self._pendentes.pop(id(obj), None)
+        return chave[1]
+
+    def _eh(self, obj, tipo) -> bool:
+        return self._tipos.get(id(obj)) == tipo
+
+    @staticmethod
+    def _media(musica) -> float:
+        avals = musica.avaliacoes or []
+        return (sum(avals) / len(avals)) if avals else 0.0
+
+    def _grupo(self, grupos, nome) -> list:
+        chave = str(nome or "").strip().lower()
+        grupo = grupos.get(chave)
+        if grupo is None:
+            grupo = grupos[chave] = [str(nome or "").strip(), 0]
+        return grupo
+
+    # Aplica as alterações anotadas pelos eventos de reprodução
+    def _sincronizar(self) -> None:
+        pendentes, self._pendentes = self._pendentes, {}
+        for chave_obj, obj in pendentes.items():
+            tipo = self._tipos.get(chave_obj)
+            if tipo is None:
+                continue
+            valor = self._valor(obj, tipo)
+            delta = valor - self._valores[chave_obj]
+            if not delta:
+                continue
+            self._valores[chave_obj] = valor
+            ranking = self._rankings.get(tipo)
+            if ranking is not None:
+                antiga = self._chaves[chave_obj]
+                nova = (-valor, antiga[1], chave_obj)
+                ranking.remover(antiga)
+                ranking.adicionar(nova)
+                self._chaves[chave_obj] = nova
+                self._sujas.add(self._SECOES[tipo])
+            if tipo == "usuario":
+                self._total_rep += delta
+                self._sujas.add("resumo")
+            elif tipo != "playlist":
+                for grupo in self._grupos_de[chave_obj]:
+                    if grupo is not None:
+                        grupo[1] += delta
+                self._sujas.add("grupos")
+
+    # Eventos do app (só os do próprio app são considerados)
+    def _ao_adicionar_midia(self, app, midia, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            musica = hasattr(midia, "avaliacoes")      # só as músicas entram no top, nas médias e nos gêneros
+            self._entrar(midia, "musica" if musica else "podcast")
+            genero = self._grupo(self._generos, midia.genero) if musica else None
+            self._grupos_de[id(midia)] = (self._grupo(self._artistas, midia.artista), genero)
+            for grupo in self._grupos_de[id(midia)]:
+                if grupo is not None:
+                    grupo[1] += midia.reproducoes
+            self._sujas.add("grupos")
+            if not musica:
+                return
+            self._qtde["musicas"] += 1
+            titulo = midia.titulo.strip()
+            self._medias[titulo] = self._media(midia)
+            self._dono_media[titulo] = id(midia)
+            self._sujas.update(("resumo", "top", "medias"))
+
+    def _ao_remover_midia(self, app, midia, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            tipo = self._tipos.get(id(midia))
+            if tipo is None:
+                return
+            if tipo == "musica":
+                self._sair(midia)
+                self._qtde["musicas"] -= 1
+                titulo = midia.titulo.strip()
+                if self._dono_media.get(titulo) == id(midia):
+                    del self._dono_media[titulo]
+                    self._medias.pop(titulo, None)
+                self._sujas.update(("resumo", "top", "medias"))
+            else:
+                for tabela in (self._tipos, self._valores, self._objetos, self._pendentes):
+                    tabela.pop(id(midia), None)
+            # Nome de exibição e ordem dos grupos dependem das mídias que restam
+            self._grupos_de.pop(id(midia), None)
+            self._regrupar = True
+            self._sujas.add("grupos")
+
+    # Artista/gênero alterados: a mídia muda de grupo (refeitos como na remoção);
+    # o top mostra título e artista, então também é re-renderizado
+    def _ao_alterar_midia(self, app, midia, campos=(), **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            if id(midia) in self._grupos_de:
+                self._regrupar = True
+                self._sujas.add("grupos")
+            if self._eh(midia, "musica"):
+                self._sujas.add("top")
+                if "titulo" in campos:
+                    self._refazer_medias()
+
+    # Médias chaveadas pelo título: refeitas na ordem do catálogo (a última música com o título vale)
+    def _refazer_medias(self) -> None:
+        self._medias, self._dono_media = {}, {}
+        for m in self.app.musicas:
+            if self._eh(m, "musica"):
+                titulo = m.titulo.strip()
+                self._medias[titulo] = self._media(m)
+                self._dono_media[titulo] = id(m)
+        self._sujas.add("medias")
+
+    # Refaz os totais por gênero e artista na ordem dos índices (como o cálculo completo),
+    # usando os valores já aplicados (pendentes de reprodução continuam valendo)
+    def _refazer_grupos(self) -> None:
+        self._generos, self._artistas = {}, {}
+        indices = self.app.indices
+        for tabela, grupos in ((self._generos, indices.grupos_genero()),
+                               (self._artistas, indices.grupos_artista())):
+            for nome, midias in grupos:
+                grupo = tabela[str(nome or "").strip().lower()] = [nome, 0]
+                for m in midias:
+                    if id(m) in self._grupos_de:
+                        grupo[1] += self._valores.get(id(m), 0)
+        for chave_obj, (_, genero) in list(self._grupos_de.items()):
+            m = self._objetos[chave_obj]
+            self._grupos_de[chave_obj] = (self._grupo(self._artistas, m.artista),
+                                          self._grupo(self._generos, m.genero) if genero is not None else None)
+        self._regrupar = False
+
+    def _ao_criar_usuario(self, app, usuario, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            self._entrar(usuario, "usuario")
+            self._qtde["usuarios"] += 1
+            self._total_rep += len(usuario.historico)
+            self._sujas.update(("resumo", "usuario"))
+
+    def _ao_criar_playlist(self, app, playlist, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            self._entrar(playlist, "playlist")
+            self._qtde["playlists"] += 1
+            self._sujas.update(("resumo", "playlist"))
+
+    def _ao_excluir_playlist(self, app, playlist, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            if self._eh(playlist, "playlist"):
+                self._sair(playlist)
+                self._qtde["playlists"] -= 1
+                self._sujas.update(("resumo", "playlist"))
+
+    def _ao_substituir_playlist(self, app, antiga, nova, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            if self._eh(antiga, "playlist"):
+                self._entrar(nova, "playlist", self._sair(antiga))
+                self._sujas.add("playlist")
+
+    # A seção da playlist mostra nome, dono e quantidade de itens
+    def _ao_alterar_playlist(self, playlist, **_) -> None:
+        if self._eh(playlist, "playlist"):
+            with self._trava:
+                self._sujas.add("playlist")
+
+    def _ao_renomear_playlist(self, app, playlist, **_) -> None:
+        if app is self.app:
+            self._ao_alterar_playlist(playlist)
+
+    # O nome aparece na seção do usuário e, como dono, na da playlist
+    def _ao_renomear_usuario(self, app, usuario, **_) -> None:
+        if app is not self.app:
+            return
+        with self._trava:
+            self._sujas.update(("usuario", "playlist"))
+
+    # Eventos de reprodução: só anotam o objeto (se acompanhado) para a próxima sincronização
+    def _ao_reproduzir(self, midia, **_) -> None:
+        if id(midia) in self._tipos:
+            with self._trava:
+                self._pendentes[id(midia)] = midia
+
+    def _ao_reproduzir_playlist(self, playlist, **_) -> None:
+        if id(playlist) in self._tipos:
+            with self._trava:
+                self._pendentes[id(playlist)] = playlist
+
+    def _ao_historico(self, usuario, **_) -> None:
+        if id(usuario) in self._tipos:
+            with self._trava:
+                self._pendentes[id(usuario)] = usuario
+
+    def _ao_avaliar(self, midia, **_) -> None:
+        titulo = midia.titulo.strip()
+        if self._dono_media.get(titulo) != id(midia):
+            return
+        with self._trava:
+            self._medias[titulo] = self._media(midia)
+            self._sujas.add("medias")
+
+    # Renderização
+    def _secao(self, nome: str, top_n: int) -> list:
+        if nome in self._sujas or nome not in self._cache or top_n != self.top_n:
+            self._cache[nome] = self._renderizar(nome, top_n)
+            self._sujas.discard(nome)
+        return self._cache[nome]
+
+    def _renderizar(self, nome: str, top_n: int) -> list:
+        if nome == "resumo":
+            q = self._qtde
+            return Analises.secao_resumo(q["usuarios"], q["musicas"], q["playlists"], self._total_rep)
+        if nome == "top":
+            top = self._rankings["musica"].primeiros(top_n)
+            return Analises.secao_top([self._objetos[c[2]] for c in top], top_n)
+        if nome == "playlist":
+            primeiro = self._rankings["playlist"].primeiros(1)
+            return Analises.secao_playlist(self._objetos[primeiro[0][2]] if primeiro else None)
+        if nome == "usuario":
+            primeiro = self._rankings["usuario"].primeiros(1)
+            return Analises.secao_usuario(self._objetos[primeiro[0][2]] if primeiro else None)
+        if nome == "medias":
+            return Analises.secao_medias(self._medias)
+        if nome == "grupos":
+            generos = sorted((g for g in self._generos.values()), key=lambda g: g[1], reverse=True)
+            artistas = sorted((a for a in self._artistas.values()), key=lambda a: a[1], reverse=True)
+            return Analises.secao_grupos({n: t for n, t in generos},
+                                         {n: t for n, t in artistas[:max(0, int(top_n))]}, top_n)
+        raise ValueError(f"Seção desconhecida: {nome}")
+
+    @instrumentar("relatorio_materializado.linhas")
+    def linhas(self, top_n: int = None, grupos: bool = True, series=None, aprox=None, gerado_em=None) -> list:
+        """Linhas do relatório a partir do estado atual (mesmo texto de Analises.montar_relatorio)."""
+        top_n = self.top_n if top_n is None else max(0, int(top_n))
+        with self._trava:
+            self._sincronizar()
+            if self._regrupar:
+                self._refazer_grupos()
+            linhas = Analises.secao_cabecalho(gerado_em)
+            for nome in ("resumo", "top", "playlist", "usuario", "medias"):
+                linhas += self._secao(nome, top_n)
+            if grupos:
+                linhas += self._secao("grupos", top_n)
+            self.top_n = top_n
+        if series is not None:
+            linhas += Analises.secao_series(series, top_n)
+        if aprox is not None:
+            linhas += Analises.secao_aproximada(aprox, top_n)
+        return linhas
+
+    @instrumentar("relatorio_materializado.salvar")
+    def salvar(self, pasta="Relatório", arquivo="relatorio.txt", top_n: int = None, series=None, aprox=None):
+        """Grava o relatório materializado em pasta/arquivo e retorna o caminho."""
+        return Analises.gravar_relatorio(self.linhas(top_n, series=series, aprox=aprox), pasta, arquivo)
+
+    def __repr__(self):
+        r = self._rankings
+        return (f"RelatorioMaterializado(musicas={len(r['musica'])}, usuarios={len(r['usuario'])}, "
+                f"playlists={len(r['playlist'])}, pendentes={len(self._pendentes)})")
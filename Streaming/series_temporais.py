@@ -0,0 +1,131 @@
+#\Streaming\series_temporais.py
+import time
+from array import array
+
+from .concorrencia import TRAVAS
+
+
+# Resoluções: nome -> (largura do balde em segundos, quantidade de baldes no anel)
+RESOLUCOES = {
+    "minuto": (60, 60),       # última hora, minuto a minuto
+    "hora": (3600, 48),       # últimas 48 horas
+    "dia": (86400, 30),       # últimos 30 dias
+}
+
+
+class SerieMidia:
+    """
+    Contagens de reprodução de uma mídia em anéis de baldes de tempo.
+    Cada resolução tem um array fixo de contagens e outro com o número do
+    balde que cada posição representa; um balde antigo é zerado quando a
+    posição é reaproveitada. Memória fixa por mídia, independente do uso.
+    """
+
+    __slots__ = ("midia", "contagens", "baldes", "trava", "_inicio", "_fim", "_atuais")
+
+    def __init__(self, midia):
+        self.midia = midia
+        self.trava = TRAVAS.para(self)    # trava particionada, resolvida uma vez
+        self.contagens = {r: array("I", [0]) * n for r, (_, n) in RESOLUCOES.items()}
+        self.baldes = {r: array("q", [-1]) * n for r, (_, n) in RESOLUCOES.items()}
+        # Atalho: enquanto o instante cair no mesmo balde de minuto (o mais estreito),
+        # as posições das três resoluções não mudam e basta somar nelas
+        self._inicio = self._fim = 0.0
+        self._atuais = ()
+
+    def registrar(self, instante: float, qtde: int = 1) -> None:
+        if self._inicio <= instante < self._fim:
+            for contagens, pos in self._atuais:
+                contagens[pos] += qtde
+            return
+        atuais = []
+        for r, (largura, n) in RESOLUCOES.items():
+            balde = int(instante // largura)
+            pos = balde % n
+            baldes, contagens = self.baldes[r], self.contagens[r]
+            if baldes[pos] != balde:
+                baldes[pos] = balde
+                contagens[pos] = 0
+            contagens[pos] += qtde
+            atuais.append((contagens, pos))
+        largura = min(l for l, _ in RESOLUCOES.values())
+        self._inicio = (instante // largura) * largura
+        self._fim = self._inicio + largura
+        self._atuais = tuple(atuais)
+
+    def soma(self, resolucao: str, ultimos: int, instante: float) -> int:
+        """Soma os 'ultimos' baldes da resolução, terminando no balde de 'instante'."""
+        largura, n = RESOLUCOES[resolucao]
+        atual = int(instante // largura)
+        inicio = atual - min(int(ultimos), n) + 1
+        baldes, contagens = self.baldes[resolucao], self.contagens[resolucao]
+        return sum(contagens[p] for p in range(n) if inicio <= baldes[p] <= atual)
+
+    def serie(self, resolucao: str, ultimos: int, instante: float) -> list:
+        """Lista de contagens dos 'ultimos' baldes, do mais antigo ao atual."""
+        largura, n = RESOLUCOES[resolucao]
+        atual = int(instante // largura)
+        saida = []
+        for b in range(atual - min(int(ultimos), n) + 1, atual + 1):
+            pos = b % n
+            saida.append(self.contagens[resolucao][pos] if self.baldes[resolucao][pos] == b else 0)
+        return saida
+
+
+class SeriesReproducoes:
+    """
+    Armazém de séries temporais de reproduções, uma SerieMidia por mídia acompanhada.
+    É alimentado pelo evento "reproducao" (ver Streaming.eventos) e consultado
+    pelo Analises (top por janela, tendências) sem percorrer históricos.
+    O relógio pode ser trocado (replay de eventos e simulações).
+    """
+
+    def __init__(self, relogio=time.time):
+        self.relogio = relogio
+        self._series = {}      # id da mídia -> SerieMidia
+
+    def acompanhar(self, midia) -> SerieMidia:
+        serie = self._series.get(midia.id)
+        if serie is None:
+            serie = self._series.setdefault(midia.id, SerieMidia(midia))
+        return serie
+
+    def esquecer(self, midia) -> None:
+        self._series.pop(midia.id, None)
+
+    # Assinante do evento "reproducao"; mídias não acompanhadas são ignoradas
+    def registrar(self, midia, instante: float = None, qtde: int = 1, **_) -> None:
+        serie = self._series.get(midia.id)
+        if serie is None or serie.midia is not midia:   # outro objeto com o mesmo ID (não acompanhado)
+            return
+        instante = self.relogio() if instante is None else instante
+        with serie.trava:
+            serie.registrar(instante, qtde)
+
+    # Escolhe a resolução mais fina que cobre a janela (em segundos)
+    @staticmethod
+    def resolucao_para(segundos: float):
+        for r, (largura, n) in RESOLUCOES.items():
+            if segundos <= largura * n:
+                return r, max(1, -(-int(segundos) // largura))
+        r = "dia"
+        return r, RESOLUCOES[r][1]
+
+    def contagens_janela(self, segundos: float, instante: float = None) -> list:
+        """Retorna [(midia, reproduções na janela)] para as mídias acompanhadas."""
+        instante = self.relogio() if instante is None else instante
+        r, ultimos = self.resolucao_para(segundos)
+        return [(s.midia, s.soma(r, ultimos, instante)) for s in list(self._series.values())]
+
+    def serie(self, midia, resolucao: str = "dia", ultimos: int = 7, instante: float = None) -> list:
+        serie = self._series.get(midia.id)
+        if serie is None:
+            return [0] * int(ultimos)
+        instante = self.relogio() if instante is None else instante
+        return serie.serie(resolucao, ultimos, instante)
+
+    def __len__(self):
+        return len(self._series)
+
+    def __repr__(self):
+        return f"SeriesReproducoes(midias={len(self._series)})"
@@ -0,0 +1,453 @@
+#\Streaming\servidor.py
+"""
+Serviço TCP local (asyncio, só biblioteca padrão) para as operações do StreamingApp.
+
+Protocolo: uma requisição JSON por linha, uma resposta JSON por linha.
+    -> {"id": 1, "op": "search", "termo": "queen"}
+    <- {"id": 1, "ok": true, "resultado": [...]}
+
+As requisições podem ser enviadas em sequência sem esperar as respostas
+(pipelining): cada uma é processada assim que chega e as respostas voltam na
+mesma ordem. Os eventos de reprodução ("play") são aplicados em lotes.
+"""
+import asyncio
+import contextlib
+import json
+import time
+
+from .instrumentacao import Instrumentacao
+
+
+# Converte uma mídia em dicionário serializável
+def _midia_para_dict(m) -> dict:
+    d = {
+        "tipo": m.__class__.__name__,
+        "titulo": m.titulo,
+        "artista": m.artista,
+        "duracao": m.duracao,
+        "reproducoes": m.reproducoes,
+    }
+    for attr in ("genero", "episodio", "temporada", "host"):
+        if hasattr(m, attr):
+            d[attr] = getattr(m, attr)
+    return d
+
+
+def _playlist_para_dict(pl) -> dict:
+    return {
+        "nome": pl.nome,
+        "dono": pl.dono,
+        "reproducoes": pl.reproducoes,
+        "itens": [m.titulo for m in pl.itens],
+    }
+
+
+class ErroRequisicao(Exception):
+    """Erro de validação de uma requisição (vira {"ok": false, "erro": ...})."""
+
+
+class LoteReproducoes:
+    """
+    Acumula os eventos de reprodução e aplica no app em lotes:
+    quando o lote chega a 'tamanho' eventos ou após 'intervalo' segundos,
+    o que vier primeiro. Cada evento recebe um future resolvido na aplicação.
+    """
+
+    def __init__(self, app, tamanho: int = 256, intervalo: float = 0.005):
+        self.app = app
+        self.tamanho = tamanho
+        self.intervalo = intervalo
+        self._pendentes = []
+        self._agendado = None
+        self.lotes = 0
+
+    def enfileirar(self, usuario, midia) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pendentes.append((usuario, midia, fut))
+        if len(self._pendentes) >= self.tamanho:
+            self.descarregar()
+        elif self._agendado is None:
+            self._agendado = loop.call_later(self.intervalo, self.descarregar)
+        return fut
+
+    def descarregar(self) -> None:
+        if self._agendado is not None:
+            self._agendado.cancel()
+            self._agendado = None
+        lote, self._pendentes = self._pendentes, []
+        if not lote:
+            return
+        self.lotes += 1
+        Instrumentacao.contar("servidor.lotes")
+        Instrumentacao.contar("servidor.reproducoes", len(lote))
+        for usuario, midia, fut in lote:
+            self.app.reproduzir_midia(usuario, midia, interativo=False)
+            if not fut.done():
+                fut.set_result(self.app.reproducoes(midia))
+
+
+class ServidorStreaming:
+    """
+    Front-end asyncio do StreamingApp.
+    Operações: ping, search, browse, media.get, play, playlist.get, playlist.list,
+    playlist.create, playlist.add, playlist.remove, playlist.delete,
+    playlist.concat, playlist.play, report e recommend.
+    """
+
+    # Tamanho máximo de uma linha de requisição (limite do StreamReader)
+    LIMITE_LINHA = 64 * 1024
+
+    def __init__(self, app, tamanho_lote: int = 256, intervalo_lote: float = 0.005):
+        self.app = app
+        self.lote = LoteReproducoes(app, tamanho_lote, intervalo_lote)
+        self._servidor = None
+        self._conexoes = set()
+        self._ops = {
+            "ping": self._op_ping,
+            "search": self._op_search,
+            "browse": self._op_browse,
+            "media.get": self._op_media_get,
+            "play": self._op_play,
+            "playlist.get": self._op_playlist_get,
+            "playlist.list": self._op_playlist_list,
+            "playlist.create": self._op_playlist_create,
+            "playlist.add": self._op_playlist_add,
+            "playlist.remove": self._op_playlist_remove,
+            "playlist.delete": self._op_playlist_delete,
+            "playlist.concat": self._op_playlist_concat,
+            "playlist.play": self._op_playlist_play,
+            "report": self._op_report,
+            "recommend": self._op_recommend,
+        }
+
+    # Ciclo de vida
+    async def iniciar(self, host: str = "127.0.0.1", porta: int = 8765):
+        """Abre o servidor e retorna a porta efetiva (porta=0 escolhe uma livre)."""
+        self._servidor = await asyncio.start_server(self._atender, host, porta,
+                                                   limit=self.LIMITE_LINHA)
+        return self._servidor.sockets[0].getsockname()[1]
+
+    async def parar(self, espera: float = 1.0) -> None:
+        """Fecha o servidor; conexões abertas têm 'espera' segundos para terminar."""
+        self.lote.descarregar()
+        if self._servidor is not None:
+            self._servidor.close()
+            if self._conexoes:
+                _, pendentes = await asyncio.wait(set(self._conexoes), timeout=espera)
+                for t in pendentes:
+                    t.cancel()
+                await asyncio.gather(*pendentes, return_exceptions=True)
+            await self._servidor.wait_closed()
+            self._servidor = None
+
+    async def servir(self, host: str = "127.0.0.1", porta: int = 8765) -> None:
+        await self.iniciar(host, porta)
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    # Conexões: leitura e escrita desacopladas para permitir pipelining
+    async def _atender(self, reader, writer):
+        tarefa = asyncio.current_task()
+        self._conexoes.add(tarefa)
+        tarefa.add_done_callback(self._conexoes.discard)
+        respostas = asyncio.Queue()
+        escritor = asyncio.create_task(self._escrever(respostas, writer))
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                # Dispara o processamento já; o escritor respeita a ordem de chegada
+                respostas.put_nowait(asyncio.ensure_future(self._processar(linha)))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except (ValueError, asyncio.LimitOverrunError):
+            # Linha acima do limite: o resto dela continua no buffer e não dá para
+            # achar o início da próxima requisição; responde o erro e encerra
+            respostas.put_nowait(asyncio.ensure_future(self._recusar(
+                f"requisição maior que {self.LIMITE_LINHA} bytes; conexão encerrada")))
+        finally:
+            respostas.put_nowait(None)
+            await escritor
+
+    async def _recusar(self, erro: str) -> bytes:
+        return (json.dumps({"id": None, "ok": False, "erro": erro}, ensure_ascii=False) + "\n").encode("utf-8")
+
+    async def _escrever(self, respostas, writer):
+        try:
+            while True:
+                fut = await respostas.get()
+                if fut is None:
+                    break
+                writer.write(await fut)
+                # Só espera o buffer esvaziar quando não há mais respostas prontas
+                if respostas.empty():
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _processar(self, linha: bytes) -> bytes:
+        rid = None
+        try:
+            req = json.loads(linha)
+            if not isinstance(req, dict):
+                raise ErroRequisicao("a requisição deve ser um objeto JSON")
+            rid = req.get("id")
+            op = self._ops.get(req.get("op"))
+            if op is None:
+                raise ErroRequisicao(f"operação desconhecida: {req.get('op')!r}")
+            with Instrumentacao.medir(f"servidor.{req['op']}"):
+                resultado = await op(req)
+            resposta = {"id": rid, "ok": True, "resultado": resultado}
+        except (ErroRequisicao, json.JSONDecodeError) as e:
+            resposta = {"id": rid, "ok": False, "erro": str(e)}
+        except Exception as e:  # erro inesperado não derruba a conexão
+            resposta = {"id": rid, "ok": False, "erro": f"{e.__class__.__name__}: {e}"}
+        return (json.dumps(resposta, ensure_ascii=False) + "\n").encode("utf-8")
+
+    # Auxiliares de validação
+    def _usuario(self, req, obrigatorio=False):
+        nome = req.get("usuario")
+        if not nome:
+            if obrigatorio:
+                raise ErroRequisicao("campo 'usuario' obrigatório")
+            return None
+        u = self.app.buscar_usuario(str(nome))
+        if u is None:
+            raise ErroRequisicao(f"usuário '{nome}' inexistente")
+        return u
+
+    def _midia(self, titulo):
+        m = self.app.buscar_midia(str(titulo or ""))
+        if m is None:
+            raise ErroRequisicao(f"mídia '{titulo}' inexistente")
+        return m
+
+    def _playlist(self, nome):
+        pl = self.app.buscar_playlist(str(nome or "").strip())
+        if pl is None:
+            raise ErroRequisicao(f"playlist '{nome}' inexistente")
+        return pl
+
+    # Operações
+    async def _op_ping(self, req):
+        return "pong"
+
+    async def _op_search(self, req):
+        termo = str(req.get("termo") or "").strip()
+        limite = int(req.get("limite") or 10)
+        if not termo:
+            raise ErroRequisicao("campo 'termo' obrigatório")
+        return [_midia_para_dict(m) for m in self.app.buscar_midias(termo, limite)]
+
+    async def _op_browse(self, req):
+        filtros = {c: req.get(c) for c in ("genero", "artista", "host", "temporada")}
+        try:
+            for c in ("duracao_min", "duracao_max"):
+                filtros[c] = None if req.get(c) is None else int(req[c])
+        except (TypeError, ValueError):
+            raise ErroRequisicao("duracao_min/duracao_max devem ser inteiros")
+        limite = int(req.get("limite") or 50)
+        return [_midia_para_dict(m) for m in self.app.navegar(**filtros)[:limite]]
+
+    async def _op_recommend(self, req):
+        n = int(req.get("n") or 10)
+        if req.get("playlist"):
+            pl = self._playlist(req["playlist"])
+            sugestoes = await asyncio.to_thread(self.app.recomendar, playlist=pl, n=n)
+        else:
+            u = self._usuario(req, obrigatorio=True)
+            sugestoes = await asyncio.to_thread(self.app.recomendar, usuario=u, n=n)
+        return [{**_midia_para_dict(m), "pontuacao": round(p, 4)} for m, p in sugestoes]
+
+    async def _op_media_get(self, req):
+        return _midia_para_dict(self._midia(req.get("titulo")))
+
+    async def _op_play(self, req):
+        usuario = self._usuario(req)
+        midia = self._midia(req.get("titulo"))
+        reproducoes = await self.lote.enfileirar(usuario, midia)
+        return {"titulo": midia.titulo, "reproducoes": reproducoes}
+
+    async def _op_playlist_get(self, req):
+        return _playlist_para_dict(self._playlist(req.get("nome")))
+
+    async def _op_playlist_list(self, req):
+        return [_playlist_para_dict(pl) for pl in list(self.app.playlists)]
+
+    async def _op_playlist_create(self, req):
+        usuario = self._usuario(req, obrigatorio=True)
+        nome = str(req.get("nome") or "").strip()
+        if not nome:
+            raise ErroRequisicao("campo 'nome' obrigatório")
+        if self.app.buscar_playlist(nome) is not None:
+            raise ErroRequisicao(f"playlist '{nome}' já existe")
+        itens = [self._midia(t) for t in (req.get("itens") or [])]
+        pl = self.app.criar_playlist(usuario, nome)
+        for m in itens:
+            with contextlib.redirect_stdout(None):
+                pl.adicionar_midia(m.titulo, self.app.catalogo)
+        return _playlist_para_dict(pl)
+
+    async def _op_playlist_add(self, req):
+        pl = self._playlist(req.get("nome"))
+        midia = self._midia(req.get("titulo"))
+        with contextlib.redirect_stdout(None):
+            pl.adicionar_midia(midia.titulo, self.app.catalogo)
+        return _playlist_para_dict(pl)
+
+    async def _op_playlist_remove(self, req):
+        pl = self._playlist(req.get("nome"))
+        with contextlib.redirect_stdout(None):
+            removida = pl.remover_midia(str(req.get("titulo") or ""))
+        if not removida:
+            raise ErroRequisicao(f"mídia '{req.get('titulo')}' não está na playlist '{pl.nome}'")
+        return _playlist_para_dict(pl)
+
+    async def _op_playlist_delete(self, req):
+        nome = str(req.get("nome") or "").strip()
+        if not self.app.excluir_playlist(nome):
+            raise ErroRequisicao(f"playlist '{nome}' inexistente")
+        return {"excluida": nome}
+
+    async def _op_playlist_concat(self, req):
+        nova = self.app.concatenar_playlists(str(req.get("destino") or "").strip(),
+                                             str(req.get("juntar") or "").strip())
+        if nova is None:
+            raise ErroRequisicao("playlist de destino ou origem não encontrada")
+        return _playlist_para_dict(nova)
+
+    async def _op_playlist_play(self, req):
+        usuario = self._usuario(req)
+        pl = self._playlist(req.get("nome"))
+        # Garante que os eventos individuais pendentes sejam aplicados antes
+        self.lote.descarregar()
+        self.app.reproduzir_playlist(usuario, pl, interativo=False)
+        return _playlist_para_dict(pl)
+
+    async def _op_report(self, req):
+        from .analises import Analises
+
+        top_n = int(req.get("top_n") or 10)
+        self.lote.descarregar()
+        self.app.descarregar_reproducoes()
+        app = self.app
+
+        # Cálculo em thread para não travar o laço de eventos em catálogos grandes
+        def calcular():
+            top = Analises.top_musicas_reproduzidas(app.musicas, top_n)
+            pl_pop = Analises.playlist_mais_popular(app.playlists)
+            u = Analises.usuario_mais_ativo(app.usuarios)
+            resultado = {
+                "top_musicas": [{"titulo": m.titulo, "artista": m.artista, "reproducoes": m.reproducoes}
+                                for m in top],
+                "playlist_mais_popular": _playlist_para_dict(pl_pop) if pl_pop else None,
+                "usuario_mais_ativo": {"nome": u.nome, "historico": len(u.historico)} if u else None,
+                "medias_avaliacoes": Analises.media_avaliacoes(app.musicas),
+                "total_reproducoes": Analises.total_reproducoes(app.usuarios),
+                "top_ultima_hora": [{"titulo": m.titulo, "reproducoes": n}
+                                    for m, n in Analises.top_janela(app.series, 3600, top_n)],
+                "em_alta": [{"titulo": m.titulo, "reproducoes": n, "fator": round(f, 2)}
+                            for m, n, f in Analises.em_alta(app.series, 3600, 86400, top_n)],
+            }
+            if req.get("salvar"):
+                resultado["arquivo"] = str(app.relatorio.salvar(top_n=top_n, series=app.series))
+            return resultado
+
+        return await asyncio.to_thread(calcular)
+
+
+# Cliente de teste de carga
+async def teste_carga(host: str, porta: int, conexoes: int = 4, requisicoes: int = 5000,
+                      janela: int = 64, ops=None) -> dict:
+    """
+    Abre 'conexoes' conexões e envia 'requisicoes' requisições no total, mantendo
+    até 'janela' requisições em voo por conexão (pipelining).
+    'ops' é uma lista de requisições-modelo sorteadas em rodízio (sem "id").
+    Retorna requisições/segundo e as latências p50/p99/máx em ms.
+    """
+    ops = ops or [{"op": "ping"}]
+    por_conexao = [requisicoes // conexoes + (1 if i < requisicoes % conexoes else 0)
+                   for i in range(conexoes)]
+    latencias = []
+    falhas = 0
+
+    async def cliente(n_req: int, deslocamento: int):
+        nonlocal falhas
+        reader, writer = await asyncio.open_connection(host, porta)
+        enviados = {}
+        vagas = asyncio.Semaphore(janela)
+
+        async def ler():
+            nonlocal falhas
+            try:
+                for _ in range(n_req):
+                    try:
+                        linha = await reader.readline()
+                    except (ValueError, asyncio.LimitOverrunError):
+                        # Resposta acima do limite do leitor: a conexão não se recupera
+                        break
+                    if not linha:
+                        break
+                    resp = json.loads(linha)
+                    rid = resp.get("id")
+                    if rid not in enviados:
+                        # Erro sem id (ex.: requisição recusada): o servidor encerra a conexão
+                        break
+                    latencias.append(time.perf_counter() - enviados.pop(rid))
+                    if not resp.get("ok"):
+                        falhas += 1
+                    vagas.release()
+            finally:
+                # Se a conexão acabou antes da hora, o envio não pode ficar esperando vaga
+                for _ in range(janela):
+                    vagas.release()
+
+        leitor = asyncio.create_task(ler())
+        with contextlib.suppress(ConnectionError):
+            for i in range(n_req):
+                await vagas.acquire()
+                if leitor.done():
+                    break
+                req = dict(ops[(deslocamento + i) % len(ops)], id=i)
+                enviados[i] = time.perf_counter()
+                writer.write((json.dumps(req, ensure_ascii=False) + "\n").encode("utf-8"))
+                if i % janela == janela - 1:
+                    await writer.drain()
+            await writer.drain()
+        await leitor
+        # Requisições sem resposta (conexão encerrada ou resposta grande demais) contam como falha
+        falhas += len(enviados)
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(n, i) for i, n in enumerate(por_conexao)))
+    dur = time.perf_counter() - inicio
+
+    latencias.sort()
+
+    def pct(p):
+        if not latencias:
+            return 0.0
+        return latencias[min(len(latencias) - 1, int(len(latencias) * p / 100))] * 1000
+
+    return {
+        "requisicoes": len(latencias),
+        "falhas": falhas,
+        "conexoes": conexoes,
+        "janela": janela,
+        "duracao_s": dur,
+        "req_por_s": len(latencias) / dur if dur else 0.0,
+        "p50_ms": pct(50),
+        "p99_ms": pct(99),
+        "max_ms": latencias[-1] * 1000 if latencias else 0.0,
+    }
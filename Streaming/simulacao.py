@@ -0,0 +1,262 @@
+#\Streaming\simulacao.py
+import heapq
+import itertools
+import random
+import time
+
+from .instrumentacao import instrumentar
+
+
+class RelogioVirtual:
+    """
+    Relógio da simulação: só anda quando o Simulador processa um evento.
+    Pode ser passado onde o código aceita 'relogio' (ex.: SeriesReproducoes).
+    """
+
+    __slots__ = ("agora",)
+
+    def __init__(self, inicio: float = 0.0):
+        self.agora = float(inicio)
+
+    def __call__(self) -> float:
+        return self.agora
+
+    def __repr__(self):
+        return f"RelogioVirtual(agora={self.agora:.3f})"
+
+
+class Simulador:
+    """
+    Motor de eventos discretos em tempo virtual.
+    - Os eventos ficam num heap de (instante, prioridade, sequência, ação,
+      argumento): no mesmo instante, a menor prioridade vem antes, e a
+      sequência desempata pela ordem de agendamento.
+    - rodar() tira o próximo evento, avança o relógio até o instante dele e
+      chama ação(argumento); a ação pode agendar novos eventos.
+    - Sem 'velocidade' o tempo virtual corre o mais rápido possível; com
+      velocidade=60, um minuto virtual leva um segundo real (carga em ritmo
+      realista para o resto do sistema).
+    """
+
+    def __init__(self, inicio: float = None, dormir=time.sleep, relogio_real=time.perf_counter):
+        self.relogio = RelogioVirtual(time.time() if inicio is None else inicio)
+        self.dormir = dormir
+        self.relogio_real = relogio_real
+        self._eventos = []
+        self._seq = itertools.count()
+        self.processados = 0
+
+    @property
+    def agora(self) -> float:
+        return self.relogio.agora
+
+    def agendar(self, atraso: float, acao, argumento=None, prioridade: int = 0) -> None:
+        """Agenda ação(argumento) para daqui a 'atraso' segundos virtuais."""
+        self.agendar_em(self.relogio.agora + max(0.0, float(atraso)), acao, argumento, prioridade)
+
+    def agendar_em(self, instante: float, acao, argumento=None, prioridade: int = 0) -> None:
+        heapq.heappush(self._eventos, (max(float(instante), self.relogio.agora), prioridade,
+                                       next(self._seq), acao, argumento))
+
+    def proximo_instante(self):
+        return self._eventos[0][0] if self._eventos else None
+
+    @instrumentar("simulacao.rodar")
+    def rodar(self, ate: float = None, velocidade: float = None) -> int:
+        """
+        Processa os eventos até a fila esvaziar ou até o instante virtual 'ate'
+        (o relógio para em 'ate'). Retorna quantos eventos foram processados.
+        """
+        eventos, relogio = self._eventos, self.relogio
+        inicio_virtual, inicio_real = relogio.agora, self.relogio_real()
+        feitos = 0
+        while eventos and (ate is None or eventos[0][0] <= ate):
+            instante, _, _, acao, argumento = heapq.heappop(eventos)
+            if velocidade:
+                # Segura o evento até a hora real correspondente ao instante virtual
+                falta = inicio_real + (instante - inicio_virtual) / velocidade - self.relogio_real()
+                if falta > 0:
+                    self.dormir(falta)
+            relogio.agora = instante
+            acao(argumento)
+            feitos += 1
+        if ate is not None and ate > relogio.agora:
+            if velocidade:
+                falta = inicio_real + (ate - inicio_virtual) / velocidade - self.relogio_real()
+                if falta > 0:
+                    self.dormir(falta)
+            relogio.agora = float(ate)
+        self.processados += feitos
+        return feitos
+
+    def __len__(self):
+        return len(self._eventos)
+
+    def __repr__(self):
+        return f"Simulador(agora={self.agora:.3f}, pendentes={len(self._eventos)}, processados={self.processados})"
+
+
+class SessaoOuvinte:
+    """Um ouvinte da simulação: a fila que ele toca e a faixa que está tocando agora."""
+
+    __slots__ = ("usuario", "fila", "atual", "inicio_faixa", "restantes")
+
+    def __init__(self, usuario, fila, faixas: int):
+        self.usuario = usuario
+        self.fila = fila
+        self.atual = None
+        self.inicio_faixa = 0.0
+        self.restantes = faixas
+
+
+class AudienciaSimulada:
+    """
+    Ouvintes simultâneos tocando filas de reprodução em tempo virtual sobre um app.
+    - Cada ouvinte chega num instante sorteado (chegadas de Poisson ao longo de
+      'chegadas' segundos), toca até 'faixas' faixas da fila e sai.
+    - Início de faixa: app.reproduzir_midia() (contadores, histórico, eventos,
+      séries temporais no relógio virtual) e um evento de fim agendado para
+      daqui a 'duracao' segundos; no fim, a próxima faixa começa no mesmo
+      instante (sem intervalo).
+    - Métricas: ouvintes agora por mídia, pico de ouvintes simultâneos por
+      mídia e no total (com o instante), ouvinte-segundos e média de ouvintes.
+    Um evento pendente por ouvinte: o heap cresce com os ouvintes
+    simultâneos, não com o tempo simulado.
+    """
+
+    # Prioridades no mesmo instante: quem termina sai antes de quem chega
+    # (a faixa é o intervalo [início, fim) e o pico não conta os dois juntos)
+    FIM = 0
+    CHEGADA = 1
+
+    def __init__(self, app, simulador: Simulador = None, semente: int = None):
+        self.app = app
+        self.simulador = simulador if simulador is not None else Simulador()
+        self.rnd = random.Random(semente)
+        self.ouvintes = {}            # id da mídia -> ouvintes agora
+        self.picos = {}               # id da mídia -> (pico de ouvintes, instante)
+        self.midias = {}              # id da mídia -> mídia (para o resultado)
+        self.sessoes = []
+        self.ativos = 0
+        self.pico_total = (0, None)
+        self.iniciadas = 0
+        self.concluidas = 0
+        self.ouvinte_segundos = 0.0
+        self._inicio = None
+
+    # Ouvintes
+    def adicionar_ouvintes(self, quantidade: int, chegadas: float = 600.0, faixas: int = 10, **opcoes) -> None:
+        """
+        Agenda 'quantidade' ouvintes; cada um toca uma playlist do app (em rodízio,
+        ou o catálogo de músicas se não houver playlists) com as opções da
+        FilaReproducao (aleatorio, repetir, janela...).
+        """
+        from .fila_reproducao import FilaReproducao
+
+        app, sim = self.app, self.simulador
+        if self._inicio is None:
+            self._inicio = sim.agora
+        playlists = list(app.playlists)
+        usuarios = list(app.usuarios)
+        taxa = quantidade / chegadas if chegadas > 0 else None
+        instante = sim.agora
+        for i in range(int(quantidade)):
+            if playlists:
+                fila = playlists[i % len(playlists)].fila(semente=self.rnd.getrandbits(64), **opcoes)
+            else:
+                fila = FilaReproducao(app.musicas, semente=self.rnd.getrandbits(64), **opcoes)
+            sessao = SessaoOuvinte(usuarios[i % len(usuarios)] if usuarios else None, fila, int(faixas))
+            self.sessoes.append(sessao)
+            if taxa:
+                instante += self.rnd.expovariate(taxa)
+            sim.agendar_em(instante, self._iniciar, sessao, self.CHEGADA)
+
+    def _iniciar(self, sessao: SessaoOuvinte) -> None:
+        midia = sessao.fila.proxima() if sessao.restantes > 0 else None
+        if midia is None:
+            return
+        agora = self.simulador.agora
+        sessao.atual = midia
+        sessao.inicio_faixa = agora
+        sessao.restantes -= 1
+        self.app.reproduzir_midia(sessao.usuario, midia, interativo=False)
+        self.iniciadas += 1
+
+        chave = midia.id
+        n = self.ouvintes.get(chave, 0) + 1
+        self.ouvintes[chave] = n
+        if n > self.picos.get(chave, (0,))[0]:
+            self.picos[chave] = (n, agora)
+            self.midias[chave] = midia
+        self.ativos += 1
+        if self.ativos > self.pico_total[0]:
+            self.pico_total = (self.ativos, agora)
+        self.simulador.agendar(max(1, int(getattr(midia, "duracao", 0) or 0)), self._terminar, sessao, self.FIM)
+
+    def _terminar(self, sessao: SessaoOuvinte) -> None:
+        midia = sessao.atual
+        chave = midia.id
+        n = self.ouvintes[chave] - 1
+        if n:
+            self.ouvintes[chave] = n
+        else:
+            del self.ouvintes[chave]
+        self.ativos -= 1
+        self.concluidas += 1
+        self.ouvinte_segundos += self.simulador.agora - sessao.inicio_faixa
+        sessao.atual = None
+        self._iniciar(sessao)
+
+    # Estado "tocando agora"
+    def tocando_agora(self, usuario=None) -> list:
+        """[(usuário, mídia, segundos desde o início da faixa)] das sessões tocando agora."""
+        agora = self.simulador.agora
+        return [(s.usuario, s.atual, agora - s.inicio_faixa) for s in self.sessoes
+                if s.atual is not None and (usuario is None or s.usuario is usuario)]
+
+    def ouvintes_de(self, midia) -> int:
+        return self.ouvintes.get(midia.id, 0)
+
+    def top_picos(self, n: int = 10) -> list:
+        """[(mídia, pico de ouvintes simultâneos, instante do pico)], do maior pico para o menor."""
+        ordem = sorted(self.picos.items(), key=lambda kv: (-kv[1][0], kv[1][1]))[:n]
+        return [(self.midias[k], pico, instante) for k, (pico, instante) in ordem]
+
+    # Execução
+    def rodar(self, ate: float = None, velocidade: float = None) -> int:
+        """
+        Roda o simulador; enquanto roda, as séries temporais do app usam o
+        relógio virtual (as reproduções caem nos baldes do instante simulado).
+        """
+        series = getattr(self.app, "series", None)
+        anterior = series.relogio if series is not None else None
+        if series is not None:
+            series.relogio = self.simulador.relogio
+        try:
+            return self.simulador.rodar(ate=ate, velocidade=velocidade)
+        finally:
+            if series is not None:
+                series.relogio = anterior
+
+    def resumo(self, top: int = 10) -> dict:
+        """Métricas da simulação; os instantes são segundos virtuais desde o início."""
+        inicio = self._inicio if self._inicio is not None else self.simulador.agora
+        decorrido = self.simulador.agora - inicio
+        # Faixas ainda tocando contam até o instante atual
+        em_curso = sum(d for _, _, d in self.tocando_agora())
+        return {
+            "ouvintes": len(self.sessoes),
+            "tempo_virtual_s": round(decorrido, 3),
+            "faixas_iniciadas": self.iniciadas,
+            "faixas_concluidas": self.concluidas,
+            "tocando_agora": self.ativos,
+            "pico_ouvintes": self.pico_total[0],
+            "pico_instante_s": round(self.pico_total[1] - inicio, 3) if self.pico_total[1] is not None else None,
+            "media_ouvintes": round((self.ouvinte_segundos + em_curso) / decorrido, 3) if decorrido else 0.0,
+            "picos_por_midia": [{"titulo": m.titulo, "pico": p, "instante_s": round(t - inicio, 3)}
+                                for m, p, t in self.top_picos(top)],
+        }
+
+    def __repr__(self):
+        return (f"AudienciaSimulada(ouvintes={len(self.sessoes)}, tocando={self.ativos}, "
+                f"pico={self.pico_total[0]}, agora={self.simulador.agora:.3f})")
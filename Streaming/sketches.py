@@ -0,0 +1,395 @@
+#\Streaming\sketches.py
+"""
+Estruturas probabilísticas (sketches) para análises aproximadas em volumes
+muito grandes, com memória fixa e erro conhecido:
+
+- HyperLogLog: quantidade de elementos distintos (ouvintes por música).
+- CountMinSketch + TopK: contagens aproximadas e itens mais frequentes.
+- TDigest: quantis de uma distribuição (durações, reproduções).
+
+Todas podem ser combinadas (merge), então partes calculadas separadamente
+(processos, shards) somam no mesmo resultado.
+"""
+import heapq
+import math
+import threading
+from array import array
+from functools import lru_cache
+from hashlib import blake2b
+
+
+# Hash de 64 bits estável entre execuções (hash() do Python muda a cada processo).
+# Nomes e títulos se repetem muito nos eventos: um cache limitado evita recalcular.
+@lru_cache(maxsize=1 << 16)
+def _hash64(item) -> int:
+    return int.from_bytes(blake2b(str(item).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# Dois hashes de 64 bits de um só cálculo (para a técnica de Kirsch-Mitzenmacher)
+@lru_cache(maxsize=1 << 16)
+def _hash128(item):
+    d = blake2b(str(item).encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(d[:8], "little"), int.from_bytes(d[8:], "little") | 1
+
+
+# Posições de um item nas d linhas de um CountMinSketch w x d
+@lru_cache(maxsize=1 << 16)
+def _posicoes_cms(item, largura: int, profundidade: int) -> tuple:
+    h1, h2 = _hash128(item)
+    return tuple((h1 + i * h2) % largura for i in range(profundidade))
+
+
+class HyperLogLog:
+    """
+    Contagem aproximada de distintos.
+    - m = 2**p registradores de 1 byte: memória = m bytes (p=12 -> 4 KiB).
+    - Erro padrão relativo ~ 1.04 / sqrt(m) (p=10: 3.3%; p=12: 1.6%; p=14: 0.8%).
+    - Modo esparso (como no HLL++): até m/8 distintos guarda os hashes de 64 bits
+      (os mesmos m bytes) e a contagem é exata (salvo colisão de hash de 64 bits);
+      acima disso passa para os registradores.
+    """
+
+    __slots__ = ("p", "m", "registros", "esparso")
+
+    def __init__(self, p: int = 12):
+        if not 4 <= p <= 16:
+            raise ValueError("p deve estar entre 4 e 16.")
+        self.p = p
+        self.m = 1 << p
+        self.registros = None
+        self.esparso = array("Q")
+
+    def adicionar(self, item) -> None:
+        self._adicionar_hash(_hash64(item))
+
+    def _adicionar_hash(self, h: int) -> None:
+        if self.esparso is not None:
+            if h not in self.esparso:
+                self.esparso.append(h)
+                if len(self.esparso) > self.m // 8:
+                    self._densificar()
+            return
+        i = h >> (64 - self.p)
+        resto = h & ((1 << (64 - self.p)) - 1)
+        posto = (64 - self.p) - resto.bit_length() + 1
+        if posto > self.registros[i]:
+            self.registros[i] = posto
+
+    def _densificar(self) -> None:
+        hashes, self.esparso = self.esparso, None
+        self.registros = bytearray(self.m)
+        for h in hashes:
+            self._adicionar_hash(h)
+
+    def contar(self) -> int:
+        if self.esparso is not None:
+            return len(self.esparso)
+        m = self.m
+        alfa = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+        soma = math.fsum(2.0 ** -r for r in self.registros)
+        estimativa = alfa * m * m / soma
+        zeros = self.registros.count(0)
+        if estimativa <= 2.5 * m and zeros:
+            estimativa = m * math.log(m / zeros)
+        return int(round(estimativa))
+
+    def combinar(self, outro: "HyperLogLog") -> None:
+        if outro.p != self.p:
+            raise ValueError("HyperLogLog com precisões diferentes.")
+        if outro.esparso is not None:
+            for h in outro.esparso:
+                self._adicionar_hash(h)
+            return
+        if self.esparso is not None:
+            self._densificar()
+        self.registros = bytearray(map(max, self.registros, outro.registros))
+
+    @property
+    def erro_padrao(self) -> float:
+        return 0.0 if self.esparso is not None else 1.04 / math.sqrt(self.m)
+
+    def memoria_bytes(self) -> int:
+        return self.m
+
+    def __len__(self):
+        return self.contar()
+
+    def __repr__(self):
+        return f"HyperLogLog(p={self.p}, estimativa={self.contar()})"
+
+
+class CountMinSketch:
+    """
+    Contagens aproximadas por item (só superestima, nunca subestima).
+    - largura w = ceil(e / epsilon), profundidade d = ceil(ln(1 / delta)).
+    - Com probabilidade >= 1 - delta: estimativa <= real + epsilon * N (N = total somado).
+      epsilon limita o tamanho do erro e delta a chance de passar dele; as propriedades
+      epsilon e delta devolvem os valores efetivos (w e d são arredondados para cima).
+    - Memória = w * d contadores de 8 bytes (epsilon=0.001, delta=0.01 -> 2719 x 5 ~ 106 KiB).
+    """
+
+    __slots__ = ("largura", "profundidade", "tabela", "total")
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01):
+        self.largura = max(1, math.ceil(math.e / epsilon))
+        self.profundidade = max(1, math.ceil(math.log(1 / delta)))
+        self.tabela = [array("Q", [0]) * self.largura for _ in range(self.profundidade)]
+        self.total = 0
+
+    def _posicoes(self, item):
+        return _posicoes_cms(item, self.largura, self.profundidade)
+
+    def adicionar(self, item, qtde: int = 1) -> int:
+        """Soma 'qtde' ao item e retorna a nova estimativa."""
+        self.total += qtde
+        valores = []
+        for linha, pos in zip(self.tabela, self._posicoes(item)):
+            linha[pos] += qtde
+            valores.append(linha[pos])
+        return min(valores)
+
+    def estimar(self, item) -> int:
+        return min(linha[pos] for linha, pos in zip(self.tabela, self._posicoes(item)))
+
+    def combinar(self, outro: "CountMinSketch") -> None:
+        if (outro.largura, outro.profundidade) != (self.largura, self.profundidade):
+            raise ValueError("CountMinSketch com dimensões diferentes.")
+        for a, b in zip(self.tabela, outro.tabela):
+            for i, v in enumerate(b):
+                if v:
+                    a[i] += v
+        self.total += outro.total
+
+    @property
+    def epsilon(self) -> float:
+        return math.e / self.largura
+
+    @property
+    def delta(self) -> float:
+        return math.exp(-self.profundidade)
+
+    def memoria_bytes(self) -> int:
+        return self.largura * self.profundidade * 8
+
+    def __repr__(self):
+        return f"CountMinSketch(largura={self.largura}, profundidade={self.profundidade}, total={self.total})"
+
+
+class TopK:
+    """
+    Itens mais frequentes (heavy hitters) sobre um CountMinSketch.
+    Guarda no máximo k candidatos num heap de mínimo; um item novo entra
+    quando sua estimativa passa a do menor candidato.
+    Todo item com frequência real > epsilon * N (do sketch) e entre os k
+    maiores aparece na lista; as contagens têm o erro do CountMinSketch
+    (até +epsilon * N, com probabilidade >= 1 - delta).
+    Memória: o sketch + k candidatos.
+    """
+
+    def __init__(self, k: int = 10, epsilon: float = 0.001, delta: float = 0.01):
+        self.k = max(1, int(k))
+        self.sketch = CountMinSketch(epsilon, delta)
+        self._candidatos = {}     # item -> estimativa atual
+        self._heap = []           # (estimativa, item), com entradas antigas descartadas depois
+
+    def adicionar(self, item, qtde: int = 1) -> None:
+        estimativa = self.sketch.adicionar(item, qtde)
+        candidatos = self._candidatos
+        if item in candidatos or len(candidatos) < self.k:
+            candidatos[item] = estimativa
+            heapq.heappush(self._heap, (estimativa, item))
+        else:
+            menor = self._menor()
+            if estimativa > menor[0]:
+                heapq.heappop(self._heap)
+                del candidatos[menor[1]]
+                candidatos[item] = estimativa
+                heapq.heappush(self._heap, (estimativa, item))
+        # Compacta o heap quando acumula entradas desatualizadas
+        if len(self._heap) > 4 * self.k + 16:
+            self._heap = [(v, i) for i, v in candidatos.items()]
+            heapq.heapify(self._heap)
+
+    # Menor candidato válido (descarta entradas desatualizadas do topo)
+    def _menor(self):
+        heap, candidatos = self._heap, self._candidatos
+        while heap and candidatos.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def top(self, n: int = None) -> list:
+        """Lista [(item, estimativa)] em ordem decrescente."""
+        itens = sorted(self._candidatos.items(), key=lambda x: (-x[1], str(x[0])))
+        return itens[:n] if n is not None else itens
+
+    def combinar(self, outro: "TopK") -> None:
+        self.sketch.combinar(outro.sketch)
+        todos = set(self._candidatos) | set(outro._candidatos)
+        melhores = heapq.nlargest(self.k, ((self.sketch.estimar(i), i) for i in todos),
+                                  key=lambda x: x[0])
+        self._candidatos = {i: v for v, i in melhores}
+        self._heap = [(v, i) for i, v in self._candidatos.items()]
+        heapq.heapify(self._heap)
+
+    def memoria_bytes(self) -> int:
+        return self.sketch.memoria_bytes() + 64 * self.k
+
+    def __repr__(self):
+        return f"TopK(k={self.k}, total={self.sketch.total})"
+
+
+class TDigest:
+    """
+    Quantis aproximados (mediana, p90, p99) de uma distribuição em fluxo.
+    - Centróides (média, peso) com tamanho limitado pela função de escala k1:
+      a precisão é maior nas caudas (p1, p99) do que no meio.
+    - Quantidade de centróides ~ compressao (100 -> poucos KiB).
+    - Erro típico de quantil ~ 1/compressao no meio e bem menor nas caudas.
+    """
+
+    def __init__(self, compressao: float = 100):
+        self.compressao = float(compressao)
+        self._medias = []
+        self._pesos = []
+        self._buffer = []
+        self._limite_buffer = int(5 * compressao)
+        self.total = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def adicionar(self, valor: float, peso: float = 1.0) -> None:
+        self._buffer.append((float(valor), float(peso)))
+        if len(self._buffer) >= self._limite_buffer:
+            self._compactar()
+
+    # Índice de escala k1: k(q) = compressao / (2*pi) * asin(2q - 1)
+    def _k(self, q: float) -> float:
+        return self.compressao / (2 * math.pi) * math.asin(2 * min(max(q, 0.0), 1.0) - 1)
+
+    def _compactar(self) -> None:
+        if not self._buffer:
+            return
+        pontos = sorted(list(zip(self._medias, self._pesos)) + self._buffer)
+        self._buffer = []
+        total = sum(p for _, p in pontos)
+        self.total = total
+        self.minimo = min(self.minimo, pontos[0][0])
+        self.maximo = max(self.maximo, pontos[-1][0])
+
+        medias, pesos = [], []
+        acumulado = 0.0
+        media, peso = pontos[0]
+        limite = self._k(0.0) + 1
+        for valor, p in pontos[1:]:
+            q = (acumulado + peso + p) / total
+            if self._k(q) <= limite:
+                media += (valor - media) * p / (peso + p)
+                peso += p
+            else:
+                medias.append(media)
+                pesos.append(peso)
+                acumulado += peso
+                limite = self._k(acumulado / total) + 1
+                media, peso = valor, p
+        medias.append(media)
+        pesos.append(peso)
+        self._medias, self._pesos = medias, pesos
+
+    def quantil(self, q: float) -> float:
+        """Valor aproximado no quantil q (0..1); NaN se vazio."""
+        self._compactar()
+        if not self._pesos:
+            return math.nan
+        alvo = min(max(q, 0.0), 1.0) * self.total
+        # Interpola linearmente entre os centros dos centróides (e os extremos min/max)
+        x_ant, v_ant = 0.0, self.minimo
+        acumulado = 0.0
+        for m, p in zip(self._medias, self._pesos):
+            centro = acumulado + p / 2
+            if alvo <= centro:
+                fracao = (alvo - x_ant) / (centro - x_ant) if centro > x_ant else 0.0
+                return v_ant + fracao * (m - v_ant)
+            x_ant, v_ant = centro, m
+            acumulado += p
+        fracao = (alvo - x_ant) / (self.total - x_ant) if self.total > x_ant else 0.0
+        return v_ant + fracao * (self.maximo - v_ant)
+
+    def combinar(self, outro: "TDigest") -> None:
+        outro._compactar()
+        self._buffer.extend(zip(outro._medias, outro._pesos))
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self._compactar()
+
+    def __len__(self):
+        self._compactar()
+        return len(self._medias)
+
+    def memoria_bytes(self) -> int:
+        # Duas listas de floats por centróide + buffer
+        return 16 * (len(self._medias) + self._limite_buffer)
+
+    def __repr__(self):
+        return f"TDigest(compressao={self.compressao:g}, centroides={len(self)}, total={self.total:g})"
+
+
+class AnalisesAproximadas:
+    """
+    Modo de análises aproximadas, alimentado pelos eventos de reprodução:
+    - ouvintes distintos por mídia e no total (HyperLogLog, criado no 1º ouvinte)
+    - usuários e mídias mais ativos (TopK sobre CountMinSketch)
+    - distribuição das durações tocadas (TDigest)
+    Teto de memória: memoria_maxima() soma o pior caso das estruturas
+    (a parte por mídia cresce com o catálogo, não com o número de eventos).
+    """
+
+    def __init__(self, k: int = 10, p: int = 10, epsilon: float = 0.001, delta: float = 0.01,
+                 compressao: float = 100):
+        self.p = p
+        self.ouvintes = {}                     # titulo -> HyperLogLog
+        self.ouvintes_total = HyperLogLog(max(p, 12))
+        self.usuarios_top = TopK(k, epsilon, delta)
+        self.midias_top = TopK(k, epsilon, delta)
+        self.duracoes = TDigest(compressao)
+        self._trava = threading.Lock()    # eventos chegam de várias sessões
+
+    # Assinante do evento "historico" (usuário + título)
+    def registrar_ouvinte(self, usuario, titulo, **_) -> None:
+        nome = getattr(usuario, "nome", usuario)
+        with self._trava:
+            hll = self.ouvintes.get(titulo)
+            if hll is None:
+                hll = self.ouvintes[titulo] = HyperLogLog(self.p)
+            hll.adicionar(nome)
+            self.ouvintes_total.adicionar(nome)
+            self.usuarios_top.adicionar(nome)
+
+    # Assinante do evento "reproducao" (mídia)
+    def registrar_reproducao(self, midia, qtde: int = 1, **_) -> None:
+        with self._trava:
+            self.midias_top.adicionar(midia.titulo, qtde)
+            self.duracoes.adicionar(midia.duracao, qtde)
+
+    def combinar(self, outro: "AnalisesAproximadas") -> None:
+        for titulo, hll in outro.ouvintes.items():
+            self.ouvintes.setdefault(titulo, HyperLogLog(self.p)).combinar(hll)
+        self.ouvintes_total.combinar(outro.ouvintes_total)
+        self.usuarios_top.combinar(outro.usuarios_top)
+        self.midias_top.combinar(outro.midias_top)
+        self.duracoes.combinar(outro.duracoes)
+
+    def memoria_bytes(self) -> int:
+        return (sum(h.memoria_bytes() for h in self.ouvintes.values())
+                + self.ouvintes_total.memoria_bytes()
+                + self.usuarios_top.memoria_bytes() + self.midias_top.memoria_bytes()
+                + self.duracoes.memoria_bytes())
+
+    def memoria_maxima(self, qtde_midias: int) -> int:
+        """Pior caso de memória para um catálogo de 'qtde_midias' mídias."""
+        return (qtde_midias * (1 << self.p) + self.ouvintes_total.memoria_bytes()
+                + self.usuarios_top.memoria_bytes() + self.midias_top.memoria_bytes()
+                + 16 * (int(2 * self.duracoes.compressao) + self.duracoes._limite_buffer))
+
+    def __repr__(self):
+        return (f"AnalisesAproximadas(midias={len(self.ouvintes)}, "
+                f"eventos={self.midias_top.sketch.total}, memoria={self.memoria_bytes()} bytes)")
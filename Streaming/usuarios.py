@@ -1,32 +1,105 @@
 #\Streaming\usuarios.py
 
 from datetime import datetime
+import threading
+
+from Streaming.concorrencia import TRAVAS
+from Streaming.ids import ListaIds, ListaIdsPreguicosa, registro_atual
 
 class Usuario:
     
     # Atributo de classe para contar instâncias
     qtde_instancias = 0
+    _trava_instancias = threading.Lock()
 
     # Construtor
     def __init__(self, nome='Usuario não informado'):
         self.nome = nome.strip().title()  # Formata o nome
+        # ID inteiro do registro de IDs (o mesmo nome sempre recebe o mesmo ID)
+        self._registro = registro_atual()
+        self.id = self._registro.usuarios.id(self.nome)
+        self._registro.usuarios.vincular(self.id, self)
+        # Playlists e histórico são guardados como IDs (array de inteiros)
         self.playlists = []
         self.historico = []
-        Usuario.qtde_instancias += 1
-        #self.id = id(self)  # ID único baseado no endereço de memória do objeto
+        with Usuario._trava_instancias:
+            Usuario.qtde_instancias += 1
         self.data_criacao = datetime.now()
-       
+
+    # Listas de referências: aceitam nomes e guardam IDs
+    @property
+    def playlists(self) -> ListaIds:
+        return self._playlists
+
+    @playlists.setter
+    def playlists(self, nomes):
+        # Nomes de playlist são únicos por usuário: internados no escopo do seu ID
+        self._playlists = ListaIds(self._registro.playlists, nomes or [], self.id)
+
+    @property
+    def historico(self) -> ListaIds:
+        return self._historico
+
+    @historico.setter
+    def historico(self, titulos):
+        # Histórico carregado sob demanda (ex.: do banco) é usado como está
+        if isinstance(titulos, ListaIdsPreguicosa) and titulos._espaco is self._registro.midias:
+            self._historico = titulos
+        else:
+            self._historico = ListaIds(self._registro.midias, titulos or [])
+
+    # Renomeia o usuário; playlists que o referenciam pelo ID mostram o nome novo.
+    # Só o registro de IDs muda: usuário de um app é renomeado por StreamingApp.renomear_usuario
+    def renomear(self, novo: str) -> None:
+        novo = (novo or "").strip().title()
+        if not novo:
+            raise ValueError("O nome do usuário não pode ser vazio.")
+        self._registro.usuarios.renomear(self.id, novo)
+        self.nome = novo
+
+    # Passa para o registro de IDs do app que incluiu o usuário (criado fora dele);
+    # playlists e histórico são refeitos pelos nomes no registro novo
+    def _mudar_registro(self, registro) -> None:
+        if registro is self._registro:
+            return
+        playlists, historico = list(self._playlists), list(self._historico)
+        self._registro = registro
+        self.id = registro.usuarios.id(self.nome)
+        registro.usuarios.vincular(self.id, self)
+        self.playlists = playlists
+        self.historico = historico
+
+    # Serializa as playlists pelos nomes (o escopo delas é o ID, que muda de processo);
+    # o registro fica no processo
+    def __getstate__(self):
+        estado = dict(self.__dict__)
+        estado.pop("_registro", None)
+        estado["_playlists"] = list(self._playlists)
+        return estado
+
+    # Ao desserializar (outro processo), o ID é obtido de novo pelo nome
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._registro = registro_atual()
+        self.id = self._registro.usuarios.id(self.nome)
+        self._registro.usuarios.vincular(self.id, self)
+        self.playlists = estado["_playlists"]
     
     #Métodos obrigatórios para a classe
     # Cria uma lista: parâmetro seu nome
     def criar_playlist(self, nome: str):
         """Adiciona uma playlist criada ao usuário corrente."""
-        if nome.strip().title() in self.playlists:
-            print(f"A playlist '{nome.strip().title()}' já existe.")
-        elif not nome.strip():
+        if not nome.strip():
             print("O nome da playlist não pode ser vazio.")
+            return
+        # Verificação e inclusão atômicas (evita duplicar em sessões paralelas)
+        with TRAVAS.para(self):
+            existe = nome.strip().title() in self.playlists
+            if not existe:
+                self.playlists.append(nome.strip().title())
+        if existe:
+            print(f"A playlist '{nome.strip().title()}' já existe.")
         else:
-            self.playlists.append(nome.strip().title())
             print(f"Playlist '{nome.strip().title()}' criada com sucesso!")
 
     #Ouvir uma música: parâmetro o nome da música
@@ -42,7 +115,19 @@ class Usuario:
     # Registra a reprodução de uma música
     def registrar_reproducao(self, musica: str):
         """Adiciona uma música escutada ao histórico de reproduções."""
-        self.historico.append(musica)
+        with TRAVAS.para(self):
+            self.historico.append(musica)
+        self._registro.eventos.emitir("historico", usuario=self, titulo=musica)
+
+    # Registra várias reproduções de uma vez (escrita adiada): uma trava, uma extensão
+    def registrar_reproducoes(self, musicas) -> None:
+        """Adiciona as músicas ao histórico na ordem e publica um evento por música."""
+        with TRAVAS.para(self):
+            inicio = len(self.historico)
+            self.historico.extend(musicas)
+        # 'posicao' indica onde cada música entrou (assinantes que olham as anteriores)
+        for i, musica in enumerate(musicas, inicio):
+            self._registro.eventos.emitir("historico", usuario=self, titulo=musica, posicao=i)
 
     
     # Métodos obrigatorios de todas as classes
@@ -51,7 +136,6 @@ class Usuario:
         return (f"Usuário: {self.nome} | "
                 f"Listas de reprodução: {len(self.playlists)} | "
                 f"Musicas no histórico: {len(self.historico)} | "
-               # f"ID: {self.id}, | "
                 f"Criado em: {self.data_criacao.strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Representação oficial
@@ -59,7 +143,7 @@ class Usuario:
         return (f"Usuário: {self.nome} | "
                 f"Número de Playlists: {self.playlists} | "
                 f"Quantidade de músicas no histórico: {self.historico} | "
-              #  f"Identificador único: {self.id} | "
+                f"Identificador: {self.id} | "
                 f"Usuário criado em: {self.data_criacao}")
     
 
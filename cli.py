@@ -0,0 +1,824 @@
+# cli.py
+"""
+Linha de comando não interativa do Streaming POD (para cron e jobs em lote).
+
+    python cli.py import                      # importa os .md de config/
+    python cli.py validate                    # só confere os .md (sem criar objetos)
+    python cli.py convert cat.md cat.spod     # converte o catálogo (.md, .csv, .jsonl, .spod)
+    python cli.py report --top 5              # importa e grava o relatório
+    python cli.py replay-plays eventos.jsonl  # importa e reproduz eventos
+    python cli.py search "bohemian rapsody"   # busca textual tolerante a erros
+    python cli.py browse --genero Rock        # navegação pelos índices (gênero, artista, temporada)
+    python cli.py bench --reproducoes 10000   # mede importação, reprodução e relatório
+    python cli.py serve --porta 8765          # serviço TCP local (JSON por linha)
+    python cli.py loadtest                    # teste de carga: req/s e latência p99
+    python cli.py export --formato colunar    # métricas por música em csv, jsonl ou colunar
+    python cli.py recommend --usuario Ana     # sugestões de "tocar em seguida"
+    python cli.py generate --genero Rock --minutos 90   # playlist por restrições
+    python cli.py watch --segundos 60         # aplica as mudanças de config/ enquanto roda
+    python cli.py queue --aleatorio           # milhões de filas de reprodução: faixas/s e memória
+    python cli.py simulate --ouvintes 10000   # audiência em tempo virtual: picos de ouvintes por mídia
+    python cli.py --perfil report             # qualquer subcomando com perfil de CPU (cProfile) na saída de erro
+
+A saída padrão recebe um único objeto JSON por execução; as mensagens
+legíveis do sistema vão para a saída de erro (ou somem com --silencioso).
+Cada subcomando importa apenas os módulos de que precisa. As conferências
+de corretude (relatório, agregados, leitores, deduplicação, concorrência,
+inquilinos) ficam em tests/ (python -m pytest).
+
+Códigos de saída:
+    0 sucesso | 1 falha de execução | 2 uso incorreto | 3 dados inválidos (--estrito)
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+SAIDA_OK = 0
+SAIDA_FALHA = 1
+SAIDA_USO = 2
+SAIDA_DADOS = 3
+
+
+# Redireciona os prints do sistema para stderr (ou descarta) para não sujar o JSON
+@contextlib.contextmanager
+def _mensagens(args):
+    if args.silencioso:
+        import io
+        destino = io.StringIO()
+    else:
+        destino = sys.stderr
+    with contextlib.redirect_stdout(destino):
+        yield
+
+
+# Escreve o resultado em JSON na saída padrão
+def _emitir(resultado: dict) -> None:
+    sys.stdout.write(json.dumps(resultado, ensure_ascii=False, default=str) + "\n")
+    sys.stdout.flush()
+
+
+# Apps criados pelo subcomando; fechados ao final (main) para gravar o que estiver
+# pendente e soltar as assinaturas de eventos
+_APPS_ABERTOS = []
+
+
+# Cria o app e importa os markdown de config/. Só os subcomandos que buscam
+# (busca=True) leem e gravam o índice de busca salvo em cache/; nos demais a
+# busca, se usada, é montada em memória no primeiro acesso
+def _carregar_app(args, busca: bool = False):
+    from main import StreamingApp, importar_markdowns_para_main
+
+    app = StreamingApp()
+    _APPS_ABERTOS.append(app)
+    if getattr(args, "aproximado", False):
+        app.ativar_analises_aproximadas()
+    if args.banco:
+        # Estado salvo antes do markdown; mudanças desta execução são gravadas ao sair
+        app.abrir_armazenamento(args.banco)
+    if getattr(args, "adiado", False):
+        # Depois do banco: ao sair, os lotes pendentes são aplicados antes da última gravação
+        app.ativar_escrita_adiada(lote=args.lote_adiado)
+    with _mensagens(args):
+        if busca:
+            app.carregar_indice_busca()
+        resumo = importar_markdowns_para_main(app)
+        if busca:
+            app.salvar_indice_busca()
+    return app, resumo
+
+
+# Lê os eventos de reprodução (JSON Lines; "-" lê da entrada padrão)
+def _ler_eventos(caminho: str):
+    """
+    Cada linha é um objeto JSON:
+      {"usuario": "Ana", "titulo": "Shape of You", "nota": 5}   (nota é opcional)
+      {"usuario": "Ana", "playlist": "Favoritas"}
+    Linhas vazias e iniciadas por '#' são ignoradas.
+    """
+    arquivo = sys.stdin if caminho == "-" else open(caminho, encoding="utf-8")
+    try:
+        for n, linha in enumerate(arquivo, start=1):
+            linha = linha.strip()
+            if not linha or linha.startswith("#"):
+                continue
+            try:
+                yield n, json.loads(linha)
+            except json.JSONDecodeError as e:
+                yield n, {"_erro": f"JSON inválido: {e}"}
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+# Aplica os eventos de reprodução no app e devolve o resumo
+def _reproduzir_eventos(app, eventos) -> dict:
+    resumo = {"eventos": 0, "reproducoes": 0, "avaliacoes": 0, "rejeitados": []}
+    for n, ev in eventos:
+        resumo["eventos"] += 1
+        if not isinstance(ev, dict) or "_erro" in ev:
+            erro = ev.get("_erro") if isinstance(ev, dict) else "evento não é um objeto"
+            resumo["rejeitados"].append(f"linha {n}: {erro}")
+            continue
+
+        usuario = None
+        if ev.get("usuario"):
+            usuario = app.buscar_usuario(str(ev["usuario"]))
+            if usuario is None:
+                resumo["rejeitados"].append(f"linha {n}: usuário '{ev['usuario']}' inexistente")
+                continue
+
+        if ev.get("playlist"):
+            pl = app.buscar_playlist(str(ev["playlist"]).strip())
+            if pl is None:
+                resumo["rejeitados"].append(f"linha {n}: playlist '{ev['playlist']}' inexistente")
+                continue
+            app.reproduzir_playlist(usuario, pl, interativo=False)
+            resumo["reproducoes"] += len(pl)
+            continue
+
+        midia = app.buscar_midia(str(ev.get("titulo") or ""))
+        if midia is None:
+            resumo["rejeitados"].append(f"linha {n}: mídia '{ev.get('titulo')}' inexistente")
+            continue
+        app.reproduzir_midia(usuario, midia, interativo=False)
+        resumo["reproducoes"] += 1
+
+        if "nota" in ev:
+            registrar = getattr(midia, "registrar_avaliacao", None)
+            if callable(registrar) and registrar(ev["nota"]):
+                resumo["avaliacoes"] += 1
+            else:
+                resumo["rejeitados"].append(f"linha {n}: nota inválida {ev['nota']!r} para '{midia.titulo}'")
+    return resumo
+
+
+# Grava o relatório: materializado por padrão; recalculado com --completo ou --processos
+def _salvar_relatorio(app, args):
+    from Streaming.analises import Analises
+
+    app.descarregar_reproducoes()
+    if not args.completo and args.processos == 1:
+        return app.relatorio.salvar(pasta=args.pasta, arquivo=args.arquivo, top_n=args.top,
+                                    series=app.series, aprox=app.aprox)
+    return Analises.salvar_relatorio(
+        musicas=app.musicas,
+        playlists=app.playlists,
+        usuarios=app.usuarios,
+        top_n=args.top,
+        pasta=args.pasta,
+        arquivo=args.arquivo,
+        indices=app.indices,
+        series=app.series,
+        aprox=app.aprox,
+        processos=args.processos or None,
+    )
+
+
+# Subcomandos
+def cmd_import(args) -> int:
+    _, resumo = _carregar_app(args)
+    _emitir({"comando": "import", **resumo})
+    if resumo["falhas"]:
+        return SAIDA_FALHA
+    if args.estrito and resumo["erros"]:
+        return SAIDA_DADOS
+    return SAIDA_OK
+
+
+def cmd_validate(args) -> int:
+    from pathlib import Path
+    from config.lermarkdown import LerMarkdown
+
+    arquivos = args.arquivos or sorted(str(p) for p in (Path(__file__).parent / "config").glob("*.md"))
+    dedup = None
+    if args.deduplicar:
+        from Streaming.deduplicacao import Deduplicador
+        dedup = Deduplicador()
+    leitor = LerMarkdown(strict=args.rigoroso, deduplicador=dedup)
+    diagnosticos, falhas = [], []
+    inicio = time.perf_counter()
+    for arq in arquivos:
+        try:
+            d = leitor.validar_arquivo(str(Path(arq).resolve()))
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            falhas.append(f"{arq}: {e}")
+            continue
+        # As mensagens podem ser muitas: o diagnóstico traz as contagens e as primeiras
+        d["qtde_avisos"], d["qtde_erros"] = len(d["avisos"]), len(d["erros"])
+        d["avisos"], d["erros"] = d["avisos"][:args.limite], d["erros"][:args.limite]
+        diagnosticos.append(d)
+    dur = time.perf_counter() - inicio
+
+    valido = all(d["valido"] and not (args.estrito and d["qtde_avisos"]) for d in diagnosticos)
+    _emitir({"comando": "validate", "valido": valido and not falhas, "duracao_ms": dur * 1000,
+             "arquivos": diagnosticos, "falhas": falhas})
+    if falhas:
+        return SAIDA_FALHA
+    return SAIDA_OK if valido else SAIDA_DADOS
+
+
+def cmd_convert(args) -> int:
+    from pathlib import Path
+    from config.leitores import ler_arquivo, leitor_para
+
+    try:
+        escritor = leitor_para(args.destino)
+        inicio = time.perf_counter()
+        secoes = ler_arquivo(args.origem)
+        leitura = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        Path(args.destino).write_bytes(escritor.escrever(secoes))
+        escrita = time.perf_counter() - inicio
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        _emitir({"comando": "convert", "erro": str(e)})
+        return SAIDA_FALHA
+
+    _emitir({"comando": "convert", "origem": args.origem, "destino": args.destino,
+             "registros": sum(len(r) for _, r in secoes),
+             "bytes_origem": Path(args.origem).stat().st_size, "bytes_destino": Path(args.destino).stat().st_size,
+             "leitura_origem_ms": leitura * 1000, "escrita_ms": escrita * 1000})
+    return SAIDA_OK
+
+
+def cmd_report(args) -> int:
+    app, resumo = _carregar_app(args)
+    destino = _salvar_relatorio(app, args)
+    _emitir({"comando": "report", "relatorio": str(destino), "importacao": resumo})
+    return SAIDA_FALHA if resumo["falhas"] else SAIDA_OK
+
+
+def cmd_replay(args) -> int:
+    app, resumo_imp = _carregar_app(args)
+    try:
+        resumo = _reproduzir_eventos(app, _ler_eventos(args.eventos))
+    except OSError as e:
+        _emitir({"comando": "replay-plays", "erro": str(e)})
+        return SAIDA_FALHA
+
+    resultado = {"comando": "replay-plays", **resumo, "importacao": resumo_imp}
+    if args.relatorio:
+        resultado["relatorio"] = str(_salvar_relatorio(app, args))
+    _emitir(resultado)
+    if args.estrito and resumo["rejeitados"]:
+        return SAIDA_DADOS
+    return SAIDA_OK
+
+
+def cmd_search(args) -> int:
+    app, _ = _carregar_app(args, busca=True)
+    achados = app.busca.buscar(args.consulta, args.limite)
+    _emitir({"comando": "search", "consulta": args.consulta, "resultados": [
+        {"tipo": m.__class__.__name__, "titulo": m.titulo, "artista": m.artista, "pontuacao": round(p, 4)}
+        for m, p in achados]})
+    return SAIDA_OK
+
+
+def cmd_browse(args) -> int:
+    app, _ = _carregar_app(args)
+    midias = app.navegar(genero=args.genero, artista=args.artista, host=args.host,
+                         temporada=args.temporada, duracao_min=args.duracao_min,
+                         duracao_max=args.duracao_max)
+    itens = []
+    for m in midias[:args.limite]:
+        item = {"tipo": m.__class__.__name__, "titulo": m.titulo, "artista": m.artista, "duracao": m.duracao}
+        for attr in ("genero", "host", "temporada", "episodio"):
+            if hasattr(m, attr):
+                item[attr] = getattr(m, attr)
+        itens.append(item)
+    _emitir({"comando": "browse", "total": len(midias), "resultados": itens})
+    return SAIDA_OK
+
+
+def cmd_recommend(args) -> int:
+    import random
+
+    app, _ = _carregar_app(args)
+    if args.simular:
+        # Reproduções aleatórias antes da consulta (a tabela acompanha pelo evento "historico")
+        rnd = random.Random(args.semente)
+        midias = app.musicas + app.podcasts
+        if app.usuarios and midias:
+            app.ativar_recomendacoes()
+            with _mensagens(args):
+                for _ in range(args.simular):
+                    app.reproduzir_midia(rnd.choice(app.usuarios), rnd.choice(midias), interativo=False)
+
+    inicio = time.perf_counter()
+    rec = app.ativar_recomendacoes()
+    construcao_ms = (time.perf_counter() - inicio) * 1000
+    if args.playlist:
+        alvo = app.buscar_playlist(args.playlist)
+        if alvo is None:
+            _emitir({"comando": "recommend", "erro": f"playlist '{args.playlist}' inexistente"})
+            return SAIDA_USO
+    else:
+        alvo = app.buscar_usuario(args.usuario)
+        if alvo is None:
+            _emitir({"comando": "recommend", "erro": f"usuário '{args.usuario}' inexistente"})
+            return SAIDA_USO
+
+    inicio = time.perf_counter()
+    if args.playlist:
+        sugestoes = app.recomendar(playlist=alvo, n=args.n)
+    else:
+        sugestoes = app.recomendar(usuario=alvo, n=args.n)
+    consulta_us = (time.perf_counter() - inicio) * 1e6
+    _emitir({"comando": "recommend", "midias_na_tabela": len(rec), "construcao_ms": round(construcao_ms, 2),
+             "consulta_us": round(consulta_us, 1), "resultados": [
+                 {"titulo": m.titulo, "artista": m.artista, "pontuacao": round(p, 4)} for m, p in sugestoes]})
+    return SAIDA_OK
+
+
+def cmd_queue(args) -> int:
+    import gc
+    import tracemalloc
+    from Streaming.arquivo_midia import Musica
+    from Streaming.catalogo import Catalogo
+    from Streaming.fila_reproducao import aquecer_texto, criar_sessoes, simular_sessoes
+    from Streaming.playlist import Playlist
+
+    # Catálogo e playlists sintéticos (as filas só apontam para eles)
+    catalogo = Catalogo()
+    catalogo.adicionar_varios([Musica(f"Faixa {i}", 60 + i % 300, f"Artista {i % 97}", f"Genero {i % 12}")
+                               for i in range(args.musicas)])
+    musicas = catalogo.musicas
+    playlists = [Playlist(f"Lista {p}", "Ouvinte",
+                          itens=[musicas[(p * 31 + k) % len(musicas)] for k in range(args.tamanho)])
+                 for p in range(args.playlists)]
+    opcoes = {"aleatorio": args.aleatorio, "repetir": args.repetir, "radio": args.radio,
+              "catalogo": catalogo, "memoria_radio": args.memoria_radio, "janela": args.janela,
+              "aquecer": None if args.sem_aquecer else aquecer_texto}
+
+    # Memória por sessão viva: medida (numa amostra de sessões, o tracemalloc é
+    # lento) depois de 'passos' e de 10x 'passos' faixas; com rádio, depois de a
+    # memória de recentes do rádio encher
+    amostra = max(1, min(args.simultaneas, args.sessoes, 500))
+    inicial = max(args.passos, args.memoria_radio + args.janela) if args.radio else args.passos
+    memoria = {}
+    for passos in (inicial, inicial * 10):
+        gc.collect()
+        tracemalloc.start()
+        filas = criar_sessoes(playlists, amostra, **opcoes)
+        for _ in range(passos):
+            for f in filas:
+                f.proxima()
+        atual, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memoria[str(passos)] = round(atual / amostra, 1)
+        del filas
+
+    resultado = simular_sessoes(playlists, args.sessoes, args.passos, args.simultaneas, **opcoes)
+    valores = list(memoria.values())
+    _emitir({"comando": "queue", "sessoes": args.sessoes, "passos": args.passos,
+             "simultaneas": args.simultaneas, "aleatorio": args.aleatorio, "repetir": args.repetir,
+             "radio": args.radio, "aquecer": not args.sem_aquecer, "tamanho_playlist": args.tamanho,
+             "faixas": resultado["faixas"], "duracao_s": round(resultado["duracao_s"], 3),
+             "faixas_por_s": round(resultado["faixas_por_s"] or 0),
+             "bytes_por_sessao": memoria,
+             "memoria_constante": max(valores) <= 1.25 * min(valores) + 64})
+    return SAIDA_OK
+
+
+def cmd_simulate(args) -> int:
+    from Streaming.simulacao import AudienciaSimulada, Simulador
+
+    app, _ = _carregar_app(args)
+    if not app.musicas and not app.playlists:
+        _emitir({"comando": "simulate", "erro": "catálogo vazio"})
+        return SAIDA_FALHA
+    antes = sum(m.reproducoes for m in app.musicas + app.podcasts)
+    audiencia = AudienciaSimulada(app, Simulador(inicio=time.time()), semente=args.semente)
+    audiencia.adicionar_ouvintes(args.ouvintes, chegadas=args.chegadas, faixas=args.faixas,
+                                 aleatorio=args.aleatorio, repetir="lista")
+    inicio_real = time.perf_counter()
+    ate = audiencia.simulador.agora + args.ate if args.ate is not None else None
+    with _mensagens(args):
+        eventos = audiencia.rodar(ate=ate, velocidade=args.velocidade)
+    dur = time.perf_counter() - inicio_real
+
+    resumo = audiencia.resumo(args.top)
+    depois = sum(m.reproducoes for m in app.musicas + app.podcasts)
+    # Em pé: as reproduções do app são exatamente as faixas iniciadas na simulação
+    erros = []
+    if depois - antes != resumo["faixas_iniciadas"]:
+        erros.append(f"reproduções no app {depois - antes} != faixas iniciadas {resumo['faixas_iniciadas']}")
+    tocando = [{"usuario": getattr(u, "nome", None), "titulo": m.titulo, "segundos": round(d, 1)}
+               for u, m, d in audiencia.tocando_agora()[:args.top]]
+    _emitir({"comando": "simulate", **resumo, "eventos": eventos,
+             "duracao_real_s": round(dur, 3),
+             "eventos_por_s": round(eventos / dur) if dur else None,
+             "aceleracao": round(resumo["tempo_virtual_s"] / dur, 1) if dur else None,
+             "amostra_tocando_agora": tocando, "ok": not erros, "erros": erros})
+    return SAIDA_DADOS if erros else SAIDA_OK
+
+
+def cmd_watch(args) -> int:
+    app, _ = _carregar_app(args)
+    aplicados = []
+    with _mensagens(args):
+        observador = app.observar_config(pasta=args.pasta, intervalo=args.intervalo, espera=args.espera,
+                                         ao_aplicar=aplicados.append)
+    try:
+        time.sleep(args.segundos)
+    finally:
+        with _mensagens(args):
+            app.fechar()
+
+    _emitir({"comando": "watch", "pasta": str(observador.pasta), "passadas": observador.passadas,
+             "intervalo_s": observador.intervalo, "espera_s": observador.espera, "aplicados": aplicados})
+    return SAIDA_OK
+
+
+def cmd_generate(args) -> int:
+    app, _ = _carregar_app(args)
+    usuario = None
+    if args.usuario:
+        usuario = app.buscar_usuario(args.usuario)
+        if usuario is None:
+            _emitir({"comando": "generate", "erro": f"usuário '{args.usuario}' inexistente"})
+            return SAIDA_USO
+
+    inicio = time.perf_counter()
+    try:
+        pl = app.gerar_playlist(usuario, args.nome, int(args.minutos * 60), recentes=args.recentes,
+                                salvar=False, semente=args.semente, genero=args.genero, artista=args.artista,
+                                duracao_min=args.faixa_min, duracao_max=args.faixa_max,
+                                nota_minima=args.nota_minima, criterio=args.criterio)
+    except ValueError as e:
+        _emitir({"comando": "generate", "erro": str(e)})
+        return SAIDA_USO
+    ms = (time.perf_counter() - inicio) * 1000
+    total = sum(m.duracao for m in pl.itens)
+    _emitir({"comando": "generate", "nome": pl.nome, "ms": round(ms, 2), "midias": len(pl),
+             "duracao_total_s": total, "orcamento_s": int(args.minutos * 60),
+             "itens": [{"titulo": m.titulo, "artista": m.artista, "duracao": m.duracao} for m in pl.itens]})
+    return SAIDA_OK
+
+
+def cmd_bench(args) -> int:
+    import random
+    from Streaming.instrumentacao import Instrumentacao
+
+    if args.instrumentar:
+        Instrumentacao.ativar()
+    tempos = {}
+
+    inicio = time.perf_counter()
+    app, _ = _carregar_app(args)
+    tempos["importacao_ms"] = (time.perf_counter() - inicio) * 1000
+
+    midias = app.musicas + app.podcasts
+    if not midias:
+        _emitir({"comando": "bench", "erro": "catálogo vazio"})
+        return SAIDA_DADOS
+
+    rnd = random.Random(args.semente)
+    inicio = time.perf_counter()
+    for _ in range(args.reproducoes):
+        usuario = rnd.choice(app.usuarios) if app.usuarios else None
+        app.reproduzir_midia(usuario, rnd.choice(midias), interativo=False)
+    dur = time.perf_counter() - inicio
+    tempos["reproducoes_ms"] = dur * 1000
+    tempos["reproducoes_por_s"] = (args.reproducoes / dur) if dur else None
+
+    inicio = time.perf_counter()
+    _salvar_relatorio(app, args)
+    tempos["relatorio_ms"] = (time.perf_counter() - inicio) * 1000
+
+    # Confere o materializado contra o recálculo completo (mesmo horário no cabeçalho)
+    from datetime import datetime
+    from Streaming.analises import Analises
+
+    agora = datetime.now()
+    inicio = time.perf_counter()
+    completo = Analises.montar_relatorio(app.musicas, app.playlists, app.usuarios, args.top,
+                                         indices=app.indices, series=app.series, aprox=app.aprox,
+                                         gerado_em=agora)
+    tempos["relatorio_completo_ms"] = (time.perf_counter() - inicio) * 1000
+    inicio = time.perf_counter()
+    materializado = app.relatorio.linhas(args.top, series=app.series, aprox=app.aprox, gerado_em=agora)
+    tempos["relatorio_materializado_ms"] = (time.perf_counter() - inicio) * 1000
+
+    resultado = {"comando": "bench", "reproducoes": args.reproducoes, **tempos,
+                 "relatorio_materializado_igual": materializado == completo}
+    if args.instrumentar:
+        resultado["metricas"] = Instrumentacao.snapshot()
+    _emitir(resultado)
+    return SAIDA_OK
+
+
+def cmd_serve(args) -> int:
+    import asyncio
+    from Streaming.servidor import ServidorStreaming
+
+    app, resumo = _carregar_app(args, busca=True)
+    servidor = ServidorStreaming(app, tamanho_lote=args.lote)
+
+    async def rodar():
+        porta = await servidor.iniciar(args.host, args.porta)
+        _emitir({"comando": "serve", "host": args.host, "porta": porta, "importacao": resumo})
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await servidor.parar()
+
+    try:
+        asyncio.run(rodar())
+    except KeyboardInterrupt:
+        pass
+    return SAIDA_OK
+
+
+def cmd_loadtest(args) -> int:
+    import asyncio
+    from Streaming.servidor import ServidorStreaming, teste_carga
+
+    # Mistura de operações: reproduções, buscas, consulta de playlist e ping
+    ops = [{"op": "ping"}]
+    servidor = None
+    if args.porta is None:
+        app, _ = _carregar_app(args, busca=True)
+        servidor = ServidorStreaming(app, tamanho_lote=args.lote)
+        usuario = app.usuarios[0].nome if app.usuarios else None
+        for m in (app.musicas + app.podcasts)[:8]:
+            ops.append({"op": "play", "usuario": usuario, "titulo": m.titulo})
+            ops.append({"op": "search", "termo": m.titulo.split()[0]})
+        for pl in app.playlists[:2]:
+            ops.append({"op": "playlist.get", "nome": pl.nome})
+    if args.op:
+        ops = [{"op": op} for op in args.op]
+
+    async def rodar():
+        porta = args.porta
+        if servidor is not None:
+            porta = await servidor.iniciar(args.host, 0)
+        try:
+            return await teste_carga(args.host, porta, args.conexoes, args.requisicoes, args.janela, ops)
+        finally:
+            if servidor is not None:
+                await servidor.parar()
+
+    resultado = asyncio.run(rodar())
+    if servidor is not None:
+        resultado["lotes_de_reproducao"] = servidor.lote.lotes
+    _emitir({"comando": "loadtest", **resultado})
+    return SAIDA_DADOS if resultado["falhas"] else SAIDA_OK
+
+
+def cmd_export(args) -> int:
+    import tracemalloc
+    from pathlib import Path
+    from Streaming.analises import Analises
+    from Streaming import exportacao
+
+    if args.sintetico is None:
+        app, resumo = _carregar_app(args)
+        if args.memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        destino, linhas = Analises.exportar_metricas(app.musicas, args.formato, args.pasta, args.arquivo, args.lote)
+    else:
+        # Linhas sintéticas geradas sob demanda: mede só o custo do escritor
+        import random
+
+        rnd = random.Random(args.semente)
+        geradas = ((i, f"Musica {i}", f"Artista {i % 997}", "Rock", rnd.randint(60, 600),
+                    rnd.randint(0, 10 ** 6), rnd.randint(0, 8), rnd.random() * 5)
+                   for i in range(args.sintetico))
+        resumo = None
+        if args.memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        destino = Path(args.pasta) / (args.arquivo or f"metricas{exportacao.ESCRITORES[args.formato].extensao}")
+        linhas = exportacao.exportar(exportacao.lotes(geradas, args.lote or exportacao.LOTE_PADRAO),
+                                     args.formato, destino)
+    ms = (time.perf_counter() - inicio) * 1000
+
+    resultado = {"comando": "export", "formato": args.formato, "arquivo": str(destino), "linhas": linhas,
+                 "bytes": destino.stat().st_size, "ms": round(ms, 1)}
+    if args.memoria:
+        resultado["pico_memoria_kib"] = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    if args.formato == "colunar":
+        # Releitura do arquivo: confere a contagem de linhas
+        resultado["linhas_relidas"] = sum(len(b["id"]) for b in exportacao.ler_colunar(destino))
+    if resumo is not None:
+        resultado["importacao"] = resumo
+    _emitir(resultado)
+    return SAIDA_OK if resultado.get("linhas_relidas", linhas) == linhas else SAIDA_FALHA
+
+
+# Monta o parser com os subcomandos
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Streaming POD — linha de comando não interativa.")
+    parser.add_argument("-s", "--silencioso", action="store_true",
+                        help="descarta as mensagens legíveis (stderr)")
+    parser.add_argument("--banco", metavar="ARQUIVO",
+                        help="banco SQLite com o estado do app (carregado antes e gravado ao final)")
+    parser.add_argument("--perfil", action="store_true",
+                        help="captura o perfil de CPU (cProfile) do subcomando e escreve na saída de erro")
+    parser.add_argument("--perfil-memoria", action="store_true",
+                        help="junto com o perfil, as linhas que mais alocaram memória (tracemalloc; mais lento)")
+    parser.add_argument("--perfil-top", type=int, default=20,
+                        help="funções e linhas listadas no perfil (padrão: 20)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    def opcoes_relatorio(p):
+        p.add_argument("--top", type=int, default=10, help="quantidade de músicas no top (padrão: 10)")
+        p.add_argument("--pasta", default="Relatório", help="pasta do relatório (padrão: Relatório)")
+        p.add_argument("--arquivo", default="relatorio.txt", help="nome do arquivo (padrão: relatorio.txt)")
+        p.add_argument("--aproximado", action="store_true",
+                       help="liga as análises aproximadas (sketches) e inclui as estimativas no relatório")
+        p.add_argument("--processos", type=int, default=1,
+                       help="processos para os agregados do relatório (0 = todos os núcleos; padrão: 1)")
+        p.add_argument("--completo", action="store_true",
+                       help="recalcula o relatório do zero em vez de usar o materializado")
+
+    def opcoes_adiado(p):
+        p.add_argument("--adiado", action="store_true",
+                       help="escrita adiada: reproduções acumuladas por thread e aplicadas em lote")
+        p.add_argument("--lote-adiado", type=int, default=256,
+                       help="reproduções por lote na escrita adiada (padrão: 256)")
+
+    p = sub.add_parser("import", help="importa os .md de config/ e mostra o resumo")
+    p.add_argument("--estrito", action="store_true", help="sai com código 3 se o parser registrar erros")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("validate", help="confere os .md sem instanciar objetos (diagnóstico por arquivo)")
+    p.add_argument("arquivos", nargs="*", help="arquivos .md, .csv, .jsonl ou .spod (padrão: os .md de config/)")
+    p.add_argument("--rigoroso", action="store_true",
+                   help="parser estrito: duração e episódio inválidos viram erro")
+    p.add_argument("--estrito", action="store_true", help="sai com código 3 também se houver avisos")
+    p.add_argument("--limite", type=int, default=20, help="mensagens listadas por arquivo (padrão: 20)")
+    p.add_argument("--deduplicar", action="store_true",
+                   help="deduplicação aproximada entre as mídias de todos os arquivos")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("convert", help="converte o catálogo entre .md, .csv, .jsonl e .spod")
+    p.add_argument("origem", help="arquivo de entrada")
+    p.add_argument("destino", help="arquivo de saída (o formato vem da extensão)")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("report", help="importa e grava o relatório de análises")
+    opcoes_relatorio(p)
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("replay-plays", help="importa e reproduz eventos de um arquivo JSON Lines")
+    p.add_argument("eventos", help="arquivo .jsonl com os eventos ('-' para stdin)")
+    p.add_argument("--relatorio", action="store_true", help="grava o relatório após reproduzir")
+    p.add_argument("--estrito", action="store_true", help="sai com código 3 se algum evento for rejeitado")
+    opcoes_relatorio(p)
+    opcoes_adiado(p)
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("search", help="busca textual no catálogo (prefixo, aproximada, BM25)")
+    p.add_argument("consulta", help="texto a buscar (título, artista, gênero, host ou letra)")
+    p.add_argument("--limite", type=int, default=10, help="máximo de resultados (padrão: 10)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("browse", help="lista mídias filtrando pelos índices secundários")
+    p.add_argument("--genero", help="gênero da música")
+    p.add_argument("--artista", help="artista (músicas e podcasts)")
+    p.add_argument("--host", help="host do podcast")
+    p.add_argument("--temporada", help="temporada do podcast (use junto com --host)")
+    p.add_argument("--duracao-min", type=int, help="duração mínima em segundos")
+    p.add_argument("--duracao-max", type=int, help="duração máxima em segundos")
+    p.add_argument("--limite", type=int, default=50, help="máximo de resultados listados (padrão: 50)")
+    p.set_defaults(func=cmd_browse)
+
+    p = sub.add_parser("recommend", help="sugere o que tocar em seguida (coocorrência em playlists e históricos)")
+    alvo = p.add_mutually_exclusive_group(required=True)
+    alvo.add_argument("--usuario", help="recomenda pelo histórico do usuário")
+    alvo.add_argument("--playlist", help="recomenda mídias para completar a playlist")
+    p.add_argument("-n", type=int, default=10, help="quantidade de sugestões (padrão: 10)")
+    p.add_argument("--simular", type=int, default=0, metavar="N",
+                   help="faz N reproduções aleatórias antes da consulta")
+    p.add_argument("--semente", type=int, default=1, help="semente das reproduções simuladas (padrão: 1)")
+    p.set_defaults(func=cmd_recommend)
+
+    p = sub.add_parser("generate", help="gera uma playlist por restrições (gênero, artista, duração, nota)")
+    p.add_argument("--minutos", type=float, required=True, help="duração total máxima da playlist")
+    p.add_argument("--nome", default="Mix automático", help="nome da playlist (padrão: Mix automático)")
+    p.add_argument("--genero", help="apenas músicas do gênero")
+    p.add_argument("--artista", help="apenas mídias do artista")
+    p.add_argument("--faixa-min", type=int, help="duração mínima de cada faixa (segundos)")
+    p.add_argument("--faixa-max", type=int, help="duração máxima de cada faixa (segundos)")
+    p.add_argument("--nota-minima", type=float, help="média mínima das avaliações (0 a 5)")
+    p.add_argument("--usuario", help="exclui as mídias recentes do histórico do usuário")
+    p.add_argument("--recentes", type=int, default=50, help="tamanho do histórico recente excluído (padrão: 50)")
+    p.add_argument("--criterio", choices=["variado", "popular"], default="variado",
+                   help="variado sorteia candidatos; popular usa os mais bem pontuados (padrão: variado)")
+    p.add_argument("--semente", type=int, help="semente do sorteio (resultado reprodutível)")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("queue", help="filas de reprodução simuladas (aleatório, repetir, rádio): faixas/s e memória")
+    p.add_argument("--sessoes", type=int, default=1000000, help="sessões simuladas (padrão: 1000000)")
+    p.add_argument("--passos", type=int, default=10, help="faixas por sessão (padrão: 10)")
+    p.add_argument("--simultaneas", type=int, default=10000, help="sessões vivas ao mesmo tempo (padrão: 10000)")
+    p.add_argument("--musicas", type=int, default=5000, help="músicas do catálogo sintético (padrão: 5000)")
+    p.add_argument("--playlists", type=int, default=200, help="playlists sintéticas (padrão: 200)")
+    p.add_argument("--tamanho", type=int, default=500, help="faixas por playlist (padrão: 500)")
+    p.add_argument("--janela", type=int, default=3, help="faixas pré-carregadas por sessão (padrão: 3)")
+    p.add_argument("--aleatorio", action="store_true", help="ordem aleatória (permutação preguiçosa)")
+    p.add_argument("--repetir", choices=("nao", "faixa", "lista"), default="lista",
+                   help="modo de repetição (padrão: lista)")
+    p.add_argument("--radio", action="store_true", help="continua pelo modo rádio quando a playlist acaba")
+    p.add_argument("--memoria-radio", type=int, default=50,
+                   help="faixas recentes que o rádio evita repetir (padrão: 50)")
+    p.add_argument("--sem-aquecer", action="store_true", help="não aquece o cache de letras na janela")
+    p.set_defaults(func=cmd_queue)
+
+    p = sub.add_parser("simulate", help="ouvintes simultâneos em tempo virtual (duração real das faixas): picos de audiência")
+    p.add_argument("--ouvintes", type=int, default=10000, help="ouvintes simulados (padrão: 10000)")
+    p.add_argument("--chegadas", type=float, default=3600.0,
+                   help="segundos virtuais ao longo dos quais os ouvintes chegam (padrão: 3600)")
+    p.add_argument("--faixas", type=int, default=20, help="faixas tocadas por ouvinte (padrão: 20)")
+    p.add_argument("--aleatorio", action="store_true", help="cada ouvinte toca a playlist em ordem aleatória")
+    p.add_argument("--ate", type=float, help="para depois de tantos segundos virtuais (mostra quem está tocando)")
+    p.add_argument("--velocidade", type=float,
+                   help="segundos virtuais por segundo real (padrão: o mais rápido possível)")
+    p.add_argument("--top", type=int, default=5, help="mídias com os maiores picos no resultado (padrão: 5)")
+    p.add_argument("--semente", type=int, default=1, help="semente do sorteio (padrão: 1)")
+    p.set_defaults(func=cmd_simulate)
+
+    p = sub.add_parser("watch", help="observa config/ e aplica só os registros alterados (catálogos e letras)")
+    p.add_argument("--segundos", type=float, default=60.0, help="tempo observando (padrão: 60)")
+    p.add_argument("--intervalo", type=float, default=1.0, help="segundos entre as passadas (padrão: 1)")
+    p.add_argument("--espera", type=float, default=0.5,
+                   help="segundos sem mudança antes de aplicar um arquivo (padrão: 0.5)")
+    p.add_argument("--pasta", help="pasta observada (padrão: config/)")
+    p.set_defaults(func=cmd_watch)
+
+    p = sub.add_parser("bench", help="mede importação, reproduções e relatório")
+    p.add_argument("--reproducoes", type=int, default=10000, help="reproduções simuladas (padrão: 10000)")
+    p.add_argument("--semente", type=int, default=42, help="semente do sorteio (padrão: 42)")
+    p.add_argument("--instrumentar", action="store_true", help="inclui o snapshot da instrumentação")
+    opcoes_relatorio(p)
+    opcoes_adiado(p)
+    p.set_defaults(func=cmd_bench)
+
+    p = sub.add_parser("serve", help="importa e abre o serviço TCP (JSON por linha)")
+    p.add_argument("--host", default="127.0.0.1", help="endereço (padrão: 127.0.0.1)")
+    p.add_argument("--porta", type=int, default=8765, help="porta (padrão: 8765)")
+    p.add_argument("--lote", type=int, default=256, help="reproduções por lote (padrão: 256)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("loadtest", help="teste de carga com pipelining (req/s e p99)")
+    p.add_argument("--host", default="127.0.0.1", help="endereço (padrão: 127.0.0.1)")
+    p.add_argument("--porta", type=int, default=None,
+                   help="porta de um servidor já aberto (sem ela, sobe um servidor local)")
+    p.add_argument("--conexoes", type=int, default=4, help="conexões simultâneas (padrão: 4)")
+    p.add_argument("--requisicoes", type=int, default=20000, help="total de requisições (padrão: 20000)")
+    p.add_argument("--janela", type=int, default=64, help="requisições em voo por conexão (padrão: 64)")
+    p.add_argument("--lote", type=int, default=256, help="reproduções por lote (padrão: 256)")
+    p.add_argument("--op", action="append", help="operação sem parâmetros a usar (ex.: ping); repetível")
+    p.set_defaults(func=cmd_loadtest)
+
+    p = sub.add_parser("export", help="exporta as métricas por música (csv, jsonl ou colunar) em lotes")
+    p.add_argument("--formato", choices=["csv", "jsonl", "colunar"], default="csv",
+                   help="formato do arquivo (padrão: csv)")
+    p.add_argument("--pasta", default="Relatório", help="pasta de saída (padrão: Relatório)")
+    p.add_argument("--arquivo", help="nome do arquivo (padrão: metricas.<extensão do formato>)")
+    p.add_argument("--lote", type=int, help="linhas por lote gravado (padrão: 10000)")
+    p.add_argument("--sintetico", type=int, metavar="N",
+                   help="exporta N linhas sintéticas em vez do catálogo importado")
+    p.add_argument("--semente", type=int, default=1, help="semente das linhas sintéticas (padrão: 1)")
+    p.add_argument("--memoria", action="store_true",
+                   help="mede o pico de memória alocada durante a exportação (tracemalloc; mais lento)")
+    p.set_defaults(func=cmd_export)
+
+    return parser
+
+
+# Escreve o perfil capturado na saída de erro (a saída padrão fica só com o JSON)
+def _escrever_perfil(perfil: dict) -> None:
+    if not perfil:
+        return
+    sys.stderr.write("=== Perfil de CPU (cumulativo) ===\n" + perfil["cpu"])
+    if perfil["memoria"]:
+        sys.stderr.write("=== Memória alocada por linha ===\n" + "\n".join(perfil["memoria"]) + "\n")
+    sys.stderr.flush()
+
+
+def main(argv=None) -> int:
+    args = criar_parser().parse_args(argv)
+    perfil = args.perfil or args.perfil_memoria
+    if perfil:
+        from Streaming.instrumentacao import Instrumentacao
+        Instrumentacao.iniciar_perfil(memoria=args.perfil_memoria)
+    try:
+        return args.func(args)
+    except KeyboardInterrupt:
+        return SAIDA_FALHA
+    finally:
+        with _mensagens(args):
+            while _APPS_ABERTOS:
+                _APPS_ABERTOS.pop().fechar()
+        if perfil:
+            _escrever_perfil(Instrumentacao.parar_perfil(top=args.perfil_top))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
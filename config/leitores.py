@@ -0,0 +1,302 @@
+# config/leitores.py
+"""
+Formatos de entrada do catálogo. Todo leitor produz o mesmo fluxo de
+registros do Markdown: [(secao, [registro, ...]), ...], em que cada
+registro é um dicionário de textos (listas em 'playlists' e 'itens'),
+exatamente o que LerMarkdown._load_usuarios/_load_musicas/_load_podcasts/
+_load_playlists consomem. Validação, deduplicação e resolução de vínculos
+continuam todas no LerMarkdown.
+
+Formatos:
+- .md    Markdown do enunciado (o leitor é o próprio LerMarkdown)
+- .csv   uma linha por registro; coluna 'secao' + uma coluna por campo;
+         listas separadas por '|'
+- .jsonl um objeto JSON por linha com 'secao' e os campos (chaves em minúsculas;
+         números e booleanos são lidos como texto, null como campo ausente;
+         listas só em 'playlists' e 'itens')
+- .spod  binário colunar, com seções e colunas prefixadas pelo tamanho (ver LeitorBinario)
+"""
+import csv
+import io
+import json
+import struct
+from pathlib import Path
+
+
+# Seções conhecidas (mesmo critério de LerMarkdown._partes_secao)
+def secao_canonica(secao: str) -> str:
+    s = (secao or "").strip().lower()
+    if "usuário" in s or "usuarios" in s or "usuários" in s:
+        return "usuarios"
+    if "música" in s or "musicas" in s or "músicas" in s:
+        return "musicas"
+    if "podcast" in s:
+        return "podcasts"
+    if "playlist" in s:
+        return "playlists"
+    return s
+
+
+# Campos que são listas (no CSV vêm separados por '|')
+CAMPOS_LISTA = frozenset(("playlists", "playlist", "itens"))
+
+
+def _agrupar(pares):
+    """[(secao, registro), ...] -> [(secao, [registros])], juntando registros seguidos da mesma seção."""
+    secoes = []
+    atual, buf = None, None
+    for secao, registro in pares:
+        if secao != atual or buf is None:
+            buf = []
+            secoes.append((secao, buf))
+            atual = secao
+        buf.append(registro)
+    return [(s, r) for s, r in secoes if s and r]
+
+
+def _pares(secoes):
+    for secao, registros in secoes:
+        for r in registros:
+            yield secao, r
+
+
+class LeitorMarkdown:
+    extensao = ".md"
+
+    def ler(self, dados: bytes):
+        from config.lermarkdown import LerMarkdown
+        return LerMarkdown()._dividir_secoes(dados.decode("utf-8"))
+
+    def escrever(self, secoes) -> bytes:
+        linhas = []
+        for secao, registros in secoes:
+            linhas += ["---", "", f"# {secao.title()}", ""]
+            for r in registros:
+                for i, (k, v) in enumerate(r.items()):
+                    v = f"[{', '.join(v)}]" if isinstance(v, list) else v
+                    linhas.append(f"{'- ' if i == 0 else '    '}{k}: {v}")
+                linhas.append("")
+        linhas += ["---", ""]
+        return "\n".join(linhas).encode("utf-8")
+
+
+class LeitorCSV:
+    extensao = ".csv"
+
+    def ler(self, dados: bytes):
+        leitor = csv.reader(io.StringIO(dados.decode("utf-8-sig"), newline=""))
+        cabecalho = [c.strip().lower() for c in next(leitor, [])]
+        if "secao" not in cabecalho:
+            raise ValueError("CSV sem a coluna 'secao'.")
+        listas = [c for c in cabecalho if c in CAMPOS_LISTA]
+        pares = []
+        canonicas = {}
+        for linha in leitor:
+            # Células vazias ficam de fora, como a chave ausente no Markdown
+            registro = {k: v for k, v in zip(cabecalho, linha) if v}
+            secao = registro.pop("secao", "")
+            if secao not in canonicas:
+                canonicas[secao] = secao_canonica(secao)
+            for k in listas:
+                v = registro.get(k)
+                if v is not None:
+                    registro[k] = [t.strip() for t in v.split("|")]
+            pares.append((canonicas[secao], registro))
+        return _agrupar(pares)
+
+    def escrever(self, secoes) -> bytes:
+        colunas = []
+        for _, r in _pares(secoes):
+            for k in r:
+                if k not in colunas:
+                    colunas.append(k)
+        saida = io.StringIO(newline="")
+        escritor = csv.writer(saida, lineterminator="\n")
+        escritor.writerow(["secao", *colunas])
+        for secao, r in _pares(secoes):
+            linha = [secao_canonica(secao)]
+            for k in colunas:
+                v = r.get(k, "")
+                linha.append("|".join(v) if isinstance(v, list) else v)
+            escritor.writerow(linha)
+        return saida.getvalue().encode("utf-8")
+
+
+class LeitorJSONL:
+    extensao = ".jsonl"
+
+    def ler(self, dados: bytes):
+        linhas = [l for l in dados.decode("utf-8-sig").splitlines() if l.strip()]
+        # Um json.loads só para o arquivo todo (linha a linha só para apontar o erro);
+        # números já viram texto no decodificador, como no Markdown
+        try:
+            objetos = json.loads(f"[{','.join(linhas)}]", parse_int=str, parse_float=str)
+        except json.JSONDecodeError:
+            objetos = []
+            for n, linha in enumerate(linhas, 1):
+                try:
+                    objetos.append(json.loads(linha, parse_int=str, parse_float=str))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"registro {n}: JSON inválido ({e.msg})") from None
+        pares = []
+        canonicas = {}
+        for n, obj in enumerate(objetos, 1):
+            if type(obj) is not dict:
+                raise ValueError(f"registro {n}: esperado um objeto JSON")
+            for k, v in list(obj.items()):
+                if type(v) is not str:
+                    obj[k] = self._valor(n, k, v)
+                    if obj[k] is None:
+                        del obj[k]
+                elif k in CAMPOS_LISTA:
+                    raise ValueError(f"registro {n}: '{k}' deve ser uma lista")
+            secao = obj.pop("secao", "")
+            if secao not in canonicas:
+                canonicas[secao] = secao_canonica(str(secao))
+            pares.append((canonicas[secao], obj))
+        return _agrupar(pares)
+
+    # Converte um valor que não é texto: escalares viram texto (null some, como a
+    # chave ausente no Markdown); listas só nos campos de lista, com itens escalares
+    @staticmethod
+    def _valor(n: int, chave: str, valor):
+        if valor is None:
+            return None
+        if type(valor) is bool:
+            return "true" if valor else "false"
+        if type(valor) is list and chave in CAMPOS_LISTA:
+            itens = []
+            for item in valor:
+                if type(item) is str:
+                    itens.append(item)
+                elif item is not None and type(item) not in (list, dict):
+                    itens.append(LeitorJSONL._valor(n, chave, item))
+                else:
+                    raise ValueError(f"registro {n}: item inválido em '{chave}' ({json.dumps(item)})")
+            return itens
+        if chave in CAMPOS_LISTA:
+            raise ValueError(f"registro {n}: '{chave}' deve ser uma lista")
+        if type(valor) in (list, dict):
+            raise ValueError(f"registro {n}: campo '{chave}' deve ser texto ou número")
+        return str(valor)
+
+    def escrever(self, secoes) -> bytes:
+        linhas = [json.dumps({"secao": secao_canonica(s), **r}, ensure_ascii=False) for s, r in _pares(secoes)]
+        return ("\n".join(linhas) + "\n").encode("utf-8")
+
+
+class LeitorBinario:
+    """
+    Formato binário compacto (.spod), em blocos colunares por seção:
+        cabeçalho  b"SPOD" + versão (1 byte)
+        bloco      tamanho do nome da seção (1 byte) + nome (UTF-8)
+                   + quantidade de registros (uint32) + quantidade de campos (1 byte)
+                   + para cada campo: indicador de lista (1 byte) + tamanho (1 byte) + chave
+                   + para cada campo: tamanho (uint32) + valores da coluna (UTF-8)
+    Os valores de uma coluna vêm separados por \x1e (itens de lista por \x1d);
+    campo ausente num registro é texto vazio, como no Markdown. Cada coluna
+    é lida com um decode() e um split(): não há análise por linha nem por campo.
+    """
+
+    extensao = ".spod"
+    MAGICO = b"SPOD"
+    VERSAO = 1
+    _VALOR, _ITEM = "\x1e", "\x1d"
+
+    def ler(self, dados: bytes):
+        if dados[:4] != self.MAGICO:
+            raise ValueError("arquivo .spod sem o cabeçalho SPOD")
+        if len(dados) < 5 or dados[4] != self.VERSAO:
+            raise ValueError("versão do formato .spod não suportada")
+        vista = memoryview(dados)
+        u32 = struct.Struct(">I").unpack_from
+        pos, fim = 5, len(dados)
+        secoes = []
+        try:
+            while pos < fim:
+                n = dados[pos]
+                secao = str(vista[pos + 1:pos + 1 + n], "utf-8")
+                pos += 1 + n
+                (qtde,) = u32(dados, pos)
+                ncampos = dados[pos + 4]
+                pos += 5
+                campos = []
+                for _ in range(ncampos):
+                    lista, n = dados[pos], dados[pos + 1]
+                    campos.append((str(vista[pos + 2:pos + 2 + n], "utf-8"), lista))
+                    pos += 2 + n
+                colunas = []
+                for _, lista in campos:
+                    (tam,) = u32(dados, pos)
+                    valores = str(vista[pos + 4:pos + 4 + tam], "utf-8").split(self._VALOR) if qtde else []
+                    pos += 4 + tam
+                    if len(valores) != qtde:
+                        raise ValueError(f"coluna com {len(valores)} valores, esperados {qtde}")
+                    if lista:
+                        item = self._ITEM
+                        valores = [v.split(item) if v else v for v in valores]
+                    colunas.append(valores)
+                chaves = [c for c, _ in campos]
+                registros = list(map(dict, map(zip, [chaves] * qtde, zip(*colunas))))
+                if secao and registros:
+                    secoes.append((secao, registros))
+        except (struct.error, IndexError) as e:
+            raise ValueError(f"arquivo .spod truncado ou corrompido (byte {pos}): {e}") from None
+        except UnicodeDecodeError as e:
+            raise ValueError(f"arquivo .spod corrompido (byte {pos}): {e}") from None
+        return secoes
+
+    def escrever(self, secoes) -> bytes:
+        proibidos = (self._VALOR, self._ITEM)
+        partes = [self.MAGICO, bytes((self.VERSAO,))]
+        for secao, registros in secoes:
+            if not registros:
+                continue
+            chaves = []
+            for r in registros:
+                for k in r:
+                    if k not in chaves:
+                        chaves.append(k)
+            if len(chaves) > 255:
+                raise ValueError(f"seção '{secao}' com mais de 255 campos")
+            nome = secao_canonica(secao).encode("utf-8")[:255]
+            partes += [bytes((len(nome),)), nome, struct.pack(">IB", len(registros), len(chaves))]
+            listas = [any(isinstance(r.get(k), list) for r in registros) for k in chaves]
+            for k, lista in zip(chaves, listas):
+                chave = k.encode("utf-8")[:255]
+                partes += [bytes((int(lista), len(chave))), chave]
+            for k, lista in zip(chaves, listas):
+                valores = []
+                for r in registros:
+                    v = r.get(k, "")
+                    for t in (v if isinstance(v, list) else (v,)):
+                        if any(c in t for c in proibidos):
+                            raise ValueError(f"campo '{k}' contém caracteres de controle reservados do .spod")
+                    valores.append(self._ITEM.join(v) if isinstance(v, list) else v)
+                coluna = self._VALOR.join(valores).encode("utf-8")
+                partes += [struct.pack(">I", len(coluna)), coluna]
+        return b"".join(partes)
+
+
+# Extensão -> leitor (novos formatos entram aqui)
+LEITORES = {cls.extensao: cls for cls in (LeitorMarkdown, LeitorCSV, LeitorJSONL, LeitorBinario)}
+
+
+def leitor_para(caminho):
+    extensao = Path(caminho).suffix.lower()
+    cls = LEITORES.get(extensao)
+    if cls is None:
+        raise ValueError(f"formato '{extensao}' não suportado (use {', '.join(sorted(LEITORES))})")
+    return cls()
+
+
+def ler_arquivo(caminho):
+    """Fluxo de registros [(secao, [registros])] de um arquivo em qualquer formato suportado."""
+    return leitor_para(caminho).ler(Path(caminho).read_bytes())
+
+
+def converter(origem, destino) -> int:
+    """Converte o catálogo entre formatos (ex.: .md -> .spod); retorna a quantidade de registros."""
+    secoes = ler_arquivo(origem)
+    Path(destino).write_bytes(leitor_para(destino).escrever(secoes))
+    return sum(len(r) for _, r in secoes)
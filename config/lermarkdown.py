@@ -3,21 +3,56 @@
 # Importa as bibliotecas possíveis e/ou necessárias
 from pathlib import Path
 from datetime import datetime
+from importlib.util import find_spec
 import sys
-import os
-import math
 
 # Adiciona o diretório raiz do projeto (exemplo notebook: "C:\Git_hub\Streaming_POD_Rafael_Sofia")
-# ao sys.path para importar os módulos
-raiz_sistema = str(Path(__file__).resolve().parent.parent)
-if raiz_sistema not in sys.path:
-    sys.path.insert(0, raiz_sistema)
+# ao sys.path apenas se o pacote Streaming ainda não for importável
+# (ex.: quando este arquivo é executado fora da raiz do projeto)
+if find_spec("Streaming") is None:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# As classes de domínio (Usuario, Musica, Podcast, Playlist) são importadas
+# apenas nos métodos que instanciam objetos, para não pesar quem só lê/valida
+from Streaming.instrumentacao import Instrumentacao, instrumentar, medir
+
+
+# Registros leves usados no modo de validação: guardam só o que as conferências
+# usam, sem criar objetos de domínio nem tocar nos registros globais
+# (ArquivoDeMidia.registroMidia, IDS, Usuario.qtde_instancias)
+class _UsuarioLido:
+    __slots__ = ("nome", "playlists", "_playlists_md")
+
+    def __init__(self, nome, playlists):
+        self.nome = nome.strip().title()
+        self.playlists = list(playlists)
+        self._playlists_md = list(playlists)
+
+
+class _MidiaLida:
+    __slots__ = ("tipo", "titulo")
+
+    def __init__(self, tipo, titulo):
+        self.tipo = tipo
+        self.titulo = titulo
+
+
+class _PlaylistLida:
+    __slots__ = ("nome", "dono", "itens", "_titulos_md")
+
+    def __init__(self, nome, dono, itens):
+        self.nome = nome
+        self.dono = dono
+        self.itens = list(itens)
+
+
+# Decisão usada quando não há deduplicador (o título exato já foi conferido)
+class _DecisaoExata:
+    __slots__ = ("titulo",)
+
+    def __init__(self, titulo):
+        self.titulo = titulo
 
-# Importa os arquivos .py dentro da pasta Streaming e os seus respectivos métodos
-from Streaming.usuarios import Usuario
-from Streaming.arquivo_midia import Musica
-from Streaming.arquivo_midia import Podcast
-from Streaming.playlist import Playlist
 
 class LerMarkdown:
     """
@@ -28,8 +63,13 @@ class LerMarkdown:
     """
 
     # Construtor da classe LerMarkdown contendo apenas a sua preparação de endereçamento
-    def __init__(self, strict: bool = False):
+    def __init__(self, strict: bool = False, deduplicador=None):
         self.strict = strict
+        # Deduplicação aproximada das mídias (Streaming/deduplicacao.py); sem ela
+        # só o título exato é comparado. Vale para todos os arquivos lidos
+        self.deduplicador = deduplicador
+        # No modo de validação os make_* devolvem registros leves (ver validar())
+        self._validando = False
         # Chama um outro método para inicializar ou criar os atributos dinâmicos
         self._reset_estados()
         # Guarda em atributos os caminhos (endereços) relativos ao projeto
@@ -43,6 +83,8 @@ class LerMarkdown:
     def _reset_estados(self):
         self.warnings = []
         self.errors = []       
+        # Quantidade de problemas por categoria (duplicado, duracao_invalida, ...)
+        self.problemas = {}
         self._usuario = []
         self._musicas = []
         self._podcast = []        
@@ -51,17 +93,32 @@ class LerMarkdown:
         self._usuarios_by_nome = {}
         self._midias_by_titulo = {}
         self._playlist_by_titulo = {}
+        # Títulos mesclados numa faixa já conhecida (apontam para ela, não são mídias novas)
+        self._apelidos = set()
+        # Título do registro -> título com que a homônima entrou ("Hello" -> "Hello (Adele)")
+        self._renomeadas = {}
+        self.mesclagens = []
         
     # A partir do caminho raiz_do_md encontra o arquivo de nome passado, lê e coloca como
     # uma string em text
+    # Outros formatos (.csv, .jsonl, .spod) passam pelo leitor de config/leitores.py
     def from_file(self, md_filename: str):
-        """Lê um arquivo .md dentro de config/ e retorna dicionário com objetos e logs."""
+        """Lê um arquivo de config/ (.md ou outro formato suportado) e retorna dicionário com objetos e logs."""
         raiz_do_md = (self._here.parent / md_filename).resolve()
         if not raiz_do_md.exists():
             raise FileNotFoundError(f"Arquivo não encontrado: {raiz_do_md}")
+        if raiz_do_md.suffix.lower() != ".md":
+            return self.parse_registros(self._ler_outro_formato(raiz_do_md), raiz_arquivo_log=str(raiz_do_md))
         text = raiz_do_md.read_text(encoding="utf-8")
         return self.parse(text, raiz_arquivo_log=str(raiz_do_md))
 
+    # Fluxo de registros de um arquivo CSV, JSON Lines ou binário
+    def _ler_outro_formato(self, caminho: Path):
+        from config.leitores import ler_arquivo
+
+        with medir("lermarkdown.leitor"):
+            return ler_arquivo(caminho)
+
     # Método que faz a leitura do texto .md e percorre os caracteres do arquivo
     def parse(self, text: str, raiz_arquivo_log: str = "<string>"):
         """Faz a leitura do texto .md 
@@ -69,14 +126,110 @@ class LerMarkdown:
         Encontra a seção de cada objeto que deve começar com #
         Instancia os objetos colocando primeiro em um temporário
         Faz até encontrar o final da seção que deve começar com ---."""
-        
+        # 1) Divide o texto em seções com seus registros (dicionários)
+        with medir("lermarkdown.split"):
+            secoes = self._dividir_secoes(text)
+        return self.parse_registros(secoes, raiz_arquivo_log)
+
+    # Carrega um fluxo de registros já dividido em seções (de qualquer leitor)
+    @instrumentar("lermarkdown.parse")
+    def parse_registros(self, secoes, raiz_arquivo_log: str = "<string>"):
+        """Mesmo que parse(), a partir de [(secao, [registros])] (ver config/leitores.py)."""
+        # 2) e 3) Carrega cada seção e resolve os vínculos
+        self._validando = False
+        self._processar(secoes)
+
+        # 4) Gravar logs
+        with medir("lermarkdown.log"):
+            self._partes_logs_to_file(raiz_arquivo_log)
+
+        Instrumentacao.contar("lermarkdown.registros", sum(len(r) for _, r in secoes))
+        Instrumentacao.contar("lermarkdown.avisos", len(self.warnings))
+        Instrumentacao.contar("lermarkdown.erros", len(self.errors))
+
+        from Streaming.arquivo_midia import Musica, Podcast
+
+        return {
+            "usuarios": list(self._usuarios_by_nome.values()),
+            "musicas": [m for m in self._midias_novas() if isinstance(m, Musica)],
+            "podcasts": [p for p in self._midias_novas() if isinstance(p, Podcast)],
+            "playlists": self._playlists,
+            "mesclagens": list(self.mesclagens),
+            "warnings": list(self.warnings),
+            "errors": list(self.errors),
+        }
+
+    # Etapas comuns a parse_registros() e validar_registros()
+    def _processar(self, secoes):
         # Faz reset nos atributos no objeto LerMarkdown
         self._reset_estados()
+
+        # 2) Carrega cada seção na ordem em que apareceu no arquivo
+        with medir("lermarkdown.secoes"):
+            for secao, records in secoes:
+                self._partes_secao(secao, records)
+
+        # 3) Resolver vínculos (depois de todas as seções)
+        with medir("lermarkdown.links"):
+            self._resolve_links()
+        return secoes
+
+    # Lê um arquivo .md (relativo a config/ ou caminho absoluto) só para validação
+    def validar_arquivo(self, md_filename: str) -> dict:
+        """Valida um arquivo .md (ou .csv, .jsonl, .spod) sem instanciar objetos; retorna o diagnóstico."""
+        raiz_do_md = (self._here.parent / md_filename).resolve()
+        if not raiz_do_md.exists():
+            raise FileNotFoundError(f"Arquivo não encontrado: {raiz_do_md}")
+        if raiz_do_md.suffix.lower() != ".md":
+            return self.validar_registros(self._ler_outro_formato(raiz_do_md), raiz_arquivo_log=str(raiz_do_md))
+        text = raiz_do_md.read_text(encoding="utf-8")
+        return self.validar(text, raiz_arquivo_log=str(raiz_do_md))
+
+    # Modo de validação: as mesmas conferências do parse(), sem efeitos colaterais
+    def validar(self, text: str, raiz_arquivo_log: str = "<string>") -> dict:
+        """Valida o texto .md (ver validar_registros())."""
+        return self.validar_registros(self._dividir_secoes(text), raiz_arquivo_log)
+
+    @instrumentar("lermarkdown.validar")
+    def validar_registros(self, secoes, raiz_arquivo_log: str = "<string>") -> dict:
+        """
+        Confere o texto .md (duplicados, durações e episódios inválidos, donos
+        e itens de playlist inexistentes) com registros leves no lugar de
+        Usuario/Musica/Podcast/Playlist: nada entra nos registros globais e o
+        log de erros não é gravado. Retorna o diagnóstico estruturado.
+        """
+        self._validando = True
+        try:
+            self._processar(secoes)
+        finally:
+            self._validando = False
+
+        lidos = {}
+        for secao, records in secoes:
+            lidos[secao] = lidos.get(secao, 0) + len(records)
+        midias = self._midias_novas()
+        return {
+            "arquivo": raiz_arquivo_log,
+            "valido": not self.errors,
+            "lidos": lidos,
+            "aceitos": {
+                "usuarios": len(self._usuarios_by_nome),
+                "musicas": sum(1 for m in midias if m.tipo == "musica"),
+                "podcasts": sum(1 for m in midias if m.tipo == "podcast"),
+                "playlists": len(self._playlists),
+            },
+            "problemas": dict(sorted(self.problemas.items())),
+            "avisos": list(self.warnings),
+            "erros": list(self.errors),
+        }
+
+    # Percorre as linhas do .md e devolve a lista [(secao, [registros])]
+    # sem instanciar nenhum objeto
+    def _dividir_secoes(self, text: str):
+        secoes = []
         secao = None
         buf = []
         current = None
-        # Faz reset nos logs
-        self.warnings = []
 
         lines = text.splitlines()
         i = 0
@@ -90,7 +243,7 @@ class LerMarkdown:
             # Encontra o início de cada seção (conjunto de ojetos) que começa com "# ..."
             if line.strip().startswith("# "):
 
-                self._partes_secao(secao, buf)
+                secoes.append((secao, buf))
                 buf = []
                 secao = line.strip()[2:].strip().lower()
                 i += 1
@@ -105,7 +258,7 @@ class LerMarkdown:
 
                 # Faz flush da seção atual
                 if secao and buf:
-                    self._partes_secao(secao, buf)
+                    secoes.append((secao, buf))
                 buf = []
 
                 # Encerra a seção, até encontrar com outra com '# '
@@ -142,22 +295,10 @@ class LerMarkdown:
 
         if current is not None:
             buf.append(current)
-        self._partes_secao(secao, buf)
-
-        # Resolver vínculos (depois de todas as seções)
-        self._resolve_links()
+        secoes.append((secao, buf))
 
-        # Gravar logs
-        self._partes_logs_to_file(raiz_arquivo_log)
-
-        return {
-            "usuarios": list(self._usuarios_by_nome.values()),
-            "musicas": [m for m in self._midias_by_titulo.values() if isinstance(m, Musica)],
-            "podcasts": [p for p in self._midias_by_titulo.values() if isinstance(p, Podcast)],
-            "playlists": self._playlists,
-            "warnings": list(self.warnings),
-            "errors": list(self.errors),
-        }
+        # Descarta as seções sem nome ou sem registros (como o _partes_secao faria)
+        return [(s, r) for s, r in secoes if s and r]
 
     # Métodos auxiliares de parsing
     # Normaliza strings (strip + lower)
@@ -215,7 +356,7 @@ class LerMarkdown:
         elif "playlist" in s or "playlists" in s:
             self._load_playlists(records)
         else:
-            self._log_warn(f"Seção desconhecida ignorada: {secao!r}")
+            self._log_warn(f"Seção desconhecida ignorada: {secao!r}", "secao_desconhecida")
 
     # Métodos que fazem o carregamento de cada seção
     # Cada método recebe a lista de registros (dicionários) daquela seção
@@ -224,10 +365,10 @@ class LerMarkdown:
         for r in records:
             nome = (r.get("nome") or "").strip()
             if not nome:
-                self._log_err("Usuário sem nome; registro ignorado.", r)
+                self._log_err("Usuário sem nome; registro ignorado.", r, "sem_nome")
                 continue
             if nome in self._usuarios_by_nome:
-                self._log_warn(f"Usuário duplicado '{nome}'. Mantendo o primeiro e ignorando o duplicado.")
+                self._log_warn(f"Usuário duplicado '{nome}'. Mantendo o primeiro e ignorando o duplicado.", "duplicado")
                 continue
             
             # Extrai a lista de playlists do MD, podendo ser string ou lista
@@ -253,7 +394,7 @@ class LerMarkdown:
             if dups:
                 self._log_err(
                     f"Usuário '{nome}' possui playlists duplicadas: {dups}. "
-                    f"Mantendo uma ocorrência de cada."
+                    f"Mantendo uma ocorrência de cada.", tipo="duplicado"
                 )
 
             playlists_titles = unicos
@@ -277,24 +418,26 @@ class LerMarkdown:
             dur_raw = (r.get("duracao") or "").strip()
 
             if not titulo:
-                self._log_err("Música sem título; ignorada.", r)
+                self._log_err("Música sem título; ignorada.", r, "sem_nome")
                 continue
-            if titulo_norm in self._midias_by_titulo:
-                self._log_warn(f"Mídia com título duplicado '{titulo}'. Mantendo a primeira.")
+            if self.deduplicador is None and titulo_norm in self._midias_by_titulo:
+                self._log_warn(f"Mídia com título duplicado '{titulo}'. Mantendo a primeira.", "duplicado")
                 continue
 
             dur_int = self._to_int(dur_raw, default=None)
             if dur_int is None or dur_int <= 0:
                 msg = f"Duração inválida para música '{titulo}': {dur_raw!r}."
                 if self.strict:
-                    self._log_err(msg + " Registro ignorado.", r)
+                    self._log_err(msg + " Registro ignorado.", r, "duracao_invalida")
                     continue
                 else:
-                    self._log_warn(msg + " Ignorada (strict=False).")
+                    self._log_warn(msg + " Ignorada (strict=False).", "duracao_invalida")
                     continue
 
-            m = self._make_musica(titulo, artista, genero, dur_int)
-            self._midias_by_titulo[titulo_norm] = m
+            decisao = self._deduplicar(titulo, artista, dur_int, "musica")
+            if decisao is not None:
+                m = self._make_musica(decisao.titulo, artista, genero, dur_int)
+                self._incluir_midia(decisao, m)
 
     # Carrega os podcasts
     def _load_podcasts(self, records):
@@ -307,33 +450,81 @@ class LerMarkdown:
             dur_raw    = (r.get("duracao")    or "").strip()
 
             if not titulo:
-                self._log_err("Podcast sem título; ignorado.", r)
+                self._log_err("Podcast sem título; ignorado.", r, "sem_nome")
                 continue
-            if titulo_norm in self._midias_by_titulo:
-                self._log_warn(f"Mídia com título duplicado '{titulo}'. Mantendo a primeira.")
+            if self.deduplicador is None and titulo_norm in self._midias_by_titulo:
+                self._log_warn(f"Mídia com título duplicado '{titulo}'. Mantendo a primeira.", "duplicado")
                 continue
 
             ep_int = self._to_int(ep_raw, default=None)
             if ep_int is None or ep_int < 0:
                 if self.strict:
-                    self._log_err(f"Episódio inválido em '{titulo}': {ep_raw!r}.", r)
+                    self._log_err(f"Episódio inválido em '{titulo}': {ep_raw!r}.", r, "episodio_invalido")
                     continue
                 else:
-                    self._log_warn(f"Episódio inválido em '{titulo}': {ep_raw!r}. Usando 0.")
+                    self._log_warn(f"Episódio inválido em '{titulo}': {ep_raw!r}. Usando 0.", "episodio_invalido")
                     ep_int = 0
 
             dur_int = self._to_int(dur_raw, default=None)
             if dur_int is None or dur_int <= 0:
                 msg = f"Duração inválida para podcast '{titulo}': {dur_raw!r}."
                 if self.strict:
-                    self._log_err(msg + " Registro ignorado.", r)
+                    self._log_err(msg + " Registro ignorado.", r, "duracao_invalida")
                     continue
                 else:
-                    self._log_warn(msg + " Ignorado (strict=False).")
+                    self._log_warn(msg + " Ignorado (strict=False).", "duracao_invalida")
                     continue
 
-            p = self._make_podcast(titulo, temporada, ep_int, host, dur_int)
-            self._midias_by_titulo[titulo_norm] = p
+            # Episódio inválido (usado 0) conta como desconhecido na deduplicação
+            ep_lido = ep_int if self._to_int(ep_raw) == ep_int else None
+            decisao = self._deduplicar(titulo, host, dur_int, "podcast", (temporada, ep_lido))
+            if decisao is not None:
+                p = self._make_podcast(decisao.titulo, temporada, ep_int, host, dur_int)
+                self._incluir_midia(decisao, p)
+
+    # Decide se a mídia lida entra, é mesclada numa faixa conhecida ou é homônima
+    # Retorna a decisão (com o título a usar) ou None se a mídia não entra
+    def _deduplicar(self, titulo, artista, duracao, tipo, extra=None):
+        if self.deduplicador is None:
+            return _DecisaoExata(titulo)
+        from Streaming.busca import normalizar
+
+        if extra is not None:
+            extra = (normalizar(extra[0].strip() or "Temporada"), extra[1])
+        d = self.deduplicador.decidir(titulo, artista, duracao, tipo, extra)
+        canonico = getattr(d.canonico, "titulo", d.canonico)
+        if d.acao == "mesclada":
+            self._log_warn(f"Mídia '{titulo}' é a mesma faixa de '{canonico}' "
+                           f"(similaridade {d.pontuacao:.2f}). Mantendo a primeira.", "duplicado")
+            self.mesclagens.append({"titulo": titulo, "canonico": canonico, "pontuacao": round(d.pontuacao, 3)})
+        elif d.acao == "homonima":
+            self._log_warn(f"Título '{titulo}' já pertence a outra faixa ('{canonico}'); "
+                           f"incluída como '{d.titulo}'.", "homonimo")
+            self._renomeadas[self._norm(titulo)] = self._norm(d.titulo)
+        elif d.acao == "conflito":
+            self._log_warn(f"Mídia com título duplicado '{titulo}'. Mantendo a primeira.", "duplicado")
+
+        # Playlists que citam o título lido usam a faixa que já o tem (como no catálogo)
+        titulo_norm = self._norm(titulo)
+        if d.canonico is not None and not isinstance(d.canonico, str) and titulo_norm not in self._midias_by_titulo:
+            self._midias_by_titulo[titulo_norm] = d.canonico
+            self._apelidos.add(titulo_norm)
+        return d if d.entra else None
+
+    def _incluir_midia(self, decisao, midia):
+        if self.deduplicador is not None:
+            self.deduplicador.incluir(decisao, midia)
+        self._midias_by_titulo[self._norm(decisao.titulo)] = midia
+
+    # Mídias criadas nesta leitura (sem os apelidos das mescladas)
+    def _midias_novas(self):
+        return [m for k, m in self._midias_by_titulo.items() if k not in self._apelidos]
+
+    # Mídia que um registro da última leitura gerou (a homônima já renomeada) ou a
+    # faixa conhecida em que foi mesclado; None se o registro foi rejeitado
+    def midia_do_registro(self, titulo: str):
+        titulo_norm = self._norm(titulo)
+        return self._midias_by_titulo.get(self._renomeadas.get(titulo_norm, titulo_norm))
 
     # Carrega as playlists
     def _load_playlists(self, records):
@@ -345,13 +536,13 @@ class LerMarkdown:
 
             # Playlist sem dono NÃO é adicionada
             if not nome:
-                self._log_warn(f"Playlist '{nome}' ignorada: sem dono/usuario informado.")
+                self._log_warn(f"Playlist '{nome}' ignorada: sem dono/usuario informado.", "sem_nome")
                 continue
 
             # Se o dono não é um usuário conhecido, tb NÃO adiciona            
             usuario_obj = self._usuarios_by_nome.get(dono)
             if not usuario_obj:
-                self._log_warn(f"Playlist '{nome}' ignorada: usuário '{dono}' inexistente no banco de dados.")
+                self._log_warn(f"Playlist '{nome}' ignorada: usuário '{dono}' inexistente no banco de dados.", "dono_inexistente")
                 continue            
             
             # Verificação das duplicatas na lista
@@ -365,7 +556,8 @@ class LerMarkdown:
                     itens_unicos.append(t)
             if dups:
                 self._log_warn(
-                    f"Playlist '{nome}' tem itens repetidos: {dups}. Mantendo uma ocorrência de cada."
+                    f"Playlist '{nome}' tem itens repetidos: {dups}. Mantendo uma ocorrência de cada.",
+                    "duplicado"
                 )
 
             # Cria a playlist com nome, dono (string) e lista de musicas em string
@@ -389,11 +581,12 @@ class LerMarkdown:
             if not uname:
                 self._log_warn(
                     f"Playlist '{self._get_playlist_name(pl)}' sem usuário definido no objeto; "
-                    f"tentando o nome do MD se disponível."
+                    f"tentando o nome do MD se disponível.", "dono_inexistente"
                 )
-            elif uname not in self._usuarios_by_nome:
+            elif uname.lower() not in self._usuarios_by_nome:
                 self._log_warn(
-                    f"Playlist '{self._get_playlist_name(pl)}' referencia usuário inexistente '{uname}'."
+                    f"Playlist '{self._get_playlist_name(pl)}' referencia usuário inexistente '{uname}'.",
+                    "dono_inexistente"
                 )
 
             # b) itens por título -> objetos de mídia
@@ -408,7 +601,8 @@ class LerMarkdown:
 
             if missing:
                 self._log_warn(
-                    f"Playlist '{self._get_playlist_name(pl)}' contém itens inexistentes: {missing}. Ignorados."
+                    f"Playlist '{self._get_playlist_name(pl)}' contém itens inexistentes: {missing}. Ignorados.",
+                    "item_inexistente"
                 )
 
             self._set_playlist_items(pl, resolved)
@@ -433,9 +627,7 @@ class LerMarkdown:
                 continue
 
             # garante lista e adiciona o NOME da playlist
-            lst = getattr(u, "playlists", None)
-            if not isinstance(lst, list):
-                lst = []
+            lst = list(getattr(u, "playlists", None) or [])
             lst.append(pl_nome)
             u.playlists = lst
 
@@ -466,6 +658,11 @@ class LerMarkdown:
         Faz a criação apenas pelo nome para evitar problemas com o consrutor e a existência
         de playlist duplicadas ou mesmo inexistentes
         """
+        if self._validando:
+            return _UsuarioLido(nome, [(t or "").strip() for t in (playlists_titles or []) if (t or "").strip()])
+
+        from Streaming.usuarios import Usuario
+
         u = Usuario(nome)
         
         # Retira os espaços (normaliza) da lista de títulos recebida
@@ -481,6 +678,11 @@ class LerMarkdown:
         
     # Faz a criação das músicas lidas
     def _make_musica(self, titulo, artista, genero, duracao):
+        if self._validando:
+            return _MidiaLida("musica", titulo)
+
+        from Streaming.arquivo_midia import Musica
+
         return Musica(
                 titulo=titulo, 
                 duracao=duracao, 
@@ -496,6 +698,11 @@ class LerMarkdown:
         Podcast(titulo, duracao, artista, episodio, temporada, host)
         Usamos host como 'artista' por falta desse campo no .md.
         """
+        if self._validando:
+            return _MidiaLida("podcast", titulo)
+
+        from Streaming.arquivo_midia import Podcast
+
         return Podcast(
             titulo=titulo,
             duracao=duracao,
@@ -520,7 +727,8 @@ class LerMarkdown:
         if not dono_val:
             dono_val = "Não Informado"
         elif dono_val not in self._usuarios_by_nome:
-            self._log_err(f"Playlist '{nome}' referencia usuário inexistente '{dono_val}'; usando 'Não Informado'.")
+            self._log_err(f"Playlist '{nome}' referencia usuário inexistente '{dono_val}'; usando 'Não Informado'.",
+                          tipo="dono_inexistente")
             dono_val = "Não Informado"
 
         # Faz a validação das musicas (string) passadas em lista
@@ -537,12 +745,18 @@ class LerMarkdown:
                 if tt_norm in self._midias_by_titulo:
                     filtrados.append(tt)
                 else:
-                    self._log_err(f"Playlist '{nome}' contém item inexistente '{tt}'; removido.")
+                    self._log_err(f"Playlist '{nome}' contém item inexistente '{tt}'; removido.",
+                                  tipo="item_inexistente")
         else:
             # catálogo ainda vazio: não validar agora, apenas normalizar
             filtrados = [ (t or "").strip() for t in (itens_titles or []) if (t or "").strip() ]
 
+        if self._validando:
+            return _PlaylistLida(nome, dono_val, filtrados)
+
         # Cria a Playlist passando as strings (dono + lista de musicas)
+        from Streaming.playlist import Playlist
+
         try:
             pl = Playlist(nome, dono_val, filtrados)
         except TypeError:
@@ -647,9 +861,7 @@ class LerMarkdown:
         pl_nome = (getattr(playlist_obj, "nome", "") or "").strip()
         if not pl_nome:
             return
-        lst = getattr(user_obj, "playlists", None)
-        if not isinstance(lst, list):
-            lst = []
+        lst = list(getattr(user_obj, "playlists", None) or [])
         lst.append(pl_nome)
         user_obj.playlists = lst
 
@@ -662,14 +874,17 @@ class LerMarkdown:
 
     # Métodos de log
     # Adiciona mensagens de aviso ou erro nas listas internas
-    def _log_warn(self, msg: str):
+    # (tipo é a categoria contada em self.problemas)
+    def _log_warn(self, msg: str, tipo: str = "outro"):
         self.warnings.append(msg)
+        self.problemas[tipo] = self.problemas.get(tipo, 0) + 1
 
     # Adiciona mensagens de erro nas listas internas
-    def _log_err(self, msg: str, record=None):
+    def _log_err(self, msg: str, record=None, tipo: str = "outro"):
         if record is not None:
             msg = f"{msg} | Registro: {record}"
         self.errors.append(msg)
+        self.problemas[tipo] = self.problemas.get(tipo, 0) + 1
 
     # Grava os logs em arquivo
     # Se não houver avisos ou erros, não grava nada
@@ -1,135 +1,661 @@
 # main.py
 from pathlib import Path
+from contextlib import contextmanager
+import os
+import threading
 
-# Importações das classes do pacote
-from Streaming.menu import Menu
-from Streaming.usuarios import Usuario
-from Streaming.arquivo_midia import ArquivoDeMidia
-from Streaming.arquivo_midia import Musica
-from Streaming.arquivo_midia import Podcast
-from Streaming.playlist import Playlist
-from Streaming.analises import Analises
-from config.lermarkdown import LerMarkdown
+# As classes do pacote são importadas nos métodos que as usam: importar main
+# (o cli.py importa ao montar o app) fica barato para quem não usa tudo
+
+# Índice de busca persistido entre execuções (não precisa ser reconstruído)
+CAMINHO_INDICE_BUSCA = Path(__file__).parent / "cache" / "indice_busca.json"
+
+# Banco local com o estado do app (reproduções, avaliações, históricos e playlists)
+CAMINHO_BANCO = Path(__file__).parent / "dados" / "streaming.db"
+
+
+def caminho_banco(ambiente=None):
+    """
+    Banco do menu, ligado pela variável de ambiente STREAMING_BANCO:
+    "1" usa CAMINHO_BANCO e outro valor é o caminho do arquivo. Sem ela
+    (ou com "0") o menu não abre banco e o estado fica só em memória.
+    """
+    valor = (os.environ if ambiente is None else ambiente).get("STREAMING_BANCO", "").strip()
+    if valor in ("", "0"):
+        return None
+    return CAMINHO_BANCO if valor == "1" else Path(valor)
 
 
 def importar_markdowns_para_main(app):
     """
     Método rodado antes da main para poder ler todos os .md da pasta /config
+    (e os catálogos em .csv, .jsonl e .spod, ver config/leitores.py)
     usando LerMarkdown e consolida em app. Evita duplicatas.
+    Retorna um resumo com as quantidades importadas, avisos e erros.
     """
-    # Pega todos os arquivos .md da pasta config
+    resumo = {"arquivos": 0, "usuarios": 0, "musicas": 0, "podcasts": 0,
+              "playlists": 0, "mescladas": 0, "homonimas": 0,
+              "avisos": 0, "erros": 0, "falhas": []}
+
+    from config.leitores import LEITORES
+    from config.lermarkdown import LerMarkdown
+    from Streaming.deduplicacao import Deduplicador
+    from Streaming.ids import usando_registro
+    from Streaming.playlist import Playlist
+
+    # Pega todos os arquivos .md (e dos outros formatos com leitor) da pasta config
+
     base_config = Path(__file__).parent / "config"
-    arquivos = sorted(base_config.glob("*.md"))
+    arquivos = sorted(p for p in base_config.iterdir() if p.suffix.lower() in LEITORES)
     
     # Se não houver arquivos, avisa e retorna
     if not arquivos:
         print("Nenhum .md encontrado em /config.")
-        return
-
-    # Faz os índices para deduplicação posterior
-    usuarios_por_nome   = {u.nome.strip().lower(): u for u in app.usuarios}
-    musicas_por_titulo  = {m.titulo.strip().lower(): m for m in app.musicas}
-    podcasts_por_titulo = {p.titulo.strip().lower(): p for p in app.podcasts}
-    playlists_chaves    = {((getattr(pl, "nome", "") or "").strip().lower(), 
-                            (getattr(pl, "dono", "") or "").strip().lower()) 
-                            for pl in app.playlists}
-
-
-    novos_u = novos_m = novos_p = novos_pl = 0
-
-    # Instancia o leitor como um objeto LerMarkdown
-    leitor = LerMarkdown(strict=False)
-
-    # Lê todos os arquivos .md da lista arquivos
-    for arq in arquivos:
-        print(f"\n=== Lendo: {arq.name} ===")
-        try:
-            # o LerMarkdown já resolve caminho relativo a /config
-            result = leitor.from_file(arq.name)  
-        except Exception as e:
-            print(f"[ERRO] {arq.name}: {e}")
-            continue
-
-        # 1 - Usuários        
-        for u in result.get("usuarios", []):
-            k = u.nome.strip().lower()
-            if k not in usuarios_por_nome:
-                app.usuarios.append(u)
-                usuarios_por_nome[k] = u
-                novos_u += 1
-
-        # 2 - Músicas    
-        for m in result.get("musicas", []):
-            k = m.titulo.strip().lower()
-            if k not in musicas_por_titulo:
-                app.musicas.append(m)
-                musicas_por_titulo[k] = m
-                novos_m += 1
-
-        # 3 - Podcasts
-        for p in result.get("podcasts", []):
-            k = p.titulo.strip().lower()
-            if k not in podcasts_por_titulo:
-                app.podcasts.append(p)
-                podcasts_por_titulo[k] = p
-                novos_p += 1
-
-        # 4 - playlists
-        for pl in result.get("playlists", []):
-            # Pegando o dono como string para exibir/armazenar (sem lower!)
-            dono_nome = (getattr(pl, "dono", "") or "").strip() or "Usuário não informado"
-            # Criando uma chave normalizada para deduplicar
-            dono_key  = dono_nome.lower()
-
-            chave_pl = (pl.nome.strip().lower(), dono_key)
-            if chave_pl in playlists_chaves:
+        return resumo
+
+    # Uma importação por vez; as coleções ficam travadas enquanto são consolidadas
+    # (sessões em paralelo aguardam e nunca veem a consolidação pela metade)
+    # Os objetos lidos já nascem no registro de IDs do app
+    with app._trava_importacao, app.travado(), usando_registro(app.ids):
+        # Faz os índices para deduplicação posterior
+        # (mídias repetidas são descartadas pelo próprio catálogo do app)
+        usuarios_por_nome   = {u.nome.strip().lower(): u for u in app.usuarios}
+        playlists_chaves    = {((getattr(pl, "nome", "") or "").strip().lower(), 
+                                (getattr(pl, "dono", "") or "").strip().lower()) 
+                                for pl in app.playlists}
+
+
+        novos_u = novos_m = novos_p = novos_pl = 0
+
+        # Instancia o leitor como um objeto LerMarkdown; o deduplicador parte do
+        # catálogo atual e decide, para cada mídia lida, se é nova, a mesma faixa
+        # de outra (mesclada, mesmo com título um pouco diferente) ou homônima
+        dedup = Deduplicador.de_midias(app.catalogo)
+        leitor = LerMarkdown(strict=False, deduplicador=dedup)
+
+        # Lê todos os arquivos .md da lista arquivos
+        for arq in arquivos:
+            print(f"\n=== Lendo: {arq.name} ===")
+            try:
+                # o LerMarkdown já resolve caminho relativo a /config
+                result = leitor.from_file(arq.name)  
+            except Exception as e:
+                print(f"[ERRO] {arq.name}: {e}")
+                resumo["falhas"].append(f"{arq.name}: {e}")
                 continue
-
-            itens = list(getattr(pl, "itens", []) or [])
-            reproducoes = int(getattr(pl, "reproducoes", 0) or 0)
-
-            # Armazenando 'dono' com a capitalização original
-            nova = Playlist(pl.nome, dono_nome, itens=itens, reproducoes=reproducoes)
-            app.playlists.append(nova)
-            playlists_chaves.add(chave_pl)
-            novos_pl += 1
-
-        # Exibir avisos/erros da leitura dos markdown (parser)
-        for w in result.get("warnings", []):
-            print(" - WARN:", w)
-        for e in result.get("errors", []):
-            print(" - ERRO:", e)
+            resumo["arquivos"] += 1
+
+            # 1 - Usuários        
+            for u in result.get("usuarios", []):
+                k = u.nome.strip().lower()
+                if k not in usuarios_por_nome:
+                    app.incluir_usuario(u)
+                    usuarios_por_nome[k] = u
+                    novos_u += 1
+
+            # 2 - Músicas (em lote; as repetidas não entram e ficam livres para o coletor)
+            novos_m += len(app.adicionar_midias(result.get("musicas", [])))
+
+            # 3 - Podcasts
+            novos_p += len(app.adicionar_midias(result.get("podcasts", [])))
+
+            # 4 - playlists
+            for pl in result.get("playlists", []):
+                # Pegando o dono como string para exibir/armazenar (sem lower!)
+                dono_nome = (getattr(pl, "dono", "") or "").strip() or "Usuário não informado"
+                # Criando uma chave normalizada para deduplicar
+                dono_key  = dono_nome.lower()
+
+                chave_pl = (pl.nome.strip().lower(), dono_key)
+                if chave_pl in playlists_chaves:
+                    continue
+
+                itens = list(getattr(pl, "itens", []) or [])
+                reproducoes = int(getattr(pl, "reproducoes", 0) or 0)
+
+                # Armazenando 'dono' com a capitalização original
+                nova = Playlist(pl.nome, dono_nome, itens=itens, reproducoes=reproducoes)
+                app.incluir_playlist(nova)
+                playlists_chaves.add(chave_pl)
+                novos_pl += 1
+
+            # Exibir avisos/erros da leitura dos markdown (parser)
+            for w in result.get("warnings", []):
+                print(" - WARN:", w)
+            for e in result.get("errors", []):
+                print(" - ERRO:", e)
+            resumo["avisos"] += len(result.get("warnings", []))
+            resumo["erros"] += len(result.get("errors", []))
 
     print("\n--- Importação concluída ---")
     print(f"Novos usuários:   {novos_u}")
     print(f"Novas músicas:    {novos_m}")
     print(f"Novos podcasts:   {novos_p}")
     print(f"Novas playlists:  {novos_pl}")
+    print(f"Mídias mescladas: {dedup.decisoes['mesclada']}")
+
+    resumo.update(usuarios=novos_u, musicas=novos_m, podcasts=novos_p, playlists=novos_pl,
+                  mescladas=dedup.decisoes["mesclada"], homonimas=dedup.decisoes["homonima"])
+    return resumo
 
 
 # Controlador do APP (local de toda a regra de negócio)
 class StreamingApp:
     # Construtor inicializado pelo LerMarkdown
     def __init__(self):
-        self.usuarios: list[Usuario] = []   
-        self.musicas: list[Musica] = []
-        self.podcasts: list[Podcast] = []
-        self.playlists: list[Playlist] = []
+        from Streaming.busca import IndiceBusca
+        from Streaming.catalogo import Catalogo
+        from Streaming.ids import RegistroIds
+        from Streaming.indices import IndicesCatalogo
+        from Streaming.relatorio_materializado import RelatorioMaterializado
+        from Streaming.series_temporais import SeriesReproducoes
+
+        # Registro de IDs próprio: nomes internados e renomeações valem só neste app
+        # (inquilinos não se enxergam) e são liberados junto com ele
+        self.ids = RegistroIds()
+        # Barramento de eventos do app: os objetos dele publicam aqui, e os componentes
+        # do app (séries, relatório, persistência...) assinam só os eventos deste app
+        self.eventos = self.ids.eventos
+        self.usuarios: list = []   
+        self._ids_usuarios = set()          # id() dos usuários deste app (filtro de eventos)
+        # Catálogo próprio do app; musicas e podcasts são as listas dele (mesmos objetos)
+        self.catalogo = Catalogo(self.ids)
+        self.musicas: list = self.catalogo.musicas
+        self.podcasts: list = self.catalogo.podcasts
+        self.playlists: list = []
+
+        # Travas por coleção, para várias sessões usarem o app em paralelo.
+        # Contadores e listas de cada objeto (reproduções, histórico, itens)
+        # são protegidos pelas travas particionadas de Streaming.concorrencia.
+        self._trava_usuarios = threading.RLock()
+        self._trava_catalogo = threading.RLock()
+        self._trava_playlists = threading.RLock()
+        self._trava_importacao = threading.Lock()
+
+        # Índice invertido para busca textual; as mídias novas entram no primeiro
+        # acesso a self.busca (carregar um catálogo grande não paga a indexação)
+        self._busca = IndiceBusca()
+        self._busca_pendentes = []
+        # Índices secundários (artista, gênero, temporada/host e duração)
+        self.indices = IndicesCatalogo()
+        # Reproduções por minuto/hora/dia de cada mídia, alimentadas pelo evento "reproducao"
+        self.series = SeriesReproducoes()
+        self.eventos.assinar("reproducao", self.series.registrar)
+
+        # Modo de análises aproximadas (sketches); desligado até ativar_analises_aproximadas()
+        self.aprox = None
+
+        # Recomendador por coocorrência; montado no primeiro uso (ativar_recomendacoes)
+        self.recomendador = None
+
+        # Persistência opcional (abrir_armazenamento); sem ela tudo fica só em memória
+        self.armazenamento = None
+
+        # Escrita adiada das reproduções (ativar_escrita_adiada); desligada por padrão
+        self.escrita_adiada = None
+
+        # Observador de config/ (observar_config); desligado por padrão
+        self.observador = None
+
+        # Relatório materializado: atualizado pelos eventos (criado antes de qualquer inclusão)
+        self.relatorio = RelatorioMaterializado(self)
+
+    # Liga o modo aproximado: passa a receber os eventos de reprodução e histórico
+    def ativar_analises_aproximadas(self, **parametros):
+        from Streaming.sketches import AnalisesAproximadas
+
+        if self.aprox is None:
+            self.aprox = AnalisesAproximadas(**parametros)
+            self.eventos.assinar("historico", self._aprox_ouvinte)
+            self.eventos.assinar("reproducao", self._aprox_reproducao)
+        return self.aprox
+
+    # Só contam os objetos incluídos no app (uma playlist gerada sem salvar também
+    # publica no barramento do app, mas não faz parte dele)
+    def _aprox_ouvinte(self, usuario, **dados) -> None:
+        if id(usuario) in self._ids_usuarios:
+            self.aprox.registrar_ouvinte(usuario, **dados)
+
+    def _aprox_reproducao(self, midia, **dados) -> None:
+        if midia in self.catalogo:
+            self.aprox.registrar_reproducao(midia, **dados)
+
+    def _recomendador_historico(self, usuario, **dados) -> None:
+        if id(usuario) in self._ids_usuarios:
+            self.recomendador.registrar(usuario, **dados)
+
+    # Persistência em SQLite: recria o estado salvo e grava as mudanças seguintes em lotes
+    def abrir_armazenamento(self, caminho=CAMINHO_BANCO, **parametros) -> dict:
+        """Abre (ou cria) o banco e carrega o que estiver salvo; retorna as quantidades carregadas."""
+        from Streaming.persistencia import ArmazenamentoSQLite
+
+        if self.armazenamento is not None:
+            raise RuntimeError("Armazenamento já aberto.")
+        self.armazenamento = ArmazenamentoSQLite(caminho, **parametros)
+        return self.armazenamento.carregar(self)
+
+    def fechar_armazenamento(self) -> None:
+        self.descarregar_reproducoes()
+        if self.armazenamento is not None:
+            self.armazenamento.fechar()
+            self.armazenamento = None
+
+    # Encerra o app: para o observador, descarrega e grava o que estiver pendente
+    # e cancela as assinaturas de eventos
+    def fechar(self) -> None:
+        if self.observador is not None:
+            self.observador.parar()
+        if self.escrita_adiada is not None:
+            self.escrita_adiada.fechar()
+        self.fechar_armazenamento()
+        self.eventos.cancelar("reproducao", self.series.registrar)
+        if self.aprox is not None:
+            self.eventos.cancelar("historico", self._aprox_ouvinte)
+            self.eventos.cancelar("reproducao", self._aprox_reproducao)
+        if self.recomendador is not None:
+            self.eventos.cancelar("historico", self._recomendador_historico)
+        self.relatorio.fechar()
+
+    # Escrita adiada: reproduções não interativas vão para buffers por thread e
+    # são aplicadas em lote (contadores, históricos e eventos)
+    def ativar_escrita_adiada(self, **parametros):
+        from Streaming.escrita_adiada import EscritaAdiada
+
+        if self.escrita_adiada is None:
+            self.escrita_adiada = EscritaAdiada(**parametros)
+        return self.escrita_adiada
+
+    def descarregar_reproducoes(self) -> None:
+        """Aplica as reproduções ainda pendentes na escrita adiada (antes de relatórios e gravações)."""
+        if self.escrita_adiada is not None:
+            self.escrita_adiada.descarregar()
+
+    def reproducoes(self, obj) -> int:
+        """Reproduções da mídia ou playlist, somando as pendentes da escrita adiada."""
+        if self.escrita_adiada is not None:
+            return self.escrita_adiada.reproducoes(obj)
+        return obj.reproducoes
+
+    # Recomendações por coocorrência; a tabela é montada no primeiro uso e
+    # segue atualizada pelas reproduções (evento "historico")
+    def ativar_recomendacoes(self, **parametros):
+        from Streaming.recomendacao import Recomendador
+
+        if self.recomendador is None:
+            with self.travado():
+                self.recomendador = Recomendador(self.catalogo, **parametros).construir(
+                    self.playlists, self.usuarios)
+                self.eventos.assinar("historico", self._recomendador_historico)
+        return self.recomendador
+
+    def recomendar(self, usuario=None, playlist=None, n: int = 10) -> list:
+        """[(mídia, pontuação)] para o usuário (pelo histórico) ou para completar a playlist."""
+        rec = self.ativar_recomendacoes()
+        if playlist is not None:
+            return rec.para_playlist(playlist, n)
+        if usuario is not None:
+            return rec.para_usuario(usuario, n)
+        return []
+
+    # Playlist automática a partir de restrições (gênero, artista, duração total, nota mínima)
+    def gerar_playlist(self, usuario, nome: str, duracao_total: int, recentes: int = 50,
+                       salvar: bool = True, semente=None, **restricoes) -> "Playlist":
+        """
+        Monta uma playlist de até 'duracao_total' segundos com o GeradorPlaylist,
+        sem as últimas 'recentes' mídias do histórico do usuário.
+        Com salvar=True a playlist entra no app (como em criar_playlist).
+        """
+        from Streaming.gerador_playlist import GeradorPlaylist
+        from Streaming.ids import usando_registro
+        from Streaming.playlist import Playlist
+
+        excluir = ()
+        if usuario is not None and recentes:
+            ids = usuario.historico.ids
+            excluir = set(ids[max(0, len(ids) - int(recentes)):])
+        with self._trava_catalogo:
+            itens = GeradorPlaylist(self.indices, semente=semente).gerar(
+                duracao_total, excluir=excluir, **restricoes)
+        with usando_registro(self.ids):
+            pl = Playlist(nome, getattr(usuario, "nome", usuario) if usuario is not None else "Não informado",
+                          itens=itens)
+        if salvar:
+            self.incluir_playlist(pl)
+        return pl
+
+    # Trava todas as coleções, sempre na mesma ordem (evita deadlock)
+    @contextmanager
+    def travado(self):
+        with self._trava_usuarios, self._trava_catalogo, self._trava_playlists:
+            yield self
 
     # Método para criar um novo usuário, a partir do menu sem usuário logado
-    def criar_novo_usuario(self, nome: str) -> Usuario:
-        u = Usuario(nome)
-        #Testa se o nome já existe (case insensitive, sem espaços)
-        try:
-            if any(existente.nome.lower() == u.nome.strip().lower() for existente in self.usuarios):
-                raise ValueError(f"Usuário com nome '{u.nome}' já existe.")
-        except ValueError:            
-            # Se já existir, não cria e retorna None
-            return None
-        # Caso o nome não exista, adiciona o novo usuário à lista
-        self.usuarios.append(u)
+    def criar_novo_usuario(self, nome: str) -> "Usuario":
+        from Streaming.ids import usando_registro
+        from Streaming.usuarios import Usuario
+
+        with usando_registro(self.ids):
+            u = Usuario(nome)
+        # Verificação e inclusão atômicas: duas sessões não criam o mesmo nome
+        with self._trava_usuarios:
+            #Testa se o nome já existe (case insensitive, sem espaços)
+            try:
+                if any(existente.nome.lower() == u.nome.strip().lower() for existente in self.usuarios):
+                    raise ValueError(f"Usuário com nome '{u.nome}' já existe.")
+            except ValueError:            
+                # Se já existir, não cria e retorna None
+                return None
+            # Caso o nome não exista, adiciona o novo usuário à lista
+            self.incluir_usuario(u)
         return u
 
+    # Inclusões nas coleções; publicam o evento dentro da trava (mesma ordem da lista).
+    # Objetos criados fora do app passam para o registro de IDs dele
+    def incluir_usuario(self, usuario) -> None:
+        with self._trava_usuarios:
+            usuario._mudar_registro(self.ids)
+            self.usuarios.append(usuario)
+            self._ids_usuarios.add(id(usuario))
+            self.eventos.emitir("usuario_criado", app=self, usuario=usuario)
+
+    def incluir_playlist(self, playlist) -> None:
+        with self._trava_playlists:
+            playlist._mudar_registro(self.ids)
+            self.playlists.append(playlist)
+            self.eventos.emitir("playlist_criada", app=self, playlist=playlist)
+
+    # Renomeia um usuário do app (nome único sem diferenciar maiúsculas); playlists e
+    # listas que guardam o ID mostram o nome novo
+    def renomear_usuario(self, usuario, novo: str) -> bool:
+        """Retorna False se o usuário não for deste app; nome já usado gera ValueError."""
+        with self._trava_usuarios:
+            if id(usuario) not in self._ids_usuarios:
+                return False
+            existente = self.buscar_usuario(novo)
+            if existente is not None and existente is not usuario:
+                raise ValueError(f"Usuário com nome '{existente.nome}' já existe.")
+            antigo = usuario.nome
+            usuario.renomear(novo)
+            self.eventos.emitir("usuario_renomeado", app=self, usuario=usuario, antigo=antigo)
+        return True
+
+    # Troca os itens de uma playlist de uma vez (ex.: registro editado no markdown)
+    def substituir_itens_playlist(self, playlist, itens) -> bool:
+        """Retorna False se os itens já eram os mesmos (e na mesma ordem)."""
+        from Streaming.concorrencia import TRAVAS
+
+        itens = list(itens)
+        with TRAVAS.para(playlist):
+            if len(itens) == len(playlist.itens) and all(a is b for a, b in zip(itens, playlist.itens)):
+                return False
+            playlist.itens[:] = itens
+        self.eventos.emitir("playlist_alterada", playlist=playlist)
+        return True
+
+    # Cria uma playlist vazia para o usuário (menu opção 6)
+    def criar_playlist(self, usuario, nome: str) -> "Playlist":
+        from Streaming.ids import usando_registro
+        from Streaming.playlist import Playlist
+
+        with usando_registro(self.ids):
+            pl = Playlist(nome, getattr(usuario, "nome", usuario))
+        self.incluir_playlist(pl)
+        return pl
+
+    # Exclui uma playlist pelo nome exato; retorna True se excluiu
+    def excluir_playlist(self, nome: str) -> bool:
+        with self._trava_playlists:
+            pl = self.buscar_playlist(nome)
+            if pl is None:
+                return False
+            self.playlists = [p for p in self.playlists if p is not pl]
+            self.eventos.emitir("playlist_excluida", app=self, playlist=pl)
+        return True
+
+    # Renomeia uma playlist do app (o nome só precisa ser livre entre as do mesmo dono)
+    def renomear_playlist(self, playlist, novo: str) -> bool:
+        """Retorna False se a playlist não for deste app; nome já usado pelo dono gera ValueError."""
+        with self._trava_playlists:
+            if not any(p is playlist for p in self.playlists):
+                return False
+            antigo = playlist.nome
+            playlist.renomear(novo)
+            self.eventos.emitir("playlist_renomeada", app=self, playlist=playlist, antigo=antigo)
+        return True
+
+    # Concatena 'juntar' em 'destino' e põe a nova no lugar de destino (menu opção 7)
+    def concatenar_playlists(self, destino: str, juntar: str):
+        """Retorna a playlist concatenada, ou None se alguma não existir."""
+        with self._trava_playlists:
+            p1_destino = self.buscar_playlist(destino)
+            p2_juntar = self.buscar_playlist(juntar)
+            if not (p1_destino and p2_juntar):
+                return None
+            # Chama o método __add__ para concatenar
+            nova = p1_destino + p2_juntar
+            # Remove a antiga da lista e põe a nova concatenada no mesmo lugar de p1_destino
+            self.playlists = [p if p is not p1_destino else nova for p in self.playlists]
+            self.eventos.emitir("playlist_substituida", app=self, antiga=p1_destino, nova=nova)
+        return nova
+
+    # Adiciona uma mídia ao catálogo, ao índice de busca e aos índices secundários
+    def adicionar_midia(self, midia) -> bool:
+        """Retorna False se já houver mídia com o mesmo título no catálogo."""
+        return bool(self.adicionar_midias((midia,)))
+
+    # Inclusão em lote: uma passada no catálogo, depois índices e eventos de cada nova
+    def adicionar_midias(self, midias) -> list:
+        """Retorna as mídias incluídas (títulos já existentes ficam de fora)."""
+        with self._trava_catalogo:
+            novas = self.catalogo.adicionar_varios(midias)
+            for midia in novas:
+                self._busca_pendentes.append(midia)
+                self.indices.adicionar(midia)
+                self.series.acompanhar(midia)
+                self.eventos.emitir("midia_adicionada", app=self, midia=midia)
+        return novas
+
+    # Remoção em lote: sai do catálogo, da busca, dos índices e das séries
+    # (playlists e históricos que já a referenciam não são alterados)
+    def remover_midias(self, midias) -> list:
+        """Retorna as mídias removidas (as que não eram deste catálogo são ignoradas)."""
+        with self._trava_catalogo:
+            removidas = self.catalogo.remover_varios(midias)
+            for midia in removidas:
+                if any(m is midia for m in self._busca_pendentes):
+                    self._busca_pendentes = [m for m in self._busca_pendentes if m is not midia]
+                else:
+                    self._busca.remover(midia)
+                self.indices.remover(midia)
+                self.series.esquecer(midia)
+                self.eventos.emitir("midia_removida", app=self, midia=midia)
+        return removidas
+
+    # Alteração de campos de uma mídia do catálogo (ex.: registro editado no markdown);
+    # o título não muda aqui (ver renomear_midia)
+    def atualizar_midia(self, midia, **campos) -> bool:
+        """Aplica os campos que mudaram (duracao, artista, genero, ...); retorna False se nada mudou."""
+        with self._trava_catalogo:
+            if midia not in self.catalogo:
+                return False
+            mudou = {k: v for k, v in campos.items() if k != "titulo" and getattr(midia, k, None) != v}
+            if not mudou:
+                return False
+            # Os índices secundários são chaveados pelos campos antigos: sai antes e volta depois
+            self.indices.remover(midia)
+            for k, v in mudou.items():
+                setattr(midia, k, v)
+            self.indices.adicionar(midia)
+            self.reindexar_midia(midia)
+            self.eventos.emitir("midia_alterada", app=self, midia=midia, campos=tuple(mudou))
+        return True
+
+    # Renomeia uma mídia do catálogo: catálogo e busca passam a usar o título novo
+    # (os índices secundários são por artista/gênero/duração e não mudam); históricos
+    # e playlists mostram o título novo pelo ID. Publica "midia_alterada" com o campo
+    # "titulo", então persistência e relatório acompanham como nas outras alterações
+    def renomear_midia(self, midia, novo: str) -> bool:
+        """Retorna False se a mídia não for deste catálogo; título já usado gera ValueError."""
+        with self._trava_catalogo:
+            if midia not in self.catalogo:
+                return False
+            antigo = midia.titulo
+            # A busca é chaveada pelo título: sai com o antigo e volta (pendente) com o novo
+            if not any(m is midia for m in self._busca_pendentes):
+                self._busca.remover(midia)
+            try:
+                self.catalogo.renomear(midia, novo)
+            finally:
+                self.reindexar_midia(midia)
+            self.eventos.emitir("midia_alterada", app=self, midia=midia, campos=("titulo",), antigo=antigo)
+        return True
+
+    # A mídia volta para a fila da busca; a assinatura (campos + .txt) decide se é retokenizada
+    def reindexar_midia(self, midia) -> None:
+        with self._trava_catalogo:
+            if not any(m is midia for m in self._busca_pendentes):
+                self._busca_pendentes.append(midia)
+
+    # Observador de config/: arquivos novos ou alterados entram sem reimportar tudo
+    def observar_config(self, **parametros):
+        """Inicia (uma vez) o ObservadorConfig em segundo plano e o retorna."""
+        from Streaming.observador import ObservadorConfig
+
+        if self.observador is None:
+            self.observador = ObservadorConfig(self, **parametros)
+            self.observador.iniciar()
+        return self.observador
+
+    # Índice de busca com as mídias pendentes já indexadas
+    @property
+    def busca(self) -> "IndiceBusca":
+        if self._busca_pendentes:
+            with self._trava_catalogo:
+                pendentes, self._busca_pendentes = self._busca_pendentes, []
+                for midia in pendentes:
+                    self._busca.adicionar(midia)
+        return self._busca
+
+    @busca.setter
+    def busca(self, indice: "IndiceBusca") -> None:
+        self._busca = indice
+
+    # Mídia do catálogo deste app pelo título
+    def buscar_midia(self, titulo: str):
+        return self.catalogo.buscar(titulo)
+
+    # Busca textual (títulos, artistas, gêneros, hosts e letras), tolerante a erros
+    def buscar_midias(self, consulta: str, limite: int = 10) -> list:
+        with self._trava_catalogo:
+            return [m for m, _ in self.busca.buscar(consulta, limite)]
+
+    # Navegação pelo catálogo usando os índices secundários (filtros combinados)
+    def navegar(self, genero: str = None, artista: str = None, host: str = None, temporada: str = None,
+                duracao_min: int = None, duracao_max: int = None) -> list:
+        """
+        Retorna as mídias que atendem a todos os filtros informados.
+        O filtro mais seletivo (temporada > host > gênero > artista > duração)
+        é resolvido no índice; os demais são conferidos só nos candidatos.
+        """
+        with self._trava_catalogo:
+            if host and temporada:
+                candidatos = self.indices.episodios(host, temporada)
+            elif host:
+                candidatos = self.indices.por_host(host)
+            elif genero:
+                candidatos = self.indices.por_genero(genero, duracao_min, duracao_max)
+            elif artista:
+                candidatos = self.indices.por_artista(artista)
+            else:
+                candidatos = self.indices.por_duracao(duracao_min, duracao_max)
+
+        def casa(m) -> bool:
+            if genero and getattr(m, "genero", "").strip().lower() != genero.strip().lower():
+                return False
+            if artista and m.artista.strip().lower() != artista.strip().lower():
+                return False
+            if duracao_min is not None and m.duracao < duracao_min:
+                return False
+            if duracao_max is not None and m.duracao > duracao_max:
+                return False
+            return True
+
+        return [m for m in candidatos if casa(m)]
+
+    # Carrega o índice salvo; só as mídias novas ou alteradas serão reindexadas
+    def carregar_indice_busca(self, caminho: Path = CAMINHO_INDICE_BUSCA) -> None:
+        from Streaming.busca import IndiceBusca
+
+        with self._trava_catalogo:
+            self._busca_pendentes = []      # todas entram abaixo
+            self.busca = IndiceBusca.carregar(caminho)
+            for m in self.musicas + self.podcasts:
+                self.busca.adicionar(m)
+
+    # Remove do índice o que saiu do catálogo e grava, se algo mudou
+    def salvar_indice_busca(self, caminho: Path = CAMINHO_INDICE_BUSCA) -> None:
+        with self._trava_catalogo:
+            self.busca.podar(self.musicas + self.podcasts)
+            if self.busca.alterado or not Path(caminho).exists():
+                try:
+                    self.busca.salvar(caminho)
+                except OSError as e:
+                    print(f"[Aviso] Índice de busca não foi salvo: {e}")
+
+    # Busca um usuário pelo nome (case insensitive, sem espaços)
+    def buscar_usuario(self, nome: str):
+        chave = (nome or "").strip().lower()
+        return next((u for u in self.usuarios if u.nome.strip().lower() == chave), None)
+
+    # Busca uma playlist pelo nome exato (mesmo critério do menu)
+    def buscar_playlist(self, nome: str):
+        return next((p for p in self.playlists if p.nome == nome), None)
+
+    # Reproduz uma mídia e registra no histórico do usuário logado
+    def reproduzir_midia(self, usuario, midia, interativo: bool = True) -> None:
+        if self.escrita_adiada is not None and not interativo:
+            self.escrita_adiada.reproduzir(midia, usuario or None)
+            return
+        midia.reproduzir(interativo)
+        if usuario:
+            usuario.registrar_reproducao(midia.titulo)
+
+    # Reproduz uma playlist e registra cada mídia no histórico do usuário logado
+    def reproduzir_playlist(self, usuario, pl, interativo: bool = True) -> None:
+        if self.escrita_adiada is not None and not interativo:
+            self.escrita_adiada.reproduzir_playlist(pl, usuario or None)
+            return
+        pl.reproduzir(interativo)
+        if usuario:
+            for m in getattr(pl, "itens", []):
+                t = getattr(m, "titulo", None)
+                if t:
+                    usuario.registrar_reproducao(t)
+
+    # Rádio (continuação automática) com os vizinhos do recomendador do app
+    def radio(self, **parametros):
+        from Streaming.fila_reproducao import Radio
+
+        return Radio(self.catalogo, self.ativar_recomendacoes(), **parametros)
+
+    # Toca uma fila de reprodução (FilaReproducao) registrando no histórico do usuário
+    def reproduzir_fila(self, usuario, fila, limite: int = None, interativo: bool = True) -> int:
+        """
+        Toca as mídias da fila até ela acabar ou até 'limite' faixas (obrigatório
+        na prática com repetir="lista" ou rádio). A playlist da fila, se houver,
+        conta uma reprodução. Retorna quantas faixas tocaram.
+        """
+        if fila.playlist is not None:
+            fila.playlist.somar_reproducoes(1)
+        tocadas = 0
+        while limite is None or tocadas < limite:
+            midia = fila.proxima()
+            if midia is None:
+                break
+            self.reproduzir_midia(usuario, midia, interativo)
+            tocadas += 1
+        return tocadas
+
     # Método para salvar relatório em txt
     def salvar_relatorio_txt(self, caminho: Path = Path("relatorios/relatorio.txt")):
         linhas = []
@@ -140,22 +666,42 @@ class StreamingApp:
         linhas.append(f"Playlists: {len(self.playlists)}")
         linhas.append("")
         for pl in self.playlists:
-            dono = pl.usuario.nome if pl.usuario else "Desconhecido"
+            dono = pl.dono or "Desconhecido"
             linhas.append(f"- {pl.nome} (dono: {dono})")
             for m in pl.itens:
+                if m is None:
+                    continue
                 cls = m.__class__.__name__
                 artista_ou_autor = getattr(m, "artista", getattr(m, "autor", ""))
                 linhas.append(f"    * [{cls}] {m.titulo} - {artista_ou_autor}")
         caminho.parent.mkdir(parents=True, exist_ok=True)
         caminho.write_text("\n".join(linhas), encoding="utf-8")
-        print("Relatório salvo em relatorios/relatorio.txt")
+        print(f"Relatório salvo em {caminho}")
 
 def main():
+    from Streaming.instrumentacao import Instrumentacao
+    from Streaming.menu import Menu
+
     menu = Menu()
     app = StreamingApp()
 
+    # Estado salvo das execuções anteriores (só com STREAMING_BANCO); o markdown
+    # só acrescenta o que for novo
+    banco = caminho_banco()
+    if banco is not None:
+        carregados = app.abrir_armazenamento(banco)
+        if any(carregados.values()):
+            print(f"Banco carregado de {banco}: {carregados['midias']} mídias, "
+                  f"{carregados['usuarios']} usuários, {carregados['playlists']} playlists.")
+    app.carregar_indice_busca()
     importar_markdowns_para_main(app)
+    app.salvar_indice_busca()
     print("Importação concluída.")
+
+    # Mudanças em config/ (catálogos e letras) entram sozinhas, sem a opção 9
+    def avisar(resumo):
+        print(f"\n[config] '{resumo['arquivo']}' atualizado.")
+    app.observar_config(ao_aplicar=avisar)
  
     # Para manter a compatibilidade com fluxo atual
     usuarios = app.usuarios          
@@ -211,6 +757,7 @@ def main():
                 # "4": "Sair do sistema":
                 case "4":
                     print("Saindo do sistema...")
+                    app.fechar()
                     return
 
                 case _:
@@ -224,12 +771,20 @@ def main():
                 # "1": "Reproduzir uma música":
                 case "1":
                     titulo = input("Título da mídia a reproduzir: ").strip()
-                    midia = ArquivoDeMidia.buscar_por_titulo(titulo)
+                    midia = app.buscar_midia(titulo)
+                    if not midia and titulo:
+                        # Sem título exato: sugere pela busca textual (aceita erros de digitação)
+                        sugestoes = app.buscar_midias(titulo, limite=5)
+                        if sugestoes:
+                            print("Mídia não encontrada. Você quis dizer:")
+                            for i, s in enumerate(sugestoes, start=1):
+                                print(f"{i} - {s.titulo} — {s.artista}")
+                            escolha = input("Número da mídia (Enter para cancelar): ").strip()
+                            if escolha.isdigit() and 1 <= int(escolha) <= len(sugestoes):
+                                midia = sugestoes[int(escolha) - 1]
                     if midia:
-                        midia.reproduzir()
-                        # registra no histórico do usuário logado
-                        if usuario_logado:
-                            usuario_logado.registrar_reproducao(midia.titulo)
+                        # reproduz e registra no histórico do usuário logado
+                        app.reproduzir_midia(usuario_logado, midia)
                     else:
                         print("Música não encontrada.")
 
@@ -272,16 +827,17 @@ def main():
                             print("Nome inválido.")
                             continue
                     
-                    pl = next((p for p in app.playlists if p.nome == nome_pl), None)
+                    pl = app.buscar_playlist(nome_pl)
                     
                     if pl:
-                        print(f"Reproduzindo playlist '{pl.nome}':")
-                        pl.reproduzir()   # chama o método da classe Playlist
-                        if usuario_logado:
-                            for m in getattr(pl, "itens", []):
-                                t = getattr(m, "titulo", None)
-                                if t:
-                                    usuario_logado.registrar_reproducao(t)
+                        aleatorio = input("Aleatório? (s/N): ").strip().lower() == "s"
+                        print(f"Reproduzindo playlist '{pl.nome}'" + (" (aleatório):" if aleatorio else ":"))
+                        if aleatorio:
+                            # Ordem sorteada pela fila de reprodução, sem copiar a playlist
+                            app.reproduzir_fila(usuario_logado, pl.fila(aleatorio=True))
+                        else:
+                            # chama o método da classe Playlist e registra no histórico
+                            app.reproduzir_playlist(usuario_logado, pl)
                     else:
                         print("Playlist não encontrada.")
 
@@ -293,8 +849,7 @@ def main():
                             continue
 
                         # Chama o construtor da playlist
-                        pl = Playlist(nome, usuario_logado.nome)
-                        app.playlists.append(pl)
+                        pl = app.criar_playlist(usuario_logado, nome)
                         print(f"Playlist '{pl.nome}' criada.")
 
                         # Pergunta se quer adicionar mídias agora
@@ -305,7 +860,7 @@ def main():
                                 break
                             titulo = input("Título exato da música/podcast: ").strip()
                             if titulo:
-                                pl.adicionar_midia(titulo)
+                                pl.adicionar_midia(titulo, app.catalogo)
 
                 # "7": "Concatenar playlists":
                 case "7":
@@ -313,18 +868,11 @@ def main():
                     destino = input("Playlist 1 destino: ").strip()
                     juntar = input("Playlist 2 a ser juntada: ").strip()
 
-                    # Encontra as playlists pelos nomes
-                    p1_destino = next((p for p in app.playlists if p.nome == destino), None)
-                    p2_juntar  = next((p for p in app.playlists if p.nome == juntar), None)
-
-                    if p1_destino and p2_juntar:
-                        # Chama o método __add__ para concatenar
-                        nova = p1_destino + p2_juntar
-
-                        # Remove a antiga da lista e põe a nova concatenada no mesmo lugar de p1_destino
-                        app.playlists = [p if p is not p1_destino else nova for p in app.playlists]
+                    # Encontra as playlists pelos nomes e concatena (usa __add__)
+                    nova = app.concatenar_playlists(destino, juntar)
 
-                        print(f"Playlists '{p1_destino.nome}' e '{p2_juntar.nome}' concatenadas em '{p1_destino.nome}'.")
+                    if nova:
+                        print(f"Playlists '{destino}' e '{juntar}' concatenadas em '{destino}'.")
                         print(f"A nova playlist tem {len(nova)} mídias.")   # usa __len__
                     
                     else:    
@@ -333,19 +881,21 @@ def main():
 
                 # "8": "Gerar relatório":
                 case "8":
-                    destino = Analises.salvar_relatorio(
-                        musicas=app.musicas,
-                        playlists=app.playlists,
-                        usuarios=app.usuarios,
-                        top_n=10,               
+                    app.descarregar_reproducoes()
+                    # Relatório materializado: só as seções alteradas desde o último são refeitas
+                    destino = app.relatorio.salvar(
                         pasta="Relatório",
                         arquivo="relatorio.txt",
+                        top_n=10,
+                        series=app.series,
+                        aprox=app.aprox,
                     )
                     print(f"Relatório salvo em {destino}")               
 
                 #"9: Ler arquivo markdown e importar mídias":
                 case "9":
                     importar_markdowns_para_main(app)
+                    app.salvar_indice_busca()
                     print("Importação concluída.")
 
                 # "10": "Sair":
@@ -353,6 +903,50 @@ def main():
                     print(f"Usuário '{usuario_logado.nome}' saiu da conta.")
                     usuario_logado = None
 
+                # "11": "Métricas de desempenho":
+                case "11":
+                    print(Instrumentacao.formatar())
+                    if not Instrumentacao.ativo:
+                        ativar = input("Instrumentação desligada. Ativar agora? (s/N) ").strip().lower()
+                        if ativar == "s":
+                            Instrumentacao.ativar()
+                            print("Instrumentação ativada.")
+
+                # "12": "Recomendações para você":
+                case "12":
+                    sugestoes = app.recomendar(usuario=usuario_logado, n=10)
+                    if not sugestoes:
+                        print("Sem recomendações ainda: reproduza algumas mídias primeiro.")
+                    else:
+                        print("Para ouvir em seguida:")
+                        for i, (m, _) in enumerate(sugestoes, start=1):
+                            print(f"{i} - {m.titulo} — {m.artista}")
+                        escolha = input("Número da mídia para reproduzir (Enter para voltar): ").strip()
+                        if escolha.isdigit() and 1 <= int(escolha) <= len(sugestoes):
+                            app.reproduzir_midia(usuario_logado, sugestoes[int(escolha) - 1][0])
+
+                # "13": "Gerar playlist automática":
+                case "13":
+                    nome = input("Nome da nova playlist: ").strip()
+                    minutos = input("Duração máxima em minutos: ").strip()
+                    if not nome or not minutos.isdigit() or int(minutos) <= 0:
+                        print("Nome ou duração inválidos.")
+                        continue
+                    genero = input("Gênero (Enter para qualquer): ").strip() or None
+                    artista = input("Artista (Enter para qualquer): ").strip() or None
+                    nota = input("Nota mínima 0-5 (Enter para nenhuma): ").strip()
+                    try:
+                        nota_minima = float(nota) if nota else None
+                    except ValueError:
+                        print("Nota inválida.")
+                        continue
+                    pl = app.gerar_playlist(usuario_logado, nome, int(minutos) * 60, genero=genero,
+                                            artista=artista, nota_minima=nota_minima)
+                    total = sum(m.duracao for m in pl.itens)
+                    print(f"Playlist '{pl.nome}' criada com {len(pl)} mídias ({total // 60} min {total % 60} s).")
+                    for m in pl.itens:
+                        print(f"  - {m.titulo} — {m.artista}")
+
                 case _:
                     print("Opção inválida. Tente novamente.")
 
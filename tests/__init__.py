@@ -0,0 +1,2 @@
+# tests/__init__.py
+# Pacote de testes (python -m pytest na raiz do projeto)
@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""
+Apoio dos testes: apps com catálogo, usuários e playlists sintéticos. Nada
+em config/, logs/ ou Relatório/ é alterado; o que é gravado vai para tmp_path.
+"""
+import contextlib
+import random
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+# App com catálogo, usuários e playlists sintéticos
+def criar_app_sintetico(musicas=60, usuarios=8, playlists=6, semente=1):
+    from main import StreamingApp
+    from Streaming.arquivo_midia import Musica, Podcast
+
+    rnd = random.Random(semente)
+    app = StreamingApp()
+    app.adicionar_midias([Musica(f"Musica {i}", 60 + i * 7 % 500, f"Artista {i % 7}", f"Genero {i % 4}")
+                          for i in range(musicas)]
+                         + [Podcast(f"Podcast {i}", 900 + i, f"Autor {i}", i + 1, "Temporada 1", f"Host {i % 3}")
+                            for i in range(musicas // 10)])
+    for i in range(usuarios):
+        app.criar_novo_usuario(f"Ouvinte {i}")
+    with contextlib.redirect_stdout(None):
+        for i in range(playlists):
+            pl = app.criar_playlist(app.usuarios[i % usuarios], f"Lista {i}")
+            for m in rnd.sample(app.musicas, 5):
+                pl.adicionar_midia(m.titulo, app.catalogo)
+    return app
+
+
+# Fábrica de apps sintéticos; os apps criados são fechados no fim do teste
+@pytest.fixture
+def app_sintetico():
+    apps = []
+
+    def criar(**opcoes):
+        apps.append(criar_app_sintetico(**opcoes))
+        return apps[-1]
+
+    yield criar
+    for app in apps:
+        app.fechar()
@@ -0,0 +1,76 @@
+# tests/test_agregados.py
+"""Agregados do relatório em shards num pool de processos x cálculo serial."""
+import random
+from array import array
+from datetime import datetime
+
+import pytest
+
+from Streaming import agregados
+from Streaming.analises import Analises
+from Streaming.arquivo_midia import Musica
+from Streaming.playlist import Playlist
+from Streaming.usuarios import Usuario
+
+
+# Coleções com muitos empates (o desempate pelo índice original precisa sobreviver aos shards)
+def _colecoes(semente=3, musicas=3000):
+    rnd = random.Random(semente)
+    ms = [Musica(f"Musica {i}", rnd.randint(60, 600), f"Artista {i % 97}", "Rock",
+                 reproducoes=rnd.randint(0, 50), avaliacoes=[rnd.randint(0, 5) for _ in range(rnd.randint(0, 8))])
+          for i in range(musicas)]
+    us = [Usuario(f"Usuario {i}") for i in range(300)]
+    for u in us:
+        u.historico.ids = array("I", [rnd.randrange(len(ms))]) * rnd.randint(0, 40)
+    pls = [Playlist(f"Lista {i}", us[i % len(us)], reproducoes=rnd.randint(0, 20)) for i in range(300)]
+    return ms, pls, us
+
+
+# Conta os pools criados, para garantir que o caminho paralelo rodou
+@pytest.fixture
+def pools(monkeypatch):
+    criados = []
+
+    class PoolContado(agregados.ProcessPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            criados.append(kwargs.get("max_workers"))
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(agregados, "LIMIAR_PARALELO", 1)
+    monkeypatch.setattr(agregados, "ProcessPoolExecutor", PoolContado)
+    return criados
+
+
+@pytest.mark.parametrize("processos", [2, 3])
+def test_agregados_paralelos_iguais_aos_seriais(pools, processos):
+    musicas, playlists, usuarios = _colecoes()
+    serial = agregados.calcular(musicas, playlists, usuarios, 10, processos=1)
+    paralelo = agregados.calcular(musicas, playlists, usuarios, 10, processos=processos)
+    assert pools == [processos]
+    assert paralelo == serial
+    assert list(paralelo[3]) == list(serial[3])     # médias na mesma ordem
+
+
+def test_relatorio_paralelo_igual_ao_serial(pools):
+    musicas, playlists, usuarios = _colecoes()
+    agora = datetime.now()
+    serial = Analises.montar_relatorio(musicas, playlists, usuarios, 10, processos=1, gerado_em=agora)
+    paralelo = Analises.montar_relatorio(musicas, playlists, usuarios, 10, processos=2, gerado_em=agora)
+    assert pools == [2]
+    assert paralelo == serial
+
+
+# Combinar shards de tamanhos desiguais dá o mesmo que um shard só
+def test_combinar_shards_desiguais():
+    musicas, playlists, usuarios = _colecoes(semente=5, musicas=101)
+    inteiro = agregados.combinar([(c, 0, agregados._PARCIAIS[c](d, 0, 7)) for c, d in
+                                  (("musicas", musicas), ("playlists", playlists), ("usuarios", usuarios))],
+                                 musicas, playlists, usuarios, 7)
+    parciais = [("musicas", i, agregados.parcial_musicas(musicas[i:f], i, 7))
+                for i, f in agregados._faixas(len(musicas), 4)]
+    parciais += [("playlists", i, agregados.parcial_playlists(playlists[i:f], i, 7))
+                 for i, f in agregados._faixas(len(playlists), 3)]
+    parciais += [("usuarios", i, agregados.parcial_usuarios(usuarios[i:f], i, 7))
+                 for i, f in agregados._faixas(len(usuarios), 5)]
+    random.Random(1).shuffle(parciais)      # a ordem de chegada dos parciais não importa
+    assert agregados.combinar(parciais, musicas, playlists, usuarios, 7) == inteiro
@@ -0,0 +1,65 @@
+# tests/test_busca.py
+"""Busca textual: BM25 com pesos por campo, prefixo, aproximada e índice incremental."""
+from Streaming.arquivo_midia import Musica, Podcast
+from Streaming.busca import IndiceBusca
+
+
+def _indice():
+    midias = [Musica("Rapsodia Boemia", 354, "Rainha", "Rock"),
+              Musica("Noite Boemia", 200, "Banda Rapsodia", "Samba"),
+              Musica("Chuva de Verao", 180, "Outra Banda", "Pop"),
+              Podcast("Papo de Rock", 1800, "Autor", 3, "T1", "Rafael")]
+    indice = IndiceBusca()
+    for m in midias:
+        indice.adicionar(m)
+    return indice, midias
+
+
+def _titulos(indice, consulta, **opcoes):
+    return [m.titulo for m, _ in indice.buscar(consulta, **opcoes)]
+
+
+# O título pesa mais que o artista; termos ausentes não pontuam
+def test_bm25_pesos_por_campo():
+    indice, _ = _indice()
+    assert _titulos(indice, "rapsodia")[:2] == ["Rapsodia Boemia", "Noite Boemia"]
+    assert _titulos(indice, "rock") == ["Papo de Rock", "Rapsodia Boemia"]
+    assert _titulos(indice, "rafael") == ["Papo de Rock"]
+    assert indice.buscar("inexistente") == [] and indice.buscar("") == []
+
+
+# Prefixo só no último termo; sem termo exato, casamento aproximado por trigramas
+def test_prefixo_e_aproximada():
+    indice, _ = _indice()
+    assert _titulos(indice, "chuva ver") == ["Chuva de Verao"]
+    assert _titulos(indice, "ver chuva") == ["Chuva de Verao"]
+    assert _titulos(indice, "bohemia") == ["Rapsodia Boemia", "Noite Boemia"]
+    assert _titulos(indice, "rapsodya")[0] == "Rapsodia Boemia"
+    assert _titulos(indice, "bohemia", aproximado=False) == []
+    assert _titulos(indice, "rapso", prefixo=False, aproximado=False) == []
+
+
+# Alteração, remoção e poda mantêm o índice igual ao catálogo
+def test_indice_incremental():
+    indice, midias = _indice()
+    chuva = midias[2]
+    chuva.artista = "Rainha"
+    assert indice.adicionar(chuva)
+    assert _titulos(indice, "rainha") == ["Rapsodia Boemia", "Chuva de Verao"]
+    assert not indice.adicionar(chuva)
+    assert indice.remover(midias[0]) and not indice.remover(midias[0])
+    assert _titulos(indice, "rapsodia") == ["Noite Boemia"]
+    assert indice.podar(midias[1:3]) == 1 and len(indice) == 2
+
+
+# Salvo e recarregado: só o que mudou é tokenizado de novo
+def test_salvar_e_carregar(tmp_path):
+    indice, midias = _indice()
+    caminho = indice.salvar(tmp_path / "indice.json")
+    assert not indice.alterado
+    lido = IndiceBusca.carregar(caminho)
+    midias[1].genero = "Forro"
+    assert [lido.adicionar(m) for m in midias] == [False, True, False, False]
+    assert _titulos(lido, "forro") == ["Noite Boemia"]
+    assert _titulos(lido, "rapsodia")[:2] == _titulos(indice, "rapsodia")[:2]
+    assert len(IndiceBusca.carregar(tmp_path / "ausente.json")) == 0
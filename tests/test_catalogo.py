@@ -0,0 +1,64 @@
+# tests/test_catalogo.py
+"""Catálogo por app: título único, consultas, remoção em lote e playlists."""
+import contextlib
+import gc
+import weakref
+
+from Streaming.arquivo_midia import Musica, Podcast
+from Streaming.catalogo import Catalogo
+from Streaming.ids import RegistroIds
+from Streaming.playlist import Playlist
+
+
+def _catalogo():
+    cat = Catalogo(RegistroIds())
+    cat.adicionar_varios([Musica("Hello", 200, "Adele", "Pop"), Musica("Halo", 210, "Beyonce", "Pop"),
+                          Podcast("Papo", 1800, "Autor", 1, "T1", "Host")])
+    return cat
+
+
+# Título único sem diferenciar maiúsculas; o objeto repetido fica de fora
+def test_titulo_unico_e_consultas():
+    cat = _catalogo()
+    hello = cat.buscar(" hello ")
+    assert hello is cat.musicas[0] and len(cat) == 3 and [p.titulo for p in cat.podcasts] == ["Papo"]
+    repetida = Musica("HELLO", 1, "Outra", "Rock")
+    assert not cat.adicionar(repetida) and cat.buscar("Hello") is hello
+    assert "hello" in cat and hello in cat and repetida not in cat
+    assert cat.por_id(hello.id) is hello and hello._registro is cat.registro
+    assert list(cat) == cat.musicas + cat.podcasts
+
+
+# Só o próprio objeto sai; as listas são reescritas no lugar
+def test_remover_varios():
+    cat = _catalogo()
+    musicas = cat.musicas
+    hello, papo = cat.buscar("Hello"), cat.buscar("Papo")
+    assert cat.remover_varios([Musica("Hello", 200, "Adele", "Pop")]) == []
+    assert cat.remover_varios([hello, papo]) == [hello, papo]
+    assert cat.buscar("Hello") is None and cat.por_id(hello.id) is None and hello not in cat
+    assert cat.musicas is musicas and [m.titulo for m in musicas] == ["Halo"] and cat.podcasts == []
+    assert cat.adicionar(Musica("Hello", 180, "Adele", "Pop"))
+
+
+# O catálogo não segura objetos que nunca incluiu
+def test_descartados_sao_liberados():
+    cat = _catalogo()
+    fora = Musica("Solta", 100, "X", "Y")
+    ref = weakref.ref(fora)
+    cat.adicionar(Musica("Solta", 100, "X", "Y"))
+    del fora
+    gc.collect()
+    assert ref() is None and cat.buscar("Solta") is not None
+
+
+# Playlist: com o catálogo do app ou, sem ele, pelo registro de IDs da playlist
+def test_playlist_adicionar_midia(app_sintetico):
+    app = app_sintetico(musicas=10, usuarios=1, playlists=0)
+    pl = app.criar_playlist(app.usuarios[0], "Nova")
+    with contextlib.redirect_stdout(None):
+        assert pl.adicionar_midia("musica 1", app.catalogo)
+        assert pl.adicionar_midia("Musica 2")
+        assert not pl.adicionar_midia("Inexistente")
+        assert not Playlist("Solta").adicionar_midia("Musica 3", Catalogo(RegistroIds()))
+    assert pl.itens == [app.musicas[1], app.musicas[2]]
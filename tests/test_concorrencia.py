@@ -0,0 +1,63 @@
+# tests/test_concorrencia.py
+"""Sessões em threads paralelas sobre o mesmo StreamingApp."""
+import contextlib
+import random
+import sys
+import threading
+
+
+# Roda 'threads' sessões ao mesmo tempo; devolve as contagens por mídia de cada sessão
+def _rodar_sessoes(app, threads: int = 6, reproducoes: int = 1000) -> list:
+    midias = app.musicas + app.podcasts
+    contagens = [dict() for _ in range(threads)]
+    erros = []
+    largada = threading.Barrier(threads)
+
+    def sessao(i):
+        try:
+            rnd = random.Random(i)
+            largada.wait()
+            u = app.criar_novo_usuario(f"Sessao {i}")
+            app.criar_novo_usuario("Sessao Compartilhada")   # só uma thread pode criar
+            pl = app.criar_playlist(u, f"Paralela {i}")
+            with contextlib.redirect_stdout(None):
+                for m in rnd.sample(midias, 3):
+                    pl.adicionar_midia(m.titulo, app.catalogo)
+            for n in range(reproducoes):
+                if n % 10 == 0:
+                    app.reproduzir_playlist(u, pl, interativo=False)
+                    tocadas = pl.itens
+                else:
+                    tocadas = [rnd.choice(midias)]
+                    app.reproduzir_midia(u, tocadas[0], interativo=False)
+                for m in tocadas:
+                    contagens[i][id(m)] = contagens[i].get(id(m), 0) + 1
+        except Exception as e:
+            erros.append(e)
+
+    troca = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)     # força trocas de thread frequentes
+    try:
+        rodando = [threading.Thread(target=sessao, args=(i,)) for i in range(threads)]
+        for t in rodando:
+            t.start()
+        for t in rodando:
+            t.join()
+    finally:
+        sys.setswitchinterval(troca)
+    assert not erros
+    return contagens
+
+
+# Nenhuma reprodução, histórico ou criação se perde entre as threads
+def test_sessoes_paralelas_contadores_exatos(app_sintetico):
+    app = app_sintetico()
+    contagens = _rodar_sessoes(app)
+    midias = app.musicas + app.podcasts
+
+    esperado = {id(m): sum(c.get(id(m), 0) for c in contagens) for m in midias}
+    assert {id(m): m.reproducoes for m in midias} == esperado
+    for i in range(len(contagens)):
+        assert len(app.buscar_usuario(f"Sessao {i}").historico) == sum(contagens[i].values())
+        assert app.buscar_playlist(f"Paralela {i}").reproducoes == 100
+    assert sum(u.nome == "Sessao Compartilhada" for u in app.usuarios) == 1
@@ -0,0 +1,101 @@
+# tests/test_deduplicacao.py
+"""Deduplicação aproximada das mídias na importação."""
+import random
+import string
+
+from config.lermarkdown import LerMarkdown
+from Streaming.deduplicacao import Deduplicador, assinatura_titulo
+
+
+def test_assinatura_ignora_qualificadores_neutros():
+    base = assinatura_titulo("Bohemian Rhapsody")
+    for variacao in ("BOHEMIAN RHAPSODY", "Bohemian Rhapsody (Remastered)", "Bohemian Rhapsody - 2011 Remaster",
+                     "Bohêmian Rhapsody!"):
+        assert assinatura_titulo(variacao) == base
+    assert assinatura_titulo("Symphony No. 5") != assinatura_titulo("Symphony No. 9")
+
+
+# Decisões em casos conhecidos
+def test_deduplicacao_decisoes():
+    dedup = Deduplicador()
+
+    def decidir(titulo, artista, duracao, referencia=None, **opcoes):
+        d = dedup.decidir(titulo, artista, duracao, **opcoes)
+        dedup.incluir(d, referencia)
+        return d
+
+    assert decidir("Bohemian Rhapsody", "Queen", 354, "original").acao == "nova"
+    for variacao in ("Bohemian Rhapsody (Remastered)", "BOHEMIAN RHAPSODY - 2011 Remaster", "Bohemian Rhapsdy"):
+        d = decidir(variacao, "Queen", 355)
+        assert (d.acao, d.canonico) == ("mesclada", "original")
+    # Mesmo título de outro artista (ou gravação de outra duração) entra desambiguado
+    d = decidir("Bohemian Rhapsody", "Panic", 200, "panic")
+    assert (d.acao, d.titulo) == ("homonima", "Bohemian Rhapsody (Panic)")
+    assert decidir("Bohemian Rhapsody", "Panic", 201).canonico == "panic"
+    assert decidir("Bohemian Rhapsody", "Queen", 600, "longa").titulo == "Bohemian Rhapsody (Queen)"
+    assert decidir("Bohemian Rhapsody", "Queen", 900).acao == "conflito"
+    # Números do título e episódios diferentes nunca são mesclados
+    assert decidir("Symphony No. 5", "Beethoven", 400, "5").acao == "nova"
+    assert decidir("Symphony No. 9", "Beethoven", 400).acao == "nova"
+    assert decidir("Cinema em Debate", "Host", 1800, "ep42", tipo="podcast", extra=("cinecast", 42)).acao == "nova"
+    assert decidir("Cinema em Debate", "Host", 1800, tipo="podcast", extra=("cinecast", 43)).acao == "homonima"
+    assert decidir("Cinema em Debate", "Host", 1800, tipo="podcast", extra=("cinecast", 42)).canonico == "ep42"
+
+
+# Catálogo sintético com gabarito: nenhuma mesclagem errada ou perdida, custo limitado
+def test_deduplicacao_catalogo_sintetico():
+    rnd = random.Random(1)
+    palavras = ["".join(rnd.choice(string.ascii_lowercase) for _ in range(rnd.randint(3, 9))) for _ in range(2000)]
+    artistas = [f"Artista {i}" for i in range(150)]
+
+    def variacao(titulo):
+        tipo = rnd.randrange(4)
+        if tipo == 0:
+            return titulo.upper()
+        if tipo == 1:
+            return f"{titulo} (Remastered)"
+        if tipo == 2:
+            return f"{titulo} - {rnd.randint(1990, 2024)} Remaster"
+        return f"{titulo} (feat. {rnd.choice(artistas)})"
+
+    faixas, registros = [], []
+    for _ in range(3000):
+        if faixas and rnd.random() < 0.3:
+            f = rnd.randrange(len(faixas))
+            titulo, artista, duracao = faixas[f]
+            registros.append((variacao(titulo), artista, duracao + rnd.randint(-2, 2), f))
+            continue
+        titulo = " ".join(rnd.choice(palavras) for _ in range(rnd.randint(2, 5))).title()
+        faixas.append((titulo, rnd.choice(artistas), rnd.randint(90, 600)))
+        registros.append((*faixas[-1], len(faixas) - 1))
+
+    dedup = Deduplicador()
+    certas = erradas = 0
+    for titulo, artista, duracao, faixa in registros:
+        d = dedup.decidir(titulo, artista, duracao)
+        if d.acao == "mesclada":
+            certas += d.canonico == faixa
+            erradas += d.canonico != faixa
+        else:
+            dedup.incluir(d, faixa)
+    assert erradas == 0
+    assert certas == len(registros) - len(faixas)
+    # Blocos limitados: bem menos de uma comparação por par de registros
+    assert dedup.comparacoes < 2 * dedup.max_bloco * len(registros)
+
+
+# Na importação, a playlist que cita o título variante passa a usar a mídia canônica
+def test_importacao_mescla_e_religa_playlists(tmp_path):
+    secoes = [
+        ("Usuários", [{"nome": "Ana", "playlists": ["Favoritas"]}]),
+        ("Músicas", [{"titulo": "Hello", "artista": "Adele", "genero": "Pop", "duracao": "295"},
+                     {"titulo": "Hello (Remastered)", "artista": "Adele", "genero": "Pop", "duracao": "296"},
+                     {"titulo": "Hello", "artista": "Lionel Richie", "genero": "Soul", "duracao": "251"}]),
+        ("Playlists", [{"nome": "Favoritas", "usuario": "Ana", "itens": ["Hello (Remastered)"]}]),
+    ]
+    leitor = LerMarkdown(deduplicador=Deduplicador())
+    leitor._log_file = tmp_path / "erros.log"
+    resultado = leitor.parse_registros(secoes)
+    assert [m.titulo for m in resultado["musicas"]] == ["Hello", "Hello (Lionel Richie)"]
+    assert len(resultado["mesclagens"]) == 1
+    assert [m.titulo for m in resultado["playlists"][0].itens] == ["Hello"]
@@ -0,0 +1,56 @@
+# tests/test_escrita_adiada.py
+"""Escrita adiada (write-behind) das reproduções."""
+import threading
+
+from Streaming.escrita_adiada import EscritaAdiada
+from tests.test_concorrencia import _rodar_sessoes
+
+
+# Com threads: a leitura (modelo + pendentes) bate antes da descarga e o modelo depois
+def test_sessoes_paralelas_com_escrita_adiada(app_sintetico):
+    app = app_sintetico()
+    app.ativar_escrita_adiada(lote=64)
+    contagens = _rodar_sessoes(app)
+    midias = app.musicas + app.podcasts
+
+    esperado = {id(m): sum(c.get(id(m), 0) for c in contagens) for m in midias}
+    assert {id(m): app.reproducoes(m) for m in midias} == esperado
+    app.descarregar_reproducoes()
+    assert {id(m): m.reproducoes for m in midias} == esperado
+    for i in range(len(contagens)):
+        assert len(app.buscar_usuario(f"Sessao {i}").historico) == sum(contagens[i].values())
+        assert app.buscar_playlist(f"Paralela {i}").reproducoes == 100
+
+
+# O lote é aplicado com um incremento e um evento por mídia, levando a quantidade
+def test_lote_aplicado_de_uma_vez(app_sintetico):
+    app = app_sintetico()
+    adiada = app.ativar_escrita_adiada(lote=10, intervalo=60)
+    qtdes = []
+    app.eventos.assinar("reproducao", lambda midia, qtde=1, **_: qtdes.append(qtde))
+    midia, usuario = app.musicas[0], app.usuarios[0]
+    for _ in range(9):
+        app.reproduzir_midia(usuario, midia, interativo=False)
+    assert (midia.reproducoes, adiada.pendentes(midia), app.reproducoes(midia)) == (0, 9, 9)
+    assert qtdes == []
+    app.reproduzir_midia(usuario, midia, interativo=False)      # décima: fecha o lote
+    assert (midia.reproducoes, adiada.pendentes(midia)) == (10, 0)
+    assert qtdes == [10]
+    assert list(usuario.historico) == [midia.titulo] * 10
+
+
+# O buffer de uma thread encerrada é aplicado e sai da lista
+def test_buffers_de_threads_encerradas_sao_descartados(app_sintetico):
+    app = app_sintetico()
+    adiada = EscritaAdiada(lote=1000, intervalo=60)
+    try:
+        midia = app.musicas[0]
+        for _ in range(20):
+            t = threading.Thread(target=adiada.reproduzir, args=(midia,))
+            t.start()
+            t.join()
+        adiada.descarregar()
+        assert midia.reproducoes == 20
+        assert len(adiada._buffers) == 0
+    finally:
+        adiada.fechar()
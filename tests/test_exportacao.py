@@ -0,0 +1,78 @@
+# tests/test_exportacao.py
+"""Exportação das métricas por música: csv, jsonl e colunar lidos de volta."""
+import csv
+import json
+import random
+
+import pytest
+
+from Streaming import exportacao
+from Streaming.analises import Analises
+
+
+# App com reproduções, avaliações e textos fora do ASCII (vírgulas, aspas, acentos)
+def _app(app_sintetico):
+    app = app_sintetico(musicas=57, usuarios=1, playlists=0)
+    rnd = random.Random(8)
+    for m in app.musicas:
+        m.reproducoes = rnd.randint(0, 10 ** 9)
+        for _ in range(rnd.randint(0, 4)):
+            m.registrar_avaliacao(rnd.randint(0, 5))
+    app.musicas[0].artista = 'Ação, "Reação" & Cia'
+    app.musicas[1].genero = "Música\nPopular"
+    return app
+
+
+# Cada formato, lido de volta, dá as mesmas linhas, em lotes que não dividem o total
+@pytest.mark.parametrize("formato", ["csv", "jsonl", "colunar"])
+def test_ida_e_volta(app_sintetico, tmp_path, formato):
+    app = _app(app_sintetico)
+    esperado = [exportacao.linha_musica(m) for m in app.musicas]
+    destino, linhas = Analises.exportar_metricas(app.musicas, formato, tmp_path, lote=10)
+    assert linhas == len(esperado) and destino.suffix == exportacao.ESCRITORES[formato].extensao
+
+    if formato == "csv":
+        with open(destino, encoding="utf-8", newline="") as f:
+            leitor = csv.reader(f)
+            assert tuple(next(leitor)) == exportacao.NOMES
+            lidas = [tuple(tipo(v) for tipo, v in zip((int, str, str, str, int, int, int, float), linha))
+                     for linha in leitor]
+    elif formato == "jsonl":
+        with open(destino, encoding="utf-8") as f:
+            lidas = [tuple(json.loads(l)[n] for n in exportacao.NOMES) for l in f]
+    else:
+        blocos = list(exportacao.ler_colunar(destino))
+        assert [len(b["id"]) for b in blocos] == [10] * 5 + [7]
+        lidas = [tuple(b[n][j] for n in exportacao.NOMES) for b in blocos for j in range(len(b["id"]))]
+    assert lidas == esperado
+
+
+# Catálogo vazio: arquivos válidos sem linhas; formato desconhecido e arquivo inválido falham
+def test_vazio_e_erros(tmp_path):
+    for formato in ("csv", "jsonl", "colunar"):
+        destino, linhas = Analises.exportar_metricas([], formato, tmp_path)
+        assert linhas == 0
+    assert (tmp_path / "metricas.csv").read_text(encoding="utf-8").strip() == ",".join(exportacao.NOMES)
+    assert list(exportacao.ler_colunar(tmp_path / "metricas.col")) == []
+    with pytest.raises(ValueError):
+        Analises.exportar_metricas([], "xml", tmp_path)
+    (tmp_path / "falso.col").write_bytes(b"nada disso")
+    with pytest.raises(ValueError):
+        list(exportacao.ler_colunar(tmp_path / "falso.col"))
+
+
+# Formatos novos entram pelo registro; a base exige _gravar
+def test_registrar_escritor(tmp_path, monkeypatch):
+    class EscritorTSV(exportacao.EscritorMetricas):
+        extensao = ".tsv"
+
+        def _gravar(self, lote):
+            self._arquivo.writelines("\t".join(map(str, linha)) + "\n" for linha in lote)
+
+    monkeypatch.setitem(exportacao.ESCRITORES, "tsv", None)
+    exportacao.registrar_escritor("tsv", EscritorTSV)
+    assert exportacao.exportar(exportacao.lotes([(1, "a"), (2, "b"), (3, "c")], 2), "tsv",
+                               tmp_path / "m.tsv") == 3
+    assert (tmp_path / "m.tsv").read_text(encoding="utf-8") == "1\ta\n2\tb\n3\tc\n"
+    with pytest.raises(TypeError):
+        exportacao.EscritorMetricas(tmp_path / "base.txt")
@@ -0,0 +1,109 @@
+# tests/test_fila_reproducao.py
+"""Permutação preguiçosa e fila de reprodução (aleatório, repetição, rádio e janela)."""
+import itertools
+from collections import Counter
+
+import pytest
+
+from Streaming.arquivo_midia import Musica
+from Streaming.fila_reproducao import FilaReproducao, PermutacaoPreguicosa, Radio, criar_sessoes
+
+
+# Bijeção em range(n) nos dois modos (tabela e Feistel), nas bordas entre eles
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 7, 255, 256, 257, 1000, 4097, 20_001])
+def test_permutacao_e_bijecao(n):
+    perm = PermutacaoPreguicosa(n, 12345)
+    valores = list(perm)
+    assert len(perm) == n and sorted(valores) == list(range(n))
+    assert list(PermutacaoPreguicosa(n, 12345)) == valores
+    if n > 20:
+        assert list(PermutacaoPreguicosa(n, 54321)) != valores and valores != list(range(n))
+    with pytest.raises(IndexError):
+        perm[n]
+
+
+# Acesso fora de ordem dá o mesmo valor; no modo tabela as ordens de n=3 saem com a mesma frequência
+def test_permutacao_preguicosa_e_uniforme():
+    for n in (50, 5000):
+        perm, outra = PermutacaoPreguicosa(n, 7), PermutacaoPreguicosa(n, 7)
+        assert [perm[i] for i in (n - 1, 3, 0, n // 2)] == [outra[i] for i in (n - 1, 3, 0, n // 2)]
+        assert list(perm) == list(outra)
+    contagem = Counter(tuple(PermutacaoPreguicosa(3, chave)) for chave in range(6000))
+    assert set(contagem) == set(itertools.permutations(range(3)))
+    assert all(850 <= c <= 1150 for c in contagem.values())
+
+
+def _musicas(n, prefixo="Faixa"):
+    return [Musica(f"{prefixo} {i}", 100 + i, "Artista", "Pop") for i in range(n)]
+
+
+def _tocar(fila, n):
+    return [fila.proxima() for _ in range(n)]
+
+
+# Ordem da lista; aleatório toca cada faixa uma vez por volta, com ordem nova a cada volta
+def test_ordem_aleatorio_e_repeticao():
+    itens = _musicas(40)
+    assert list(FilaReproducao(itens, aquecer=None)) == itens
+    fila = FilaReproducao(itens, aleatorio=True, repetir="lista", semente=3, aquecer=None)
+    voltas = [_tocar(fila, 40) for _ in range(3)]
+    assert all(sorted(v, key=itens.index) == itens for v in voltas)
+    assert voltas[0] != voltas[1] != voltas[2] and voltas[0] != itens
+    assert fila.itens is itens and fila.tocadas == 120
+    faixa = FilaReproducao(itens, repetir="faixa", aquecer=None)
+    assert _tocar(faixa, 3) == [itens[0]] * 3
+    with pytest.raises(ValueError):
+        FilaReproducao(itens, repetir="sempre")
+
+
+# Enfileiradas tocam antes; proximas() não avança; desligar o aleatório volta à ordem da lista
+def test_enfileirar_proximas_e_embaralhar():
+    itens, extras = _musicas(10), _musicas(2, "Extra")
+    aquecidas = []
+    fila = FilaReproducao(itens, janela=3, aquecer=aquecidas.append)
+    assert fila.proxima() is itens[0] and aquecidas == itens[:4]
+    fila.enfileirar(extras[0])
+    fila.enfileirar(extras[1])
+    assert fila.proximas() == [extras[0], extras[1], itens[1]] and fila.proximas() == fila.proximas()
+    assert _tocar(fila, 3) == [extras[0], extras[1], itens[1]]
+    fila.embaralhar(True)
+    aleatorias = _tocar(fila, 3)
+    fila.embaralhar(False)
+    assert fila.proximas(2) == [itens[(itens.index(aleatorias[-1]) + k) % 10] for k in (1, 2)]
+    # Faixas incluídas na lista durante a sessão entram na continuação
+    fila = FilaReproducao(itens[:2], janela=1, aquecer=None)
+    assert fila.proxima() is itens[0]
+    fila.itens.append(itens[5])
+    assert _tocar(fila, 3) == [itens[1], itens[5], None]
+
+
+# Rádio: continua depois do fim sem repetir as recentes; com recomendador segue os vizinhos
+def test_radio(app_sintetico):
+    app = app_sintetico(musicas=30, usuarios=2, playlists=0)
+    radio = Radio(app.catalogo, memoria=10, semente=1)
+    fila = FilaReproducao(app.musicas[:2], radio=radio, aquecer=None)
+    tocadas = _tocar(fila, 40)
+    assert tocadas[:2] == app.musicas[:2] and None not in tocadas
+    assert all(len({m.id for m in tocadas[i:i + 10]}) == 10 for i in range(len(tocadas) - 10))
+
+    u = app.usuarios[0]
+    for _ in range(4):
+        for m in app.musicas[5:8]:
+            app.reproduzir_midia(u, m, interativo=False)
+    fila = FilaReproducao([app.musicas[5]], radio=app.radio(memoria=2, semente=1), aquecer=None)
+    assert _tocar(fila, 3) == app.musicas[5:8]
+
+
+# Pelo app: a fila conta as reproduções e a playlist; sessões em rodízio pelas playlists
+def test_reproduzir_fila_e_sessoes(app_sintetico):
+    app = app_sintetico(musicas=20, usuarios=1, playlists=3)
+    pl = app.playlists[0]
+    u = app.usuarios[0]
+    antes = pl.reproducoes
+    fila = FilaReproducao.da_playlist(pl, aleatorio=True, repetir="lista", semente=2, aquecer=None)
+    assert app.reproduzir_fila(u, fila, limite=12, interativo=False) == 12
+    assert pl.reproducoes == antes + 1 and len(u.historico) == 12
+    assert sum(m.reproducoes for m in pl.itens) >= 12
+    filas = criar_sessoes(app.playlists, 5, catalogo=app.catalogo, radio=True, aquecer=None)
+    assert [f.playlist for f in filas] == [app.playlists[i % 3] for i in range(5)]
+    assert all(None not in _tocar(f, 8) for f in filas)
@@ -0,0 +1,88 @@
+# tests/test_gerador_playlist.py
+"""Gerador de playlists: restrições, orçamento de duração e empacotamento."""
+import random
+
+import pytest
+
+from Streaming.arquivo_midia import Musica
+from Streaming.gerador_playlist import GeradorPlaylist
+from Streaming.indices import IndicesCatalogo
+
+
+def _indices(qtde=600, semente=3):
+    rnd = random.Random(semente)
+    indices = IndicesCatalogo()
+    musicas = []
+    for i in range(qtde):
+        m = Musica(f"Faixa {i}", rnd.randint(60, 480), f"Artista {i % 5}", ["Rock", "Jazz", "Pop"][i % 3])
+        m.id = i
+        m.reproducoes = rnd.randint(0, 5000)
+        for _ in range(rnd.randint(0, 3)):
+            m.avaliacoes.append(rnd.randint(0, 5))
+        indices.adicionar(m)
+        musicas.append(m)
+    return indices, musicas
+
+
+def _media(m):
+    return sum(m.avaliacoes) / len(m.avaliacoes) if m.avaliacoes else None
+
+
+# Cabe no orçamento e, depois do empacotamento, nenhuma faixa de fora ainda caberia
+def test_empacotar_respeita_orcamento_e_preenche_sobra():
+    rnd = random.Random(1)
+    for _ in range(200):
+        candidatos = [Musica(f"F{i}", rnd.randint(1, 50), "A", "G") for i in range(rnd.randint(0, 15))]
+        orcamento = rnd.randint(0, 200)
+        escolhidas = GeradorPlaylist.empacotar(candidatos, orcamento, GeradorPlaylist.pontuacao)
+        usado = sum(m.duracao for m in escolhidas)
+        assert usado <= orcamento and len({id(m) for m in escolhidas}) == len(escolhidas)
+        assert all(usado + m.duracao > orcamento for m in candidatos if m not in escolhidas)
+
+
+# Todas as restrições valem em cada faixa, nos dois critérios e com a faixa do índice sorteada
+@pytest.mark.parametrize("criterio", ["variado", "popular"])
+def test_restricoes(criterio):
+    indices, musicas = _indices()
+    excluir = {m.id for m in musicas[:100]}
+    gerador = GeradorPlaylist(indices, candidatos=20, semente=7)
+    itens = gerador.gerar(1800, genero="rock", duracao_min=120, duracao_max=300, nota_minima=2,
+                          excluir=excluir, criterio=criterio)
+    assert itens and sum(m.duracao for m in itens) <= 1800
+    for m in itens:
+        assert m.genero == "Rock" and 120 <= m.duracao <= 300 and m.id not in excluir
+        assert _media(m) is not None and _media(m) >= 2
+    assert [GeradorPlaylist.pontuacao(m) for m in itens] == \
+        sorted((GeradorPlaylist.pontuacao(m) for m in itens), reverse=True)
+    assert gerador.gerar(1800, genero="rock", criterio=criterio) == \
+        GeradorPlaylist(indices, candidatos=20, semente=7).gerar(1800, genero="rock", criterio=criterio)
+    if criterio == "popular":
+        # Candidatos = os de maior pontuação entre os que passam nos filtros
+        aceitas = sorted((m for m in musicas if m.artista == "Artista 2" and m.duracao <= 900),
+                         key=GeradorPlaylist.pontuacao, reverse=True)
+        esperado = GeradorPlaylist.empacotar(aceitas[:3], 900, GeradorPlaylist.pontuacao)
+        esperado.sort(key=GeradorPlaylist.pontuacao, reverse=True)
+        assert GeradorPlaylist(indices, candidatos=3).gerar(900, artista="artista 2", criterio="popular") == esperado
+
+
+def test_entradas_invalidas():
+    indices, _ = _indices(30)
+    gerador = GeradorPlaylist(indices)
+    assert gerador.gerar(0) == [] and gerador.gerar(-10) == []
+    assert gerador.gerar(600, genero="Inexistente") == []
+    with pytest.raises(ValueError):
+        gerador.gerar(600, criterio="aleatorio")
+
+
+# Pelo app: sem o histórico recente do usuário; salva ou não no app
+def test_gerar_playlist_pelo_app(app_sintetico):
+    app = app_sintetico(musicas=60, usuarios=1, playlists=0)
+    u = app.usuarios[0]
+    for m in app.musicas[:40]:
+        app.reproduzir_midia(u, m, interativo=False)
+    pl = app.gerar_playlist(u, "Automatica", 3600, recentes=40, semente=2)
+    assert pl.itens and all(m in app.musicas[40:] for m in pl.itens)
+    assert sum(m.duracao for m in pl.itens) <= 3600 and not any(m in app.podcasts for m in pl.itens)
+    assert app.buscar_playlist("Automatica") is pl and pl.dono == u.nome
+    rascunho = app.gerar_playlist(u, "Rascunho", 600, salvar=False, semente=2)
+    assert app.buscar_playlist("Rascunho") is None and sum(m.duracao for m in rascunho.itens) <= 600
@@ -0,0 +1,110 @@
+# tests/test_ids.py
+"""Registro de IDs: renomeações pelo app (catálogo, busca, banco) e coleta de nomes."""
+import contextlib
+import gc
+
+import pytest
+
+from main import StreamingApp
+from Streaming.arquivo_midia import Musica
+from Streaming.ids import EspacoIds, ListaIds
+
+
+# Catálogo e busca passam a usar o título novo; o antigo fica livre
+def test_renomear_midia_pelo_app(app_sintetico):
+    app = app_sintetico(musicas=20, usuarios=1, playlists=0)
+    m, u = app.musicas[0], app.usuarios[0]
+    app.reproduzir_midia(u, m, interativo=False)
+    assert app.renomear_midia(m, "Faixa Renomeada")
+    assert app.buscar_midia("faixa renomeada") is m and app.buscar_midia("Musica 0") is None
+    assert list(u.historico) == ["Faixa Renomeada"]
+    assert app.buscar_midias("renomeada") == [m]
+    assert app.adicionar_midia(Musica("Musica 0", 100, "Outro", "Rock"))
+    with pytest.raises(ValueError):
+        app.renomear_midia(m, "musica 1")
+    assert m.titulo == "Faixa Renomeada" and app.buscar_midias("renomeada") == [m]
+    assert not app.renomear_midia(Musica("Fora do Catalogo", 100, "X", "Y"), "Outro Nome")
+
+
+# Dono renomeado aparece nas playlists; antes disso vale a grafia informada
+def test_renomear_usuario_e_playlist(app_sintetico):
+    app = app_sintetico(musicas=10, usuarios=2, playlists=0)
+    u = app.usuarios[0]
+    pl = app.criar_playlist("ouvinte 0", "Minha")
+    assert pl.dono == "ouvinte 0" and pl.dono_id == u.id
+    with pytest.raises(ValueError):
+        app.renomear_usuario(u, "ouvinte 1")
+    assert app.renomear_usuario(u, "nova ouvinte")
+    assert u.nome == "Nova Ouvinte" and pl.dono == "Nova Ouvinte"
+    assert app.buscar_usuario("Ouvinte 0") is None and app.buscar_usuario("nova ouvinte") is u
+    assert app.renomear_playlist(pl, "Preferidas")
+    assert app.buscar_playlist("Preferidas") is pl and app.buscar_playlist("Minha") is None
+
+
+# O banco guarda os nomes novos: reaberto, o app não volta aos antigos
+def test_renomeacoes_sobrevivem_ao_reabrir(tmp_path):
+    caminho = tmp_path / "streaming.db"
+    app = StreamingApp()
+    app.abrir_armazenamento(caminho)
+    app.adicionar_midias([Musica("Song A", 200, "Artista", "Pop"), Musica("Song B", 180, "Artista", "Pop")])
+    u = app.criar_novo_usuario("Ana")
+    pl = app.criar_playlist(u, "Favoritas")
+    with contextlib.redirect_stdout(None):
+        pl.adicionar_midia("Song A", app.catalogo)
+    app.reproduzir_midia(u, app.musicas[0], interativo=False)
+    app.renomear_midia(app.musicas[0], "Song C")
+    app.renomear_usuario(u, "Bia")
+    app.renomear_playlist(pl, "Preferidas")
+    app.fechar()
+
+    novo = StreamingApp()
+    novo.abrir_armazenamento(caminho)
+    try:
+        m = novo.buscar_midia("Song C")
+        assert m is not None and novo.buscar_midia("Song A") is None
+        u = novo.buscar_usuario("Bia")
+        assert u is not None and novo.buscar_usuario("Ana") is None
+        assert list(u.historico) == ["Song C"]
+        pl = novo.buscar_playlist("Preferidas")
+        assert pl is not None and pl.dono == "Bia" and pl.itens == [m]
+    finally:
+        novo.fechar()
+
+
+# Nomes que ninguém referencia são liberados e reaproveitados; os referenciados ficam
+def test_coleta_libera_nomes_sem_referencia(app_sintetico):
+    app = app_sintetico(musicas=10, usuarios=1, playlists=2)
+    u = app.usuarios[0]
+    espaco = app.ids.playlists
+    antes = [(p.id, p.nome) for p in app.playlists]
+    for i in range(100):
+        app.criar_playlist(u, f"Temporaria {i}")
+        app.excluir_playlist(f"Temporaria {i}")
+    # Mídia fora do catálogo que continua no histórico: o título não pode sumir
+    m = app.musicas[0]
+    app.reproduzir_midia(u, m, interativo=False)
+    app.remover_midias([m])
+    del m
+    gc.collect()
+    for e in (espaco, app.ids.midias):
+        e.coletar()
+        e.coletar()
+    assert len(espaco) == len(app.playlists) == 2
+    assert [(p.id, p.nome) for p in app.playlists] == antes
+    assert all(espaco.nome(i) == nome for i, nome in antes)
+    assert list(u.historico) == ["Musica 0"]
+    livres = len(espaco._nomes)
+    nova = app.criar_playlist(u, "Depois")
+    assert nova.id < livres and espaco.nome(nova.id) == "Depois"
+
+
+# Coleta automática: com rotatividade, o espaço não cresce junto com os nomes criados
+def test_espaco_com_rotatividade_fica_limitado():
+    espaco = EspacoIds("teste")
+    espaco.COLETA_MINIMA = espaco._limiar = 16
+    guardados = ListaIds(espaco, ["fica 1", "fica 2"])
+    for i in range(5000):
+        espaco.id(f"temporario {i}")
+    assert len(espaco._nomes) < 100
+    assert list(guardados) == ["fica 1", "fica 2"]
+    assert espaco.procurar("fica 2") == guardados.ids[1]
@@ -0,0 +1,42 @@
+# tests/test_imports.py
+"""Imports preguiçosos e orçamento de tempo de import (python -X importtime)."""
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import RAIZ
+
+# Tempo máximo de import por módulo (cumulativo, em ms) e medições por módulo:
+# vale a menor, as outras só somam ruído da máquina
+ORCAMENTO_MS = 35.0
+REPETICOES = 3
+
+
+# Roda "python -X importtime -c 'import <modulo>'" e devolve o tempo cumulativo do módulo em ms
+def _medir_import(modulo: str) -> float:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                          cwd=RAIZ, capture_output=True, text=True, check=True)
+    # Linhas no formato: "import time:  self [us] | cumulative | imported package"
+    for linha in proc.stderr.splitlines():
+        partes = linha[len("import time:"):].split("|")
+        if linha.startswith("import time:") and len(partes) == 3 and partes[2].strip() == modulo:
+            return int(partes[1]) / 1000
+    raise AssertionError(f"{modulo} não aparece na saída de -X importtime")
+
+
+# Importar o cli e o main não carrega as classes do pacote (só ao montar o app)
+def test_imports_preguicosos():
+    codigo = ("import sys, cli, main, Streaming; "
+              "print(sorted(m for m in sys.modules if m.startswith(('Streaming.', 'config.'))))")
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == "[]"
+
+
+# O cli.py importa o main ao montar o app, então main entra no orçamento
+@pytest.mark.parametrize("modulo", ["Streaming", "cli", "main", "config.lermarkdown"])
+def test_tempo_de_import_no_orcamento(modulo):
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "Streaming", "config", "cli.py", "main.py"],
+                   cwd=RAIZ, check=True)    # mede o import, não a compilação dos .py
+    melhor = min(_medir_import(modulo) for _ in range(REPETICOES))
+    assert melhor <= ORCAMENTO_MS, f"import {modulo}: {melhor:.1f} ms (orçamento {ORCAMENTO_MS} ms)"
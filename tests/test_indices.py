@@ -0,0 +1,70 @@
+# tests/test_indices.py
+"""Índices secundários x filtragem direta no catálogo."""
+import random
+
+from Streaming.arquivo_midia import Musica, Podcast
+from Streaming.indices import IndicesCatalogo
+
+
+def _midias(semente=5):
+    rnd = random.Random(semente)
+    musicas = [Musica(f"Faixa {i}", rnd.randint(60, 600), f"Artista {i % 9}", ["Rock", "pop ", "Jazz"][i % 3])
+               for i in range(300)]
+    podcasts = [Podcast(f"Episodio {i}", rnd.randint(600, 3600), "Autor", rnd.randint(1, 40),
+                        f"T{i % 3}", ["Ana", "Rui"][i % 2]) for i in range(60)]
+    return musicas, podcasts
+
+
+# Consultas por artista, gênero/duração, episódios e duração iguais às filtragens diretas
+def test_consultas_iguais_a_filtragem():
+    musicas, podcasts = _midias()
+    indices = IndicesCatalogo()
+    for m in musicas + podcasts:
+        indices.adicionar(m)
+    todas = musicas + podcasts
+    ordem = {id(m): i for i, m in enumerate(todas)}
+
+    assert indices.por_artista(" artista 3 ") == [m for m in todas if m.artista == "Artista 3"]
+    esperado = sorted((m for m in musicas if m.genero.strip().lower() == "pop" and 120 <= m.duracao <= 240),
+                      key=lambda m: (m.duracao, ordem[id(m)]))
+    assert indices.por_genero("POP", 120, 240) == esperado
+    esperado = sorted((p for p in podcasts if p.host == "Rui" and p.temporada == "T1"),
+                      key=lambda p: (p.episodio, ordem[id(p)]))
+    assert indices.episodios("rui", "t1") == esperado
+    assert [p.episodio for p in indices.episodios("Rui", "T1", 5, 20)] == \
+        [p.episodio for p in esperado if 5 <= p.episodio <= 20]
+    assert indices.por_duracao(300, 310) == sorted((m for m in todas if 300 <= m.duracao <= 310),
+                                                   key=lambda m: (m.duracao, ordem[id(m)]))
+    assert {(h, t) for h, t, _ in indices.temporadas()} == {(h, f"T{t}") for h in ("Ana", "Rui") for t in range(3)}
+    # visao: o índice mais seletivo; o resto dos filtros é conferido nos candidatos
+    lista, ini, fim = indices.visao(genero="jazz", artista="Artista 0", duracao_max=200)
+    casa = [m for m in lista[ini:fim]
+            if m.genero == "Jazz" and m.artista == "Artista 0" and m.duracao <= 200]
+    assert sorted(casa, key=id) == sorted((m for m in musicas if m.genero == "Jazz"
+                                           and m.artista == "Artista 0" and m.duracao <= 200), key=id)
+    assert fim - ini <= min(len(indices.por_artista("Artista 0")), len(indices.por_genero("jazz", None, 200)))
+
+
+# Remoção tira a mídia de todos os índices (e os grupos vazios somem)
+def test_remocao():
+    musicas, podcasts = _midias()
+    indices = IndicesCatalogo()
+    for m in musicas[:3] + podcasts[:1]:
+        indices.adicionar(m)
+    assert indices.remover(musicas[0]) and not indices.remover(musicas[0])
+    assert musicas[0] not in indices and len(indices) == 3
+    assert indices.por_artista("Artista 0") == [] and indices.por_genero("Rock") == []
+    assert indices.remover(podcasts[0])
+    assert indices.temporadas() == [] and indices.por_host(podcasts[0].host) == []
+
+
+# app.navegar combina filtros; alterar o gênero move a mídia de grupo
+def test_navegar_e_atualizar(app_sintetico):
+    app = app_sintetico(musicas=80, usuarios=1, playlists=0)
+    esperado = [m for m in app.musicas if m.genero == "Genero 1" and m.artista == "Artista 2"]
+    achados = app.navegar(genero="genero 1", artista="artista 2")
+    assert sorted(achados, key=id) == sorted(esperado, key=id) and achados
+    m = esperado[0]
+    assert app.atualizar_midia(m, genero="Genero Novo", duracao=1)
+    assert app.navegar(genero="Genero Novo") == [m] and m not in app.navegar(genero="Genero 1")
+    assert app.navegar(duracao_max=1) == [m]
@@ -0,0 +1,67 @@
+# tests/test_inquilinos.py
+"""Vários inquilinos no mesmo processo: roteamento, descarte LRU e snapshots."""
+from Streaming.arquivo_midia import Musica
+from Streaming.ids import IDS
+from Streaming.inquilinos import RoteadorInquilinos
+
+
+def _criar(app, inquilino):
+    app.adicionar_midias([Musica(f"Musica {i}", 120, "Artista", "Pop") for i in range(20)])
+    u = app.criar_novo_usuario("Ana")
+    app.criar_playlist(u, "Favoritas")
+
+
+# Nomes, renomeações e reproduções de um inquilino não afetam o outro nem o registro
+# global; os nomes novos continuam valendo depois do descarte
+def test_inquilinos_isolados(tmp_path):
+    nomes_globais = (len(IDS.midias), len(IDS.usuarios), len(IDS.playlists))
+    roteador = RoteadorInquilinos(tmp_path, max_ativos=2, criar=_criar)
+    with roteador.usar("a") as a, roteador.usar("b") as b:
+        assert a is not b and a.musicas[0] is not b.musicas[0]
+        for app in (a, b):
+            app.reproduzir_midia(app.usuarios[0], app.musicas[0], interativo=False)
+        a.reproduzir_midia(a.usuarios[0], a.musicas[1], interativo=False)
+        assert (a.musicas[0].reproducoes, b.musicas[0].reproducoes, b.musicas[1].reproducoes) == (1, 1, 0)
+        assert list(b.usuarios[0].historico) == ["Musica 0"]
+        a.renomear_midia(a.musicas[0], "Faixa de A")
+        a.renomear_usuario(a.usuarios[0], "Bia")
+        assert (b.musicas[0].titulo, b.usuarios[0].nome, b.playlists[0].dono) == ("Musica 0", "Ana", "Ana")
+    roteador.descarregar_todos()
+    assert (len(IDS.midias), len(IDS.usuarios), len(IDS.playlists)) == nomes_globais
+    with roteador.usar("a") as a:
+        assert a.buscar_midia("Faixa de A") is a.musicas[0] and a.buscar_midia("Musica 0") is None
+        assert (a.usuarios[0].nome, a.playlists[0].dono) == ("Bia", "Bia")
+        assert list(a.usuarios[0].historico) == ["Faixa de A", "Musica 1"]
+    roteador.descarregar_todos()
+
+
+# Só max_ativos ficam em memória; o descartado volta do snapshot com contadores e históricos
+def test_descarte_lru_preserva_o_estado(tmp_path):
+    roteador = RoteadorInquilinos(tmp_path, max_ativos=2, fragmentos=4, criar=_criar)
+    for n in range(3):
+        for inquilino in ("a", "b", "c", "d"):
+            with roteador.usar(inquilino) as app:
+                app.reproduzir_midia(app.usuarios[0], app.musicas[n], interativo=False)
+            assert len(roteador.ativos()) <= 2
+    assert roteador.descartes >= 8
+    with roteador.usar("a") as a:
+        assert [m.reproducoes for m in a.musicas[:4]] == [1, 1, 1, 0]
+        assert list(a.usuarios[0].historico) == ["Musica 0", "Musica 1", "Musica 2"]
+        assert a.playlists[0].dono == "Ana"
+    roteador.descarregar_todos()
+
+
+# Um inquilino em uso nunca é descartado, mesmo passando do limite
+def test_inquilino_em_uso_nao_e_descartado(tmp_path):
+    roteador = RoteadorInquilinos(tmp_path, max_ativos=1, criar=_criar)
+    with roteador.usar("a") as a:
+        with roteador.usar("b"):
+            pass
+        with roteador.usar("c"):
+            pass
+        assert "a" in roteador.ativos()
+        a.reproduzir_midia(a.usuarios[0], a.musicas[0], interativo=False)
+    roteador.descarregar_todos()
+    with roteador.usar("a") as a:
+        assert a.musicas[0].reproducoes == 1
+    roteador.descarregar_todos()
@@ -0,0 +1,60 @@
+# tests/test_leitores.py
+"""Formatos de entrada do catálogo: .md, .csv, .jsonl e .spod."""
+import pytest
+
+from config.leitores import LEITORES, LeitorCSV, LeitorJSONL, converter, leitor_para, ler_arquivo, secao_canonica
+from tests.conftest import RAIZ
+
+
+# Fluxo comparável: seções canônicas e campos vazios fora (como a chave ausente no Markdown)
+def _fluxo(secoes):
+    return [(secao_canonica(nome), [{k: v for k, v in r.items() if v not in ("", None, [])} for r in regs])
+            for nome, regs in secoes]
+
+
+# Conversão entre formatos: o destino relido produz o mesmo fluxo de registros
+@pytest.mark.parametrize("extensao", sorted(LEITORES))
+@pytest.mark.parametrize("origem", sorted((RAIZ / "config").glob("*.md")), ids=lambda p: p.stem)
+def test_leitores_ida_e_volta(tmp_path, origem, extensao):
+    secoes = ler_arquivo(origem)
+    destino = tmp_path / f"catalogo{extensao}"
+    destino.write_bytes(leitor_para(destino).escrever(secoes))
+    assert _fluxo(ler_arquivo(destino)) == _fluxo(secoes)
+
+
+def test_converter_entre_formatos(tmp_path):
+    origem = RAIZ / "config" / "Exemplo Entrada - 1.md"
+    binario, csv = tmp_path / "catalogo.spod", tmp_path / "catalogo.csv"
+    assert converter(origem, binario) == sum(len(r) for _, r in ler_arquivo(origem))
+    converter(binario, csv)
+    assert _fluxo(ler_arquivo(csv)) == _fluxo(ler_arquivo(origem))
+
+
+def test_jsonl_escalares_viram_texto():
+    dados = (b'{"secao": "musicas", "titulo": 1999, "artista": "Prince", "duracao": 379, "explicita": true}\n'
+             b'{"secao": "playlists", "nome": "Anos 80", "usuario": "Ana", "itens": [1999, "Purple Rain"],'
+             b' "reproducoes": null}\n')
+    assert LeitorJSONL().ler(dados) == [
+        ("musicas", [{"titulo": "1999", "artista": "Prince", "duracao": "379", "explicita": "true"}]),
+        ("playlists", [{"nome": "Anos 80", "usuario": "Ana", "itens": ["1999", "Purple Rain"]}]),
+    ]
+
+
+@pytest.mark.parametrize("linha, erro", [
+    (b'{"secao": "musicas", "titulo": {"a": 1}}', "deve ser texto ou número"),
+    (b'{"secao": "playlists", "nome": "X", "itens": "Hello"}', "deve ser uma lista"),
+    (b'{"secao": "playlists", "nome": "X", "itens": [["Hello"]]}', "item inválido"),
+    (b'["musicas"]', "esperado um objeto JSON"),
+    (b'{"secao": "musicas", "titulo": ', "JSON inválido"),
+])
+def test_jsonl_rejeita_valores_aninhados(linha, erro):
+    with pytest.raises(ValueError, match=erro):
+        LeitorJSONL().ler(b'{"secao": "usuarios", "nome": "Ana"}\n' + linha + b"\n")
+
+
+def test_csv_listas_e_coluna_secao():
+    dados = "secao,nome,usuario,itens\nPlaylists,Treino,Ana,Hello | Purple Rain\n".encode("utf-8")
+    assert LeitorCSV().ler(dados) == [("playlists", [{"nome": "Treino", "usuario": "Ana",
+                                                      "itens": ["Hello", "Purple Rain"]}])]
+    with pytest.raises(ValueError, match="secao"):
+        LeitorCSV().ler(b"nome\nAna\n")
@@ -0,0 +1,85 @@
+# tests/test_observador.py
+"""Observador de config/: aplica só o que mudou, depois da espera da rajada."""
+import contextlib
+
+import pytest
+
+from Streaming.arquivo_midia import Musica
+from Streaming.observador import ObservadorConfig
+
+REGISTRO = "- titulo: Hello\n    artista: Adele\n    genero: Pop\n    duracao: {}\n"
+PLAYLIST = "\n---\n\n# Playlists\n\n- nome: Baladas\n    usuario: Ana\n    itens: [{}]\n"
+
+
+def _catalogo(duracao, itens=None):
+    texto = f"---\n\n# Usuários\n\n- nome: Ana\n\n---\n\n# Músicas\n\n{REGISTRO.format(duracao)}"
+    texto += "- titulo: Someone Like You\n    artista: Adele\n    genero: Pop\n    duracao: 285\n"
+    return texto + (PLAYLIST.format(itens) if itens else "") + "\n---\n"
+
+
+# Relógio manual: a espera da rajada é conferida sem dormir
+class _Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+@pytest.fixture
+def observado(tmp_path, app_sintetico):
+    catalogo = tmp_path / "catalogo.md"
+    catalogo.write_text(_catalogo(295), encoding="utf-8")
+    app = app_sintetico(musicas=0, usuarios=0, playlists=0)
+    app.criar_novo_usuario("Ana")
+    app.adicionar_midias([Musica("Hello", 295, "Adele", "Pop"), Musica("Someone Like You", 285, "Adele", "Pop")])
+    relogio = _Relogio()
+    observador = ObservadorConfig(app, pasta=tmp_path, espera=0.5, relogio=relogio)
+
+    def editar(texto):
+        # Tamanho novo garante (mtime, tamanho) diferente mesmo no mesmo instante
+        catalogo.write_text(texto, encoding="utf-8")
+        with contextlib.redirect_stdout(None):
+            return observador.verificar()
+
+    return app, observador, relogio, editar
+
+
+# A edição de um registro chega ao app sem reimportar, só depois da espera
+def test_registro_editado_aplicado_depois_da_espera(observado):
+    app, observador, relogio, editar = observado
+    assert editar(_catalogo(2960)) == []
+    assert observador.pendentes() == ["catalogo.md"]
+    assert app.buscar_midia("Hello").duracao == 295
+    relogio.agora += 1
+    with contextlib.redirect_stdout(None):
+        aplicados = observador.verificar()
+    assert [(r["registros_alterados"], r["midias_atualizadas"]) for r in aplicados] == [(1, 1)]
+    assert app.buscar_midia("Hello").duracao == 2960
+    assert app.buscar_midia("Someone Like You").duracao == 285
+
+
+# Playlist nova e depois com itens trocados; nada muda se o arquivo não mudou
+def test_playlist_criada_e_alterada(observado):
+    app, observador, relogio, editar = observado
+    editar(_catalogo(295, "Hello"))
+    relogio.agora += 1
+    with contextlib.redirect_stdout(None):
+        assert observador.verificar()[0]["playlists"] == 1
+    assert [m.titulo for m in app.buscar_playlist("Baladas").itens] == ["Hello"]
+    editar(_catalogo(295, "Hello, Someone Like You"))
+    relogio.agora += 1
+    with contextlib.redirect_stdout(None):
+        assert observador.verificar()[0]["playlists_atualizadas"] == 1
+        assert observador.verificar() == []
+    assert [m.titulo for m in app.buscar_playlist("Baladas").itens] == ["Hello", "Someone Like You"]
+
+
+# Arquivo inválido (ex.: ainda sendo gravado) mantém a versão anterior
+def test_arquivo_invalido_mantem_o_anterior(tmp_path, observado):
+    app, observador, relogio, _ = observado
+    (tmp_path / "extra.jsonl").write_text('{"secao": "musicas", "titulo": ', encoding="utf-8")
+    with contextlib.redirect_stdout(None):
+        resumo, = observador.verificar(forcar=True)
+    assert resumo["arquivo"] == "extra.jsonl" and "JSON inválido" in resumo["falha"]
+    assert len(app.musicas) == 2
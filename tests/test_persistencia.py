@@ -0,0 +1,83 @@
+# tests/test_persistencia.py
+"""Persistência em SQLite: o app reaberto tem o mesmo estado; o menu só usa banco se pedido."""
+import contextlib
+import random
+
+from main import CAMINHO_BANCO, StreamingApp, caminho_banco
+from Streaming.arquivo_midia import Musica, Podcast
+
+
+# Tudo que o banco guarda, em forma comparável. No banco, a mídia removida sai
+# também dos históricos e das playlists ('removidas' tira esses títulos)
+def _estado(app, removidas=()):
+    return {
+        "midias": sorted((m.__class__.__name__, m.titulo, m.duracao, m.artista, getattr(m, "genero", None),
+                          m.reproducoes, list(getattr(m, "avaliacoes", None) or [])) for m in app.catalogo),
+        "usuarios": sorted((u.nome, [t for t in u.historico if t not in removidas], sorted(u.playlists))
+                           for u in app.usuarios),
+        "playlists": sorted((p.nome, p.dono, [m.titulo for m in p.itens if m.titulo not in removidas],
+                             p.reproducoes) for p in app.playlists),
+    }
+
+
+def _abrir(caminho, **parametros):
+    app = StreamingApp()
+    carregados = app.abrir_armazenamento(caminho, **parametros)
+    return app, carregados
+
+
+# Inclusões, reproduções, avaliações, edições e exclusões sobrevivem ao reabrir
+def test_ida_e_volta(tmp_path):
+    caminho = tmp_path / "streaming.db"
+    app, carregados = _abrir(caminho, lote=7)
+    assert carregados == {"midias": 0, "usuarios": 0, "playlists": 0}
+    app.adicionar_midias([Musica(f"Faixa {i}", 100 + i, f"Artista {i % 3}", "Rock") for i in range(20)]
+                         + [Podcast("Papo 1", 1800, "Autor", 1, "T1", "Host")])
+    usuarios = [app.criar_novo_usuario(f"Ouvinte {i}") for i in range(3)]
+    rnd = random.Random(6)
+    with contextlib.redirect_stdout(None):
+        for i, u in enumerate(usuarios):
+            pl = app.criar_playlist(u, f"Lista {i}")
+            for m in rnd.sample(app.musicas, 4):
+                pl.adicionar_midia(m.titulo, app.catalogo)
+        for _ in range(300):
+            u = rnd.choice(usuarios)
+            if rnd.random() < 0.1:
+                app.reproduzir_playlist(u, rnd.choice(app.playlists), interativo=False)
+            else:
+                app.reproduzir_midia(u, rnd.choice(app.musicas + app.podcasts), interativo=False)
+            if rnd.random() < 0.2:
+                rnd.choice(app.musicas).registrar_avaliacao(rnd.randint(0, 5))
+    app.atualizar_midia(app.musicas[0], genero="Jazz", duracao=999)
+    removidas = {m.titulo for m in app.remover_midias(app.musicas[1:3])}
+    app.excluir_playlist("Lista 2")
+    app.concatenar_playlists("Lista 0", "Lista 1")
+    esperado = _estado(app, removidas)
+    app.fechar()
+
+    reaberto, carregados = _abrir(caminho)
+    try:
+        assert carregados == {"midias": 19, "usuarios": 3, "playlists": len(esperado["playlists"])}
+        # O histórico só é lido quando acessado, mas o tamanho já vem do banco
+        u = reaberto.buscar_usuario("Ouvinte 0")
+        n = len(u.historico)
+        assert n and not u.historico.carregada()
+        assert len(list(u.historico)) == n and u.historico.carregada()
+        assert _estado(reaberto) == esperado
+        # Mudanças depois de reabrir continuam sendo gravadas
+        reaberto.reproduzir_midia(u, reaberto.musicas[0], interativo=False)
+        esperado = _estado(reaberto)
+    finally:
+        reaberto.fechar()
+    terceiro, _ = _abrir(caminho)
+    try:
+        assert _estado(terceiro) == esperado
+    finally:
+        terceiro.fechar()
+
+
+# O menu só abre banco com STREAMING_BANCO
+def test_banco_do_menu_opcional(tmp_path):
+    assert caminho_banco({}) is None and caminho_banco({"STREAMING_BANCO": " 0 "}) is None
+    assert caminho_banco({"STREAMING_BANCO": "1"}) == CAMINHO_BANCO
+    assert caminho_banco({"STREAMING_BANCO": str(tmp_path / "outro.db")}) == tmp_path / "outro.db"
@@ -0,0 +1,76 @@
+# tests/test_recomendacao.py
+"""Recomendador por coocorrência x similaridade calculada par a par."""
+import random
+from math import sqrt
+
+from Streaming.recomendacao import Recomendador
+
+
+# Cosseno das coocorrências a até 'janela' posições, calculado sobre todos os pares
+def _similaridades(sequencias, janela):
+    co, oc = {}, {}
+    for ids in sequencias:
+        for i, a in enumerate(ids):
+            oc[a] = oc.get(a, 0) + 1
+            for j, b in enumerate(ids):
+                if 0 < i - j <= janela and a != b:
+                    co[(a, b)] = co.get((a, b), 0) + 1
+                    co[(b, a)] = co.get((b, a), 0) + 1
+    return {par: c / sqrt(oc[par[0]] * oc[par[1]]) for par, c in co.items()}
+
+
+def _sequencias(app):
+    return ([[m.id for m in pl.itens] for pl in app.playlists]
+            + [u.historico.ids.tolist() for u in app.usuarios])
+
+
+# Vizinhos de cada mídia: os K mais similares, empate pelo menor id
+def _conferir(rec, sequencias):
+    sim = _similaridades(sequencias, rec.janela)
+    for a in {a for a, _ in sim}:
+        esperado = sorted(((b, s) for (x, b), s in sim.items() if x == a), key=lambda v: (-v[1], v[0]))[:rec.k]
+        obtido = rec.vizinhos(a)
+        assert [b for b, _ in obtido] == [b for b, _ in esperado]
+        assert all(abs(s - t) < 1e-12 for (_, s), (_, t) in zip(obtido, esperado))
+
+
+# Montagem inicial e atualização pelas reproduções iguais ao cálculo par a par
+def test_vizinhos_iguais_ao_calculo_direto(app_sintetico):
+    app = app_sintetico(musicas=40, usuarios=6, playlists=8)
+    rnd = random.Random(5)
+    for u in app.usuarios:
+        for _ in range(30):
+            app.reproduzir_midia(u, rnd.choice(app.musicas[:15]), interativo=False)
+    rec = app.ativar_recomendacoes(k=8, janela=3)
+    _conferir(rec, _sequencias(app))
+    # Reproduções depois da montagem, uma a uma e em lote ('posicao')
+    for u in app.usuarios:
+        for _ in range(20):
+            app.reproduzir_midia(u, rnd.choice(app.musicas), interativo=False)
+        u.registrar_reproducoes([m.titulo for m in rnd.sample(app.musicas, 6)])
+    _conferir(rec, _sequencias(app))
+    novo = Recomendador(app.catalogo, k=8, janela=3).construir(app.playlists, app.usuarios)
+    assert all(novo.vizinhos(a) == rec.vizinhos(a) for a in list(novo._co))
+
+
+# Sugestões não repetem o que o usuário acabou de ouvir nem o que a playlist tem
+def test_sugestoes(app_sintetico):
+    app = app_sintetico(musicas=30, usuarios=2, playlists=0)
+    a, b, c, d = app.musicas[:4]
+    u, v = app.usuarios
+    # 'v' sempre ouve a -> b -> c; 'u' só ouviu 'a'
+    for _ in range(5):
+        for m in (a, b, c):
+            app.reproduzir_midia(v, m, interativo=False)
+    app.reproduzir_midia(u, a, interativo=False)
+    sugestoes = app.recomendar(usuario=u, n=5)
+    assert [m for m, _ in sugestoes][:2] == [b, c] and a not in [m for m, _ in sugestoes]
+    pl = app.criar_playlist(u, "Inicio")
+    pl.itens.append(a)
+    pl.itens.append(b)
+    assert [m for m, _ in app.recomendar(playlist=pl, n=5)] == [c]
+    # Mídia fora do catálogo não é sugerida
+    app.remover_midias([b])
+    assert b not in [m for m, _ in app.recomendar(usuario=u, n=5)]
+    assert app.recomendar(usuario=app.criar_novo_usuario("Sem Historico")) == []
+    assert app.recomendar() == [] and d not in [m for m, _ in app.recomendar(usuario=u)]
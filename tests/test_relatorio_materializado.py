@@ -0,0 +1,54 @@
+# tests/test_relatorio_materializado.py
+"""Relatório materializado pelos eventos x relatório recalculado do zero."""
+import contextlib
+import random
+from datetime import datetime
+
+from Streaming.analises import Analises
+
+
+# Mudar o top_n re-renderiza todas as seções: as comparações depois das alterações
+# usam o mesmo top_n da anterior, para só as seções sujas serem refeitas
+def _comparar(app, tops=(10,)) -> None:
+    agora = datetime.now()
+    for top in tops:
+        completo = Analises.montar_relatorio(app.musicas, app.playlists, app.usuarios, top,
+                                             indices=app.indices, series=app.series, gerado_em=agora)
+        assert app.relatorio.linhas(top, series=app.series, gerado_em=agora) == completo
+
+
+# Reproduções, avaliações, alterações, remoções, itens novos e renomeações
+def test_relatorio_materializado_igual_ao_completo(app_sintetico):
+    app = app_sintetico()
+    rnd = random.Random(7)
+    midias = app.musicas + app.podcasts
+    for n in range(3000):
+        usuario = rnd.choice(app.usuarios)
+        if n % 50 == 0:
+            app.reproduzir_playlist(usuario, rnd.choice(app.playlists), interativo=False)
+        else:
+            app.reproduzir_midia(usuario, rnd.choice(midias), interativo=False)
+        if n % 7 == 0:
+            rnd.choice(app.musicas).registrar_avaliacao(rnd.randint(0, 5))
+    _comparar(app, tops=(3, 10))      # seções já renderizadas: as mudanças abaixo precisam sujá-las
+
+    app.atualizar_midia(app.musicas[0], genero="Jazz", duracao=999)
+    app.remover_midias(app.musicas[1:4])
+    app.excluir_playlist(app.playlists[0].nome)
+    app.criar_novo_usuario("Ouvinte Novo")
+    app.concatenar_playlists(app.playlists[0].nome, app.playlists[1].nome)
+    _comparar(app)
+
+    # Itens novos na playlist mais popular e renomeações do que aparece no relatório
+    popular = max(app.playlists, key=lambda p: p.reproducoes)
+    with contextlib.redirect_stdout(None):
+        popular.adicionar_midia(next(m for m in app.musicas if m not in popular.itens).titulo, app.catalogo)
+    top = max(app.musicas, key=lambda m: m.reproducoes)
+    ativo = max(app.usuarios, key=lambda u: len(u.historico))
+    app.renomear_midia(top, "Faixa Renomeada")
+    dono = app.ids.usuarios.objeto(popular.dono_id)
+    app.renomear_usuario(dono, "Dona Renomeada")
+    if ativo is not dono:
+        app.renomear_usuario(ativo, "Ouvinte Mais Ativo")
+    app.renomear_playlist(popular, "Playlist Renomeada")
+    _comparar(app)
@@ -0,0 +1,90 @@
+# tests/test_series_temporais.py
+"""Séries de reproduções em baldes de tempo e top por janela x contagem direta."""
+import random
+
+from Streaming.analises import Analises
+from Streaming.arquivo_midia import Musica
+from Streaming.series_temporais import RESOLUCOES, SerieMidia, SeriesReproducoes
+
+
+# Reproduções nos 'ultimos' baldes da resolução, contadas uma a uma
+def _contar(instantes, resolucao, ultimos, instante):
+    largura, n = RESOLUCOES[resolucao]
+    atual = int(instante // largura)
+    inicio = atual - min(ultimos, n) + 1
+    return sum(1 for t in instantes if inicio <= int(t // largura) <= atual)
+
+
+# Soma e série de cada resolução iguais à contagem direta, inclusive com baldes reaproveitados
+def test_baldes_iguais_a_contagem_direta():
+    rnd = random.Random(3)
+    inicio = 1_700_000_000.0
+    instantes = sorted(inicio + rnd.uniform(0, 40 * 86400) for _ in range(4000))
+    instantes += [instantes[-1] + i for i in range(1, 90, 3)]      # rajada no mesmo minuto e nos seguintes
+    serie = SerieMidia(Musica("Faixa", 200, "Artista", "Pop"))
+    for t in instantes:
+        serie.registrar(t)
+    fim = instantes[-1]
+    for resolucao, (largura, n) in RESOLUCOES.items():
+        for ultimos in (1, 2, n // 2, n, n + 10):
+            for instante in (fim, fim + largura, fim + n * largura):
+                assert serie.soma(resolucao, ultimos, instante) == _contar(instantes, resolucao, ultimos, instante)
+        atual = int(fim // largura)
+        esperado = [sum(1 for t in instantes if int(t // largura) == b) for b in range(atual - 6, atual + 1)]
+        assert serie.serie(resolucao, 7, fim) == esperado
+
+
+# Só mídias acompanhadas contam; esquecer descarta a série
+def test_acompanhar_e_esquecer():
+    series = SeriesReproducoes(relogio=lambda: 1000.0)
+    m, outra = Musica("A", 100, "X", "Pop"), Musica("B", 100, "X", "Pop")
+    m.id, outra.id = 1, 2
+    series.acompanhar(m)
+    series.registrar(m, qtde=3)
+    series.registrar(outra)
+    assert series.contagens_janela(60) == [(m, 3)] and len(series) == 1
+    assert series.resolucao_para(90) == ("minuto", 2)
+    assert series.resolucao_para(7200) == ("hora", 2) and series.resolucao_para(90 * 86400) == ("dia", 30)
+    series.esquecer(m)
+    assert series.contagens_janela(60) == [] and series.serie(m, "dia", 3) == [0, 0, 0]
+
+
+# Top da janela e mídias em alta pelo app, com relógio controlado
+def test_top_janela_e_em_alta(app_sintetico):
+    app = app_sintetico(musicas=30, usuarios=1, playlists=0)
+    agora = [1_700_000_000.0]
+    app.series.relogio = lambda: agora[0]
+    rnd = random.Random(11)
+    tocadas = []
+    # Um dia de fundo espalhado e, na última hora, rajadas das primeiras mídias
+    for _ in range(2000):
+        m = rnd.choice(app.musicas)
+        agora[0] += rnd.uniform(0, 40)
+        app.reproduzir_midia(None, m, interativo=False)
+        tocadas.append((agora[0], m))
+    for i in range(300):
+        m = app.musicas[i % 3]
+        agora[0] += 1
+        app.reproduzir_midia(None, m, interativo=False)
+        tocadas.append((agora[0], m))
+    fim = agora[0]
+
+    top = Analises.top_janela(app.series, 3600, 5, instante=fim)
+    contagem = {}
+    for t, m in tocadas:
+        if _contar([t], "minuto", 60, fim):
+            contagem[m.titulo] = contagem.get(m.titulo, 0) + 1
+    assert [n for _, n in top] == sorted(contagem.values(), reverse=True)[:5]
+    assert all(contagem[m.titulo] == n for m, n in top)
+    alta = Analises.em_alta(app.series, 3600, 86400, 3, instante=fim)
+    assert {m.titulo for m, _, _ in alta} == {m.titulo for m in app.musicas[:3]}
+    assert all(fator > 1 for _, _, fator in alta)
+
+    # Mídia removida sai das séries; a mesma mídia em outro app não é contada aqui
+    app.remover_midias([app.musicas[0]])
+    assert all(m.titulo != "Musica 0" for m, _ in app.series.contagens_janela(3600, fim))
+    outro = app_sintetico(musicas=5, usuarios=1, playlists=0)
+    antes = sum(n for _, n in app.series.contagens_janela(86400, fim))
+    outro.reproduzir_midia(None, outro.musicas[1], interativo=False)
+    assert sum(n for _, n in app.series.contagens_janela(86400, fim)) == antes
+    assert sum(n for _, n in outro.series.contagens_janela(60)) == 1
@@ -0,0 +1,98 @@
+# tests/test_simulacao.py
+"""Simulação de eventos discretos: ordem dos eventos, relógio virtual e métricas da audiência."""
+import pytest
+
+from Streaming.simulacao import AudienciaSimulada, Simulador
+
+
+# Mesmo instante: menor prioridade primeiro, depois a ordem de agendamento; ações agendam outras
+def test_ordem_dos_eventos_e_parada():
+    sim = Simulador(inicio=100.0)
+    feitos = []
+
+    def anotar(nome):
+        feitos.append((sim.agora, nome))
+        if nome == "a":
+            sim.agendar(0, anotar, "gerado por a", prioridade=-1)
+            sim.agendar(50, anotar, "depois")
+
+    sim.agendar(10, anotar, "b", prioridade=1)
+    sim.agendar(10, anotar, "a")
+    sim.agendar(10, anotar, "c", prioridade=1)
+    sim.agendar_em(5, anotar, "passado vira agora")
+    assert sim.proximo_instante() == 100.0
+    assert sim.rodar(ate=130) == 5 and sim.agora == 130 and len(sim) == 1
+    assert feitos == [(100.0, "passado vira agora"), (110.0, "a"), (110.0, "gerado por a"),
+                      (110.0, "b"), (110.0, "c")]
+    assert sim.rodar() == 1 and feitos[-1] == (160.0, "depois") and sim.processados == 6
+
+
+# Com velocidade, o tempo real acompanha o virtual (relógio real e espera simulados)
+def test_velocidade():
+    real = [0.0]
+    esperas = []
+
+    def dormir(segundos):
+        esperas.append(segundos)
+        real[0] += segundos
+
+    sim = Simulador(inicio=0.0, dormir=dormir, relogio_real=lambda: real[0])
+    for t in (60, 120, 600):
+        sim.agendar(t, lambda _: None)
+    sim.rodar(ate=1200, velocidade=60)
+    assert real[0] == pytest.approx(20.0) and esperas == pytest.approx([1.0, 1.0, 8.0, 10.0])
+
+
+# Picos, ouvintes agora e média iguais à varredura dos intervalos [início, fim) das faixas
+def test_audiencia_igual_aos_intervalos(app_sintetico):
+    app = app_sintetico(musicas=40, usuarios=10, playlists=4)
+    audiencia = AudienciaSimulada(app, Simulador(inicio=1_000_000.0), semente=3)
+    inicios = []
+    app.eventos.assinar("reproducao", lambda midia, **_: inicios.append((audiencia.simulador.agora, midia)))
+    antes = sum(m.reproducoes for m in app.musicas)
+    audiencia.adicionar_ouvintes(300, chegadas=900, faixas=6, aleatorio=True)
+    fim = 1_000_000.0 + 1500
+    audiencia.rodar(ate=fim)
+
+    assert len(inicios) == audiencia.iniciadas == sum(m.reproducoes for m in app.musicas) - antes
+    assert all(s.restantes >= 0 for s in audiencia.sessoes)
+    # Varredura: fim antes de início no mesmo instante
+    marcas = []
+    for t, m in inicios:
+        marcas.append((t, 1, m.id))
+        if t + m.duracao <= fim:
+            marcas.append((t + m.duracao, 0, m.id))
+    marcas.sort()
+    ativos, pico, por_midia, picos = 0, (0, None), {}, {}
+    for t, tipo, i in marcas:
+        passo = 1 if tipo else -1
+        ativos += passo
+        por_midia[i] = por_midia.get(i, 0) + passo
+        if passo > 0 and ativos > pico[0]:
+            pico = (ativos, t)
+        if passo > 0 and por_midia[i] > picos.get(i, (0,))[0]:
+            picos[i] = (por_midia[i], t)
+    assert audiencia.pico_total == pico and audiencia.ativos == ativos
+    assert {m.id: (p, t) for m, p, t in audiencia.top_picos(len(picos))} == picos
+    assert {i: n for i, n in por_midia.items() if n} == audiencia.ouvintes
+    assert all(audiencia.ouvintes_de(m) == por_midia.get(m.id, 0) for m in app.musicas)
+
+    resumo = audiencia.resumo(top=3)
+    tocado = sum(min(m.duracao, fim - t) for t, m in inicios)
+    assert resumo["media_ouvintes"] == pytest.approx(tocado / 1500, abs=1e-3)
+    assert resumo["tocando_agora"] == len(audiencia.tocando_agora()) == ativos
+    assert len(resumo["picos_por_midia"]) == 3
+    # As séries temporais usam o relógio virtual só enquanto a simulação roda
+    ultima_hora = sum(n for _, n in app.series.contagens_janela(3600, fim))
+    assert ultima_hora == len(inicios) and app.series.relogio is not audiencia.simulador.relogio
+
+
+# Sem playlists, os ouvintes tocam o catálogo; cada um toca no máximo 'faixas'
+def test_sem_playlists(app_sintetico):
+    app = app_sintetico(musicas=8, usuarios=2, playlists=0)
+    audiencia = AudienciaSimulada(app, Simulador(inicio=0.0), semente=1)
+    audiencia.adicionar_ouvintes(5, chegadas=0, faixas=3)
+    audiencia.rodar()
+    assert audiencia.iniciadas == audiencia.concluidas == 15 and audiencia.ativos == 0
+    assert audiencia.pico_total == (5, 0.0)
+    assert [len(u.historico) for u in app.usuarios] == [9, 6]       # ouvintes em rodízio pelos usuários
@@ -0,0 +1,122 @@
+# tests/test_sketches.py
+"""Sketches do modo aproximado dentro dos limites de erro documentados."""
+import bisect
+import contextlib
+import math
+import random
+
+import pytest
+
+from Streaming.analises import Analises
+from Streaming.sketches import CountMinSketch, HyperLogLog, TDigest, TopK
+
+
+# Fluxo com frequências de cauda longa (Zipf), como reproduções reais
+def _fluxo(n=50_000, itens=5_000, semente=2):
+    rnd = random.Random(semente)
+    pesos = [1 / (i + 1) for i in range(itens)]
+    return rnd.choices([f"item {i}" for i in range(itens)], weights=pesos, k=n)
+
+
+# Exato no modo esparso; depois, dentro de 4 erros padrão; combinar = união
+def test_hyperloglog():
+    hll = HyperLogLog(10)
+    for i in range(100):
+        hll.adicionar(f"u{i % 60}")
+    assert hll.contar() == 60 and hll.erro_padrao == 0.0
+    partes = [HyperLogLog(10) for _ in range(3)]
+    for i in range(30_000):
+        partes[i % 3].adicionar(f"u{i}")
+    uniao = HyperLogLog(10)
+    for p in partes:
+        uniao.combinar(p)
+    assert abs(uniao.contar() - 30_000) <= 4 * uniao.erro_padrao * 30_000
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+
+
+# Nunca subestima; passa de epsilon * N em no máximo uma fração ~delta dos itens
+def test_count_min_limites():
+    fluxo = _fluxo()
+    cms = CountMinSketch(epsilon=0.01, delta=0.05)
+    reais = {}
+    for item in fluxo:
+        cms.adicionar(item)
+        reais[item] = reais.get(item, 0) + 1
+    assert cms.epsilon <= 0.01 and cms.delta <= 0.05 and cms.total == len(fluxo)
+    limite = cms.epsilon * cms.total
+    acima = sum(1 for item, n in reais.items() if not n <= cms.estimar(item) <= n + limite)
+    assert all(cms.estimar(item) >= n for item, n in reais.items())
+    assert acima <= 2 * cms.delta * len(reais)
+
+    metade = CountMinSketch(epsilon=0.01, delta=0.05)
+    for item in fluxo[::2]:
+        metade.adicionar(item)
+    outra = CountMinSketch(epsilon=0.01, delta=0.05)
+    for item in fluxo[1::2]:
+        outra.adicionar(item)
+    metade.combinar(outra)
+    assert all(metade.estimar(i) == cms.estimar(i) for i in list(reais)[:200])
+    with pytest.raises(ValueError):
+        metade.combinar(CountMinSketch(epsilon=0.1))
+
+
+# Itens com frequência acima de epsilon * N entram no top; combinar mantém os mesmos
+def test_topk_heavy_hitters():
+    fluxo = _fluxo()
+    reais = {}
+    for item in fluxo:
+        reais[item] = reais.get(item, 0) + 1
+    top = TopK(k=10, epsilon=0.001)
+    partes = [TopK(k=10, epsilon=0.001) for _ in range(2)]
+    for i, item in enumerate(fluxo):
+        top.adicionar(item)
+        partes[i % 2].adicionar(item)
+    verdadeiros = sorted(reais, key=reais.get, reverse=True)[:10]
+    pesados = {i for i in verdadeiros if reais[i] > top.sketch.epsilon * len(fluxo)}
+    assert pesados and pesados <= {i for i, _ in top.top()}
+    assert all(reais[i] <= n <= reais[i] + top.sketch.epsilon * len(fluxo) for i, n in top.top())
+    partes[0].combinar(partes[1])
+    assert pesados <= {i for i, _ in partes[0].top()}
+
+
+# Erro de posto ~ 1/compressao no meio, menor nas caudas; combinar equivale ao fluxo único
+def test_tdigest_quantis():
+    rnd = random.Random(4)
+    valores = [rnd.lognormvariate(5, 1) for _ in range(50_000)]
+    ordenados = sorted(valores)
+    digest, a, b = TDigest(100), TDigest(100), TDigest(100)
+    for i, v in enumerate(valores):
+        digest.adicionar(v)
+        (a if i % 2 else b).adicionar(v)
+    a.combinar(b)
+    for q, tolerancia in ((0.01, 0.003), (0.5, 0.01), (0.9, 0.01), (0.99, 0.003)):
+        for d in (digest, a):
+            posto = bisect.bisect_left(ordenados, d.quantil(q)) / len(ordenados)
+            assert abs(posto - q) <= tolerancia
+    assert len(digest) <= 2 * 100 and math.isnan(TDigest().quantil(0.5))
+
+
+# Pelo app: a seção do relatório rotula as contagens como reproduções e mostra o delta
+def test_secao_aproximada(app_sintetico):
+    app = app_sintetico(musicas=40, usuarios=5, playlists=0)
+    aprox = app.ativar_analises_aproximadas(k=5)
+    rnd = random.Random(9)
+    for _ in range(2000):
+        app.reproduzir_midia(rnd.choice(app.usuarios), app.musicas[min(int(rnd.expovariate(0.3)), 39)],
+                             interativo=False)
+    with contextlib.redirect_stdout(None):
+        linhas = Analises.secao_aproximada(aprox, 5)
+    assert "Mídias mais tocadas (reproduções estimadas):" in linhas
+    assert any("com probabilidade >= 0.99" in l for l in linhas)
+    limite = aprox.midias_top.sketch.epsilon * aprox.midias_top.sketch.total
+    for titulo, n in Analises.midias_mais_tocadas_aprox(aprox, 5):
+        real = app.buscar_midia(titulo).reproducoes
+        assert real <= n <= real + limite
+    # Poucos ouvintes por mídia: o HyperLogLog ainda está no modo esparso (exato)
+    ouvintes = {}
+    for u in app.usuarios:
+        for titulo in u.historico:
+            ouvintes.setdefault(titulo, set()).add(u.nome)
+    assert Analises.ouvintes_distintos(aprox) == 5
+    assert all(Analises.ouvintes_distintos(aprox, t) == len(nomes) for t, nomes in ouvintes.items())
@@ -0,0 +1,118 @@
+# tests/test_validacao.py
+"""Modo de validação do LerMarkdown e comando validate x leitura completa."""
+import json
+
+import pytest
+
+import cli
+from config.lermarkdown import LerMarkdown
+from Streaming.ids import RegistroIds, registro_atual, usando_registro
+from tests.conftest import RAIZ
+
+COM_PROBLEMAS = """
+# Usuários
+
+- nome: Ana
+    playlists: [Favoritas]
+
+- nome: Bia
+---
+
+# Músicas
+
+- titulo: Hello
+    artista: Adele
+    genero: Pop
+    duracao: 295
+
+- titulo: hello
+    artista: Outra
+    duracao: 100
+
+- titulo: Sem Duracao
+    artista: X
+    duracao: abc
+---
+
+# Podcasts
+
+- titulo: Papo
+    temporada: T1
+    episodio: um
+    host: Rui
+    duracao: 1800
+---
+
+# Playlists
+
+- nome: Favoritas
+    usuario: Ana
+    itens: [Hello, Inexistente]
+
+- nome: Orfa
+    usuario: Ninguem
+    itens: [Hello]
+"""
+
+
+# Leitor com o log num arquivo temporário (o de logs/ fica intacto)
+def _leitor(tmp_path, **opcoes):
+    leitor = LerMarkdown(**opcoes)
+    leitor._log_file = tmp_path / "erros.log"
+    return leitor
+
+
+# Mesmos avisos, erros e aceitos da leitura completa; sem objetos nem log
+@pytest.mark.parametrize("strict", [False, True])
+@pytest.mark.parametrize("texto", [COM_PROBLEMAS] + [p.read_text(encoding="utf-8")
+                                                      for p in sorted((RAIZ / "config").glob("*.md"))],
+                         ids=lambda t: "problemas" if t is COM_PROBLEMAS else "config")
+def test_validar_igual_ao_parse(tmp_path, texto, strict):
+    registro = registro_atual()
+    antes = (len(registro.midias), len(registro.usuarios), len(registro.playlists))
+    diag = _leitor(tmp_path, strict=strict).validar(texto)
+    assert (len(registro.midias), len(registro.usuarios), len(registro.playlists)) == antes
+    assert not (tmp_path / "erros.log").exists()
+
+    with usando_registro(RegistroIds()):
+        lido = _leitor(tmp_path, strict=strict).parse(texto)
+    assert diag["avisos"] == lido["warnings"] and diag["erros"] == lido["errors"]
+    assert diag["aceitos"] == {chave: len(lido[chave]) for chave in ("usuarios", "musicas", "podcasts", "playlists")}
+    assert diag["valido"] == (not lido["errors"])
+
+
+# Problemas contados por categoria; o parser estrito transforma os inválidos em erro
+def test_diagnostico_por_categoria(tmp_path):
+    diag = _leitor(tmp_path).validar(COM_PROBLEMAS)
+    assert diag["lidos"] == {"usuários": 2, "músicas": 3, "podcasts": 1, "playlists": 2}
+    assert diag["aceitos"] == {"usuarios": 2, "musicas": 1, "podcasts": 1, "playlists": 1}
+    assert diag["problemas"] == {"dono_inexistente": 1, "duplicado": 1, "duracao_invalida": 1,
+                                 "episodio_invalido": 1, "item_inexistente": 2}
+    assert not diag["valido"] and len(diag["erros"]) == 1
+    rigoroso = _leitor(tmp_path, strict=True).validar(COM_PROBLEMAS)
+    assert rigoroso["aceitos"]["podcasts"] == 0
+    assert len(rigoroso["erros"]) == len(diag["erros"]) + 2
+
+
+# Códigos de saída do comando: 0 válido, 3 com erros (ou avisos com --estrito), 1 falha de leitura
+def test_comando_validate(tmp_path, capsys):
+    limpo = tmp_path / "limpo.md"
+    limpo.write_text("# Músicas\n- titulo: Hello\n    artista: Adele\n    genero: Pop\n    duracao: 295\n",
+                     encoding="utf-8")
+    com_aviso = tmp_path / "aviso.md"
+    com_aviso.write_text("# Músicas\n- titulo: Hello\n    duracao: x\n", encoding="utf-8")
+    problemas = tmp_path / "problemas.md"
+    problemas.write_text(COM_PROBLEMAS, encoding="utf-8")
+
+    def rodar(*argv):
+        codigo = cli.main(["validate", *map(str, argv)])
+        return codigo, json.loads(capsys.readouterr().out)
+
+    codigo, saida = rodar(limpo)
+    assert codigo == cli.SAIDA_OK and saida["valido"] and saida["arquivos"][0]["aceitos"]["musicas"] == 1
+    assert rodar(com_aviso)[0] == cli.SAIDA_OK and rodar(com_aviso, "--estrito")[0] == cli.SAIDA_DADOS
+    codigo, saida = rodar(problemas, "--limite", "1")
+    assert codigo == cli.SAIDA_DADOS and not saida["valido"]
+    assert saida["arquivos"][0]["qtde_avisos"] == 5 and len(saida["arquivos"][0]["avisos"]) == 1
+    codigo, saida = rodar(limpo, tmp_path / "ausente.md")
+    assert codigo == cli.SAIDA_FALHA and len(saida["falhas"]) == 1